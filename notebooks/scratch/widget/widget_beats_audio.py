@@ -110,7 +110,7 @@ def build_beat_sonification_audio(
         x: Mono waveform.
         sr: Sample rate.
         beat_times: Beat onset times in seconds.
-        labels: Nx3 array (time_sec, bar_number, beat_number).
+        labels: Structured meter labels (time_sec, bar, beat).
         beats_per_bar: Beats per bar.
         head_in_time_sec: Anchor time for bar 1 beat 1.
         click_amp: Amplitude of regular beat clicks.
@@ -125,7 +125,7 @@ def build_beat_sonification_audio(
     click_len = int(sr * click_duration_ms / 1000)
     click_len = max(2, min(click_len, 100))
 
-    is_downbeat = labels[:, 2] == 1
+    is_downbeat = labels["beat"] == 1
     for i, t_sec in enumerate(beat_times):
         pos = int(t_sec * sr)
         if pos < 0 or pos >= n_samples:
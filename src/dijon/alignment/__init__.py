@@ -0,0 +1,9 @@
+"""Cross-track alignment package."""
+
+from .methods import align_chromagrams, band_limits, transposition_costs
+
+__all__ = [
+    "align_chromagrams",
+    "band_limits",
+    "transposition_costs",
+]
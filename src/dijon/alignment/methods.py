@@ -0,0 +1,201 @@
+# src/dijon/alignment/methods.py
+"""Banded dynamic time warping of metric chromagrams, with transposition search."""
+
+from __future__ import annotations
+
+import numpy as np
+from numba import jit, prange
+
+BAND_DEFAULT = 0.1
+N_SHIFTS = 12
+
+
+def _unit_rows(C: np.ndarray, eps: float = 1e-9) -> np.ndarray:
+    """float64 (N, 12) copy of chroma C (12, N) with L2-normalized frames (silent ones stay zero).
+
+    Frames are rows so the kernels read each one contiguously.
+    """
+    C = np.asarray(C, dtype=np.float64)
+    if C.ndim != 2 or C.shape[0] != N_SHIFTS:
+        raise ValueError(f"Expected chroma with shape (12, N), got {C.shape}")
+    if C.shape[1] < 1:
+        raise ValueError("Chroma has no columns")
+    return np.ascontiguousarray((C / np.maximum(np.linalg.norm(C, axis=0), eps)[None, :]).T)
+
+
+def _kernel_inputs(X: np.ndarray, Y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(X rows (N, 12), Y rows repeated twice (M, 24)).
+
+    Y transposed up by s semitones is Y2[:, 12 - s : 24 - s], so the kernels
+    index every shift without a modulo.
+    """
+    Yr = _unit_rows(Y)
+    return _unit_rows(X), np.ascontiguousarray(np.hstack([Yr, Yr]))
+
+
+def band_limits(N: int, M: int, *, band: float = BAND_DEFAULT) -> tuple[np.ndarray, np.ndarray]:
+    """Sakoe-Chiba band around the diagonal from (0, 0) to (N-1, M-1).
+
+    Row i may use columns lo[i]..hi[i] (inclusive): within radius columns of the
+    diagonal, radius = band * max(N, M), but at least the diagonal's slope so
+    consecutive rows overlap and a path always exists.
+    """
+    if not 0 < band <= 1:
+        raise ValueError(f"band must be in (0, 1], got {band}")
+    slope = (M - 1) / (N - 1) if N > 1 else float(M)
+    radius = max(int(np.ceil(band * max(N, M))), int(np.ceil(slope)), 1)
+    center = np.rint(np.arange(N) * slope).astype(np.int64) if N > 1 else np.zeros(1, np.int64)
+    lo = np.clip(center - radius, 0, M - 1)
+    hi = np.clip(center + radius, 0, M - 1)
+    lo[0], hi[-1] = 0, M - 1
+    return lo, hi
+
+
+@jit(nopython=True, cache=True)
+def _cell_cost(X, Y2, i, j, shift):
+    """1 - cosine between frame X[i] and frame Y[j] transposed up by shift semitones."""
+    dot = 0.0
+    base = 12 - shift
+    for p in range(12):
+        dot += X[i, p] * Y2[j, base + p]
+    return 1.0 - dot
+
+
+@jit(nopython=True, parallel=True, cache=True)
+def _dtw_shift_costs(X, Y2, lo, hi):
+    """Total banded DTW cost for each of the 12 circular shifts of Y.
+
+    Shifts run in parallel; each keeps only the previous and current band rows.
+    """
+    N = X.shape[0]
+    W = 0
+    for i in range(N):
+        W = max(W, hi[i] - lo[i] + 1)
+    out = np.empty(12)
+    for shift in prange(12):
+        prev = np.full(W, np.inf)
+        cur = np.full(W, np.inf)
+        for i in range(N):
+            for k in range(W):
+                cur[k] = np.inf
+            for j in range(lo[i], hi[i] + 1):
+                best = np.inf
+                if i == 0 and j == 0:
+                    best = 0.0
+                if j > lo[i]:
+                    best = min(best, cur[j - 1 - lo[i]])
+                if i > 0:
+                    kp = j - lo[i - 1]
+                    if 0 <= kp <= hi[i - 1] - lo[i - 1]:
+                        best = min(best, prev[kp])
+                    if 1 <= kp <= hi[i - 1] - lo[i - 1] + 1:
+                        best = min(best, prev[kp - 1])
+                cur[j - lo[i]] = best + _cell_cost(X, Y2, i, j, shift)
+            prev, cur = cur, prev
+        out[shift] = prev[hi[N - 1] - lo[N - 1]]
+    return out
+
+
+@jit(nopython=True, cache=True)
+def _dtw_band(X, Y2, shift, lo, hi):
+    """Accumulated banded DTW cost D (N, W): D[i, k] is cell (i, lo[i] + k); inf outside."""
+    N = X.shape[0]
+    W = 0
+    for i in range(N):
+        W = max(W, hi[i] - lo[i] + 1)
+    D = np.full((N, W), np.inf, dtype=np.float32)
+    for i in range(N):
+        for j in range(lo[i], hi[i] + 1):
+            best = np.inf
+            if i == 0 and j == 0:
+                best = 0.0
+            if j > lo[i]:
+                best = min(best, D[i, j - 1 - lo[i]])
+            if i > 0:
+                kp = j - lo[i - 1]
+                if 0 <= kp <= hi[i - 1] - lo[i - 1]:
+                    best = min(best, D[i - 1, kp])
+                if 1 <= kp <= hi[i - 1] - lo[i - 1] + 1:
+                    best = min(best, D[i - 1, kp - 1])
+            D[i, j - lo[i]] = best + _cell_cost(X, Y2, i, j, shift)
+    return D
+
+
+@jit(nopython=True, cache=True)
+def _backtrack_band(D, lo, hi):
+    """Optimal warping path (K, 2) of (i, j) pairs from (0, 0) to the last cell of D."""
+    N = D.shape[0]
+    i = N - 1
+    j = hi[N - 1]
+    path = np.empty((N + hi[N - 1] + 1, 2), dtype=np.int64)
+    n = 0
+    while True:
+        path[n, 0] = i
+        path[n, 1] = j
+        n += 1
+        if i == 0 and j == 0:
+            break
+        best = np.inf
+        bi, bj = i, j - 1
+        if i > 0:
+            kp = j - lo[i - 1]
+            if 1 <= kp <= hi[i - 1] - lo[i - 1] + 1 and D[i - 1, kp - 1] < best:
+                best = D[i - 1, kp - 1]
+                bi, bj = i - 1, j - 1
+            if 0 <= kp <= hi[i - 1] - lo[i - 1] and D[i - 1, kp] < best:
+                best = D[i - 1, kp]
+                bi, bj = i - 1, j
+        if j > lo[i] and D[i, j - 1 - lo[i]] < best:
+            bi, bj = i, j - 1
+        i, j = bi, bj
+    return path[:n][::-1].copy()
+
+
+def transposition_costs(
+    X: np.ndarray, Y: np.ndarray, *, band: float = BAND_DEFAULT
+) -> np.ndarray:
+    """Banded DTW cost of aligning X with Y transposed up by 0..11 semitones.
+
+    Costs are normalized by N + M (cosine cost per path step, roughly in [0, 1]).
+    """
+    Xr, Y2 = _kernel_inputs(X, Y)
+    N, M = Xr.shape[0], Y2.shape[0]
+    lo, hi = band_limits(N, M, band=band)
+    return _dtw_shift_costs(Xr, Y2, lo, hi) / (N + M)
+
+
+def align_chromagrams(
+    X: np.ndarray,
+    Y: np.ndarray,
+    *,
+    band: float = BAND_DEFAULT,
+    transpose: bool = True,
+) -> dict:
+    """Align two metric chromagrams (12, N) and (12, M) with banded cosine-cost DTW.
+
+    With transpose, all 12 circular shifts of Y are scored (transposition_costs)
+    and the path is computed for the cheapest one; otherwise shift 0 is used.
+
+    Returns:
+        Dict with path ((K, 2) column pairs), cost (normalized by N + M), shift
+        (semitones Y is transposed up), shift_costs ((12,) or None), and the
+        accumulated band D ((N, W) float32, inf outside the band) with lo/hi limits.
+    """
+    Xr, Y2 = _kernel_inputs(X, Y)
+    N, M = Xr.shape[0], Y2.shape[0]
+    lo, hi = band_limits(N, M, band=band)
+    shift_costs = None
+    shift = 0
+    if transpose:
+        shift_costs = _dtw_shift_costs(Xr, Y2, lo, hi) / (N + M)
+        shift = int(np.argmin(shift_costs))
+    D = _dtw_band(Xr, Y2, shift, lo, hi)
+    return {
+        "path": _backtrack_band(D, lo, hi),
+        "cost": float(D[N - 1, hi[N - 1] - lo[N - 1]]) / (N + M),
+        "shift": shift,
+        "shift_costs": shift_costs,
+        "D": D,
+        "lo": lo,
+        "hi": hi,
+    }
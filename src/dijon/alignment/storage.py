@@ -0,0 +1,86 @@
+"""On-disk alignment results: one uncompressed .npz per track pair.
+
+An entry holds the warping path, normalized cost, chosen transposition, the 12
+per-shift costs, the accumulated banded cost matrix (with its row limits) and
+the chromagram filenames, sizes and mtimes it was computed from. An entry whose
+chromagrams have changed is stale, so results double as a per-pair cache.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+
+from ..utils.storage import save_npz_atomic
+
+ALIGNMENT_VERSION = 1
+
+
+def save_alignment(
+    path: Path,
+    result: dict,
+    *,
+    band: float,
+    stamps: tuple[tuple[str, int, int], tuple[str, int, int]],
+) -> None:
+    """Write align_chromagrams output atomically (temp file + rename), creating the directory.
+
+    stamps are the dijon.utils.storage.source_stamp of the two chromagrams.
+    """
+    shift_costs = result["shift_costs"]
+    (a_name, a_size, a_mtime), (b_name, b_size, b_mtime) = stamps
+    save_npz_atomic(
+        path,
+        path=result["path"].astype(np.int32),
+        cost=np.asarray(float(result["cost"])),
+        shift=np.asarray(int(result["shift"])),
+        shift_costs=np.asarray([] if shift_costs is None else shift_costs, dtype=np.float64),
+        D=result["D"],
+        lo=result["lo"],
+        hi=result["hi"],
+        band=np.asarray(float(band)),
+        a_name=np.asarray(a_name),
+        b_name=np.asarray(b_name),
+        a_stamp=np.asarray([a_size, a_mtime], dtype=np.int64),
+        b_stamp=np.asarray([b_size, b_mtime], dtype=np.int64),
+        version=np.asarray(ALIGNMENT_VERSION),
+    )
+
+
+def load_alignment(
+    path: Path,
+    stamps: tuple[tuple[str, int, int], tuple[str, int, int]] | None = None,
+) -> dict | None:
+    """Return a saved alignment as a dict, or None if absent, unreadable or stale.
+
+    When stamps are given, the entry must come from exactly those chromagrams.
+    shift_costs is None when the pair was aligned without transposition search.
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != ALIGNMENT_VERSION:
+                return None
+            saved = (
+                (str(data["a_name"]), *map(int, data["a_stamp"])),
+                (str(data["b_name"]), *map(int, data["b_stamp"])),
+            )
+            if stamps is not None and saved != tuple(tuple(s) for s in stamps):
+                return None
+            shift_costs = data["shift_costs"]
+            return {
+                "path": data["path"],
+                "cost": float(data["cost"]),
+                "shift": int(data["shift"]),
+                "shift_costs": shift_costs if shift_costs.size else None,
+                "D": data["D"],
+                "lo": data["lo"],
+                "hi": data["hi"],
+                "band": float(data["band"]),
+                "sources": saved,
+            }
+    except (OSError, KeyError, ValueError):
+        return None
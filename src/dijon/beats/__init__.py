@@ -1,13 +1,37 @@
 """Beat tracking and meter inference package."""
 
-from .meter import compute_beat_energies, estimate_beats_per_bar, label_bars_and_beats
-from .tracking import beat_period_to_tempo, compute_beat_sequence, compute_penalty
+from .meter import (
+    as_meter_labels,
+    compute_beat_energies,
+    compute_beat_energies_from_file,
+    estimate_beats_per_bar,
+    estimate_meter,
+    label_bars_and_beats,
+    read_beat_windows,
+    score_meter_hypotheses,
+)
+from .tracking import (
+    beat_period_to_tempo,
+    compute_beat_sequence,
+    compute_beat_sequence_local,
+    compute_penalty,
+    compute_tempo_curve,
+    tempo_curve_to_beat_ref,
+)
 
 __all__ = [
+    "as_meter_labels",
     "beat_period_to_tempo",
     "compute_beat_energies",
+    "compute_beat_energies_from_file",
     "compute_beat_sequence",
+    "compute_beat_sequence_local",
     "compute_penalty",
+    "compute_tempo_curve",
     "estimate_beats_per_bar",
+    "estimate_meter",
     "label_bars_and_beats",
+    "read_beat_windows",
+    "score_meter_hypotheses",
+    "tempo_curve_to_beat_ref",
 ]
@@ -1,24 +1,61 @@
 """Meter inference and bar/beat labeling from beat times."""
 
+from functools import lru_cache
+
 import numpy as np
+import soundfile as sf
 from scipy.signal import butter, filtfilt
 
 
-def _band_rms(x, sr, low_hz=None, high_hz=None, order=4):
-    """Extract RMS of a band-filtered signal. low_hz/high_hz define passband; None = no limit."""
+@lru_cache(maxsize=32)
+def _butter_band(sr, low_hz, high_hz, order):
+    """Butterworth (b, a) for the passband; designed once per (sr, band, order)."""
     nyq = sr / 2
     if low_hz is not None and high_hz is not None:
-        b, a = butter(order, [low_hz / nyq, high_hz / nyq], btype="band")
-    elif low_hz is not None:
-        b, a = butter(order, low_hz / nyq, btype="high")
-    elif high_hz is not None:
-        b, a = butter(order, high_hz / nyq, btype="low")
-    else:
+        return butter(order, [low_hz / nyq, high_hz / nyq], btype="band")
+    if low_hz is not None:
+        return butter(order, low_hz / nyq, btype="high")
+    return butter(order, high_hz / nyq, btype="low")
+
+
+def _band_rms(x, sr, low_hz=None, high_hz=None, order=4):
+    """Extract RMS of a band-filtered signal. low_hz/high_hz define passband; None = no limit."""
+    if low_hz is None and high_hz is None:
         return np.sqrt(np.mean(x**2))
+    b, a = _butter_band(sr, low_hz, high_hz, order)
     x_filt = filtfilt(b, a, x.astype(np.float64))
     return np.sqrt(np.mean(x_filt**2))
 
 
+def _first_sample_at(times_sec, sr):
+    """Smallest sample index j with j / sr >= time (same rounding as np.arange(n) / sr)."""
+    j = np.ceil(np.asarray(times_sec, dtype=np.float64) * sr).astype(np.int64)
+    j -= (j - 1) / sr >= times_sec
+    j += j / sr < times_sec
+    return j
+
+
+def _beat_window_bounds(beat_times_sec, sr, n_samples, win_half_sec):
+    """Sample ranges [start, end) of the +-win_half_sec window around each beat."""
+    b = np.asarray(beat_times_sec, dtype=np.float64)
+    starts = np.clip(_first_sample_at(b - win_half_sec, sr), 0, n_samples)
+    ends = np.clip(_first_sample_at(b + win_half_sec, sr), 0, n_samples)
+    return starts, ends
+
+
+def _segment_energies(segments, sr, low_cut_hz, low_pass_hz, high_cut_hz):
+    """Low-band and mid/high-band RMS of each segment (0 for empty segments)."""
+    n = len(segments)
+    low_energy = np.zeros(n)
+    high_energy = np.zeros(n)
+    for i, seg in enumerate(segments):
+        if len(seg) == 0:
+            continue
+        low_energy[i] = _band_rms(seg, sr, low_hz=low_cut_hz, high_hz=low_pass_hz)
+        high_energy[i] = _band_rms(seg, sr, low_hz=high_cut_hz)
+    return low_energy, high_energy
+
+
 def compute_beat_energies(
     beat_times_sec,
     x,
@@ -29,83 +66,183 @@ def compute_beat_energies(
     high_cut_hz=1600,
 ):
     """Compute low-band (kick/bass) and mid/high-band (hihat/chuck) RMS per beat."""
-    n = len(beat_times_sec)
-    low_energy = np.zeros(n)
-    high_energy = np.zeros(n)
-    t = np.arange(len(x)) / sr
-
-    for i in range(n):
-        t_center = beat_times_sec[i]
-        t_start = max(0, t_center - win_half_sec)
-        t_end = min(len(x) / sr, t_center + win_half_sec)
-        idx = (t >= t_start) & (t < t_end)
-        if not np.any(idx):
-            continue
-        seg = x[idx]
-        low_energy[i] = _band_rms(seg, sr, low_hz=low_cut_hz, high_hz=low_pass_hz)
-        high_energy[i] = _band_rms(seg, sr, low_hz=high_cut_hz)
+    starts, ends = _beat_window_bounds(beat_times_sec, sr, len(x), win_half_sec)
+    segments = [x[s:e] for s, e in zip(starts, ends)]
+    return _segment_energies(segments, sr, low_cut_hz, low_pass_hz, high_cut_hz)
+
+
+def read_beat_windows(path, beat_times_sec, win_half_sec=0.15):
+    """Read only the +-win_half_sec windows around each beat from an audio file.
+
+    Seeks to each window instead of decoding the whole file; channels are
+    averaged to mono as librosa.load(mono=True) does.
+
+    Returns:
+        (segments, sr): list of float32 mono arrays (one per beat) and sample rate.
+    """
+    with sf.SoundFile(str(path)) as f:
+        sr = f.samplerate
+        starts, ends = _beat_window_bounds(beat_times_sec, sr, f.frames, win_half_sec)
+        segments = []
+        for start, end in zip(starts, ends):
+            if end <= start:
+                segments.append(np.zeros(0, dtype=np.float32))
+                continue
+            f.seek(int(start))
+            seg = f.read(int(end - start), dtype="float32", always_2d=True)
+            segments.append(seg.mean(axis=1))
+    return segments, sr
+
+
+def compute_beat_energies_from_file(
+    path,
+    beat_times_sec,
+    win_half_sec=0.15,
+    low_cut_hz=30,
+    low_pass_hz=250,
+    high_cut_hz=1600,
+):
+    """compute_beat_energies on an audio file, reading only the beat windows."""
+    segments, sr = read_beat_windows(path, beat_times_sec, win_half_sec)
+    return _segment_energies(segments, sr, low_cut_hz, low_pass_hz, high_cut_hz)
+
+
+METER_CANDIDATES = tuple(range(2, 13))
+METER_LABEL_DTYPE = np.dtype([("time_sec", "<f8"), ("bar", "<i4"), ("beat", "i1")])
+
+
+def score_meter_hypotheses(low_norm, high_norm, i0=0, candidates=METER_CANDIDATES):
+    """Score every (beats per bar, downbeat phase) hypothesis in one pass.
+
+    Beat i falls in group (i - i0) % B; phase p puts downbeats on group p. The score
+    is the low-band contrast (downbeats minus other beats) plus the high-band
+    contrast (other beats minus downbeats), from group sums via np.bincount.
+
+    Returns:
+        Array of shape (len(candidates), max(candidates)); entry [j, p] scores bars
+        of candidates[j] beats with downbeats at i0 + p (mod B). Phases p >= B, and
+        hypotheses leaving downbeats or other beats empty, are -inf.
+    """
+    low = np.asarray(low_norm, dtype=np.float64)
+    high = np.asarray(high_norm, dtype=np.float64)
+    cands = np.asarray(candidates, dtype=np.int64)
+    n = len(low)
+    C = len(cands)
+    width = int(cands.max())
+
+    k = np.arange(n) - int(i0)
+    groups = (k[None, :] % cands[:, None] + width * np.arange(C)[:, None]).ravel()
+    size = C * width
+    counts = np.bincount(groups, minlength=size).reshape(C, width)
+    sum_low = np.bincount(groups, weights=np.tile(low, C), minlength=size).reshape(C, width)
+    sum_high = np.bincount(groups, weights=np.tile(high, C), minlength=size).reshape(C, width)
+
+    other = n - counts
+    valid = (counts > 0) & (other > 0)
+    counts_safe = np.where(valid, counts, 1)
+    other_safe = np.where(valid, other, 1)
+    # Strong beats (1, 3): more low, less high; weak beats (2, 4): more high, less low
+    score_low = sum_low / counts_safe - (low.sum() - sum_low) / other_safe
+    score_high = (high.sum() - sum_high) / other_safe - sum_high / counts_safe
+    return np.where(valid, score_low + score_high, -np.inf)
+
+
+def estimate_meter(
+    beat_times_sec,
+    head_in_time_sec,
+    x,
+    sr,
+    candidates=METER_CANDIDATES,
+    search_phase=True,
+    energies=None,
+):
+    """Infer beats-per-bar and downbeat phase from low vs mid/high-band contrast.
 
-    return low_energy, high_energy
+    All candidate bar lengths (and, with search_phase, all downbeat phases) are
+    scored at once by score_meter_hypotheses. Without search_phase the downbeat is
+    fixed at the beat nearest head_in_time_sec. Ties go to the shorter bar, then
+    the smaller phase.
 
+    energies: Precomputed (low_energy, high_energy) per beat, e.g. from
+    compute_beat_energies_from_file; x and sr are then not used (may be None).
 
-def estimate_beats_per_bar(beat_times_sec, head_in_time_sec, x, sr):
-    """Infer beats-per-bar from low-band (strong beats) vs mid/high-band (weak beats) contrast."""
+    Returns:
+        (beats_per_bar, phase, low_energy, high_energy); the downbeat nearest the
+        head-in beat i0 is beat i0 + phase, with phase in (-B/2, B/2].
+    """
     b = np.asarray(beat_times_sec, dtype=np.float64)
-    t0 = head_in_time_sec
-    i0 = int(np.argmin(np.abs(b - t0)))
+    i0 = int(np.argmin(np.abs(b - head_in_time_sec)))
 
-    low_energy, high_energy = compute_beat_energies(b, x, sr)
+    if energies is not None:
+        low_energy, high_energy = (np.asarray(e, dtype=np.float64) for e in energies)
+    else:
+        low_energy, high_energy = compute_beat_energies(b, x, sr)
 
     # Normalize so scale differences don't dominate
     low_norm = low_energy / (np.std(low_energy) + 1e-10)
     high_norm = high_energy / (np.std(high_energy) + 1e-10)
 
-    candidates = [2, 3, 4]
-    best_score = -np.inf
-    best_B = 2
-
-    for B in candidates:
-        downbeat_low = []
-        other_low = []
-        downbeat_high = []
-        other_high = []
-        for i in range(len(b)):
-            k = i - i0
-            pos = k % B
-            if pos == 0:
-                downbeat_low.append(low_norm[i])
-                downbeat_high.append(high_norm[i])
-            else:
-                other_low.append(low_norm[i])
-                other_high.append(high_norm[i])
-
-        if not downbeat_low or not other_low:
-            continue
+    cands = tuple(int(c) for c in candidates)
+    scores = score_meter_hypotheses(low_norm, high_norm, i0=i0, candidates=cands)
+    if not search_phase:
+        scores = scores[:, :1]
+    j, phase = np.unravel_index(int(np.argmax(scores)), scores.shape)
+    if not np.isfinite(scores[j, phase]):
+        return cands[0], 0, low_energy, high_energy
 
-        # Strong beats (1, 3): more low, less high
-        score_low = np.mean(downbeat_low) - np.mean(other_low)
-        # Weak beats (2, 4): more high, less low
-        score_high = np.mean(other_high) - np.mean(downbeat_high)
-        score = score_low + score_high
+    B = cands[j]
+    phase = int(phase)
+    if phase > B // 2:
+        phase -= B
+    return B, phase, low_energy, high_energy
 
-        if score > best_score:
-            best_score = score
-            best_B = B
 
-    return best_B, low_energy, high_energy
+def estimate_beats_per_bar(beat_times_sec, head_in_time_sec, x, sr, candidates=(2, 3, 4)):
+    """Infer beats-per-bar from low-band (strong beats) vs mid/high-band (weak beats) contrast.
+
+    The downbeat is fixed at the beat nearest head_in_time_sec; see estimate_meter
+    to also search the downbeat phase.
+    """
+    B, _phase, low_energy, high_energy = estimate_meter(
+        beat_times_sec, head_in_time_sec, x, sr, candidates=candidates, search_phase=False
+    )
+    return B, low_energy, high_energy
 
 
 def label_bars_and_beats(beat_times_sec, head_in_time_sec, beats_per_bar):
-    """Map each beat to (time_sec, bar_number, beat_number). Anchor at head_in = bar 1 beat 1."""
+    """Map each beat to (time_sec, bar, beat). Anchor at head_in = bar 1 beat 1.
+
+    Returns a structured array of METER_LABEL_DTYPE (float64 time, int32 bar,
+    int8 beat; 13 bytes per beat). Bars before the anchor are numbered <= 0.
+    """
     b = np.asarray(beat_times_sec, dtype=np.float64)
     B = int(beats_per_bar)
-    i0 = int(np.argmin(np.abs(b - head_in_time_sec)))
-
-    labels = []
-    for i in range(len(b)):
-        k = i - i0
-        bar_number = 1 + (k // B)
-        beat_number = 1 + (k % B)
-        labels.append((float(b[i]), bar_number, beat_number))
-
-    return np.array(labels)
+    i0 = int(np.argmin(np.abs(b - head_in_time_sec))) if len(b) else 0
+
+    k = np.arange(len(b)) - i0
+    labels = np.empty(len(b), dtype=METER_LABEL_DTYPE)
+    labels["time_sec"] = b
+    labels["bar"] = 1 + k // B
+    labels["beat"] = 1 + k % B
+    return labels
+
+
+def as_meter_labels(arr):
+    """Return meter labels as METER_LABEL_DTYPE.
+
+    Structured label arrays are returned as-is (no copy); legacy float (N, 3)
+    arrays of (time_sec, bar, beat) rows are converted.
+    """
+    arr = np.asarray(arr)
+    if arr.dtype.names is not None:
+        missing = set(METER_LABEL_DTYPE.names) - set(arr.dtype.names)
+        if missing:
+            raise ValueError(f"Meter labels missing field(s): {sorted(missing)}")
+        return arr
+    if arr.ndim != 2 or arr.shape[1] != 3:
+        raise ValueError(f"Expected meter labels with shape (N, 3), got shape {arr.shape}")
+    labels = np.empty(len(arr), dtype=METER_LABEL_DTYPE)
+    labels["time_sec"] = arr[:, 0]
+    labels["bar"] = arr[:, 1]
+    labels["beat"] = arr[:, 2]
+    return labels
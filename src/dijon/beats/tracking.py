@@ -1,6 +1,10 @@
 """Ellis DP beat tracking from novelty (FMP C6S3_BeatTracking)."""
 
 import numpy as np
+from numba import jit
+
+TEMPO_SMOOTHNESS_DEFAULT = 20.0
+LAG_RATIO_DEFAULT = 2.0
 
 
 def compute_penalty(N, beat_ref):
@@ -53,3 +57,110 @@ def compute_beat_sequence(novelty, beat_ref, penalty=None, factor=1.0, return_al
 def beat_period_to_tempo(beat, Fs):
     """Convert beat period (frames) to tempo (BPM)."""
     return 60.0 / (beat / Fs)
+
+
+def compute_tempo_curve(
+    profile, F_coef_BPM, smoothness=TEMPO_SMOOTHNESS_DEFAULT, center_bpm=None
+):
+    """Smoothed tempo (BPM) per column of a (K, W) windowed tempo profile.
+
+    Viterbi over tempo bins: observations are per-column log magnitudes
+    (normalized to the column max), transitions cost
+    smoothness * log2(tempo ratio)^2. smoothness=0 is the plain per-column argmax.
+    With center_bpm (e.g. the global tempo), only tempi within half an octave of
+    it are considered, so the curve follows drift without octave jumps.
+    """
+    profile = np.abs(np.asarray(profile, dtype=np.float64))
+    F_coef_BPM = np.asarray(F_coef_BPM, dtype=np.float64)
+    if profile.ndim != 2 or profile.shape[0] != len(F_coef_BPM):
+        raise ValueError(
+            f"Expected profile of shape ({len(F_coef_BPM)}, W), got {profile.shape}"
+        )
+    if profile.shape[1] == 0:
+        return np.zeros(0)
+    if center_bpm is not None:
+        keep = np.abs(np.log2(F_coef_BPM / center_bpm)) <= 0.5
+        if keep.any():
+            profile, F_coef_BPM = profile[keep], F_coef_BPM[keep]
+    if smoothness <= 0:
+        return F_coef_BPM[np.argmax(profile, axis=0)]
+
+    col_max = np.maximum(profile.max(axis=0, keepdims=True), 1e-12)
+    obs = np.log(profile / col_max + 1e-6)
+    log_tempo = np.log2(F_coef_BPM)
+    trans = -smoothness * np.square(log_tempo[:, None] - log_tempo[None, :])
+
+    K, W = obs.shape
+    D = obs[:, 0].copy()
+    back = np.zeros((W, K), dtype=np.int64)
+    for w in range(1, W):
+        scores = D[:, None] + trans
+        back[w] = np.argmax(scores, axis=0)
+        D = obs[:, w] + scores[back[w], np.arange(K)]
+
+    path = np.zeros(W, dtype=np.int64)
+    path[-1] = int(np.argmax(D))
+    for w in range(W - 1, 0, -1):
+        path[w - 1] = back[w, path[w]]
+    return F_coef_BPM[path]
+
+
+def tempo_curve_to_beat_ref(curve_bpm, curve_times_sec, num_frames, Fs):
+    """Per-frame beat period (frames) from a tempo curve sampled at curve_times_sec."""
+    t = np.arange(num_frames) / Fs
+    bpm = np.interp(t, curve_times_sec, curve_bpm)
+    return Fs * 60.0 / bpm
+
+
+@jit(nopython=True, cache=True)
+def _beat_dp_local(novelty, beat_ref, factor, lag_ratio):
+    """Windowed beat DP; predecessors of n lie within beat_ref[n] / lag_ratio .. * lag_ratio."""
+    N = novelty.shape[0]
+    D = np.zeros(N)
+    P = np.full(N, -1, dtype=np.int64)
+    for n in range(N):
+        ref = beat_ref[n]
+        lag_lo = max(1, int(np.ceil(ref / lag_ratio)))
+        lag_hi = min(n, int(np.floor(ref * lag_ratio)))
+        best = 0.0
+        best_m = -1
+        # Longest lag first so ties go to the earliest predecessor, as in the full DP.
+        for lag in range(lag_hi, lag_lo - 1, -1):
+            r = np.log2(lag / ref)
+            score = D[n - lag] - factor * r * r
+            if score > best:
+                best = score
+                best_m = n - lag
+        D[n] = novelty[n] + best
+        P[n] = best_m
+    return D, P
+
+
+def compute_beat_sequence_local(
+    novelty, beat_ref, factor=1.0, lag_ratio=LAG_RATIO_DEFAULT, return_all=False
+):
+    """DP beat tracking with a time-varying reference period.
+
+    Like compute_beat_sequence, but beat_ref may be a per-frame array (e.g. from
+    tempo_curve_to_beat_ref) and only predecessors within a factor lag_ratio of
+    the local period are scored, so the cost is O(N * period) instead of O(N^2).
+
+    Returns beat indices (0-based, in novelty frames). With return_all=True,
+    returns (B, D, P) where P holds predecessor frames (-1 for a first beat).
+    """
+    novelty = np.asarray(novelty, dtype=np.float64)
+    N = len(novelty)
+    beat_ref = np.broadcast_to(np.asarray(beat_ref, dtype=np.float64), (N,))
+    if N == 0:
+        B = np.zeros(0, dtype=int)
+        return (B, np.zeros(0), np.zeros(0, dtype=int)) if return_all else B
+    D, P = _beat_dp_local(novelty, np.ascontiguousarray(beat_ref), float(factor), float(lag_ratio))
+
+    beats = [int(np.argmax(D))]
+    while P[beats[-1]] != -1:
+        beats.append(int(P[beats[-1]]))
+    B = np.array(beats[::-1], dtype=int)
+
+    if return_all:
+        return B, D, P
+    return B
@@ -1,7 +1,27 @@
 """Chromagram computation package."""
 
-from .methods import metric_chromagram
+from .methods import (
+    chroma_at_tuning,
+    estimate_tuning_cents,
+    extract_beat_times_from_meter_map,
+    frame_chroma,
+    frame_chroma_blocks,
+    frame_weight_envelope,
+    metric_chromagram,
+    metric_chromagram_from_frames,
+    sweep_tuning,
+    tuning_cqt,
+)
 
 __all__ = [
+    "chroma_at_tuning",
+    "estimate_tuning_cents",
+    "extract_beat_times_from_meter_map",
+    "frame_chroma",
+    "frame_chroma_blocks",
+    "frame_weight_envelope",
     "metric_chromagram",
+    "metric_chromagram_from_frames",
+    "sweep_tuning",
+    "tuning_cqt",
 ]
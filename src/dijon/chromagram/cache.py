@@ -0,0 +1,126 @@
+"""On-disk cache of frame-level chroma and weight envelopes.
+
+Frame chroma depends only on the audio (track and region), hop_length,
+chroma_type, preprocess and tuning; bpm_threshold, aggregate, accent_mode,
+weight_power and min_frames_per_bin only change the aggregation step. Caching the
+frames per track therefore turns a sweep over aggregation parameters into one
+CQT per track plus cheap aggregations (metric_chromagram_from_frames).
+
+Frame chroma is not frame-local: tuning estimation and HPSS see the whole
+analysed span, so chroma entries are keyed by their sample span as well and are
+only reused for exactly that span. Weight envelopes are frame-local and are
+sliced from any entry covering the requested frames.
+
+Entries are uncompressed .npz files holding the array, its first frame index
+(frames may cover only the meter span), sample rate, audio duration and the
+source audio's size and mtime; an entry whose source audio has changed is
+treated as a miss.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+
+from ..utils.storage import save_npz_atomic
+
+FRAME_CACHE_VERSION = 2
+
+
+def region_tag(region: tuple[float, float] | None) -> str:
+    """Filename tag for an audio region in seconds ("full" when untrimmed)."""
+    if region is None:
+        return "full"
+    start_sec, end_sec = region
+    return f"{start_sec:.3f}-{end_sec:.3f}"
+
+
+def chroma_cache_path(
+    cache_dir: Path,
+    track_name: str,
+    *,
+    region: tuple[float, float] | None,
+    hop_length: int,
+    chroma_type: str,
+    preprocess: str,
+    tuning: float | None,
+    span: tuple[int, int] | None = None,
+) -> Path:
+    """Cache path for frame chroma, e.g. YTB-001_framechroma_cqt-harmonic-256-auto_full.npz.
+
+    span is the analysed (start, end) sample range within region, appended as
+    _<start>-<end> when given (YTB-001_framechroma_..._full_66048-1102500.npz).
+    """
+    tuning_tag = "auto" if tuning is None else f"{tuning:g}"
+    span_tag = "" if span is None else f"_{int(span[0])}-{int(span[1])}"
+    return Path(cache_dir) / (
+        f"{track_name}_framechroma_{chroma_type}-{preprocess}-{hop_length}-{tuning_tag}"
+        f"_{region_tag(region)}{span_tag}.npz"
+    )
+
+
+def weights_cache_path(
+    cache_dir: Path,
+    track_name: str,
+    *,
+    region: tuple[float, float] | None,
+    hop_length: int,
+    weight_source: str,
+) -> Path:
+    """Cache path for a frame weight envelope, e.g. YTB-001_frameweights_rms-256_full.npz."""
+    return Path(cache_dir) / (
+        f"{track_name}_frameweights_{weight_source}-{hop_length}_{region_tag(region)}.npz"
+    )
+
+
+def load_frames(
+    path: Path, stamp: tuple[str, int, int]
+) -> tuple[np.ndarray, int, float, int] | None:
+    """Return (array, sr, duration, frame_offset) from a cache entry, or None if absent or stale.
+
+    stamp is the dijon.utils.storage.source_stamp of the source audio; its size
+    and mtime must match the entry's.
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != FRAME_CACHE_VERSION:
+                return None
+            if (int(data["source_size"]), int(data["source_mtime_ns"])) != tuple(stamp[1:]):
+                return None
+            return (
+                data["frames"],
+                int(data["sr"]),
+                float(data["duration"]),
+                int(data["frame_offset"]),
+            )
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def save_frames(
+    path: Path,
+    frames: np.ndarray,
+    *,
+    sr: int,
+    duration: float,
+    stamp: tuple[str, int, int],
+    frame_offset: int = 0,
+) -> None:
+    """Write a cache entry atomically (temp file + rename), creating the directory.
+
+    frame_offset is the audio frame index of frames[..., 0].
+    """
+    save_npz_atomic(
+        path,
+        frames=np.asarray(frames),
+        sr=np.asarray(int(sr)),
+        duration=np.asarray(float(duration)),
+        frame_offset=np.asarray(int(frame_offset)),
+        source_size=np.asarray(int(stamp[1])),
+        source_mtime_ns=np.asarray(int(stamp[2])),
+        version=np.asarray(FRAME_CACHE_VERSION),
+    )
@@ -3,47 +3,33 @@
 
 from __future__ import annotations
 
-import re
-from pathlib import Path
+from collections.abc import Sequence
 
 import librosa
 import numpy as np
-
-
-def _parse_novelty_log_region(log_path: Path, base: str) -> tuple[float, float, str, str]:
-    """Parse novelty log and extract analysis region for one base filename.
-
-    Expected log pattern:
-    - item line containing "• {base}.wav:" and "success"
-    - following line containing "region: Xs -> Ys"
-    - optional "markers: A -> B"
-    """
-    # NOTE FOR AGENTS: If novelty log formatting changes, update regex + line-walk
-    # logic here and the notebook import sites that rely on this parser.
-    text = log_path.read_text()
-    wav_name = f"{base}.wav"
-    if wav_name not in text:
-        raise ValueError(f"Base '{base}' not found in novelty log {log_path}")
-
-    lines = text.splitlines()
-    region_re = re.compile(r"region:\s*([\d.]+)s\s*->\s*([\d.]+)s")
-    markers_re = re.compile(r"markers:\s*(\S+)\s*->\s*(\S+)")
-    for i, line in enumerate(lines):
-        if f"• {wav_name}:" in line and "success" in line:
-            if i + 1 >= len(lines):
-                raise ValueError(f"Incomplete entry for {wav_name} in {log_path}")
-            details = lines[i + 1]
-            m_region = region_re.search(details)
-            m_markers = markers_re.search(details)
-            if not m_region:
-                raise ValueError(f"No region found for {wav_name} in {log_path}")
-            start_sec = float(m_region.group(1))
-            end_sec = float(m_region.group(2))
-            start_name = m_markers.group(1) if m_markers else ""
-            end_name = m_markers.group(2) if m_markers else ""
-            return (start_sec, end_sec, start_name, end_name)
-
-    raise ValueError(f"Could not parse region for {wav_name} in {log_path}")
+from numba import jit, prange
+
+PREPROCESS_DEFAULT = "harmonic"
+# Audio kept on each side of the meter span: covers half the longest CQT filter
+# (~1.6 s at C1 with 36 bins/octave, so ~0.8 s either side) and the
+# harmonic-percussive median filter.
+SPAN_MARGIN_SEC_DEFAULT = 2.0
+# Resolution of the CQT behind tuning sweeps: chroma_cqt's own 36 bins/octave, so
+# whole-bin offsets (33.3 cents) match frame_chroma up to CQT resampling error
+# and offsets in between are approximated by a Catmull-Rom shift (chroma_at_tuning).
+# Sweeps cover +-TUNING_MAX_CENTS.
+TUNING_BINS_PER_OCTAVE = 36
+TUNING_MAX_CENTS = 50.0
+# Block-wise chroma (frame_chroma_blocks): block length, and audio kept on each
+# side of a block so HPSS (31-frame median at hop 512) and the longest CQT filter
+# (~1.6 s at C1, 36 bins/octave) see the same neighbourhood as on the whole track.
+STREAM_BLOCK_SEC_DEFAULT = 60.0
+STREAM_CONTEXT_SEC = 3.0
+# librosa.effects.harmonic and librosa.estimate_tuning STFT hop (n_fft=2048).
+_LIBROSA_STFT_HOP = 512
+# librosa.feature.chroma_cqt defaults: seven octaves above C1.
+_CHROMA_FMIN = float(librosa.note_to_hz("C1"))
+_CHROMA_N_OCTAVES = 7
 
 
 def cents_to_cqt_tuning(cents: float, bins_per_octave: int = 36) -> float:
@@ -82,8 +68,92 @@ def score_metric_chromagram(
         else np.zeros(0)
     )
     jw = np.minimum(strengths[:-1], strengths[1:])
-    jit = np.sum(jitter * jw) / np.sum(jw) if len(jitter) and np.sum(jw) > 0 else 0.0
-    return float(conc - lambda_jitter * jit), float(conc), float(jit)
+    jitter_score = np.sum(jitter * jw) / np.sum(jw) if len(jitter) and np.sum(jw) > 0 else 0.0
+    return float(conc - lambda_jitter * jitter_score), float(conc), float(jitter_score)
+
+
+@jit(nopython=True, parallel=True, cache=True)
+def _score_metric_candidates(X, bounds, k, lambda_jitter):
+    """Score candidates stored as column blocks X[:, bounds[c]:bounds[c + 1]] of (12, T) X.
+
+    One pass per candidate (spread over numba threads) computing
+    score_metric_chromagram's L1-normalized columns, top-k mass and strength-weighted
+    jitter without temporaries.
+    """
+    D = X.shape[0]
+    n = bounds.shape[0] - 1
+    kk = min(k, D)
+    out = np.empty((n, 3))
+    for c in prange(n):
+        cur = np.zeros(D)
+        prev = np.zeros(D)
+        top = np.empty(max(kk, 1))
+        total = 0.0
+        conc_num = 0.0
+        jw_total = 0.0
+        jitter_num = 0.0
+        prev_strength = 0.0
+        for t in range(bounds[c], bounds[c + 1]):
+            strength = 0.0
+            for d in range(D):
+                cur[d] = X[d, t]
+                strength += cur[d]
+            inv = 1.0 / strength if strength > 1e-12 else 0.0
+            for d in range(D):
+                cur[d] *= inv
+            # Largest kk values, kept sorted by branch-free compare-exchange.
+            for j in range(kk):
+                top[j] = -1.0
+            for d in range(D):
+                v = cur[d]
+                for j in range(kk):
+                    hi = max(top[j], v)
+                    v = min(top[j], v)
+                    top[j] = hi
+            topk = 0.0
+            for j in range(kk):
+                topk += top[j]
+            total += strength
+            conc_num += topk * strength
+            if t > bounds[c]:
+                w = min(prev_strength, strength)
+                dist = 0.0
+                for d in range(D):
+                    dist += abs(cur[d] - prev[d])
+                jw_total += w
+                jitter_num += dist * w
+            cur, prev = prev, cur
+            prev_strength = strength
+        conc = conc_num / total if total > 0 else np.nan
+        jitter_score = jitter_num / jw_total if jw_total > 0 else 0.0
+        out[c, 0] = conc - lambda_jitter * jitter_score
+        out[c, 1] = conc
+        out[c, 2] = jitter_score
+    return out
+
+
+def score_metric_chromagrams(
+    C_metrics: Sequence[np.ndarray] | np.ndarray,
+    k: int = 4,
+    lambda_jitter: float = 0.5,
+) -> np.ndarray:
+    """score_metric_chromagram for many candidates at once.
+
+    C_metrics is a stack (N, 12, M) or a list of (12, M_i) metric chromagrams,
+    e.g. one per configuration in a parameter sweep; widths may differ. The
+    candidates are packed side by side and scored by a numba kernel in a single
+    pass each, in parallel across candidates.
+
+    Returns:
+        (N, 3) array of (score, concentration, jitter) rows.
+    """
+    mats = [np.asarray(C) for C in C_metrics]
+    if not mats:
+        return np.zeros((0, 3), dtype=np.float64)
+    bounds = np.zeros(len(mats) + 1, dtype=np.int64)
+    np.cumsum([C.shape[1] for C in mats], out=bounds[1:])
+    X = np.concatenate(mats, axis=1).astype(np.float64, copy=False)
+    return _score_metric_candidates(X, bounds, int(k), float(lambda_jitter))
 
 
 def _validate_audio(y: np.ndarray, sr: int) -> tuple[np.ndarray, int]:
@@ -114,7 +184,7 @@ def _preprocess_audio_for_chroma(
     raise ValueError('preprocess must be "none" or "harmonic"')
 
 
-def _extract_beat_times_from_meter_map(
+def extract_beat_times_from_meter_map(
     meter_map: np.ndarray,
     *,
     duration: float,
@@ -124,23 +194,42 @@ def _extract_beat_times_from_meter_map(
 
     Returns validated beat boundaries verbatim. Does not clip, prepend 0.0,
     or append duration. Requires at least two rows. Assumes the audio passed
-    to metric_chromagram is on the same timebase as meter_map[:, 0].
+    to metric_chromagram is on the same timebase as the meter map times.
+
+    meter_map is either the structured label array written by the meter stage
+    (fields time_sec, bar, beat; its time_sec field is returned without a copy)
+    or a legacy float (N, 3) array of (time_sec, bar, beat) rows.
     """
     if not isinstance(meter_map, np.ndarray):
         raise TypeError("meter_map must be a NumPy array")
-    if meter_map.ndim != 2:
-        raise ValueError(f"meter_map must be 2-D, got shape {meter_map.shape}")
-    if meter_map.shape[1] != 3:
-        raise ValueError(f"meter_map must have shape (N, 3), got {meter_map.shape}")
-    if meter_map.shape[0] < 2:
-        raise ValueError("meter_map must contain at least two rows")
-
-    if meter_map.dtype.kind != "f":
-        raise TypeError(f"meter_map must be float dtype, got {meter_map.dtype}")
-    if not np.all(np.isfinite(meter_map)):
-        raise ValueError("meter_map contains non-finite values")
-
-    beat_times = meter_map[:, 0].astype(np.float64, copy=False)
+
+    if meter_map.dtype.names is not None:
+        if meter_map.ndim != 1:
+            raise ValueError(f"Structured meter_map must be 1-D, got shape {meter_map.shape}")
+        if "time_sec" not in meter_map.dtype.names:
+            raise ValueError("Structured meter_map has no time_sec field")
+        if meter_map.shape[0] < 2:
+            raise ValueError("meter_map must contain at least two rows")
+        time_col = meter_map["time_sec"]
+        if time_col.dtype.kind != "f":
+            raise TypeError(f"meter_map time_sec must be float dtype, got {time_col.dtype}")
+        if not np.all(np.isfinite(time_col)):
+            raise ValueError("meter_map contains non-finite values")
+    else:
+        if meter_map.ndim != 2:
+            raise ValueError(f"meter_map must be 2-D, got shape {meter_map.shape}")
+        if meter_map.shape[1] != 3:
+            raise ValueError(f"meter_map must have shape (N, 3), got {meter_map.shape}")
+        if meter_map.shape[0] < 2:
+            raise ValueError("meter_map must contain at least two rows")
+
+        if meter_map.dtype.kind != "f":
+            raise TypeError(f"meter_map must be float dtype, got {meter_map.dtype}")
+        if not np.all(np.isfinite(meter_map)):
+            raise ValueError("meter_map contains non-finite values")
+        time_col = meter_map[:, 0]
+
+    beat_times = time_col.astype(np.float64, copy=False)
     if beat_times.size < 1:
         raise ValueError("meter_map time column is empty")
     if not np.all(np.diff(beat_times) > 0):
@@ -156,6 +245,29 @@ def _extract_beat_times_from_meter_map(
     return beat_times
 
 
+def chroma_sample_span(
+    beat_times: np.ndarray,
+    *,
+    sr: int,
+    hop_length: int,
+    n_samples: int,
+    margin_sec: float = SPAN_MARGIN_SEC_DEFAULT,
+) -> tuple[int, int]:
+    """Sample range [start, end) of the audio needed for chroma over the beat span.
+
+    Covers [beat_times[0] - margin_sec, beat_times[-1] + margin_sec], clipped to the
+    audio. start is a multiple of hop_length, so (center=True) frame j of
+    y[start:end] is frame start // hop_length + j of y.
+    """
+    if margin_sec < 0:
+        raise ValueError(f"margin_sec must be >= 0, got {margin_sec}")
+    first = int(librosa.time_to_frames(beat_times[0] - margin_sec, sr=sr, hop_length=hop_length))
+    last = int(librosa.time_to_frames(beat_times[-1] + margin_sec, sr=sr, hop_length=hop_length))
+    start = max(0, first) * hop_length
+    end = min(n_samples, (last + 1) * hop_length)
+    return min(start, n_samples), end
+
+
 def _compute_frame_chroma(
     y: np.ndarray,
     *,
@@ -193,23 +305,358 @@ def _compute_frame_weights(
     n_frames: int,
 ) -> np.ndarray:
     """Compute per-frame weights for weighted aggregation."""
+    envelope = frame_weight_envelope(y, sr=sr, hop_length=hop_length, weight_source=weight_source)
+    return _shape_frame_weights(envelope, weight_power=weight_power, n_frames=n_frames)
+
+
+def _shape_frame_weights(
+    envelope: np.ndarray,
+    *,
+    weight_power: float,
+    n_frames: int,
+) -> np.ndarray:
+    """Fit a weight envelope to n_frames, floor at 1e-10 and raise to weight_power."""
+    weights = librosa.util.fix_length(envelope, size=n_frames)
+    weights = np.maximum(weights.astype(np.float64, copy=False), 1e-10) ** float(
+        weight_power
+    )
+    return weights
+
+
+def frame_weight_envelope(
+    y: np.ndarray,
+    *,
+    sr: int,
+    hop_length: int = 256,
+    weight_source: str = "rms",
+) -> np.ndarray:
+    """Per-frame RMS or onset-strength envelope of y, before weight_power is applied.
+
+    Independent of weight_power and the aggregation settings, so it can be cached
+    per (audio, hop_length, weight_source) and reused across sweeps.
+    """
+    y, sr = _validate_audio(y, sr)
     if weight_source == "rms":
-        weights = librosa.feature.rms(
+        return librosa.feature.rms(
             y=y,
             frame_length=2048,
             hop_length=hop_length,
             center=True,
         )[0]
-    elif weight_source == "onset":
-        weights = librosa.onset.onset_strength(y=y, sr=sr, hop_length=hop_length)
-    else:
-        raise ValueError('weight_source must be "rms" or "onset"')
+    if weight_source == "onset":
+        return librosa.onset.onset_strength(y=y, sr=sr, hop_length=hop_length)
+    raise ValueError('weight_source must be "rms" or "onset"')
 
-    weights = librosa.util.fix_length(weights, size=n_frames)
-    weights = np.maximum(weights.astype(np.float64, copy=False), 1e-10) ** float(
-        weight_power
+
+def frame_chroma(
+    y: np.ndarray,
+    *,
+    sr: int,
+    hop_length: int = 256,
+    chroma_type: str = "cqt",
+    preprocess: str = PREPROCESS_DEFAULT,
+    tuning: float | None = None,
+) -> np.ndarray:
+    """Frame-level chroma (12, T) of y, preprocessed as metric_chromagram does.
+
+    This is the expensive part of metric_chromagram and depends only on the audio,
+    hop_length, chroma_type, preprocess and tuning; pass the result to
+    metric_chromagram_from_frames to sweep the aggregation parameters.
+    """
+    y, sr = _validate_audio(y, sr)
+    y_chroma = _preprocess_audio_for_chroma(y, preprocess=preprocess)
+    return _compute_frame_chroma(
+        y_chroma,
+        sr=sr,
+        hop_length=hop_length,
+        chroma_type=chroma_type,
+        tuning=tuning,
     )
-    return weights
+
+
+def _stream_blocks(
+    n_samples: int, *, step: int, block: int, context: int
+) -> list[tuple[int, int, int, int]]:
+    """(context start, block start, block end, context end) sample bounds covering n_samples.
+
+    All starts are multiples of step, so frames of each padded block line up with
+    frames of the whole signal.
+    """
+    bounds = []
+    for start in range(0, n_samples, block):
+        end = min(start + block, n_samples)
+        bounds.append((max(0, start - context), start, end, min(n_samples, end + context)))
+    return bounds
+
+
+def frame_chroma_blocks(
+    y: np.ndarray,
+    *,
+    sr: int,
+    hop_length: int = 256,
+    preprocess: str = PREPROCESS_DEFAULT,
+    tuning: float | None = None,
+    block_sec: float = STREAM_BLOCK_SEC_DEFAULT,
+) -> np.ndarray:
+    """CQT frame chroma of y computed in overlapping blocks; same (12, T) as frame_chroma.
+
+    Peak memory for HPSS and the CQT is set by block_sec (+- STREAM_CONTEXT_SEC of
+    context) instead of the track length. Each block is analysed with its context
+    and only its own frames are kept, so frames agree with frame_chroma up to
+    floating-point noise. With tuning=None, one tuning is estimated for the whole
+    signal (as librosa does) from pitch peaks gathered block by block; a signal
+    shorter than one block is passed to frame_chroma unchanged.
+    """
+    if hop_length <= 0:
+        raise ValueError(f"hop_length must be positive, got {hop_length}")
+    if block_sec <= 0:
+        raise ValueError(f"block_sec must be positive, got {block_sec}")
+    y, sr = _validate_audio(y, sr)
+    step = int(np.lcm(hop_length, _LIBROSA_STFT_HOP))
+    block = max(step, int(block_sec * sr) // step * step)
+    context = -(-int(STREAM_CONTEXT_SEC * sr) // step) * step
+    if len(y) <= block:
+        return frame_chroma(y, sr=sr, hop_length=hop_length, preprocess=preprocess, tuning=tuning)
+    bounds = _stream_blocks(len(y), step=step, block=block, context=context)
+
+    # Pass 1: preprocess block by block; collect pitch peaks of the block's own
+    # frames for librosa.estimate_tuning's median-magnitude rule.
+    y_chroma = np.empty_like(y)
+    pitches: list[np.ndarray] = []
+    mags: list[np.ndarray] = []
+    for c0, b0, b1, c1 in bounds:
+        part = _preprocess_audio_for_chroma(y[c0:c1], preprocess=preprocess)
+        y_chroma[b0:b1] = part[b0 - c0 : b1 - c0]
+        if tuning is None:
+            pitch, mag = librosa.piptrack(y=part, sr=sr, n_fft=2048)
+            f0 = (b0 - c0) // _LIBROSA_STFT_HOP
+            f1 = f0 + -(-(b1 - b0) // _LIBROSA_STFT_HOP)
+            pitch, mag = pitch[:, f0:f1], mag[:, f0:f1]
+            voiced = pitch > 0
+            pitches.append(pitch[voiced])
+            mags.append(mag[voiced])
+    if tuning is None:
+        pitch, mag = np.concatenate(pitches), np.concatenate(mags)
+        threshold = np.median(mag) if mag.size else 0.0
+        tuning = librosa.pitch_tuning(pitch[mag >= threshold], resolution=0.01, bins_per_octave=36)
+
+    # Pass 2: CQT chroma per block with context, keeping the block's own frames.
+    n_frames = 1 + len(y) // hop_length
+    C = np.empty((12, n_frames), dtype=np.float64)
+    for c0, b0, b1, c1 in bounds:
+        C_part = _compute_frame_chroma(
+            y_chroma[c0:c1], sr=sr, hop_length=hop_length, chroma_type="cqt", tuning=tuning
+        )
+        f0 = b0 // hop_length
+        f1 = n_frames if b1 == len(y) else b1 // hop_length
+        C[:, f0:f1] = C_part[:, f0 - c0 // hop_length : f1 - c0 // hop_length]
+    return C
+
+
+def _tuning_margin_bins(bins_per_octave: int) -> int:
+    """CQT bins kept beyond each end of the chroma range to shift by +-TUNING_MAX_CENTS."""
+    return int(np.ceil(TUNING_MAX_CENTS * bins_per_octave / 1200.0)) + 2
+
+
+def tuning_cqt(
+    y: np.ndarray,
+    *,
+    sr: int,
+    hop_length: int = 256,
+    preprocess: str = PREPROCESS_DEFAULT,
+    bins_per_octave: int = TUNING_BINS_PER_OCTAVE,
+) -> np.ndarray:
+    """High-resolution magnitude CQT of y (A440) for chroma at any tuning offset.
+
+    Covers chroma_cqt's seven octaves above C1 plus a few bins either side, so
+    chroma_at_tuning can derive chroma for offsets up to +-TUNING_MAX_CENTS by
+    shifting and folding bins instead of running one CQT per offset.
+    """
+    if bins_per_octave <= 0 or bins_per_octave % 12 != 0:
+        raise ValueError(f"bins_per_octave must be a positive multiple of 12, got {bins_per_octave}")
+    if hop_length <= 0:
+        raise ValueError(f"hop_length must be positive, got {hop_length}")
+    y, sr = _validate_audio(y, sr)
+    y_chroma = _preprocess_audio_for_chroma(y, preprocess=preprocess)
+    margin = _tuning_margin_bins(bins_per_octave)
+    X = librosa.cqt(
+        y_chroma,
+        sr=sr,
+        hop_length=hop_length,
+        fmin=_CHROMA_FMIN * 2.0 ** (-margin / bins_per_octave),
+        n_bins=_CHROMA_N_OCTAVES * bins_per_octave + 2 * margin,
+        bins_per_octave=bins_per_octave,
+        tuning=0.0,
+    )
+    return np.abs(X)
+
+
+def chroma_at_tuning(
+    X: np.ndarray,
+    *,
+    cents: float,
+    bins_per_octave: int = TUNING_BINS_PER_OCTAVE,
+) -> np.ndarray:
+    """Frame chroma (12, T) at a tuning offset in cents from a tuning_cqt spectrum.
+
+    Approximates frame_chroma with tuning=cents_to_cqt_tuning(cents, bins_per_octave)
+    without a new CQT: bin k of the tuned transform sits cents / (1200 /
+    bins_per_octave) bins above bin k of the A440 one, so the A440 bins are shifted
+    by that fractional offset with Catmull-Rom (cubic) weights over the four
+    neighbouring bins, clipped at zero and folded to pitch classes. At whole-bin
+    offsets no weights are applied and the result matches frame_chroma to within
+    0.01 per entry (CQT resampling error); between bins the interpolation adds
+    error, up to 0.1 per entry and below 0.01 on average for detuned pure tones.
+    """
+    if abs(cents) > TUNING_MAX_CENTS:
+        raise ValueError(f"cents must be within +-{TUNING_MAX_CENTS:g}, got {cents}")
+    margin = _tuning_margin_bins(bins_per_octave)
+    n_bins = _CHROMA_N_OCTAVES * bins_per_octave
+    if X.ndim != 2 or X.shape[0] != n_bins + 2 * margin:
+        raise ValueError(
+            f"X has shape {X.shape}; expected ({n_bins + 2 * margin}, T) from "
+            f"tuning_cqt(bins_per_octave={bins_per_octave})"
+        )
+    pos = margin + cents * bins_per_octave / 1200.0
+    i = int(np.floor(pos))
+    frac = pos - i
+    shifted = X[i : i + n_bins]
+    if frac > 0:
+        # Catmull-Rom weights over bins i-1..i+2: unlike linear interpolation the
+        # result keeps a sinusoid's peak between bins, so scores vary smoothly
+        # with cents instead of peaking at whole bins.
+        f2, f3 = frac * frac, frac * frac * frac
+        w = (
+            0.5 * (-f3 + 2 * f2 - frac),
+            0.5 * (3 * f3 - 5 * f2 + 2),
+            0.5 * (-3 * f3 + 4 * f2 + frac),
+            0.5 * (f3 - f2),
+        )
+        shifted = sum(wj * X[i - 1 + j : i - 1 + j + n_bins] for j, wj in enumerate(w))
+        shifted = np.maximum(shifted, 0.0)
+    C = librosa.feature.chroma_cqt(
+        C=shifted,
+        fmin=_CHROMA_FMIN,
+        bins_per_octave=bins_per_octave,
+    )
+    return C.astype(np.float64, copy=False)
+
+
+def sweep_tuning(
+    X: np.ndarray,
+    cents: np.ndarray,
+    *,
+    sr: int,
+    meter_map: np.ndarray,
+    duration: float,
+    hop_length: int = 256,
+    bpm_threshold: float = 180.0,
+    aggregate: str = "mean",
+    min_frames_per_bin: int = 2,
+    frame_offset: int = 0,
+    bins_per_octave: int = TUNING_BINS_PER_OCTAVE,
+    k: int = 4,
+    lambda_jitter: float = 0.5,
+) -> np.ndarray:
+    """Score metric chromagrams of one tuning_cqt spectrum at each offset in cents.
+
+    X is tuning_cqt of the audio (or of a span starting at frame frame_offset, as
+    in metric_chromagram_from_frames). Returns (len(cents), 3) rows of
+    score_metric_chromagram's (score, concentration, jitter).
+    """
+    C_metrics = [
+        metric_chromagram_from_frames(
+            chroma_at_tuning(X, cents=float(c), bins_per_octave=bins_per_octave),
+            sr=sr,
+            meter_map=meter_map,
+            duration=duration,
+            hop_length=hop_length,
+            bpm_threshold=bpm_threshold,
+            aggregate=aggregate,
+            min_frames_per_bin=min_frames_per_bin,
+            frame_offset=frame_offset,
+        )
+        for c in np.asarray(cents, dtype=np.float64)
+    ]
+    return score_metric_chromagrams(C_metrics, k=k, lambda_jitter=lambda_jitter)
+
+
+def estimate_tuning_cents(
+    y: np.ndarray,
+    *,
+    sr: int,
+    meter_map: np.ndarray,
+    hop_length: int = 256,
+    bpm_threshold: float = 180.0,
+    aggregate: str = "mean",
+    min_frames_per_bin: int = 2,
+    preprocess: str = PREPROCESS_DEFAULT,
+    span_margin_sec: float | None = SPAN_MARGIN_SEC_DEFAULT,
+    bins_per_octave: int = TUNING_BINS_PER_OCTAVE,
+    coarse_step: float = 10.0,
+    fine_step: float = 1.0,
+    k: int = 4,
+    lambda_jitter: float = 0.5,
+) -> tuple[float, np.ndarray]:
+    """Coarse-to-fine tuning search scored with score_metric_chromagram.
+
+    One tuning_cqt of the meter span, then every coarse_step cents over
+    +-TUNING_MAX_CENTS and every fine_step cents within one coarse step of the
+    best coarse offset.
+
+    Returns:
+        (best offset in cents, (N, 4) array of [cents, score, concentration,
+        jitter] rows for every evaluated offset, sorted by cents).
+    """
+    if coarse_step <= 0 or fine_step <= 0:
+        raise ValueError(f"coarse_step and fine_step must be positive, got {coarse_step}, {fine_step}")
+    y, sr = _validate_audio(y, sr)
+    duration = len(y) / float(sr)
+    beat_times = extract_beat_times_from_meter_map(meter_map, duration=duration)
+    start, end = 0, len(y)
+    if span_margin_sec is not None:
+        start, end = chroma_sample_span(
+            beat_times,
+            sr=sr,
+            hop_length=hop_length,
+            n_samples=len(y),
+            margin_sec=span_margin_sec,
+        )
+    X = tuning_cqt(
+        y[start:end],
+        sr=sr,
+        hop_length=hop_length,
+        preprocess=preprocess,
+        bins_per_octave=bins_per_octave,
+    )
+
+    def _sweep(cents: np.ndarray) -> np.ndarray:
+        scores = sweep_tuning(
+            X,
+            cents,
+            sr=sr,
+            meter_map=meter_map,
+            duration=duration,
+            hop_length=hop_length,
+            bpm_threshold=bpm_threshold,
+            aggregate=aggregate,
+            min_frames_per_bin=min_frames_per_bin,
+            frame_offset=start // hop_length,
+            bins_per_octave=bins_per_octave,
+            k=k,
+            lambda_jitter=lambda_jitter,
+        )
+        return np.column_stack([cents, scores])
+
+    coarse = np.arange(-TUNING_MAX_CENTS, TUNING_MAX_CENTS + 1e-9, coarse_step)
+    rows = _sweep(coarse)
+    peak = rows[int(np.nanargmax(rows[:, 1])), 0]
+    fine = np.arange(peak - coarse_step, peak + coarse_step + 1e-9, fine_step)
+    fine = fine[(np.abs(fine) <= TUNING_MAX_CENTS) & ~np.isin(np.round(fine, 6), np.round(coarse, 6))]
+    if fine.size:
+        rows = np.vstack([rows, _sweep(fine)])
+    rows = rows[np.argsort(rows[:, 0], kind="stable")]
+    return float(rows[int(np.nanargmax(rows[:, 1])), 0]), rows
 
 
 def _build_subdivision_boundaries(
@@ -244,13 +691,14 @@ def metric_chromagram(
     hop_length: int = 256,
     bpm_threshold: float = 180.0,
     chroma_type: str = "cqt",
-    preprocess: str = "harmonic",
+    preprocess: str = PREPROCESS_DEFAULT,
     tuning: float | None = None,
     aggregate: str = "mean",
     accent_mode: str = "preserve",
     weight_source: str = "rms",
     weight_power: float = 1.0,
     min_frames_per_bin: int = 2,
+    span_margin_sec: float | None = SPAN_MARGIN_SEC_DEFAULT,
 ) -> np.ndarray:
     """Metric-aligned chromagram using an external meter map.
 
@@ -261,8 +709,10 @@ def metric_chromagram(
     sr : int
         Sampling rate (Hz).
     meter_map : np.ndarray
-        Shape (N, 3) with columns [time_sec, bar_number, beat_number].
-        Only time_sec is used for boundaries; bar/beat columns are metadata.
+        Meter labels as written by the meter stage: a structured array with
+        fields time_sec, bar, beat, or a legacy float (N, 3) array with columns
+        [time_sec, bar_number, beat_number]. Only time_sec is used for
+        boundaries; bar/beat are metadata.
         time_sec must be on the same timeline as y; if y is region-trimmed,
         meter_map must be region-relative.
     hop_length : int
@@ -290,6 +740,12 @@ def metric_chromagram(
         Exponent applied to positive frame weights.
     min_frames_per_bin : int
         Minimum chroma frames per subdivision bin after time-to-frame quantization.
+    span_margin_sec : float | None
+        Preprocessing, chroma and weights are computed only on the audio from
+        the first beat minus this margin to the last beat plus it (see
+        chroma_sample_span), so a meter map covering part of a long track only
+        pays for that part. Estimated tuning then also comes from this span.
+        None uses the whole waveform.
 
     Returns
     -------
@@ -304,11 +760,22 @@ def metric_chromagram(
     if min_frames_per_bin < 1:
         raise ValueError(f"min_frames_per_bin must be >= 1, got {min_frames_per_bin}")
 
-    # --- setup: validate audio, preprocess for chroma, extract beat times ---
+    # --- setup: validate audio, extract beat times, cut to the meter span, preprocess ---
     y, sr = _validate_audio(y, sr)
-    y_chroma = _preprocess_audio_for_chroma(y, preprocess=preprocess)
     duration = len(y) / float(sr)
-    beat_times = _extract_beat_times_from_meter_map(meter_map, duration=duration)
+    beat_times = extract_beat_times_from_meter_map(meter_map, duration=duration)
+
+    start, end = 0, len(y)
+    if span_margin_sec is not None:
+        start, end = chroma_sample_span(
+            beat_times,
+            sr=sr,
+            hop_length=hop_length,
+            n_samples=len(y),
+            margin_sec=span_margin_sec,
+        )
+        y = y[start:end]
+    y_chroma = _preprocess_audio_for_chroma(y, preprocess=preprocess)
 
     C = _compute_frame_chroma(
         y_chroma,
@@ -318,13 +785,9 @@ def metric_chromagram(
         tuning=tuning,
     )
 
-    # --- accent handling: optionally normalise or pre-compute frame weights ---
+    # --- weighted accents: frame weights come from the original waveform ---
     frame_weights: np.ndarray | None = None
-    if accent_mode == "normalize":
-        C = librosa.util.normalize(C, norm=1, axis=0)
-    elif accent_mode == "preserve":
-        pass
-    elif accent_mode == "weighted":
+    if accent_mode == "weighted":
         frame_weights = _compute_frame_weights(
             y,
             sr=sr,
@@ -333,7 +796,92 @@ def metric_chromagram(
             weight_power=weight_power,
             n_frames=C.shape[1],
         )
-    else:
+
+    return _aggregate_metric_chromagram(
+        C,
+        beat_times,
+        sr=sr,
+        hop_length=hop_length,
+        bpm_threshold=bpm_threshold,
+        aggregate=aggregate,
+        accent_mode=accent_mode,
+        frame_weights=frame_weights,
+        min_frames_per_bin=min_frames_per_bin,
+        frame_offset=start // hop_length,
+    )
+
+
+def metric_chromagram_from_frames(
+    C: np.ndarray,
+    *,
+    sr: int,
+    meter_map: np.ndarray,
+    duration: float,
+    hop_length: int = 256,
+    bpm_threshold: float = 180.0,
+    aggregate: str = "mean",
+    accent_mode: str = "preserve",
+    weight_envelope: np.ndarray | None = None,
+    weight_power: float = 1.0,
+    min_frames_per_bin: int = 2,
+    frame_offset: int = 0,
+) -> np.ndarray:
+    """metric_chromagram on precomputed frame chroma (from frame_chroma).
+
+    duration is the length (s) of the audio the meter map refers to. For
+    accent_mode="weighted", weight_envelope is frame_weight_envelope of the
+    original (unpreprocessed) audio. When C covers only part of that audio
+    (y[start:end] with start from chroma_sample_span), frame_offset is
+    start // hop_length. The result equals metric_chromagram on the same audio
+    span; only subdivision and aggregation are computed.
+    """
+    if min_frames_per_bin < 1:
+        raise ValueError(f"min_frames_per_bin must be >= 1, got {min_frames_per_bin}")
+    beat_times = extract_beat_times_from_meter_map(meter_map, duration=duration)
+
+    frame_weights: np.ndarray | None = None
+    if accent_mode == "weighted":
+        if weight_envelope is None:
+            raise ValueError('accent_mode="weighted" requires weight_envelope')
+        frame_weights = _shape_frame_weights(
+            weight_envelope, weight_power=weight_power, n_frames=C.shape[1]
+        )
+
+    return _aggregate_metric_chromagram(
+        C,
+        beat_times,
+        sr=sr,
+        hop_length=hop_length,
+        bpm_threshold=bpm_threshold,
+        aggregate=aggregate,
+        accent_mode=accent_mode,
+        frame_weights=frame_weights,
+        min_frames_per_bin=min_frames_per_bin,
+        frame_offset=frame_offset,
+    )
+
+
+def _aggregate_metric_chromagram(
+    C: np.ndarray,
+    beat_times: np.ndarray,
+    *,
+    sr: int,
+    hop_length: int,
+    bpm_threshold: float,
+    aggregate: str,
+    accent_mode: str,
+    frame_weights: np.ndarray | None,
+    min_frames_per_bin: int,
+    frame_offset: int = 0,
+) -> np.ndarray:
+    """Aggregate frame chroma C into adaptive metric subdivisions of beat_times.
+
+    Column j of C (and frame_weights) is frame frame_offset + j of the audio.
+    """
+    # --- accent handling: optionally normalise ---
+    if accent_mode == "normalize":
+        C = librosa.util.normalize(C, norm=1, axis=0)
+    elif accent_mode not in {"preserve", "weighted"}:
         raise ValueError('accent_mode must be "preserve", "normalize", or "weighted"')
 
     # --- build adaptive subdivision grid (tempo-aware) and convert to frame indices ---
@@ -341,7 +889,9 @@ def metric_chromagram(
         beat_times,
         bpm_threshold=bpm_threshold,
     )
-    boundary_frames = librosa.time_to_frames(boundary_times, sr=sr, hop_length=hop_length)
+    boundary_frames = (
+        librosa.time_to_frames(boundary_times, sr=sr, hop_length=hop_length) - frame_offset
+    )
 
     # --- guard: boundaries must be strictly increasing after quantisation to frames ---
     if not np.all(np.diff(boundary_frames) > 0):
@@ -351,9 +901,10 @@ def metric_chromagram(
         )
 
     T = C.shape[1]
-    if boundary_frames[-1] > T:
+    if boundary_frames[0] < 0 or boundary_frames[-1] > T:
         raise ValueError(
-            f"Meter map extends beyond chroma frames (last_frame={boundary_frames[-1]}, T={T})"
+            f"Meter map extends beyond chroma frames (frames {boundary_frames[0]}.."
+            f"{boundary_frames[-1]}, T={T}, frame_offset={frame_offset})"
         )
 
     # --- guard: every bin must have enough frames for a meaningful aggregate ---
@@ -3,6 +3,7 @@ from __future__ import annotations
 import logging
 import os
 import sys
+import time
 import traceback
 from collections.abc import Callable, Generator
 from contextlib import contextmanager
@@ -202,8 +203,11 @@ class BaseCLI:
 
         Logs:
             - Delegates to handle_errors for exception logging.
+            - When logging, appends one JSON record per result item to
+              runs.jsonl in the log directory (see dijon.pipeline.runlog).
         """
         log_file: TextIO | None = None
+        log_path = None
         use_log = enable_log and log_module is not None
 
         def _out(msg: str) -> None:
@@ -242,8 +246,18 @@ class BaseCLI:
             if pre_message:
                 _out(pre_message)
 
+            t_start = time.perf_counter()
             with handle_errors(operation, logger=self.logger, log_file=log_file):
                 result = op_callable()
+            if log_path is not None and isinstance(result, dict):
+                _record_run(
+                    result,
+                    command=log_module,
+                    method=log_method,
+                    run=log_path.name,
+                    dry_run=log_dry_run,
+                    run_elapsed_s=time.perf_counter() - t_start,
+                )
 
             if success_message and isinstance(result, dict) and result.get("success"):
                 _out(success_message)
@@ -255,6 +269,16 @@ class BaseCLI:
                 log_file.close()
 
 
+def _record_run(result: dict[str, Any], **kwargs: Any) -> None:
+    """Append run records for result to runs.jsonl; never fails the command."""
+    from ..pipeline.runlog import append_run_records, run_records
+
+    try:
+        append_run_records(run_records(result, **kwargs), DERIVED_LOGS_DIR)
+    except (OSError, TypeError, ValueError) as e:
+        get_logger(__name__).warning("Could not write run records: %s", e)
+
+
 def run_cli_task(task: Callable[[], int | None]) -> int:
     """Run a CLI task and convert unexpected failures into exit codes.
 
@@ -288,7 +312,8 @@ def _format_result_dict(result: dict[str, Any], op_label: str) -> str:
 
     Args:
         result: Result dictionary with optional keys: success, total,
-            succeeded, failed, skipped, elapsed_s, message, failures, items.
+            succeeded, failed, skipped, compile_s, elapsed_s, message, failures,
+            items.
         op_label: Operation label to display.
 
     Returns:
@@ -308,6 +333,8 @@ def _format_result_dict(result: dict[str, Any], op_label: str) -> str:
         for key, label in stats_order
         if key in result and result[key] is not None
     ]
+    if "compile_s" in result:
+        stats.append(f"compile: {result['compile_s']:.2f}s")
     if "elapsed_s" in result:
         stats.append(f"elapsed: {result['elapsed_s']:.2f}s")
     if stats:
@@ -0,0 +1,109 @@
+"""CLI command for aligning metric chromagrams across the tracks of a set."""
+
+from __future__ import annotations
+
+from typing import Annotated
+
+import typer
+
+from ...global_config import PROJECT_ROOT
+from ...pipeline.alignment import (
+    ALIGNMENT_OUTPUT_DIR,
+    BAND_DEFAULT,
+    CHROMAGRAM_DIR,
+    run_alignment,
+)
+from ...utils.sets import resolve_set_path
+from ..base import BaseCLI
+
+app = typer.Typer(
+    name="align",
+    help="Align metric chromagrams of the same tune across a set and write to data/derived/alignment",
+)
+
+
+@app.callback(invoke_without_command=True)
+def align(
+    set_ref: Annotated[
+        str,
+        typer.Argument(help="Set reference (name like 'gold' or path like 'data/sets/gold.yaml')"),
+    ],
+    params: Annotated[
+        str,
+        typer.Option(
+            "--params",
+            help="Chromagram parameter prefix selecting one chromagram per track, "
+            "e.g. metric_cqt_256-180.0. Needed when a track has several.",
+        ),
+    ] = "",
+    band: Annotated[
+        float,
+        typer.Option(
+            "--band",
+            help=f"Sakoe-Chiba band radius as a fraction of the longer track. Default: {BAND_DEFAULT}.",
+        ),
+    ] = BAND_DEFAULT,
+    no_transpose: Annotated[
+        bool,
+        typer.Option("--no-transpose", help="Do not search the 12 transpositions; align as is."),
+    ] = False,
+    all_pairs: Annotated[
+        bool,
+        typer.Option("--all-pairs", help="Align every pair in the set, not only tracks sharing a song_name."),
+    ] = False,
+    workers: Annotated[
+        int,
+        typer.Option("--workers", help="Processes aligning pairs in parallel. Default: 1."),
+    ] = 1,
+    force: Annotated[
+        bool,
+        typer.Option("--force", help="Recompute pairs whose saved alignment is up to date."),
+    ] = False,
+    dry_run: Annotated[
+        bool,
+        typer.Option("--dry-run", help="Show what would be written without writing files."),
+    ] = False,
+    no_log: Annotated[
+        bool,
+        typer.Option("--no-log", help="Do not write a log file to data/logs/derived."),
+    ] = False,
+) -> None:
+    """Align chromagrams of performances of the same tune and write to data/derived/alignment.
+
+    Output: <a>__<b>_alignment_<band>-<transpose|fixed>.npz with the warping path,
+    cost, transposition and banded cost matrix. Up-to-date pairs are reused.
+    """
+    cli = BaseCLI("align")
+
+    def _run() -> dict:
+        return run_alignment(
+            set_path=resolve_set_path(set_ref, project_root=PROJECT_ROOT),
+            chromagram_dir=CHROMAGRAM_DIR,
+            output_dir=ALIGNMENT_OUTPUT_DIR,
+            params_prefix=params,
+            band=band,
+            transpose=not no_transpose,
+            all_pairs=all_pairs,
+            workers=workers,
+            force=force,
+            dry_run=dry_run,
+        )
+
+    pre_message = (
+        f"Aligning set {set_ref} (dry-run; no files will be written)..."
+        if dry_run
+        else f"Aligning chromagram pairs in set {set_ref}..."
+    )
+    cli.handle_cli_operation(
+        operation="align",
+        op_callable=_run,
+        pre_message=pre_message,
+        log_module="alignment",
+        log_method="transpose" if not no_transpose else "fixed",
+        log_dry_run=dry_run,
+        enable_log=not no_log,
+        log_context={
+            "inputs": f"set {set_ref}, chromagrams in {CHROMAGRAM_DIR}",
+            "output_dir": str(ALIGNMENT_OUTPUT_DIR),
+        },
+    )
@@ -41,6 +41,46 @@ def beats(
         int | None,
         typer.Option("--theta-max", help="Maximum tempo (BPM). Default: 320."),
     ] = None,
+    from_novelty: Annotated[
+        bool,
+        typer.Option(
+            "--from-novelty",
+            help="Treat inputs as novelty files and compute the tempo profile directly "
+            "(no tempogram read or written).",
+        ),
+    ] = False,
+    n: Annotated[
+        int | None,
+        typer.Option("--n", "-N", help="Window length N for --from-novelty. Default: 512."),
+    ] = None,
+    h: Annotated[
+        int | None,
+        typer.Option("--h", "-H", help="Hop size H for --from-novelty. Default: 1."),
+    ] = None,
+    local_tempo: Annotated[
+        bool,
+        typer.Option(
+            "--local-tempo",
+            help="Follow tempo drift: smoothed per-window tempo curve and a "
+            "time-varying DP penalty instead of one global tempo.",
+        ),
+    ] = False,
+    tempo_window: Annotated[
+        float,
+        typer.Option(
+            "--tempo-window",
+            help="Window length (s) for the --local-tempo curve. Default: 10. "
+            "Profile artifacts use their stored windows.",
+        ),
+    ] = 10.0,
+    tempo_smoothness: Annotated[
+        float,
+        typer.Option(
+            "--tempo-smoothness",
+            help="Viterbi smoothness of the --local-tempo curve (0 = per-window argmax). "
+            "Default: 20.",
+        ),
+    ] = 20.0,
     dry_run: Annotated[
         bool,
         typer.Option("--dry-run", help="Show what would be written without writing files."),
@@ -53,6 +93,9 @@ def beats(
     """Compute beat times from tempogram and novelty files and write to data/derived/beats.
 
     For each tempogram, finds matching novelty by track name. Output: <track_name>_beats.npy
+    Tempo profiles (*_profile.npz from dijon tempogram --emit) are used in place of
+    the full tempogram when present. With --from-novelty, inputs are novelty files.
+    --local-tempo tracks tempo drift (per-window tempo curve, windowed DP).
     """
     cli = BaseCLI("beats")
 
@@ -68,6 +111,12 @@ def beats(
             theta_min=theta_min,
             theta_max=theta_max,
             dry_run=dry_run,
+            profile_from_novelty=from_novelty,
+            N=n,
+            H=h,
+            local_tempo=local_tempo,
+            tempo_window_sec=tempo_window,
+            tempo_smoothness=tempo_smoothness,
         )
 
     pre_message = (
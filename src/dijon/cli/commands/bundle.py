@@ -0,0 +1,83 @@
+"""CLI command for packing per-track derived arrays into bundles."""
+
+from __future__ import annotations
+
+from typing import Annotated
+
+import typer
+
+from ...global_config import DERIVED_DIR
+from ...pipeline.bundle import BUNDLE_OUTPUT_DIR, BUNDLE_STAGES, run_bundle
+from ..base import BaseCLI
+
+app = typer.Typer(
+    name="bundle",
+    help="Pack each track's derived arrays into one lazily loaded file in data/derived/bundle",
+)
+
+
+@app.callback(invoke_without_command=True)
+def bundle(
+    tracks: Annotated[
+        list[str],
+        typer.Argument(help="Track ID(s), e.g. YTB-014. If omitted, every track with derived data is bundled."),
+    ] = [],
+    stage: Annotated[
+        list[str],
+        typer.Option(
+            "--stage",
+            help=f"Stage to include (repeatable). Default: all of {', '.join(BUNDLE_STAGES)}.",
+        ),
+    ] = [],
+    force: Annotated[
+        bool,
+        typer.Option("--force", help="Rebuild bundles whose source files are unchanged."),
+    ] = False,
+    dry_run: Annotated[
+        bool,
+        typer.Option("--dry-run", help="Show what would be written without writing files."),
+    ] = False,
+    no_log: Annotated[
+        bool,
+        typer.Option("--no-log", help="Do not write a log file to data/logs/derived."),
+    ] = False,
+) -> None:
+    """Pack derived arrays of each track into data/derived/bundle/<track>_bundle.npz.
+
+    Members are named <stage>/<params> and carry their source file and parameters;
+    open them with dijon.pipeline.bundle.open_bundle (memory-mapped, read on access).
+    """
+    cli = BaseCLI("bundle")
+
+    track_list = list(tracks) or None
+    stages = tuple(stage) or BUNDLE_STAGES
+
+    def _run() -> dict:
+        return run_bundle(
+            tracks=track_list,
+            derived_dir=DERIVED_DIR,
+            output_dir=BUNDLE_OUTPUT_DIR,
+            stages=stages,
+            force=force,
+            dry_run=dry_run,
+        )
+
+    target = f"{len(track_list)} track(s)" if track_list else "all tracks"
+    pre_message = (
+        f"Bundling {target} (dry-run; no files will be written)..."
+        if dry_run
+        else f"Bundling derived arrays of {target}..."
+    )
+    cli.handle_cli_operation(
+        operation="bundle",
+        op_callable=_run,
+        pre_message=pre_message,
+        log_module="bundle",
+        log_method="-".join(stages),
+        log_dry_run=dry_run,
+        enable_log=not no_log,
+        log_context={
+            "inputs": f"{', '.join(stages)} in {DERIVED_DIR}",
+            "output_dir": str(BUNDLE_OUTPUT_DIR),
+        },
+    )
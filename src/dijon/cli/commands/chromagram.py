@@ -9,9 +9,12 @@ import typer
 
 from ...pipeline.chromagram import (
     CHROMAGRAM_OUTPUT_DIR,
+    FRAME_CACHE_DIR,
     METER_DIR,
+    SWEEP_CONFIGS,
     run_chromagram,
 )
+from ...chromagram.methods import SPAN_MARGIN_SEC_DEFAULT
 from ...global_config import RAW_AUDIO_DIR
 from ..base import BaseCLI
 
@@ -72,6 +75,37 @@ def chromagram(
         str | None,
         typer.Option("--end-marker", "-e", help="End marker name. Use with --start-marker to align with novelty/beats region."),
     ] = None,
+    span_margin: Annotated[
+        float,
+        typer.Option(
+            "--span-margin",
+            help="Seconds of audio analysed beyond the first/last meter-map beat. Default: 2.0.",
+        ),
+    ] = SPAN_MARGIN_SEC_DEFAULT,
+    full_audio: Annotated[
+        bool,
+        typer.Option(
+            "--full-audio",
+            help="Compute frame chroma over the whole region, not just the meter-map span.",
+        ),
+    ] = False,
+    sweep: Annotated[
+        bool,
+        typer.Option(
+            "--sweep",
+            help=(
+                "Compare bpm-threshold/aggregate/accent-mode combinations per track and "
+                "write only the best-scoring chromagram."
+            ),
+        ),
+    ] = False,
+    no_frame_cache: Annotated[
+        bool,
+        typer.Option(
+            "--no-frame-cache",
+            help="Recompute frame chroma instead of reusing data/derived/chroma_frames.",
+        ),
+    ] = False,
     dry_run: Annotated[
         bool,
         typer.Option("--dry-run", help="Show what would be written without writing files."),
@@ -87,6 +121,11 @@ def chromagram(
     Output filenames encode the main chromagram parameters.
     When meter maps come from novelty/beats (marker-trimmed), use --start-marker
     and --end-marker so the selected region matches the meter-map timeline.
+    Frame chroma is cached per track, region, hop length and chroma type, so
+    re-runs that only change aggregation options skip the CQT. Only the audio
+    spanned by the meter map (plus --span-margin seconds) is analysed.
+    --sweep aggregates each track under every SWEEP_CONFIGS combination from
+    one set of frame chroma, scores all candidates in one batch and keeps the best.
     """
     cli = BaseCLI("chromagram")
 
@@ -109,6 +148,9 @@ def chromagram(
             weight_power=weight_power,
             min_frames_per_bin=min_frames_per_bin,
             dry_run=dry_run,
+            frame_cache_dir=None if no_frame_cache else FRAME_CACHE_DIR,
+            span_margin_sec=None if full_audio else span_margin,
+            sweep=list(SWEEP_CONFIGS) if sweep else None,
         )
 
     pre_message = (
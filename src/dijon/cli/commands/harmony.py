@@ -0,0 +1,113 @@
+"""CLI command for chord and key estimation on metric chromagrams."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from ...global_config import PROJECT_ROOT
+from ...pipeline.harmony import (
+    CHROMAGRAM_DIR,
+    HARMONY_OUTPUT_DIR,
+    SMOOTHING_DEFAULT,
+    run_harmony,
+)
+from ...utils.sets import resolve_set_path
+from ..base import BaseCLI
+
+app = typer.Typer(
+    name="harmony",
+    help="Estimate chords and keys from metric chromagrams and write to data/derived/harmony",
+)
+
+
+@app.callback(invoke_without_command=True)
+def harmony(
+    files: Annotated[
+        list[Path],
+        typer.Argument(
+            help="Chromagram file(s): track ID (e.g. YTB-014) or full path. If omitted, all .npy in data/derived/chromagram are used.",
+        ),
+    ] = [],
+    set_ref: Annotated[
+        str | None,
+        typer.Option(
+            "--set",
+            help="Process the tracks of a set instead (name like 'gold' or path like 'data/sets/gold.yaml').",
+        ),
+    ] = None,
+    params: Annotated[
+        str,
+        typer.Option(
+            "--params",
+            help="Chromagram parameter prefix, e.g. metric_cqt_256-180.0. With --set, needed when a track has several.",
+        ),
+    ] = "",
+    smoothing: Annotated[
+        float,
+        typer.Option(
+            "--smoothing",
+            help="Penalty per chord change in Viterbi decoding (cosine units); 0 labels each bin "
+            f"independently. Default: {SMOOTHING_DEFAULT}.",
+        ),
+    ] = SMOOTHING_DEFAULT,
+    dry_run: Annotated[
+        bool,
+        typer.Option("--dry-run", help="Show what would be written without writing files."),
+    ] = False,
+    no_log: Annotated[
+        bool,
+        typer.Option("--no-log", help="Do not write a log file to data/logs/derived."),
+    ] = False,
+) -> None:
+    """Label metric chromagram bins with chords and tracks with keys, writing to data/derived/harmony.
+
+    Output: <track>_harmony_<chromagram params>-<smoothing>.npz, one per chromagram.
+    """
+    cli = BaseCLI("harmony")
+
+    chroma_list = list(files) if files else None
+
+    def _run() -> dict:
+        return run_harmony(
+            chromagram_files=chroma_list,
+            set_path=resolve_set_path(set_ref, project_root=PROJECT_ROOT) if set_ref else None,
+            chromagram_dir=CHROMAGRAM_DIR,
+            output_dir=HARMONY_OUTPUT_DIR,
+            params_prefix=params,
+            smoothing=smoothing,
+            dry_run=dry_run,
+        )
+
+    if set_ref:
+        target = f"set {set_ref}"
+    elif chroma_list:
+        target = f"{len(chroma_list)} chromagram(s)"
+    else:
+        target = "all chromagrams in folder"
+    pre_message = (
+        f"Estimating chords for {target} (dry-run; no files will be written)..."
+        if dry_run
+        else f"Estimating chords and keys for {target}..."
+    )
+    if set_ref:
+        inputs_desc = f"set {set_ref}, chromagrams in {CHROMAGRAM_DIR}"
+    elif chroma_list:
+        inputs_desc = str([str(p) for p in chroma_list])
+    else:
+        inputs_desc = f"all .npy in {CHROMAGRAM_DIR}"
+    cli.handle_cli_operation(
+        operation="harmony",
+        op_callable=_run,
+        pre_message=pre_message,
+        log_module="harmony",
+        log_method="viterbi" if smoothing > 0 else "argmax",
+        log_dry_run=dry_run,
+        enable_log=not no_log,
+        log_context={
+            "inputs": inputs_desc,
+            "output_dir": str(HARMONY_OUTPUT_DIR),
+        },
+    )
@@ -9,6 +9,7 @@ import typer
 
 from ...pipeline.meter import (
     BEATS_DIR,
+    MAX_BEATS_PER_BAR_DEFAULT,
     METER_OUTPUT_DIR,
     run_meter,
 )
@@ -28,6 +29,21 @@ def meter(
             help="Beats file(s): track ID (e.g. YTB-014) or full path. If omitted, all .npy in data/derived/beats are used.",
         ),
     ] = [],
+    max_beats_per_bar: Annotated[
+        int,
+        typer.Option(
+            "--max-beats-per-bar",
+            help="Largest bar length (beats) considered; 2..N are scored. "
+            f"Default: {MAX_BEATS_PER_BAR_DEFAULT}.",
+        ),
+    ] = MAX_BEATS_PER_BAR_DEFAULT,
+    search_phase: Annotated[
+        bool,
+        typer.Option(
+            "--search-phase",
+            help="Also score every downbeat phase instead of fixing beat 1 at HEAD_IN_START.",
+        ),
+    ] = False,
     dry_run: Annotated[
         bool,
         typer.Option("--dry-run", help="Show what would be written without writing files."),
@@ -40,6 +56,7 @@ def meter(
     """Compute meter labels for beat files and write to data/derived/meter.
 
     Tracks without HEAD_IN_START marker are skipped. Output: <track_name>_meter.npy
+    --search-phase lets the downbeat move off the beat nearest HEAD_IN_START.
     """
     cli = BaseCLI("meter")
 
@@ -51,6 +68,8 @@ def meter(
             output_dir=METER_OUTPUT_DIR,
             beats_dir=BEATS_DIR,
             dry_run=dry_run,
+            max_beats_per_bar=max_beats_per_bar,
+            search_phase=search_phase,
         )
 
     pre_message = (
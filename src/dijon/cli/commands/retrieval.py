@@ -0,0 +1,180 @@
+"""CLI commands for the bar-shingle index and passage queries."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from ...pipeline.retrieval import (
+    BAR_INDEX_DIR,
+    CHROMAGRAM_DIR,
+    METER_DIR,
+    run_bar_index,
+    run_bar_query,
+)
+from ...retrieval.index import NPROBE_DEFAULT
+from ...retrieval.methods import WINDOW_BARS_DEFAULT
+from ..base import BaseCLI
+
+app = typer.Typer(
+    name="retrieval",
+    help="Index bar-level chroma of the corpus and find similar passages",
+)
+
+
+def _parse_bars(bars: str) -> tuple[int, int | None]:
+    """'9-16' -> (9, 16); '9' -> (9, None)."""
+    try:
+        if "-" in bars.strip("-"):
+            first, last = bars.split("-", 1)
+            return int(first), int(last)
+        return int(bars), None
+    except ValueError:
+        raise typer.BadParameter(f"Expected a bar or bar range like 9-16, got {bars!r}") from None
+
+
+@app.command("index")
+def index(
+    files: Annotated[
+        list[Path],
+        typer.Argument(
+            help="Chromagram file(s): track ID (e.g. YTB-014) or full path. If omitted, all .npy in data/derived/chromagram are used.",
+        ),
+    ] = [],
+    params: Annotated[
+        str,
+        typer.Option(
+            "--params",
+            help="Chromagram parameter prefix selecting one chromagram per track, "
+            "e.g. metric_cqt_256-180.0. Needed when a track has several.",
+        ),
+    ] = "",
+    window: Annotated[
+        int,
+        typer.Option(
+            "--window",
+            help=f"Bars per shingle; fixed when the index is created. Default: {WINDOW_BARS_DEFAULT}.",
+        ),
+    ] = WINDOW_BARS_DEFAULT,
+    rebuild: Annotated[
+        bool,
+        typer.Option("--rebuild", help="Re-index up-to-date tracks and retrain the IVF lists."),
+    ] = False,
+    dry_run: Annotated[
+        bool,
+        typer.Option("--dry-run", help="Show what would be indexed without writing files."),
+    ] = False,
+    no_log: Annotated[
+        bool,
+        typer.Option("--no-log", help="Do not write a log file to data/logs/derived."),
+    ] = False,
+) -> None:
+    """Add metric chromagrams to the bar-shingle index in data/derived/bar_index.
+
+    Tracks without a meter map are skipped; tracks already indexed from the same
+    chromagram are skipped unless --rebuild.
+    """
+    cli = BaseCLI("retrieval")
+
+    chroma_list = list(files) if files else None
+
+    def _run() -> dict:
+        return run_bar_index(
+            chromagram_files=chroma_list,
+            chromagram_dir=CHROMAGRAM_DIR,
+            meter_dir=METER_DIR,
+            index_dir=BAR_INDEX_DIR,
+            window=window,
+            params_prefix=params,
+            rebuild=rebuild,
+            dry_run=dry_run,
+        )
+
+    pre_message = (
+        "Indexing chromagrams (dry-run; no files will be written)..."
+        if dry_run
+        else "Indexing "
+        + (f"{len(chroma_list)} chromagram(s)..." if chroma_list else "all chromagrams in folder...")
+    )
+    inputs_desc = (
+        str([str(p) for p in chroma_list]) if chroma_list
+        else f"all .npy in {CHROMAGRAM_DIR}"
+    )
+    cli.handle_cli_operation(
+        operation="index",
+        op_callable=_run,
+        pre_message=pre_message,
+        log_module="retrieval",
+        log_method=f"window-{window}",
+        log_dry_run=dry_run,
+        enable_log=not no_log,
+        log_context={
+            "inputs": inputs_desc,
+            "output_dir": str(BAR_INDEX_DIR),
+        },
+    )
+
+
+@app.command("query")
+def query(
+    track: Annotated[
+        str,
+        typer.Argument(help="Indexed track ID, e.g. YTB-014"),
+    ],
+    bars: Annotated[
+        str,
+        typer.Option(
+            "--bars",
+            help="Query passage as bar labels, e.g. 9-16; a single bar starts a window of the index size.",
+        ),
+    ],
+    k: Annotated[
+        int,
+        typer.Option("-k", help="Number of matches. Default: 10."),
+    ] = 10,
+    mode: Annotated[
+        str,
+        typer.Option("--mode", help="Search mode: ivf (approximate) or exact. Default: ivf."),
+    ] = "ivf",
+    nprobe: Annotated[
+        int,
+        typer.Option("--nprobe", help=f"IVF lists scanned per query. Default: {NPROBE_DEFAULT}."),
+    ] = NPROBE_DEFAULT,
+    no_transpose: Annotated[
+        bool,
+        typer.Option("--no-transpose", help="Match only at the query's pitch."),
+    ] = False,
+    include_self: Annotated[
+        bool,
+        typer.Option("--include-self", help="Also return other passages of the query track."),
+    ] = False,
+) -> None:
+    """Find the indexed passages most harmonically similar to bars of a track.
+
+    Matches are listed with their bar range, cosine score and the transposition
+    (in semitones) at which they match.
+    """
+    cli = BaseCLI("retrieval")
+    first_bar, last_bar = _parse_bars(bars)
+
+    def _run() -> dict:
+        return run_bar_query(
+            track=track,
+            first_bar=first_bar,
+            last_bar=last_bar,
+            index_dir=BAR_INDEX_DIR,
+            k=k,
+            mode=mode,
+            nprobe=nprobe,
+            transpose=not no_transpose,
+            include_self=include_self,
+        )
+
+    cli.handle_cli_operation(
+        operation="query",
+        op_callable=_run,
+        pre_message=f"Searching for passages like {track} bars {bars}...",
+        enable_log=False,
+    )
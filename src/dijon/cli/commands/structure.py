@@ -0,0 +1,113 @@
+"""CLI command for section segmentation of metric chromagrams."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from ...pipeline.structure import (
+    CHROMAGRAM_DIR,
+    KERNEL_SIZE_DEFAULT,
+    KERNEL_VARIANCE_DEFAULT,
+    METER_DIR,
+    STRUCTURE_OUTPUT_DIR,
+    run_structure,
+)
+from ..base import BaseCLI
+
+app = typer.Typer(
+    name="structure",
+    help="Find section boundaries in metric chromagrams and write to data/derived/structure",
+)
+
+
+@app.callback(invoke_without_command=True)
+def structure(
+    files: Annotated[
+        list[Path],
+        typer.Argument(
+            help="Chromagram file(s): track ID (e.g. YTB-014) or full path. If omitted, all .npy in data/derived/chromagram are used.",
+        ),
+    ] = [],
+    unit: Annotated[
+        str,
+        typer.Option("--unit", help="Self-similarity unit: bar or beat. Default: bar."),
+    ] = "bar",
+    kernel_size: Annotated[
+        int,
+        typer.Option(
+            "--kernel-size",
+            help="Checkerboard kernel half-width in units; also the minimum section length. "
+            f"Default: {KERNEL_SIZE_DEFAULT}.",
+        ),
+    ] = KERNEL_SIZE_DEFAULT,
+    variance: Annotated[
+        float,
+        typer.Option(
+            "--variance",
+            help=f"Gaussian taper of the kernel (relative to its size). Default: {KERNEL_VARIANCE_DEFAULT}.",
+        ),
+    ] = KERNEL_VARIANCE_DEFAULT,
+    threshold: Annotated[
+        float,
+        typer.Option(
+            "--threshold",
+            help="Minimum boundary novelty relative to the strongest peak. Default: 0.1.",
+        ),
+    ] = 0.1,
+    dry_run: Annotated[
+        bool,
+        typer.Option("--dry-run", help="Show what would be written without writing files."),
+    ] = False,
+    no_log: Annotated[
+        bool,
+        typer.Option("--no-log", help="Do not write a log file to data/logs/derived."),
+    ] = False,
+) -> None:
+    """Segment metric chromagrams into sections and write to data/derived/structure.
+
+    Tracks without a meter map are skipped. Output:
+    <track>_structure_<chromagram params>-<unit>-<kernel_size>-<variance>.npy
+    """
+    cli = BaseCLI("structure")
+
+    chroma_list = list(files) if files else None
+
+    def _run() -> dict:
+        return run_structure(
+            chromagram_files=chroma_list,
+            output_dir=STRUCTURE_OUTPUT_DIR,
+            chromagram_dir=CHROMAGRAM_DIR,
+            meter_dir=METER_DIR,
+            unit=unit,
+            kernel_size=kernel_size,
+            variance=variance,
+            threshold=threshold,
+            dry_run=dry_run,
+        )
+
+    pre_message = (
+        "Segmenting chromagrams (dry-run; no files will be written)..."
+        if dry_run
+        else "Segmenting "
+        + (f"{len(chroma_list)} chromagram(s)..." if chroma_list else "all chromagrams in folder...")
+    )
+    inputs_desc = (
+        str([str(p) for p in chroma_list]) if chroma_list
+        else f"all .npy in {CHROMAGRAM_DIR}"
+    )
+    cli.handle_cli_operation(
+        operation="structure",
+        op_callable=_run,
+        pre_message=pre_message,
+        log_module="structure",
+        log_method=unit,
+        log_dry_run=dry_run,
+        enable_log=not no_log,
+        log_context={
+            "inputs": inputs_desc,
+            "output_dir": str(STRUCTURE_OUTPUT_DIR),
+        },
+    )
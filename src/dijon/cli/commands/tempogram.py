@@ -26,7 +26,13 @@ def tempogram(
     ] = [],
     type: Annotated[
         str,
-        typer.Option("--type", "-t", help="Tempogram type: fourier, autocorr, cyclic. Default: fourier."),
+        typer.Option(
+            "--type",
+            "-t",
+            help="Tempogram type(s): fourier, autocorr, cyclic, adaptive (coarse-to-fine fourier), "
+            "or a comma-separated subset "
+            "(e.g. fourier,cyclic) computed in one pass. Default: fourier.",
+        ),
     ] = "fourier",
     n: Annotated[
         int | None,
@@ -44,6 +50,34 @@ def tempogram(
         int | None,
         typer.Option("--theta-max", help="Maximum tempo (BPM). Default 320."),
     ] = None,
+    dtype: Annotated[
+        str,
+        typer.Option("--dtype", help="Storage dtype: float64, float32, float16. Default: float64."),
+    ] = "float64",
+    decimate: Annotated[
+        int,
+        typer.Option("--decimate", help="Block-average this many frames in time before saving. Default: 1."),
+    ] = 1,
+    emit: Annotated[
+        str,
+        typer.Option(
+            "--emit",
+            help="What to write: tempogram, profile (tempo-profile summary only), or both. "
+            "Default: tempogram.",
+        ),
+    ] = "tempogram",
+    profile_window: Annotated[
+        float,
+        typer.Option("--profile-window", help="Window length (s) for windowed tempo profiles. Default: 10."),
+    ] = 10.0,
+    threads: Annotated[
+        int,
+        typer.Option(
+            "--threads",
+            help="Numba threads for fourier/cyclic/adaptive (parallel over tempi). "
+            "0 = all cores. Default: 1.",
+        ),
+    ] = 1,
     dry_run: Annotated[
         bool,
         typer.Option("--dry-run", help="Show what would be written without writing files."),
@@ -61,6 +95,14 @@ def tempogram(
 
     Output filenames: <track_name>_tempogram_<type>_<N>-<H>-<theta_min>-<theta_max>.npy
     Cyclic type is computed from fourier tempogram in the same run.
+    Several types (e.g. --type fourier,cyclic,autocorr) load each novelty file once
+    and reuse the fourier result for cyclic.
+    --dtype/--decimate store a compact array (filename gets e.g. _float16-d10) and
+    every output gets a <stem>.json sidecar with Theta, Fs, N, H for mmap readers.
+    --emit profile|both writes <stem>_profile.npz (global and windowed tempo profiles),
+    which dijon beats reads instead of the full matrix.
+    --threads N spreads the fourier computation over N numba threads; when running
+    several tempogram processes at once, keep processes x threads <= cores.
     """
     cli = BaseCLI("tempogram")
 
@@ -78,6 +120,11 @@ def tempogram(
             theta_max=theta_max,
             dry_run=dry_run,
             skip_if_exists=skip_existing,
+            dtype=dtype.lower(),
+            decimate=decimate,
+            emit=emit.lower(),
+            profile_window_sec=profile_window,
+            threads=threads,
         )
 
     pre_message = (
@@ -95,7 +142,7 @@ def tempogram(
         op_callable=_run,
         pre_message=pre_message,
         log_module="tempogram",
-        log_method=type.lower(),
+        log_method=type.lower().replace(",", "+"),
         log_dry_run=dry_run,
         enable_log=not no_log,
         log_context={
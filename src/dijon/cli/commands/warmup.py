@@ -0,0 +1,51 @@
+"""CLI command for warming numba kernels (JIT compile or cache load)."""
+
+from __future__ import annotations
+
+from typing import Annotated
+
+import typer
+
+from ...pipeline.warmup import JIT_KERNELS, run_warmup
+from ..base import BaseCLI
+
+app = typer.Typer(
+    name="warmup",
+    help="Compile numba kernels (or load them from cache) and report compile vs run time",
+)
+
+
+@app.callback(invoke_without_command=True)
+def warmup(
+    kernels: Annotated[
+        list[str],
+        typer.Argument(
+            help=f"Kernel name(s) to warm. If omitted, all: {', '.join(JIT_KERNELS)}.",
+        ),
+    ] = [],
+    no_log: Annotated[
+        bool,
+        typer.Option("--no-log", help="Do not write a log file to data/logs/derived."),
+    ] = False,
+) -> None:
+    """Compile numba kernels once so later runs only pay the on-disk cache load.
+
+    Run after install or upgrade, or before starting a batch of short invocations
+    (e.g. dijon tempogram YTB-014 per track). Each kernel reports its compile (or
+    cache-load) time separately from one run on a small sample input.
+    """
+    cli = BaseCLI("warmup")
+
+    kernel_list = list(kernels) if kernels else None
+
+    def _run() -> dict:
+        return run_warmup(kernels=kernel_list)
+
+    cli.handle_cli_operation(
+        operation="warmup",
+        op_callable=_run,
+        pre_message="Warming numba kernels...",
+        log_module="warmup",
+        enable_log=not no_log,
+        log_context={"kernels": kernel_list or "all"},
+    )
@@ -1,35 +1,113 @@
 from __future__ import annotations
 
+import importlib
+
 import typer
+from typer.core import TyperCommand, TyperGroup
 
 from .base import configure_logging
-from .commands.acquire import app as acquire_app
-from .commands.beats import app as beats_app
-from .commands.chromagram import app as chromagram_app
-from .commands.clean import app as clean_app
-from .commands.ingest import app as ingest_app
-from .commands.meter import app as meter_app
-from .commands.novelty import app as novelty_app
-from .commands.reaper import app as reaper_app
-from .commands.sets import app as sets_app
-from .commands.tempogram import app as tempogram_app
+
+# Subcommand name -> (command module, help shown by `dijon --help`). Modules are
+# imported only when their subcommand runs, so `dijon --help` and light commands
+# (clean, sets, ...) never load numba, scipy or librosa. Keep help in sync with
+# each module's Typer(help=...).
+COMMANDS: dict[str, tuple[str, str]] = {
+    "acquire": ("dijon.cli.commands.acquire", "Acquisition operations"),
+    "align": (
+        "dijon.cli.commands.align",
+        "Align metric chromagrams of the same tune across a set and write to data/derived/alignment",
+    ),
+    "beats": (
+        "dijon.cli.commands.beats",
+        "Compute beat times from tempogram and novelty .npy and write to data/derived/beats",
+    ),
+    "bundle": (
+        "dijon.cli.commands.bundle",
+        "Pack each track's derived arrays into one lazily loaded file in data/derived/bundle",
+    ),
+    "chromagram": (
+        "dijon.cli.commands.chromagram",
+        "Compute metric chromagrams from audio + meter maps and write to data/derived/chromagram",
+    ),
+    "clean": ("dijon.cli.commands.clean", "Cleaning operations"),
+    "harmony": (
+        "dijon.cli.commands.harmony",
+        "Estimate chords and keys from metric chromagrams and write to data/derived/harmony",
+    ),
+    "ingest": ("dijon.cli.commands.ingest", "Ingestion operations"),
+    "meter": (
+        "dijon.cli.commands.meter",
+        "Compute meter labels from beats .npy and write to data/derived/meter",
+    ),
+    "novelty": (
+        "dijon.cli.commands.novelty",
+        "Compute novelty functions from raw audio and write .npy to data/derived/novelty",
+    ),
+    "reaper": ("dijon.cli.commands.reaper", "Reaper project operations"),
+    "retrieval": (
+        "dijon.cli.commands.retrieval",
+        "Index bar-level chroma of the corpus and find similar passages",
+    ),
+    "sets": ("dijon.cli.commands.sets", "Set operations"),
+    "structure": (
+        "dijon.cli.commands.structure",
+        "Find section boundaries in metric chromagrams and write to data/derived/structure",
+    ),
+    "tempogram": (
+        "dijon.cli.commands.tempogram",
+        "Compute tempograms from novelty .npy and write to data/derived/tempogram",
+    ),
+    "warmup": (
+        "dijon.cli.commands.warmup",
+        "Compile numba kernels (or load them from cache) and report compile vs run time",
+    ),
+}
+
+
+class _LazyCommand(TyperCommand):
+    """Placeholder listed in `dijon --help`; replaced by the real group when invoked."""
+
+    def __init__(self, name: str, module: str, help: str) -> None:
+        super().__init__(name=name, help=help)
+        self.module = module
+
+    def load(self) -> TyperGroup:
+        sub_app = importlib.import_module(self.module).app
+        command = typer.main.get_group(sub_app)
+        command.name = self.name
+        return command
+
+
+class LazyGroup(TyperGroup):
+    """Top-level group that imports a subcommand's module only when it is resolved."""
+
+    def __init__(self, **attrs) -> None:
+        super().__init__(**attrs)
+        for name, (module, help_text) in COMMANDS.items():
+            self.commands.setdefault(name, _LazyCommand(name, module, help_text))
+
+    def _load(self, cmd_name: str) -> None:
+        cmd = self.commands.get(cmd_name)
+        if isinstance(cmd, _LazyCommand):
+            self.commands[cmd_name] = cmd.load()
+
+    def resolve_command(self, ctx, args):
+        if args and args[0] in self.commands:
+            self._load(args[0])
+        return super().resolve_command(ctx, args)
+
 
 configure_logging()
 app = typer.Typer(
     help="Project CLI",
+    cls=LazyGroup,
     context_settings={"help_option_names": ["-h", "--help"]},
 )
 
-app.add_typer(acquire_app, name="acquire")
-app.add_typer(beats_app, name="beats")
-app.add_typer(chromagram_app, name="chromagram")
-app.add_typer(clean_app, name="clean")
-app.add_typer(ingest_app, name="ingest")
-app.add_typer(meter_app, name="meter")
-app.add_typer(novelty_app, name="novelty")
-app.add_typer(reaper_app, name="reaper")
-app.add_typer(sets_app, name="sets")
-app.add_typer(tempogram_app, name="tempogram")
+
+@app.callback()
+def _root() -> None:
+    """Project CLI."""
 
 
 def main() -> None:
@@ -47,4 +125,3 @@ def main() -> None:
 
 if __name__ == "__main__":
     main()
-
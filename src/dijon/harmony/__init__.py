@@ -0,0 +1,19 @@
+"""Chord and key estimation package."""
+
+from .methods import (
+    chord_scores,
+    chord_templates,
+    decode_chords,
+    estimate_chords,
+    estimate_keys,
+    key_templates,
+)
+
+__all__ = [
+    "chord_scores",
+    "chord_templates",
+    "decode_chords",
+    "estimate_chords",
+    "estimate_keys",
+    "key_templates",
+]
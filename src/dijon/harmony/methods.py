@@ -0,0 +1,176 @@
+# src/dijon/harmony/methods.py
+"""Chord and key estimation on metric chromagrams by template matching."""
+
+from __future__ import annotations
+
+import numpy as np
+from numba import jit, prange
+
+PITCH_CLASSES = ("C", "C#", "D", "Eb", "E", "F", "F#", "G", "Ab", "A", "Bb", "B")
+# Intervals (semitones above the root) of each chord quality; names are root:quality.
+CHORD_QUALITIES: dict[str, tuple[int, ...]] = {
+    "maj": (0, 4, 7),
+    "min": (0, 3, 7),
+    "7": (0, 4, 7, 10),
+    "maj7": (0, 4, 7, 11),
+    "min7": (0, 3, 7, 10),
+}
+NO_CHORD = "N"
+# Krumhansl-Kessler key profiles, tonic first.
+MAJOR_PROFILE = (6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88)
+MINOR_PROFILE = (6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17)
+# Cost of a chord change in cosine-similarity units: a change is kept only if the
+# new chord fits the following bins better by this much in total.
+SMOOTHING_DEFAULT = 1.0
+
+
+def chord_templates(
+    qualities: dict[str, tuple[int, ...]] = CHORD_QUALITIES,
+) -> tuple[list[str], np.ndarray]:
+    """Chord names (root:quality, quality by quality) and L2-normalized templates float32 (n, 12)."""
+    names: list[str] = []
+    rows: list[np.ndarray] = []
+    for quality, intervals in qualities.items():
+        base = np.zeros(12, dtype=np.float32)
+        base[list(intervals)] = 1.0
+        for root, pc in enumerate(PITCH_CLASSES):
+            names.append(f"{pc}:{quality}")
+            rows.append(np.roll(base, root))
+    T = np.stack(rows)
+    return names, T / np.linalg.norm(T, axis=1, keepdims=True)
+
+
+def key_templates() -> tuple[list[str], np.ndarray]:
+    """Key names (24: C..B major, then minor) and zero-mean unit-norm profiles float32 (24, 12).
+
+    The dot product of a profile with a zero-mean unit-norm chroma vector is their
+    Pearson correlation (the Krumhansl-Schmuckler key score).
+    """
+    names: list[str] = []
+    rows: list[np.ndarray] = []
+    for mode, profile in (("major", MAJOR_PROFILE), ("minor", MINOR_PROFILE)):
+        base = np.asarray(profile, dtype=np.float32)
+        for root, pc in enumerate(PITCH_CLASSES):
+            names.append(f"{pc} {mode}")
+            rows.append(np.roll(base, root))
+    P = np.stack(rows)
+    P -= P.mean(axis=1, keepdims=True)
+    return names, P / np.linalg.norm(P, axis=1, keepdims=True)
+
+
+def chord_scores(C: np.ndarray, templates: np.ndarray, *, eps: float = 1e-9) -> np.ndarray:
+    """Cosine similarity of every chroma column with every template, plus a no-chord row.
+
+    C is (12, N); chromagrams of several tracks can be concatenated along axis 1
+    and scored in one product. Returns float32 (N, n_templates + 1), one row per
+    column so decoding reads each frame contiguously; the last entry (no chord) is
+    1 for silent columns and 0 elsewhere, so silence is labelled N and sound never is.
+    """
+    C = np.asarray(C, dtype=np.float32)
+    if C.ndim != 2 or C.shape[0] != 12:
+        raise ValueError(f"Expected chroma with shape (12, N), got {C.shape}")
+    norms = np.linalg.norm(C, axis=0)
+    silent = norms <= eps
+    S = np.empty((C.shape[1], templates.shape[0] + 1), dtype=np.float32)
+    S[:, :-1] = (C / np.maximum(norms, eps)).T @ templates.astype(np.float32, copy=False).T
+    S[:, -1] = silent
+    return S
+
+
+@jit(nopython=True, cache=True, parallel=True)
+def _viterbi_segments(scores, offsets, penalty):
+    """Best label path per segment scores[offsets[t]:offsets[t + 1]] of frame rows (N, K).
+
+    Maximizes the summed score of the chosen labels minus penalty per label
+    change (an HMM with uniform switching in the log domain), so each step costs
+    O(K): the best predecessor is either the same label or the overall best.
+    Segments (tracks) are decoded in parallel.
+    """
+    K = scores.shape[1]
+    labels = np.empty(scores.shape[0], dtype=np.int32)
+    for t in prange(offsets.shape[0] - 1):
+        a = offsets[t]
+        b = offsets[t + 1]
+        if b <= a:
+            continue
+        back = np.empty((b - a, K), dtype=np.int16)
+        delta = np.empty(K, dtype=np.float64)
+        for k in range(K):
+            delta[k] = scores[a, k]
+            back[0, k] = k
+        for n in range(1, b - a):
+            best = 0
+            for k in range(1, K):
+                if delta[k] > delta[best]:
+                    best = k
+            switch = delta[best] - penalty
+            for k in range(K):
+                if delta[k] >= switch:
+                    back[n, k] = k
+                    delta[k] = delta[k] + scores[a + n, k]
+                else:
+                    back[n, k] = best
+                    delta[k] = switch + scores[a + n, k]
+        state = 0
+        for k in range(1, K):
+            if delta[k] > delta[state]:
+                state = k
+        for n in range(b - a - 1, -1, -1):
+            labels[a + n] = state
+            state = back[n, state]
+    return labels
+
+
+def decode_chords(
+    scores: np.ndarray, *, smoothing: float = SMOOTHING_DEFAULT, offsets: np.ndarray | None = None
+) -> np.ndarray:
+    """Label index per frame row of scores (N, K) from chord_scores; int32 (N,).
+
+    smoothing 0 takes the best template per column; otherwise Viterbi decoding
+    charges smoothing per chord change. offsets (n_tracks + 1,) marks track
+    boundaries in concatenated scores so paths do not run across tracks.
+    """
+    if smoothing < 0:
+        raise ValueError(f"smoothing must be >= 0, got {smoothing}")
+    if smoothing == 0:
+        return np.argmax(scores, axis=1).astype(np.int32)
+    if offsets is None:
+        offsets = np.array([0, scores.shape[0]], dtype=np.int64)
+    return _viterbi_segments(
+        np.ascontiguousarray(scores, dtype=np.float32), np.asarray(offsets, dtype=np.int64), float(smoothing)
+    )
+
+
+def estimate_chords(
+    chromagrams: list[np.ndarray],
+    *,
+    smoothing: float = SMOOTHING_DEFAULT,
+    qualities: dict[str, tuple[int, ...]] = CHORD_QUALITIES,
+) -> tuple[list[str], list[np.ndarray]]:
+    """Chord labels for each chromagram (12, N_t), scored and decoded in one batch.
+
+    Returns (names, labels): names holds the chord names followed by NO_CHORD;
+    labels[t] is an int16 (N_t,) index into names per column of chromagrams[t].
+    """
+    names, T = chord_templates(qualities)
+    if not chromagrams:
+        return names + [NO_CHORD], []
+    offsets = np.cumsum([0] + [C.shape[1] for C in chromagrams]).astype(np.int64)
+    S = chord_scores(np.concatenate(chromagrams, axis=1), T)
+    labels = decode_chords(S, smoothing=smoothing, offsets=offsets).astype(np.int16)
+    return names + [NO_CHORD], [labels[a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+
+
+def estimate_keys(chromagrams: list[np.ndarray], *, eps: float = 1e-9) -> tuple[list[str], np.ndarray]:
+    """Key correlations of each chromagram's summed chroma, for all tracks in one product.
+
+    Returns (names, R) with R float32 (24, n_tracks): Pearson correlation of
+    track t's pitch-class distribution with each key profile; argmax is the key.
+    """
+    names, P = key_templates()
+    if not chromagrams:
+        return names, np.zeros((24, 0), dtype=np.float32)
+    M = np.stack([np.asarray(C, dtype=np.float64).sum(axis=1) for C in chromagrams], axis=1)
+    M -= M.mean(axis=0, keepdims=True)
+    M /= np.maximum(np.linalg.norm(M, axis=0, keepdims=True), eps)
+    return names, (P @ M.astype(np.float32)).astype(np.float32)
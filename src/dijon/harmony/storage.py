@@ -0,0 +1,69 @@
+"""On-disk harmony results: one uncompressed .npz per chromagram.
+
+An entry holds the chord label of every chromagram column (an index into the
+stored chord names), the key correlations of the track and the chromagram
+filename and smoothing it was computed with.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+
+from ..utils.storage import save_npz_atomic
+
+HARMONY_VERSION = 1
+
+
+def save_harmony(
+    path: Path,
+    *,
+    chords: np.ndarray,
+    chord_names: list[str],
+    key_scores: np.ndarray,
+    key_names: list[str],
+    smoothing: float,
+    source: str,
+) -> None:
+    """Write chord labels and key scores atomically (temp file + rename), creating the directory."""
+    save_npz_atomic(
+        path,
+        chords=np.asarray(chords, dtype=np.int16),
+        chord_names=np.asarray(chord_names),
+        key_scores=np.asarray(key_scores, dtype=np.float32),
+        key_names=np.asarray(key_names),
+        smoothing=np.asarray(float(smoothing)),
+        source=np.asarray(source),
+        version=np.asarray(HARMONY_VERSION),
+    )
+
+
+def load_harmony(path: Path) -> dict | None:
+    """Return a saved harmony entry as a dict, or None if absent, unreadable or of another version.
+
+    Adds key (the best-scoring key name) and labels (chord name per column).
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != HARMONY_VERSION:
+                return None
+            chords = data["chords"]
+            chord_names = data["chord_names"]
+            key_scores = data["key_scores"]
+            key_names = data["key_names"]
+            return {
+                "chords": chords,
+                "chord_names": chord_names.tolist(),
+                "labels": chord_names[chords],
+                "key": str(key_names[int(np.argmax(key_scores))]),
+                "key_scores": key_scores,
+                "key_names": key_names.tolist(),
+                "smoothing": float(data["smoothing"]),
+                "source": str(data["source"]),
+            }
+    except (OSError, KeyError, ValueError):
+        return None
@@ -0,0 +1,247 @@
+"""Pipeline for aligning metric chromagrams of the tracks in a set (data/derived/alignment)."""
+
+from __future__ import annotations
+
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from pathlib import Path
+
+import numba
+import numpy as np
+
+from ..alignment import align_chromagrams
+from ..alignment.methods import BAND_DEFAULT
+from ..alignment.storage import load_alignment, save_alignment
+from ..global_config import DERIVED_DIR
+from ..utils.sets import load_set_yaml
+from ..utils.storage import source_stamp
+from .catalog import chromagram_for_track, record_artifact
+from .warmup import warm_kernels
+
+CHROMAGRAM_DIR = DERIVED_DIR / "chromagram"
+ALIGNMENT_OUTPUT_DIR = DERIVED_DIR / "alignment"
+ALIGNMENT_KERNELS = ["alignment.shift_costs", "alignment.dtw_band", "alignment.backtrack"]
+
+
+def _output_filename(track_a: str, track_b: str, *, band: float, transpose: bool) -> str:
+    """E.g. YTB-004__YTB-005_alignment_0.1-transpose.npz."""
+    mode = "transpose" if transpose else "fixed"
+    return f"{track_a}__{track_b}_alignment_{band}-{mode}.npz"
+
+
+def _set_pairs(set_items: list[dict], *, all_pairs: bool) -> list[tuple[str, str]]:
+    """Track pairs to align: every pair when all_pairs, else pairs sharing a song_name.
+
+    Song names are compared ignoring case and spacing; items without one only pair
+    under all_pairs.
+    """
+    groups: dict[str, list[str]] = {}
+    for item in set_items:
+        file_id = str(item.get("file_id") or "").strip()
+        if not file_id:
+            continue
+        song = "" if all_pairs else " ".join(str(item.get("song_name") or "").split()).casefold()
+        if song or all_pairs:
+            groups.setdefault(song, []).append(file_id)
+    pairs: list[tuple[str, str]] = []
+    for tracks in groups.values():
+        pairs.extend(combinations(sorted(dict.fromkeys(tracks)), 2))
+    return sorted(pairs)
+
+
+def _init_worker() -> None:
+    """Pool initializer: one numba thread per process, kernels loaded from cache."""
+    numba.set_num_threads(1)
+    warm_kernels(ALIGNMENT_KERNELS)
+
+
+def _align_pair(task: dict) -> dict:
+    """Align one pair and write its result unless dry_run (runs in pool workers)."""
+    X = np.load(task["a_path"])
+    Y = np.load(task["b_path"])
+    result = align_chromagrams(X, Y, band=task["band"], transpose=task["transpose"])
+    if not task["dry_run"]:
+        save_alignment(task["out_path"], result, band=task["band"], stamps=task["stamps"])
+    return {
+        "cost": result["cost"],
+        "shift": result["shift"],
+        "path_length": int(result["path"].shape[0]),
+        "frames": (int(X.shape[1]), int(Y.shape[1])),
+    }
+
+
+def run_alignment(
+    *,
+    set_path: Path,
+    chromagram_dir: Path = CHROMAGRAM_DIR,
+    output_dir: Path = ALIGNMENT_OUTPUT_DIR,
+    params_prefix: str = "",
+    band: float = BAND_DEFAULT,
+    transpose: bool = True,
+    all_pairs: bool = False,
+    workers: int = 1,
+    force: bool = False,
+    dry_run: bool = False,
+) -> dict:
+    """Align metric chromagrams of performances of the same tune in a set.
+
+    Pairs are tracks of the set YAML at set_path sharing a song_name, or all
+    pairs with all_pairs. Each track's chromagram is looked up in chromagram_dir;
+    params_prefix (e.g. metric_cqt_256-180.0) selects one when a track has
+    several. Each pair is aligned with banded DTW (band as a fraction of the
+    longer track), searching all 12 transpositions of the second track unless
+    transpose is False, and written to
+    <a>__<b>_alignment_<band>-<transpose|fixed>.npz. A result computed from the
+    same chromagram files is reused unless force.
+
+    workers > 1 aligns pairs in that many processes (one numba thread each);
+    workers == 1 aligns in this process, scoring transpositions in parallel.
+
+    Returns:
+        Dict with success, total, succeeded, failed, skipped, message, items, failures,
+        compile_s and elapsed_s.
+    """
+    problems = []
+    if not 0 < band <= 1:
+        problems.append(f"band must be in (0, 1], got {band}")
+    if workers < 1:
+        problems.append(f"workers must be >= 1, got {workers}")
+    set_items: list[dict] = []
+    if not problems:
+        try:
+            set_items = load_set_yaml(Path(set_path)).get("items") or []
+        except FileNotFoundError as e:
+            problems.append(str(e))
+    if problems:
+        return {
+            "success": False,
+            "total": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "skipped": 0,
+            "message": "; ".join(problems),
+            "items": [],
+            "failures": [],
+        }
+
+    pairs = _set_pairs(set_items, all_pairs=all_pairs)
+    if not pairs:
+        return {
+            "success": True,
+            "total": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "skipped": 0,
+            "message": "No track pairs to align.",
+            "items": [],
+            "failures": [],
+        }
+
+    output_dir = Path(output_dir)
+    succeeded = 0
+    failed = 0
+    skipped = 0
+    items: list[dict] = []
+    failures: list[dict] = []
+
+    chroma_paths: dict[str, Path | str] = {}
+    for track in sorted({t for pair in pairs for t in pair}):
+        try:
+            chroma_paths[track] = chromagram_for_track(track, chromagram_dir, params_prefix)
+        except ValueError as e:
+            chroma_paths[track] = str(e)
+
+    tasks: list[dict] = []
+    for track_a, track_b in pairs:
+        name = f"{track_a}__{track_b}"
+        missing = [p for p in (chroma_paths[track_a], chroma_paths[track_b]) if isinstance(p, str)]
+        if missing:
+            skipped += 1
+            items.append({"file": name, "status": "skipped", "detail": "; ".join(missing)})
+            continue
+        out_name = _output_filename(track_a, track_b, band=band, transpose=transpose)
+        a_path, b_path = chroma_paths[track_a], chroma_paths[track_b]
+        stamps = (source_stamp(a_path), source_stamp(b_path))
+        cached = None if force else load_alignment(output_dir / out_name, stamps)
+        if cached is not None:
+            succeeded += 1
+            items.append({
+                "file": name,
+                "output": out_name,
+                "status": "success",
+                "cache": "hit",
+                "cost": cached["cost"],
+                "shift": cached["shift"],
+                "detail": f"cached: cost {cached['cost']:.4f}, shift {cached['shift']:+d}",
+            })
+            continue
+        tasks.append({
+            "name": name,
+            "a_path": a_path,
+            "b_path": b_path,
+            "out_path": output_dir / out_name,
+            "stamps": stamps,
+            "band": band,
+            "transpose": transpose,
+            "dry_run": dry_run,
+        })
+
+    compile_s = warm_kernels(ALIGNMENT_KERNELS) if tasks else 0.0
+    t_start = time.perf_counter()
+
+    if tasks and workers > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(tasks)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        ) as pool:
+            futures = [pool.submit(_align_pair, task) for task in tasks]
+            outcomes = []
+            for future in futures:
+                try:
+                    outcomes.append(future.result())
+                except Exception as e:
+                    outcomes.append(e)
+    else:
+        outcomes = []
+        for task in tasks:
+            try:
+                outcomes.append(_align_pair(task))
+            except Exception as e:
+                outcomes.append(e)
+
+    for task, outcome in zip(tasks, outcomes):
+        if isinstance(outcome, Exception):
+            failed += 1
+            failures.append({"item": task["name"], "reason": str(outcome)})
+            items.append({"file": task["name"], "status": "failed", "detail": str(outcome)})
+            continue
+        if not dry_run:
+            record_artifact(task["out_path"], "alignment")
+        succeeded += 1
+        items.append({
+            "file": task["name"],
+            "output": task["out_path"].name,
+            "status": "success",
+            "cache": "miss",
+            **outcome,
+            "detail": f"cost {outcome['cost']:.4f}, shift {outcome['shift']:+d}, "
+            f"{outcome['frames'][0]}x{outcome['frames'][1]} frames",
+        })
+
+    total = len(pairs)
+    return {
+        "success": failed == 0,
+        "total": total,
+        "succeeded": succeeded,
+        "failed": failed,
+        "skipped": skipped,
+        "compile_s": compile_s,
+        "elapsed_s": time.perf_counter() - t_start,
+        "message": f"Processed {total} pair(s). Succeeded: {succeeded}, failed: {failed}, skipped: {skipped}."
+        + (" [DRY RUN]" if dry_run else ""),
+        "items": items,
+        "failures": failures,
+    }
@@ -2,12 +2,32 @@
 
 from __future__ import annotations
 
+import time
 from pathlib import Path
 
 import numpy as np
 
-from ..beats import compute_beat_sequence
+from ..beats import (
+    compute_beat_sequence,
+    compute_beat_sequence_local,
+    compute_tempo_curve,
+    tempo_curve_to_beat_ref,
+)
+from ..beats.tracking import TEMPO_SMOOTHNESS_DEFAULT
 from ..global_config import DERIVED_DIR
+from ..tempogram.profile import (
+    PROFILE_SUFFIX,
+    PROFILE_WINDOW_SEC_DEFAULT,
+    compute_tempo_profile_fourier,
+    is_profile_path,
+    load_tempo_profile,
+    profile_path_for,
+    tempo_profiles_from_tempogram,
+)
+from ..tempogram.storage import load_tempogram_meta, mean_abs_over_time, open_tempogram
+from .catalog import find_artifacts, record_artifact
+from .tempogram import resolve_novelty_files, track_name_from_novelty_stem
+from .warmup import warm_kernels
 
 FS_NOV = 100.0
 TEMPOGRAM_DIR = DERIVED_DIR / "tempogram"
@@ -15,29 +35,62 @@ NOVELTY_DIR = DERIVED_DIR / "novelty"
 BEATS_OUTPUT_DIR = DERIVED_DIR / "beats"
 
 THETA_DEFAULT = (40, 320)
+FOURIER_DEFAULTS = (512, 1)  # (N, H) for tempo profiles computed from novelty
+
+
+def _collapse_profile_pairs(paths: list[Path]) -> list[Path]:
+    """Drop <stem>_profile.npz entries whose <stem>.npy tempogram is also listed.
+
+    run_beats prefers the sibling profile of a tempogram anyway, so each
+    tempogram/profile pair is one input.
+    """
+    npy_stems = {p.with_suffix("").as_posix() for p in paths if p.suffix == ".npy"}
+    out: list[Path] = []
+    for p in paths:
+        if is_profile_path(p):
+            stem = p.with_name(p.name[: -len(PROFILE_SUFFIX)]).as_posix()
+            if stem in npy_stems:
+                continue
+        out.append(p)
+    return out
 
 
 def _resolve_tempogram_files(files: list[Path] | None, tempogram_dir: Path) -> list[Path]:
     """Return list of tempogram paths: explicit if given, else all .npy in tempogram_dir.
 
+    Tempo profiles (*_profile.npz) count as tempogram inputs; a profile next to its
+    tempogram .npy is folded into that one entry.
+
     When files are provided, each item is resolved as follows:
     - Full path (absolute or with directory): used as-is.
-    - Basename only (e.g. YTB-014): glob tempogram_dir/<track_id>_tempogram_*.npy.
-      If multiple matches, raises ValueError (ambiguous; use explicit path).
+    - Basename only (e.g. YTB-014): tempogram_dir/<track_id>_tempogram_*.npy (and
+      *_profile.npz), looked up in the derived-artifact catalog. A longer name
+      narrows by parameters, e.g. YTB-014_tempogram_fourier_512-1. If multiple
+      matches, raises ValueError (ambiguous; use explicit path or more parameters).
     """
     if not files:
         if not tempogram_dir.exists():
             return []
-        return sorted(tempogram_dir.glob("*.npy"))
+        return _collapse_profile_pairs(
+            sorted([*tempogram_dir.glob("*.npy"), *tempogram_dir.glob(f"*{PROFILE_SUFFIX}")])
+        )
 
     resolved: list[Path] = []
     for p in files:
         path = Path(p)
         is_shorthand = not path.is_absolute() and len(path.parts) == 1
         if is_shorthand:
-            stem = path.stem
-            track_id = stem.split("_tempogram_")[0] if "_tempogram_" in stem else stem
-            matches = sorted(tempogram_dir.glob(f"{track_id}_tempogram_*.npy"))
+            stem = path.name[:-4] if path.suffix == ".npy" else path.name
+            track_id, params_prefix = (
+                stem.split("_tempogram_", 1) if "_tempogram_" in stem else (stem, "")
+            )
+            matches = _collapse_profile_pairs([
+                m
+                for m in find_artifacts(
+                    tempogram_dir, "tempogram", track_id, params_prefix=params_prefix
+                )
+                if m.suffix == ".npy" or is_profile_path(m)
+            ])
             if len(matches) > 1:
                 names = [m.name for m in matches]
                 raise ValueError(
@@ -51,6 +104,69 @@ def _resolve_tempogram_files(files: list[Path] | None, tempogram_dir: Path) -> l
     return list(dict.fromkeys(resolved))
 
 
+def _tempo_profile_for_tempogram(
+    tempo_path: Path, theta: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return (F_coef_BPM, global tempo profile) for a tempogram or profile path.
+
+    Uses the profile artifact when tempo_path is one or has a sibling profile;
+    otherwise memory-maps the tempogram and reduces it in chunks.
+    """
+    profile_path = tempo_path if is_profile_path(tempo_path) else profile_path_for(tempo_path)
+    if profile_path.exists():
+        profile = load_tempo_profile(profile_path)
+        if profile["type"] == "cyclic":
+            raise ValueError("Cyclic tempo profile has no BPM axis")
+        return profile["axis"], profile["global_profile"]
+
+    # Memory-mapped and reduced in chunks; only the tempo profile is needed.
+    tempogram_arr = open_tempogram(tempo_path)
+
+    if tempogram_arr.ndim != 2:
+        raise ValueError(f"Expected 2D tempogram, got shape {tempogram_arr.shape}")
+
+    meta = load_tempogram_meta(tempo_path)
+    F_coef_BPM = _tempogram_axis(tempogram_arr.shape[0], theta, meta)
+    return F_coef_BPM, mean_abs_over_time(tempogram_arr)
+
+
+def _tempogram_axis(K: int, theta: np.ndarray, meta: dict | None) -> np.ndarray:
+    """Tempo axis (BPM) for a K-row tempogram: sidecar theta, else theta, else 40.. BPM."""
+    if meta is not None and len(meta.get("theta", [])) == K:
+        return np.asarray(meta["theta"], dtype=np.float64)
+    if K == len(theta):
+        return theta
+    return np.arange(40, 40 + K, dtype=np.float64)
+
+
+def _windowed_tempo_profile_for_tempogram(
+    tempo_path: Path, theta: np.ndarray, window_sec: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Return (F_coef_BPM, global profile, windowed profile (K, W), window centers in s).
+
+    A profile artifact supplies its stored windows (window_sec is then ignored);
+    a tempogram is memory-mapped and reduced into window_sec windows in chunks.
+    """
+    profile_path = tempo_path if is_profile_path(tempo_path) else profile_path_for(tempo_path)
+    if profile_path.exists():
+        profile = load_tempo_profile(profile_path)
+        if profile["type"] == "cyclic":
+            raise ValueError("Cyclic tempo profile has no BPM axis")
+        centers = profile["window_times_sec"] + profile["window_sec"] / 2
+        return profile["axis"], profile["global_profile"], profile["windowed_profile"], centers
+
+    tempogram_arr = open_tempogram(tempo_path)
+    if tempogram_arr.ndim != 2:
+        raise ValueError(f"Expected 2D tempogram, got shape {tempogram_arr.shape}")
+    meta = load_tempogram_meta(tempo_path)
+    F_coef_BPM = _tempogram_axis(tempogram_arr.shape[0], theta, meta)
+    frame_rate_hz = float(meta["frame_rate_hz"]) if meta is not None else FS_NOV
+    global_profile, windowed, window_times = tempo_profiles_from_tempogram(
+        tempogram_arr, frame_rate_hz=frame_rate_hz, window_sec=window_sec
+    )
+    return F_coef_BPM, global_profile, windowed, window_times + window_sec / 2
+
+
 def _track_name_from_tempogram_stem(stem: str) -> str:
     """Extract track name from tempogram filename stem."""
     if "_tempogram_" in stem:
@@ -60,11 +176,42 @@ def _track_name_from_tempogram_stem(stem: str) -> str:
 
 def _find_novelty_for_track(track_name: str, novelty_dir: Path) -> Path | None:
     """Find first matching novelty file for a track."""
-    prefix = f"{track_name}_novelty_"
-    matches = sorted(novelty_dir.glob(f"{prefix}*.npy"))
+    matches = find_artifacts(novelty_dir, "novelty", track_name, suffixes=(".npy",))
     return matches[0] if matches else None
 
 
+def _source_novelty_name(tempo_path: Path) -> str:
+    """Return the novelty filename a tempogram or profile was computed from ("" if unrecorded).
+
+    Reads source_novelty from the profile .npz (tempo_path itself or its sibling)
+    or from the tempogram's JSON sidecar; neither requires loading the array.
+    """
+    profile_path = tempo_path if is_profile_path(tempo_path) else profile_path_for(tempo_path)
+    if profile_path.exists():
+        with np.load(profile_path, allow_pickle=False) as data:
+            if "source_novelty" in data.files:
+                name = str(data["source_novelty"])
+                if name:
+                    return name
+    meta = load_tempogram_meta(tempo_path)
+    return str(meta.get("source_novelty", "")) if meta is not None else ""
+
+
+def _novelty_for_tempogram(
+    tempo_path: Path, track_name: str, novelty_dir: Path
+) -> tuple[Path | None, str]:
+    """Return (novelty path, how it was chosen) for a tempogram or profile.
+
+    Uses the source novelty recorded by run_tempogram ("provenance"), so beats are
+    tracked on exactly the novelty the tempogram came from. Tempograms without a
+    record fall back to the first novelty file for the track ("track").
+    """
+    source = _source_novelty_name(tempo_path)
+    if source:
+        return Path(novelty_dir) / source, "provenance"
+    return _find_novelty_for_track(track_name, novelty_dir), "track"
+
+
 def run_beats(
     *,
     tempogram_files: list[Path] | None = None,
@@ -75,13 +222,35 @@ def run_beats(
     theta_min: int | None = None,
     theta_max: int | None = None,
     dry_run: bool = False,
+    profile_from_novelty: bool = False,
+    N: int | None = None,
+    H: int | None = None,
+    local_tempo: bool = False,
+    tempo_window_sec: float = PROFILE_WINDOW_SEC_DEFAULT,
+    tempo_smoothness: float = TEMPO_SMOOTHNESS_DEFAULT,
 ) -> dict:
     """Compute beat times from tempogram and novelty files and write .npy to output_dir.
 
     If tempogram_files is None or empty, uses all .npy in tempogram_dir.
-    For each tempogram, finds matching novelty (first match by track name prefix).
+    For each tempogram, loads the novelty it was computed from (source_novelty in
+    the JSON sidecar or profile .npz, looked up in novelty_dir); tempograms without
+    that record fall back to the first novelty file matching the track name.
+    Only the global tempo profile is used: a <stem>_profile.npz written by
+    run_tempogram (emit="profile"/"both") is read instead of the matrix when present.
     Output filename: <track_name>_beats.npy
 
+    profile_from_novelty: When True, tempogram_files are novelty inputs (track IDs
+    or paths, default all .npy in novelty_dir) and the Fourier tempo profile is
+    computed chunk-wise straight from novelty with window N and hop H (defaults
+    512, 1), without materializing or reading a tempogram.
+
+    local_tempo: When True, follow tempo drift instead of using one global tempo.
+    A tempo curve is taken from windowed tempo profiles (tempo_window_sec windows,
+    or the windows stored in a profile artifact), Viterbi-smoothed with
+    tempo_smoothness and kept within half an octave of the global tempo. The DP
+    then penalizes deviation from the local beat period and only scores
+    predecessors within a factor 2 of it (O(N * period) instead of O(N^2)).
+
     Returns:
         Dict with success, total, succeeded, failed, skipped, message, items, failures.
     """
@@ -89,7 +258,13 @@ def run_beats(
     theta_max = theta_max if theta_max is not None else THETA_DEFAULT[1]
     theta = np.arange(theta_min, theta_max + 1, dtype=np.float64)
 
-    paths = _resolve_tempogram_files(tempogram_files, tempogram_dir)
+    N = N if N is not None else FOURIER_DEFAULTS[0]
+    H = H if H is not None else FOURIER_DEFAULTS[1]
+
+    if profile_from_novelty:
+        paths = resolve_novelty_files(tempogram_files, novelty_dir)
+    else:
+        paths = _resolve_tempogram_files(tempogram_files, tempogram_dir)
     if not paths:
         return {
             "success": True,
@@ -112,9 +287,16 @@ def run_beats(
     items: list[dict] = []
     failures: list[dict] = []
 
+    compile_s = warm_kernels(["beats.dp_local"] if local_tempo else [])
+    t_start = time.perf_counter()
+
     for tempo_path in paths:
-        track_name = _track_name_from_tempogram_stem(tempo_path.stem)
-        nov_path = _find_novelty_for_track(track_name, novelty_dir)
+        if profile_from_novelty:
+            track_name = track_name_from_novelty_stem(tempo_path.stem)
+            nov_path, novelty_match = tempo_path, "input"
+        else:
+            track_name = _track_name_from_tempogram_stem(tempo_path.stem)
+            nov_path, novelty_match = _novelty_for_tempogram(tempo_path, track_name, novelty_dir)
 
         if nov_path is None:
             skipped += 1
@@ -135,29 +317,50 @@ def run_beats(
             continue
 
         if not nov_path.exists():
+            reason = (
+                f"Source novelty {nov_path.name} not found in {novelty_dir}"
+                if novelty_match == "provenance"
+                else "Novelty file not found"
+            )
             failed += 1
-            failures.append({"item": str(nov_path), "reason": "Novelty file not found"})
-            items.append({"file": tempo_path.name, "status": "failed", "detail": "Novelty file not found"})
+            failures.append({"item": str(nov_path), "reason": reason})
+            items.append({"file": tempo_path.name, "status": "failed", "detail": reason})
             continue
 
         try:
             novelty = np.load(nov_path).astype(np.float64)
-            tempogram_arr = np.load(tempo_path)
-
-            if tempogram_arr.ndim != 2:
-                raise ValueError(f"Expected 2D tempogram, got shape {tempogram_arr.shape}")
-
-            K, _M = tempogram_arr.shape
-            F_coef_BPM = theta if K == len(theta) else np.arange(40, 40 + K, dtype=np.float64)
-            tempo_profile = np.mean(np.abs(tempogram_arr), axis=1)
+            windowed: np.ndarray | None = None
+            if profile_from_novelty:
+                F_coef_BPM = theta
+                tempo_profile, windowed, window_times = compute_tempo_profile_fourier(
+                    novelty, FS_NOV, N, H, theta, window_sec=tempo_window_sec
+                )
+                window_centers = window_times + tempo_window_sec / 2
+            elif local_tempo:
+                F_coef_BPM, tempo_profile, windowed, window_centers = (
+                    _windowed_tempo_profile_for_tempogram(tempo_path, theta, tempo_window_sec)
+                )
+            else:
+                F_coef_BPM, tempo_profile = _tempo_profile_for_tempogram(tempo_path, theta)
             tempo_bpm = float(F_coef_BPM[int(np.argmax(tempo_profile))])
-            beat_ref = int(np.round(FS_NOV * 60.0 / tempo_bpm))
 
-            B = compute_beat_sequence(novelty, beat_ref=beat_ref, factor=factor)
+            tempo_curve: np.ndarray | None = None
+            if local_tempo and windowed is not None and windowed.shape[1] > 0:
+                tempo_curve = compute_tempo_curve(
+                    windowed, F_coef_BPM, smoothness=tempo_smoothness, center_bpm=tempo_bpm
+                )
+                beat_ref_curve = tempo_curve_to_beat_ref(
+                    tempo_curve, window_centers, len(novelty), FS_NOV
+                )
+                B = compute_beat_sequence_local(novelty, beat_ref_curve, factor=factor)
+            else:
+                beat_ref = int(np.round(FS_NOV * 60.0 / tempo_bpm))
+                B = compute_beat_sequence(novelty, beat_ref=beat_ref, factor=factor)
             beat_times = B / FS_NOV
 
             if not dry_run:
                 np.save(out_path, beat_times, allow_pickle=False)
+                record_artifact(out_path, "beats")
 
             # Metadata for CLI display
             num_beats = len(beat_times)
@@ -173,10 +376,11 @@ def run_beats(
             ibi_std = float(np.std(ibi)) if len(ibi) > 0 else 0.0
 
             succeeded += 1
-            items.append({
+            item = {
                 "file": tempo_path.name,
-                "input_tempogram": tempo_path.name,
+                "input_tempogram": None if profile_from_novelty else tempo_path.name,
                 "input_novelty": nov_path.name,
+                "novelty_match": novelty_match,
                 "output": out_name,
                 "status": "success",
                 "num_beats": num_beats,
@@ -191,7 +395,12 @@ def run_beats(
                 "t_last": t_last,
                 "duration": duration,
                 "coverage_ratio": coverage,
-            })
+                "tempo_mode": "local" if tempo_curve is not None else "global",
+            }
+            if tempo_curve is not None:
+                item["tempo_curve_min_bpm"] = float(np.min(tempo_curve))
+                item["tempo_curve_max_bpm"] = float(np.max(tempo_curve))
+            items.append(item)
         except Exception as e:
             failed += 1
             failures.append({"item": str(tempo_path), "reason": str(e)})
@@ -203,6 +412,8 @@ def run_beats(
         "succeeded": succeeded,
         "failed": failed,
         "skipped": skipped,
+        "compile_s": compile_s,
+        "elapsed_s": time.perf_counter() - t_start,
         "message": f"Processed {len(paths)} file(s). Succeeded: {succeeded}, failed: {failed}, skipped: {skipped}."
         + (" [DRY RUN]" if dry_run else ""),
         "items": items,
@@ -0,0 +1,209 @@
+"""Pipeline for packing each track's derived arrays into one bundle (data/derived/bundle)."""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from ..global_config import DERIVED_DIR
+from ..tempogram.storage import load_tempogram_meta
+from ..utils.bundle import FeatureBundle, write_bundle
+from ..utils.storage import source_stamp
+from .catalog import list_artifacts, record_artifact
+
+BUNDLE_OUTPUT_DIR = DERIVED_DIR / "bundle"
+# Per-track stage directories under DERIVED_DIR, in pipeline order.
+BUNDLE_STAGES = ("novelty", "tempogram", "beats", "meter", "chromagram", "structure", "harmony")
+
+
+def _output_filename(track: str) -> str:
+    return f"{track}_bundle.npz"
+
+
+def bundle_path(track: str, output_dir: Path = BUNDLE_OUTPUT_DIR) -> Path:
+    """Path of a track's bundle in output_dir (it may not exist yet)."""
+    return Path(output_dir) / _output_filename(track)
+
+
+def open_bundle(track: str, output_dir: Path = BUNDLE_OUTPUT_DIR) -> FeatureBundle:
+    """Open a track's bundle for lazy, memory-mapped reads; raises FileNotFoundError if absent."""
+    path = bundle_path(track, output_dir)
+    if not path.exists():
+        raise FileNotFoundError(f"No bundle for {track} in {output_dir}; run `dijon bundle {track}`")
+    return FeatureBundle(path)
+
+
+def _member_name(stage: str, params: str) -> str:
+    return f"{stage}/{params}" if params else stage
+
+
+def _stage_sources(
+    derived_dir: Path, stages: tuple[str, ...], tracks: set[str] | None
+) -> dict[str, list[tuple[str, str, Path]]]:
+    """Track -> [(stage, params, path)] from one catalog listing per stage directory."""
+    sources: dict[str, list[tuple[str, str, Path]]] = {}
+    for stage in stages:
+        for track, params, path in list_artifacts(derived_dir / stage, stage):
+            if path.name.startswith(".") or (tracks is not None and track not in tracks):
+                continue
+            sources.setdefault(track, []).append((stage, params, path))
+    return sources
+
+
+def _source_stamps(sources: list[tuple[str, str, Path]]) -> list[list]:
+    """[stage, filename, size, mtime_ns] per source; a bundle with other stamps is stale."""
+    return [[stage, *source_stamp(path)] for stage, _, path in sources]
+
+
+def _bundle_arrays(sources: list[tuple[str, str, Path]]) -> tuple[dict[str, np.ndarray], dict[str, dict]]:
+    """Arrays and per-member provenance for a track; .npy sources are memory-mapped, not read."""
+    arrays: dict[str, np.ndarray] = {}
+    members: dict[str, dict] = {}
+    for stage, params, path in sources:
+        source, size, mtime_ns = source_stamp(path)
+        provenance = {
+            "stage": stage,
+            "params": params,
+            "source": source,
+            "size": size,
+            "mtime_ns": mtime_ns,
+        }
+        name = _member_name(stage, params)
+        if path.suffix == ".npz":
+            with np.load(path, allow_pickle=False) as data:
+                for key in data.files:
+                    arrays[f"{name}/{key}"] = data[key]
+                    members[f"{name}/{key}"] = {**provenance, "key": key}
+            continue
+        arrays[name] = np.load(path, mmap_mode="r", allow_pickle=False)
+        if stage == "tempogram":
+            meta = load_tempogram_meta(path)
+            if meta is not None:
+                provenance["meta"] = meta
+        members[name] = provenance
+    return arrays, members
+
+
+def run_bundle(
+    *,
+    tracks: list[str] | None = None,
+    derived_dir: Path = DERIVED_DIR,
+    output_dir: Path = BUNDLE_OUTPUT_DIR,
+    stages: tuple[str, ...] | list[str] = BUNDLE_STAGES,
+    force: bool = False,
+    dry_run: bool = False,
+) -> dict:
+    """Pack each track's derived arrays from the stage directories into <track>_bundle.npz.
+
+    Every artifact of the given stages under derived_dir becomes one member named
+    <stage>/<params> (arrays of .npz artifacts add /<key>), with its source file,
+    size, mtime, stage and parameters (and tempogram sidecar metadata) in the
+    bundle index. tracks limits the run to those track IDs (default: every track
+    with an artifact). A bundle built from the same source files is kept unless
+    force.
+
+    Returns:
+        Dict with success, total, succeeded, failed, skipped, message, items, failures.
+    """
+    stages = tuple(stages)
+    unknown = [s for s in stages if s not in BUNDLE_STAGES]
+    if unknown or not stages:
+        return {
+            "success": False,
+            "total": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "skipped": 0,
+            "message": f"Unknown stage(s) {unknown}; choose from {list(BUNDLE_STAGES)}"
+            if unknown else "No stages to bundle.",
+            "items": [],
+            "failures": [],
+        }
+
+    wanted = set(tracks) if tracks else None
+    derived_dir = Path(derived_dir)
+    sources = _stage_sources(derived_dir, stages, wanted)
+    names = sorted(wanted) if wanted else sorted(sources)
+    if not names:
+        return {
+            "success": True,
+            "total": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "skipped": 0,
+            "message": f"No derived artifacts found in {derived_dir}.",
+            "items": [],
+            "failures": [],
+        }
+
+    output_dir = Path(output_dir)
+    succeeded = 0
+    failed = 0
+    skipped = 0
+    items: list[dict] = []
+    failures: list[dict] = []
+    t_start = time.perf_counter()
+
+    for track in names:
+        track_sources = sources.get(track, [])
+        if not track_sources:
+            skipped += 1
+            items.append({"file": track, "status": "skipped", "detail": "No derived artifacts"})
+            continue
+        out_name = _output_filename(track)
+        out_path = output_dir / out_name
+        try:
+            stamps = _source_stamps(track_sources)
+            if not force and out_path.exists():
+                try:
+                    current = FeatureBundle(out_path).meta.get("sources") == stamps
+                except ValueError:
+                    current = False
+                if current:
+                    skipped += 1
+                    items.append({"file": track, "output": out_name, "status": "skipped", "detail": "Up to date"})
+                    continue
+            arrays, members = _bundle_arrays(track_sources)
+            n_bytes = sum(int(a.nbytes) for a in arrays.values())
+            if not dry_run:
+                write_bundle(
+                    out_path,
+                    arrays,
+                    members=members,
+                    meta={
+                        "track": track,
+                        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                        "stages": sorted({s for s, _, _ in track_sources}, key=stages.index),
+                        "sources": stamps,
+                    },
+                )
+                record_artifact(out_path, "bundle")
+            succeeded += 1
+            items.append({
+                "file": track,
+                "output": out_name,
+                "status": "success",
+                "members": len(arrays),
+                "detail": f"{len(arrays)} array(s) from {len(track_sources)} file(s), "
+                f"{n_bytes / 1e6:.1f} MB",
+            })
+        except Exception as e:
+            failed += 1
+            failures.append({"item": track, "reason": str(e)})
+            items.append({"file": track, "status": "failed", "detail": str(e)})
+
+    return {
+        "success": failed == 0,
+        "total": len(names),
+        "succeeded": succeeded,
+        "failed": failed,
+        "skipped": skipped,
+        "elapsed_s": time.perf_counter() - t_start,
+        "message": f"Processed {len(names)} track(s). Succeeded: {succeeded}, failed: {failed}, skipped: {skipped}."
+        + (" [DRY RUN]" if dry_run else ""),
+        "items": items,
+        "failures": failures,
+    }
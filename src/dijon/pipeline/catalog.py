@@ -0,0 +1,260 @@
+"""Derived-artifact catalog: an SQLite index of files in the data/derived stage dirs.
+
+One catalog.sqlite sits next to the stage directories (data/derived/catalog.sqlite
+for the defaults) with a row per artifact keyed by stage directory, track and
+parameter string, e.g. YTB-001_novelty_spectrum_1024-256-100.0-10.npy ->
+(novelty, YTB-001, spectrum_1024-256-100.0-10). Pipelines record outputs as they
+write them and resolve track-ID shorthands with an indexed query instead of a glob
+per track. The chromagram helpers below resolve the inputs of the stages that
+read metric chromagrams (structure, alignment, harmony, retrieval).
+
+A stage directory whose mtime differs from the one stored at its last scan
+(files written, copied in or deleted) is rescanned once at the next lookup, so a
+run costs one directory listing instead of one glob per track. Catalog errors
+(read-only or locked database) fall back to globbing.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+CATALOG_FILENAME = "catalog.sqlite"
+ARTIFACT_SUFFIXES = (".npy", ".npz")
+# Directory mtimes tick coarsely; a scan this close to the last change is not
+# trusted, so a file created in the same tick is still picked up next time.
+_RACY_MTIME_NS = 2_000_000_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    dir TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    track TEXT NOT NULL,
+    params TEXT NOT NULL,
+    PRIMARY KEY (dir, filename)
+);
+CREATE INDEX IF NOT EXISTS artifacts_track ON artifacts (dir, track, params);
+CREATE TABLE IF NOT EXISTS scans (
+    dir TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL
+);
+"""
+
+
+def catalog_path(directory: Path) -> Path:
+    """Return the catalog file serving a stage directory (its parent's catalog.sqlite)."""
+    return Path(directory).resolve().parent / CATALOG_FILENAME
+
+
+def parse_artifact_name(filename: str, kind: str) -> tuple[str, str]:
+    """Split <track>_<kind>[_<params>].<ext> into (track, params).
+
+    kind is the stage token in the filename (novelty, tempogram, beats, ...).
+    Names without the token map to (stem, "").
+    """
+    stem = filename.rsplit(".", 1)[0]
+    token = f"_{kind}_"
+    if token in stem:
+        track, params = stem.split(token, 1)
+        return track, params
+    if stem.endswith(f"_{kind}"):
+        return stem[: -len(kind) - 1], ""
+    return stem, ""
+
+
+def _connect(directory: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(catalog_path(directory)), timeout=5.0)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _sync(conn: sqlite3.Connection, directory: Path, kind: str) -> None:
+    """Rescan directory into the catalog if its mtime changed since the last scan."""
+    mtime_ns = directory.stat().st_mtime_ns
+    row = conn.execute("SELECT mtime_ns FROM scans WHERE dir = ?", (directory.name,)).fetchone()
+    if row is not None and row[0] == mtime_ns:
+        return
+    rows = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.endswith(ARTIFACT_SUFFIXES) and entry.is_file():
+                rows.append((directory.name, entry.name, *parse_artifact_name(entry.name, kind)))
+    if time.time_ns() - mtime_ns < _RACY_MTIME_NS:
+        mtime_ns = -1
+    with conn:
+        conn.execute("DELETE FROM artifacts WHERE dir = ?", (directory.name,))
+        conn.executemany("INSERT INTO artifacts VALUES (?, ?, ?, ?)", rows)
+        conn.execute(
+            "INSERT OR REPLACE INTO scans (dir, mtime_ns) VALUES (?, ?)",
+            (directory.name, mtime_ns),
+        )
+
+
+def _glob_artifacts(
+    directory: Path, kind: str, track: str, params_prefix: str, suffixes: tuple[str, ...]
+) -> list[Path]:
+    """Filesystem fallback with the same matching rules as the catalog query."""
+    matches = []
+    for suffix in suffixes:
+        for p in directory.glob(f"{track}_{kind}*{suffix}"):
+            p_track, p_params = parse_artifact_name(p.name, kind)
+            if p_track == track and p_params.startswith(params_prefix):
+                matches.append(p)
+    return sorted(matches)
+
+
+def find_artifacts(
+    directory: Path,
+    kind: str,
+    track: str,
+    *,
+    params_prefix: str = "",
+    suffixes: tuple[str, ...] = ARTIFACT_SUFFIXES,
+) -> list[Path]:
+    """Return sorted artifact paths in directory for track, optionally filtered by params.
+
+    params_prefix narrows variants, e.g. "spectrum" or "fourier_512-1" selects only
+    novelty/tempogram files whose parameter string starts with it.
+    """
+    directory = Path(directory).resolve()
+    if not directory.is_dir():
+        return []
+    try:
+        conn = _connect(directory)
+        try:
+            _sync(conn, directory, kind)
+            names = [
+                name
+                for (name,) in conn.execute(
+                    "SELECT filename FROM artifacts WHERE dir = ? AND track = ? "
+                    "AND substr(params, 1, ?) = ? ORDER BY filename",
+                    (directory.name, track, len(params_prefix), params_prefix),
+                )
+            ]
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning("Artifact catalog unavailable (%s); globbing %s", e, directory)
+        return _glob_artifacts(directory, kind, track, params_prefix, suffixes)
+    return [directory / name for name in names if name.endswith(suffixes)]
+
+
+def list_artifacts(
+    directory: Path,
+    kind: str,
+    *,
+    suffixes: tuple[str, ...] = ARTIFACT_SUFFIXES,
+) -> list[tuple[str, str, Path]]:
+    """Return (track, params, path) for every artifact in directory, sorted by filename."""
+    directory = Path(directory).resolve()
+    if not directory.is_dir():
+        return []
+    try:
+        conn = _connect(directory)
+        try:
+            _sync(conn, directory, kind)
+            rows = conn.execute(
+                "SELECT track, params, filename FROM artifacts WHERE dir = ? ORDER BY filename",
+                (directory.name,),
+            ).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning("Artifact catalog unavailable (%s); listing %s", e, directory)
+        rows = sorted(
+            ((*parse_artifact_name(p.name, kind), p.name) for suffix in suffixes for p in directory.glob(f"*{suffix}")),
+            key=lambda row: row[2],
+        )
+    return [
+        (track, params, directory / name)
+        for track, params, name in rows
+        if name.endswith(suffixes)
+    ]
+
+
+def record_artifact(path: Path, kind: str) -> None:
+    """Record a newly written artifact in its directory's catalog (best effort)."""
+    path = Path(path).resolve()
+    directory = path.parent
+    try:
+        conn = _connect(directory)
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?, ?)",
+                    (directory.name, path.name, *parse_artifact_name(path.name, kind)),
+                )
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning("Could not record %s in artifact catalog: %s", path.name, e)
+
+
+def resolve_chromagram_files(files: list[Path] | None, chromagram_dir: Path) -> list[Path]:
+    """Return list of chromagram paths: explicit if given, else all .npy in chromagram_dir.
+
+    When files are provided, each item is resolved as follows:
+    - Full path (absolute or with directory): used as-is.
+    - Basename only (e.g. YTB-014): chromagram_dir/<track_id>_chromagram_*.npy, looked
+      up in the derived-artifact catalog. A longer name narrows by parameters, e.g.
+      YTB-014_chromagram_metric_cqt_256-180.0. If multiple match, raises ValueError.
+    """
+    if not files:
+        if not chromagram_dir.exists():
+            return []
+        return sorted(chromagram_dir.glob("*.npy"))
+
+    resolved: list[Path] = []
+    for p in files:
+        path = Path(p)
+        is_shorthand = not path.is_absolute() and len(path.parts) == 1
+        if is_shorthand:
+            stem = path.name[:-4] if path.suffix == ".npy" else path.name
+            track_id, params_prefix = (
+                stem.split("_chromagram_", 1) if "_chromagram_" in stem else (stem, "")
+            )
+            matches = find_artifacts(
+                chromagram_dir, "chromagram", track_id, params_prefix=params_prefix, suffixes=(".npy",)
+            )
+            if len(matches) > 1:
+                names = [m.name for m in matches]
+                raise ValueError(
+                    f"Ambiguous shorthand '{path}': {len(matches)} matching chromagram files. "
+                    f"Specify one explicitly: {names}"
+                )
+            if matches:
+                resolved.append(matches[0].resolve())
+        else:
+            resolved.append(path.resolve())
+    return list(dict.fromkeys(resolved))
+
+
+def chromagram_for_track(track: str, chromagram_dir: Path, params_prefix: str) -> Path:
+    """The track's chromagram in chromagram_dir; raises ValueError if none or several match."""
+    matches = find_artifacts(
+        chromagram_dir, "chromagram", track, params_prefix=params_prefix, suffixes=(".npy",)
+    )
+    if not matches:
+        raise ValueError(f"No chromagram for {track}")
+    if len(matches) > 1:
+        raise ValueError(
+            f"{len(matches)} chromagrams for {track}; narrow with params: "
+            f"{[m.name for m in matches]}"
+        )
+    return matches[0]
+
+
+def bpm_threshold_from_params(params: str) -> float:
+    """bpm_threshold encoded in a chromagram parameter string.
+
+    E.g. metric_cqt_256-180.0-mean-preserve-rms-1.0-2 -> 180.0.
+    """
+    fields = params.rsplit("_", 1)[-1].split("-")
+    if not params.startswith("metric_") or len(fields) < 2:
+        raise ValueError(f"Cannot read bpm_threshold from chromagram parameters '{params}'")
+    return float(fields[1])
@@ -1,23 +1,62 @@
 """Pipeline for computing metric chromagrams from audio and meter maps.
 
-Invariant: meter_map[:, 0] and the waveform passed to metric_chromagram must be
+Invariant: meter_map time_sec and the waveform passed to metric_chromagram must be
 on the same timebase. When meter maps come from marker-trimmed novelty/beats,
 chromagram audio must be trimmed to the same marker-defined region.
 """
 
 from __future__ import annotations
 
+import time
 from pathlib import Path
 
-import librosa
 import numpy as np
+import soundfile as sf
 
-from ..chromagram import metric_chromagram
+from ..chromagram import (
+    extract_beat_times_from_meter_map,
+    frame_chroma,
+    frame_chroma_blocks,
+    frame_weight_envelope,
+    metric_chromagram_from_frames,
+)
+from ..chromagram.cache import (
+    chroma_cache_path,
+    load_frames,
+    save_frames,
+    weights_cache_path,
+)
+from ..chromagram.methods import (
+    PREPROCESS_DEFAULT,
+    SPAN_MARGIN_SEC_DEFAULT,
+    chroma_sample_span,
+    score_metric_chromagrams,
+)
 from ..global_config import DERIVED_DIR, RAW_AUDIO_DIR
 from ..utils.audio_region import resolve_audio_region
+from ..utils.storage import source_stamp
+from .catalog import record_artifact
+from .warmup import warm_kernels
 
 METER_DIR = DERIVED_DIR / "meter"
 CHROMAGRAM_OUTPUT_DIR = DERIVED_DIR / "chromagram"
+FRAME_CACHE_DIR = DERIVED_DIR / "chroma_frames"
+# Aggregation settings compared per track by `dijon chromagram --sweep`; each entry
+# overrides the run's own values. All share one set of frame chroma.
+SWEEP_CONFIGS: tuple[dict, ...] = tuple(
+    {"bpm_threshold": bpm_threshold, "aggregate": aggregate, "accent_mode": accent_mode}
+    for bpm_threshold in (120.0, 180.0, 240.0)
+    for aggregate, accent_mode in (
+        ("mean", "preserve"),
+        ("median", "preserve"),
+        ("mean", "normalize"),
+        ("median", "normalize"),
+        ("mean", "weighted"),
+    )
+)
+SWEEP_KEYS = frozenset(
+    {"bpm_threshold", "aggregate", "accent_mode", "weight_power", "min_frames_per_bin"}
+)
 
 
 def _resolve_audio_files(files: list[Path] | None, raw_audio_dir: Path) -> list[Path]:
@@ -73,6 +112,177 @@ def _output_filename(
     )
 
 
+def _region_samples(audio_path: Path, region: tuple[float, float] | None) -> tuple[int, int, int]:
+    """Return (sr, first sample, sample count) of the region (whole file when None)."""
+    info = sf.info(str(audio_path))
+    sr = int(info.samplerate)
+    if region is None:
+        return sr, 0, int(info.frames)
+    # Same sample bounds as slicing the decoded waveform y[int(start*sr):int(end*sr)].
+    start = min(int(region[0] * sr), int(info.frames))
+    stop = min(int(region[1] * sr), int(info.frames))
+    return sr, start, max(0, stop - start)
+
+
+def _read_mono(audio_path: Path, start: int, stop: int) -> np.ndarray:
+    """Samples [start, stop) of an audio file as float32 mono (as librosa.load with sr=None)."""
+    with sf.SoundFile(str(audio_path)) as f:
+        f.seek(start)
+        y = f.read(max(0, stop - start), dtype="float32", always_2d=True)
+    return y.mean(axis=1)
+
+
+def _frame_features(
+    audio_path: Path,
+    track_name: str,
+    *,
+    region: tuple[float, float] | None,
+    sr: int,
+    region_start: int,
+    n_samples: int,
+    beat_times: np.ndarray,
+    span_margin_sec: float | None,
+    cache_dir: Path | None,
+    write_cache: bool,
+    hop_length: int,
+    chroma_type: str,
+    weight_source: str | None,
+) -> tuple[np.ndarray, np.ndarray | None, int, str]:
+    """Return (frame chroma, weight envelope or None, frame offset, cache status).
+
+    Only the audio from the first beat minus span_margin_sec to the last beat plus
+    span_margin_sec (within region) is decoded and analysed; frame offset is the
+    region frame index of column 0. Frame chroma is read from cache_dir when an
+    up-to-date entry for exactly that span exists (tuning and HPSS depend on the
+    whole span); the weight envelope, when weight_source is given, from any entry
+    covering it. Missing entries are computed and cached. Status is "hit" when nothing was
+    computed, "miss" otherwise, "off" without a cache_dir.
+    """
+    duration = n_samples / float(sr)
+    start, end = 0, n_samples
+    if span_margin_sec is not None:
+        start, end = chroma_sample_span(
+            beat_times,
+            sr=sr,
+            hop_length=hop_length,
+            n_samples=n_samples,
+            margin_sec=span_margin_sec,
+        )
+    offset = start // hop_length
+    n_frames = 1 + (end - start) // hop_length
+
+    stamp = source_stamp(audio_path) if cache_dir is not None else None
+    decoded: list[np.ndarray] = []
+    computed = False
+
+    def _cached(path: Path | None, compute, *, exact: bool) -> np.ndarray:
+        nonlocal computed
+        if path is not None:
+            entry = load_frames(path, stamp)
+            if entry is not None:
+                arr, _, _, cached_offset = entry
+                skip = offset - cached_offset
+                if exact:
+                    if skip == 0 and arr.shape[-1] == n_frames:
+                        return arr
+                elif skip >= 0 and skip + n_frames <= arr.shape[-1]:
+                    return arr[..., skip : skip + n_frames]
+        computed = True
+        if not decoded:
+            decoded.append(_read_mono(audio_path, region_start + start, region_start + end))
+        arr = compute(decoded[0])
+        if path is not None and write_cache:
+            save_frames(path, arr, sr=sr, duration=duration, stamp=stamp, frame_offset=offset)
+        return arr
+
+    chroma_path = weights_path = None
+    if cache_dir is not None:
+        chroma_path = chroma_cache_path(
+            cache_dir,
+            track_name,
+            region=region,
+            hop_length=hop_length,
+            chroma_type=chroma_type,
+            preprocess=PREPROCESS_DEFAULT,
+            tuning=None,
+            span=(start, end),
+        )
+        if weight_source is not None:
+            weights_path = weights_cache_path(
+                cache_dir,
+                track_name,
+                region=region,
+                hop_length=hop_length,
+                weight_source=weight_source,
+            )
+
+    def _chroma(y: np.ndarray) -> np.ndarray:
+        if chroma_type == "cqt":
+            # Block-wise so HPSS/CQT memory does not grow with the span length.
+            return frame_chroma_blocks(y, sr=sr, hop_length=hop_length)
+        return frame_chroma(y, sr=sr, hop_length=hop_length, chroma_type=chroma_type)
+
+    C = _cached(chroma_path, _chroma, exact=True)
+    envelope: np.ndarray | None = None
+    if weight_source is not None:
+        envelope = _cached(
+            weights_path,
+            lambda y: frame_weight_envelope(
+                y, sr=sr, hop_length=hop_length, weight_source=weight_source
+            ),
+            exact=False,
+        )
+
+    if cache_dir is None:
+        status = "off"
+    else:
+        status = "miss" if computed else "hit"
+    return C, envelope, offset, status
+
+
+def _best_config(
+    C: np.ndarray,
+    envelope: np.ndarray | None,
+    configs: list[dict],
+    *,
+    sr: int,
+    meter_map: np.ndarray,
+    duration: float,
+    hop_length: int,
+    frame_offset: int,
+) -> tuple[dict, np.ndarray, float, int]:
+    """Aggregate C under each config and return (config, C_metric, score, n_scored).
+
+    Configs that cannot be aggregated (e.g. bins too short at that bpm_threshold)
+    are left out; all remaining candidates are scored in one batch.
+    """
+    valid: list[dict] = []
+    candidates: list[np.ndarray] = []
+    errors: list[str] = []
+    for config in configs:
+        try:
+            candidates.append(
+                metric_chromagram_from_frames(
+                    C,
+                    sr=sr,
+                    meter_map=meter_map,
+                    duration=duration,
+                    hop_length=hop_length,
+                    weight_envelope=envelope,
+                    frame_offset=frame_offset,
+                    **config,
+                )
+            )
+            valid.append(config)
+        except ValueError as e:
+            errors.append(str(e))
+    if not candidates:
+        raise ValueError(f"No sweep configuration could be computed: {errors[0]}")
+    scores = score_metric_chromagrams(candidates)[:, 0]
+    best = int(np.argmax(np.nan_to_num(scores, nan=-np.inf)))
+    return valid[best], candidates[best], float(scores[best]), len(candidates)
+
+
 def run_chromagram(
     *,
     audio_files: list[Path] | None = None,
@@ -90,13 +300,57 @@ def run_chromagram(
     weight_power: float = 1.0,
     min_frames_per_bin: int = 2,
     dry_run: bool = False,
+    frame_cache_dir: Path | None = FRAME_CACHE_DIR,
+    span_margin_sec: float | None = SPAN_MARGIN_SEC_DEFAULT,
+    sweep: list[dict] | None = None,
 ) -> dict:
     """Compute metric chromagram for audio file(s) and write .npy to output_dir.
 
     start_marker, end_marker: When both provided, trim audio to the marker-defined
     region (same as novelty pipeline). Meter maps from novelty/beats are region-relative;
     use the same markers to align timelines. When omitted, use full audio.
+
+    frame_cache_dir: Frame chroma and weight envelopes are cached here per
+    (track, region, hop_length, chroma_type), so runs that only change
+    bpm_threshold, aggregate, accent_mode, weight_power or min_frames_per_bin skip
+    decoding and CQT. None disables the cache; dry runs read but do not write it.
+
+    span_margin_sec: Only audio from the first meter-map beat minus this margin to
+    the last beat plus it is decoded and analysed (see chroma_sample_span), so a
+    meter map covering part of a long track costs a proportional CQT. None
+    analyses the whole region.
+
+    sweep: Aggregation configurations to compare per track (dicts over SWEEP_KEYS,
+    e.g. SWEEP_CONFIGS), each overriding the arguments above. All are aggregated
+    from the same frame chroma and scored together with score_metric_chromagrams;
+    only the best-scoring chromagram is written, under its own output filename.
     """
+    unknown = sorted({key for config in sweep or () for key in config} - SWEEP_KEYS)
+    if unknown or sweep == []:
+        return {
+            "success": False,
+            "total": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "skipped": 0,
+            "message": (
+                f"Unknown sweep key(s): {unknown}. Use any of: {sorted(SWEEP_KEYS)}"
+                if unknown
+                else "sweep must list at least one configuration."
+            ),
+            "items": [],
+            "failures": [],
+        }
+    base_config = {
+        "bpm_threshold": bpm_threshold,
+        "aggregate": aggregate,
+        "accent_mode": accent_mode,
+        "weight_power": weight_power,
+        "min_frames_per_bin": min_frames_per_bin,
+    }
+    configs = [dict(base_config, **config) for config in sweep or [{}]]
+    need_weights = any(config["accent_mode"] == "weighted" for config in configs)
+
     paths = _resolve_audio_files(audio_files, raw_audio_dir)
     if not paths:
         return {
@@ -120,6 +374,9 @@ def run_chromagram(
     items: list[dict] = []
     failures: list[dict] = []
 
+    compile_s = warm_kernels(["chromagram.score_candidates"] if sweep is not None else [])
+    t_start = time.perf_counter()
+
     for audio_path in paths:
         track_name = _track_name(audio_path)
         meter_path = _meter_path_for_track(track_name, meter_dir)
@@ -133,19 +390,6 @@ def run_chromagram(
             })
             continue
 
-        out_name = _output_filename(
-            track_name,
-            chroma_type=chroma_type,
-            hop_length=hop_length,
-            bpm_threshold=bpm_threshold,
-            aggregate=aggregate,
-            accent_mode=accent_mode,
-            weight_source=weight_source,
-            weight_power=weight_power,
-            min_frames_per_bin=min_frames_per_bin,
-        )
-        out_path = output_dir / out_name
-
         if not audio_path.exists():
             failed += 1
             failures.append({"item": str(audio_path), "reason": "File not found"})
@@ -153,39 +397,70 @@ def run_chromagram(
             continue
 
         try:
-            y, sr = librosa.load(audio_path, sr=None, mono=True)
-            region_start_sec: float | None = None
-            region_end_sec: float | None = None
-
+            region: tuple[float, float] | None = None
             if start_marker is not None and end_marker is not None:
-                # Trim waveform so audio and meter_map share the same region-local time origin.
-                start_sec, end_sec = resolve_audio_region(
+                region = resolve_audio_region(
                     audio_path,
                     start_marker=start_marker,
                     end_marker=end_marker,
                 )
-                start_ix = int(start_sec * sr)
-                end_ix = int(end_sec * sr)
-                y = y[start_ix:end_ix]
-                region_start_sec = start_sec
-                region_end_sec = end_sec
-
-            meter_map = np.load(meter_path).astype(np.float64)
-            C_metric = metric_chromagram(
-                y,
+
+            meter_map = np.load(meter_path)
+            if meter_map.dtype.names is None:
+                meter_map = meter_map.astype(np.float64, copy=False)
+            sr, region_start, n_samples = _region_samples(audio_path, region)
+            duration = n_samples / float(sr)
+            beat_times = extract_beat_times_from_meter_map(meter_map, duration=duration)
+
+            C, envelope, frame_offset, cache_status = _frame_features(
+                audio_path,
+                track_name,
+                region=region,
                 sr=sr,
-                meter_map=meter_map,
+                region_start=region_start,
+                n_samples=n_samples,
+                beat_times=beat_times,
+                span_margin_sec=span_margin_sec,
+                cache_dir=frame_cache_dir,
+                write_cache=not dry_run,
                 hop_length=hop_length,
-                bpm_threshold=bpm_threshold,
                 chroma_type=chroma_type,
-                aggregate=aggregate,
-                accent_mode=accent_mode,
+                weight_source=weight_source if need_weights else None,
+            )
+            if sweep is None:
+                config = configs[0]
+                C_metric = metric_chromagram_from_frames(
+                    C,
+                    sr=sr,
+                    meter_map=meter_map,
+                    duration=duration,
+                    hop_length=hop_length,
+                    weight_envelope=envelope,
+                    frame_offset=frame_offset,
+                    **config,
+                )
+            else:
+                config, C_metric, score, n_scored = _best_config(
+                    C,
+                    envelope,
+                    configs,
+                    sr=sr,
+                    meter_map=meter_map,
+                    duration=duration,
+                    hop_length=hop_length,
+                    frame_offset=frame_offset,
+                )
+            out_name = _output_filename(
+                track_name,
+                chroma_type=chroma_type,
+                hop_length=hop_length,
                 weight_source=weight_source,
-                weight_power=weight_power,
-                min_frames_per_bin=min_frames_per_bin,
+                **config,
             )
+            out_path = output_dir / out_name
             if not dry_run:
                 np.save(out_path, C_metric, allow_pickle=False)
+                record_artifact(out_path, "chromagram")
 
             succeeded += 1
             item: dict = {
@@ -193,10 +468,16 @@ def run_chromagram(
                 "meter": meter_path.name,
                 "output": out_name,
                 "status": "success",
+                "frame_cache": cache_status,
             }
-            if region_start_sec is not None and region_end_sec is not None:
-                item["region_start_sec"] = region_start_sec
-                item["region_end_sec"] = region_end_sec
+            if sweep is not None:
+                item["sweep"] = {"config": config, "score": score, "candidates": n_scored}
+                item["detail"] = (
+                    f"best of {n_scored}: {config['bpm_threshold']}-{config['aggregate']}-"
+                    f"{config['accent_mode']}, score {score:.4f}"
+                )
+            if region is not None:
+                item["region_start_sec"], item["region_end_sec"] = region
             items.append(item)
         except Exception as e:
             failed += 1
@@ -209,6 +490,8 @@ def run_chromagram(
         "succeeded": succeeded,
         "failed": failed,
         "skipped": skipped,
+        "compile_s": compile_s,
+        "elapsed_s": time.perf_counter() - t_start,
         "message": f"Processed {len(paths)} file(s). Succeeded: {succeeded}, failed: {failed}, skipped: {skipped}."
         + (" [DRY RUN]" if dry_run else ""),
         "items": items,
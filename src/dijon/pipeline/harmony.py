@@ -0,0 +1,207 @@
+"""Pipeline for chord and key estimation on metric chromagrams (data/derived/harmony)."""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import numpy as np
+
+from ..global_config import DERIVED_DIR
+from ..harmony import estimate_chords, estimate_keys
+from ..harmony.methods import SMOOTHING_DEFAULT
+from ..harmony.storage import save_harmony
+from ..utils.sets import load_set_yaml
+from .catalog import (
+    chromagram_for_track,
+    parse_artifact_name,
+    record_artifact,
+    resolve_chromagram_files,
+)
+from .warmup import warm_kernels
+
+CHROMAGRAM_DIR = DERIVED_DIR / "chromagram"
+HARMONY_OUTPUT_DIR = DERIVED_DIR / "harmony"
+# Chromagram columns scored per batch; the (columns, 61) score matrix of a full
+# batch is 64 MB of float32.
+BATCH_COLUMNS = 1 << 18
+
+
+def _output_filename(chroma_path: Path, smoothing: float) -> str:
+    """<track>_harmony_<chromagram params>-<smoothing>.npz, mirroring the chromagram it labels."""
+    track, params = parse_artifact_name(Path(chroma_path).name, "chromagram")
+    return f"{track}_harmony_{params}-{smoothing}.npz" if params else f"{track}_harmony_{smoothing}.npz"
+
+
+def _batches(shapes: list[int], limit: int) -> list[list[int]]:
+    """Split indices into consecutive runs whose column counts sum to at most limit (one track minimum)."""
+    batches: list[list[int]] = []
+    total = 0
+    for i, n in enumerate(shapes):
+        if not batches or total + n > limit:
+            batches.append([])
+            total = 0
+        batches[-1].append(i)
+        total += n
+    return batches
+
+
+def run_harmony(
+    *,
+    chromagram_files: list[Path] | None = None,
+    set_path: Path | None = None,
+    chromagram_dir: Path = CHROMAGRAM_DIR,
+    output_dir: Path = HARMONY_OUTPUT_DIR,
+    params_prefix: str = "",
+    smoothing: float = SMOOTHING_DEFAULT,
+    dry_run: bool = False,
+) -> dict:
+    """Label every metric chromagram column with a chord and each track with a key.
+
+    Inputs are the tracks of the set YAML at set_path (params_prefix selects one
+    chromagram per track), else chromagram_files, else every chromagram in
+    chromagram_dir. Chromagrams are scored against the chord templates in
+    batches of up to BATCH_COLUMNS columns (one matrix product per batch) and
+    decoded with a chord-change penalty of smoothing (0: best template per
+    column). Each chromagram's result is written to
+    <track>_harmony_<chromagram params>-<smoothing>.npz.
+
+    Returns:
+        Dict with success, total, succeeded, failed, skipped, message, items, failures,
+        compile_s and elapsed_s.
+    """
+    problems = []
+    if smoothing < 0:
+        problems.append(f"smoothing must be >= 0, got {smoothing}")
+    set_items: list[dict] = []
+    if set_path is not None and not problems:
+        try:
+            set_items = load_set_yaml(Path(set_path)).get("items") or []
+        except FileNotFoundError as e:
+            problems.append(str(e))
+    if problems:
+        return {
+            "success": False,
+            "total": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "skipped": 0,
+            "message": "; ".join(problems),
+            "items": [],
+            "failures": [],
+        }
+
+    items: list[dict] = []
+    paths: list[Path] = []
+    skipped = 0
+    if set_path is not None:
+        tracks = dict.fromkeys(
+            str(item.get("file_id") or "").strip() for item in set_items if item.get("file_id")
+        )
+        for track in tracks:
+            try:
+                paths.append(chromagram_for_track(track, chromagram_dir, params_prefix))
+            except ValueError as e:
+                skipped += 1
+                items.append({"file": track, "status": "skipped", "detail": str(e)})
+    else:
+        paths = [
+            p for p in resolve_chromagram_files(chromagram_files, chromagram_dir)
+            if parse_artifact_name(p.name, "chromagram")[1].startswith(params_prefix)
+        ]
+
+    if not paths and not items:
+        return {
+            "success": True,
+            "total": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "skipped": 0,
+            "message": "No chromagram files to process.",
+            "items": [],
+            "failures": [],
+        }
+
+    output_dir = Path(output_dir)
+    succeeded = 0
+    failed = 0
+    failures: list[dict] = []
+
+    # Shapes come from the headers; a batch's chromagrams are read only when it is scored.
+    loaded: list[Path] = []
+    n_columns: list[int] = []
+    for path in paths:
+        try:
+            shape = np.load(path, mmap_mode="r").shape
+            if len(shape) != 2 or shape[0] != 12:
+                raise ValueError(f"Expected chroma with shape (12, N), got {shape}")
+            loaded.append(path)
+            n_columns.append(shape[1])
+        except Exception as e:
+            failed += 1
+            failures.append({"item": str(path), "reason": str(e)})
+            items.append({"file": path.name, "status": "failed", "detail": str(e)})
+
+    compile_s = warm_kernels(["harmony.viterbi"]) if loaded and smoothing > 0 else 0.0
+    t_start = time.perf_counter()
+
+    for batch in _batches(n_columns, BATCH_COLUMNS):
+        try:
+            batch_chroma = [np.load(loaded[i]) for i in batch]
+            chord_names, labels = estimate_chords(batch_chroma, smoothing=smoothing)
+            key_names, key_scores = estimate_keys(batch_chroma)
+        except Exception as e:
+            # One unreadable or invalid chromagram fails its batch, not the run.
+            for i in batch:
+                failed += 1
+                failures.append({"item": str(loaded[i]), "reason": str(e)})
+                items.append({"file": loaded[i].name, "status": "failed", "detail": str(e)})
+            continue
+        for j, i in enumerate(batch):
+            path = loaded[i]
+            out_name = _output_filename(path, smoothing)
+            try:
+                chords = labels[j]
+                key = key_names[int(np.argmax(key_scores[:, j]))]
+                n_changes = int(np.count_nonzero(np.diff(chords)))
+                if not dry_run:
+                    out_path = output_dir / out_name
+                    save_harmony(
+                        out_path,
+                        chords=chords,
+                        chord_names=chord_names,
+                        key_scores=key_scores[:, j],
+                        key_names=key_names,
+                        smoothing=smoothing,
+                        source=path.name,
+                    )
+                    record_artifact(out_path, "harmony")
+                succeeded += 1
+                items.append({
+                    "file": path.name,
+                    "output": out_name,
+                    "status": "success",
+                    "key": key,
+                    "chord_changes": n_changes,
+                    "detail": f"{key}, {n_changes} chord change(s) over {chords.shape[0]} bins",
+                })
+            except Exception as e:
+                failed += 1
+                failures.append({"item": str(path), "reason": str(e)})
+                items.append({"file": path.name, "status": "failed", "detail": str(e)})
+
+    elapsed_s = time.perf_counter() - t_start
+    total = len(paths) + skipped
+    return {
+        "success": failed == 0,
+        "total": total,
+        "succeeded": succeeded,
+        "failed": failed,
+        "skipped": skipped,
+        "compile_s": compile_s,
+        "elapsed_s": elapsed_s,
+        "message": f"Processed {total} file(s). Succeeded: {succeeded}, failed: {failed}, skipped: {skipped}."
+        + (" [DRY RUN]" if dry_run else ""),
+        "items": items,
+        "failures": failures,
+    }
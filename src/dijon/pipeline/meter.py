@@ -5,14 +5,15 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
-import librosa
 import numpy as np
 
-from ..beats import estimate_beats_per_bar, label_bars_and_beats
+from ..beats import compute_beat_energies_from_file, estimate_meter, label_bars_and_beats
 from ..global_config import AUDIO_MARKERS_DIR, DERIVED_DIR, RAW_AUDIO_DIR
+from .catalog import record_artifact
 
 BEATS_DIR = DERIVED_DIR / "beats"
 METER_OUTPUT_DIR = DERIVED_DIR / "meter"
+MAX_BEATS_PER_BAR_DEFAULT = 4
 
 
 def _resolve_beats_files(files: list[Path] | None, beats_dir: Path) -> list[Path]:
@@ -76,6 +77,8 @@ def run_meter(
     raw_audio_dir: Path = RAW_AUDIO_DIR,
     markers_dir: Path = AUDIO_MARKERS_DIR,
     dry_run: bool = False,
+    max_beats_per_bar: int = MAX_BEATS_PER_BAR_DEFAULT,
+    search_phase: bool = False,
 ) -> dict:
     """Compute meter labels for beat files and write .npy to output_dir.
 
@@ -83,9 +86,26 @@ def run_meter(
     Tracks without HEAD_IN_START marker are skipped.
     Output filename: <track_name>_meter.npy
 
+    Bar lengths 2..max_beats_per_bar are scored at once. By default bar 1 beat 1
+    is the beat nearest HEAD_IN_START; with search_phase, every downbeat phase is
+    scored too and bar 1 starts at the best-scoring downbeat nearest head-in.
+
     Returns:
         Dict with success, total, succeeded, failed, skipped, message, items, failures.
     """
+    if max_beats_per_bar < 2:
+        return {
+            "success": False,
+            "total": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "skipped": 0,
+            "message": f"max_beats_per_bar must be >= 2, got {max_beats_per_bar}",
+            "items": [],
+            "failures": [],
+        }
+    candidates = tuple(range(2, max_beats_per_bar + 1))
+
     paths = _resolve_beats_files(beats_files, beats_dir)
     if not paths:
         return {
@@ -142,18 +162,24 @@ def run_meter(
             if beat_times.ndim != 1:
                 raise ValueError(f"Expected 1D beat times, got shape {beat_times.shape}")
 
-            x, sr = librosa.load(audio_path, sr=None, mono=True)
-            beats_per_bar, _low_energy, _high_energy = estimate_beats_per_bar(
-                beat_times, head_in, x, sr
+            # Only the short windows around each beat are read, not the whole track.
+            energies = compute_beat_energies_from_file(audio_path, beat_times)
+            beats_per_bar, phase, _low_energy, _high_energy = estimate_meter(
+                beat_times,
+                head_in,
+                None,
+                None,
+                candidates=candidates,
+                search_phase=search_phase,
+                energies=energies,
             )
-            labels = label_bars_and_beats(beat_times, head_in, beats_per_bar)
-
-            if not labels.ndim == 2 or labels.shape[1] < 3:
-                raise ValueError(
-                    f"Expected labels with shape (N, 3), got shape {labels.shape}"
-                )
+            i_nearest = int(np.argmin(np.abs(beat_times - head_in)))
+            i_downbeat = i_nearest + phase
+            if not 0 <= i_downbeat < len(beat_times):
+                i_downbeat -= int(np.sign(phase)) * beats_per_bar
+            labels = label_bars_and_beats(beat_times, beat_times[i_downbeat], beats_per_bar)
 
-            beat_nums = labels[:, 2].astype(int)
+            beat_nums = labels["beat"]
             if np.any(beat_nums < 1) or np.any(beat_nums > beats_per_bar):
                 raise ValueError(
                     f"Beat numbers out of range [1, {beats_per_bar}]: "
@@ -163,15 +189,15 @@ def run_meter(
             num_beats = len(beat_times)
             t_first = float(beat_times[0])
             t_last = float(beat_times[-1])
-            bar_count = len(set(labels[:, 1].astype(int)))
+            bar_count = len(np.unique(labels["bar"]))
             beat_counts = {int(b): int(np.sum(beat_nums == b)) for b in np.unique(beat_nums)}
 
-            i_nearest = int(np.argmin(np.abs(beat_times - head_in)))
             head_in_nearest_beat = float(beat_times[i_nearest])
             head_in_offset = head_in_nearest_beat - head_in
 
             if not dry_run:
                 np.save(out_path, labels, allow_pickle=False)
+                record_artifact(out_path, "meter")
 
             succeeded += 1
             items.append({
@@ -190,6 +216,7 @@ def run_meter(
                 "beat_counts": beat_counts,
                 "head_in_nearest_beat": head_in_nearest_beat,
                 "head_in_offset": head_in_offset,
+                "downbeat_phase": phase,
             })
         except Exception as e:
             failed += 1
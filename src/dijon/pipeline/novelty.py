@@ -15,6 +15,7 @@ from ..novelty import (
     compute_novelty_phase,
     compute_novelty_spectrum,
 )
+from .catalog import record_artifact
 
 NOVELTY_OUTPUT_DIR = DERIVED_DIR / "novelty"
 
@@ -182,6 +183,7 @@ def run_novelty(
             novelty, novelty_fs_hz = _compute_novelty(y, sr, ntype, N, H, gamma, M)
             if not dry_run:
                 np.save(out_path, novelty, allow_pickle=False)
+                record_artifact(out_path, "novelty")
             succeeded += 1
             items.append({
                 "file": audio_path.name,
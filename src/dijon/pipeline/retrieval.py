@@ -0,0 +1,281 @@
+"""Pipeline for the corpus bar-shingle index (data/derived/bar_index) and passage queries."""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import numpy as np
+
+from ..beats import as_meter_labels
+from ..global_config import DERIVED_DIR
+from ..retrieval import bar_shingles
+from ..retrieval.index import (
+    IVF_MIN_ROWS,
+    MANIFEST_FILENAME,
+    NPROBE_DEFAULT,
+    SEARCH_MODES,
+    BarIndex,
+)
+from ..retrieval.methods import WINDOW_BARS_DEFAULT
+from ..structure import unit_features
+from ..utils.storage import source_stamp
+from .catalog import (
+    bpm_threshold_from_params,
+    parse_artifact_name,
+    resolve_chromagram_files,
+)
+
+CHROMAGRAM_DIR = DERIVED_DIR / "chromagram"
+METER_DIR = DERIVED_DIR / "meter"
+BAR_INDEX_DIR = DERIVED_DIR / "bar_index"
+
+
+def _failure(message: str) -> dict:
+    return {
+        "success": False,
+        "total": 0,
+        "succeeded": 0,
+        "failed": 0,
+        "skipped": 0,
+        "message": message,
+        "items": [],
+        "failures": [],
+    }
+
+
+def _chromagrams_by_track(paths: list[Path], params_prefix: str) -> dict[str, list[Path]]:
+    """Group chromagram paths by track, keeping those whose parameters start with params_prefix."""
+    by_track: dict[str, list[Path]] = {}
+    for path in paths:
+        track, params = parse_artifact_name(path.name, "chromagram")
+        if params.startswith(params_prefix):
+            by_track.setdefault(track, []).append(path)
+    return by_track
+
+
+def _track_shingles(
+    chroma_path: Path, meter_path: Path, *, window: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(shingles, first bar label, start time) of each window of a track's bars."""
+    _, params = parse_artifact_name(chroma_path.name, "chromagram")
+    labels = as_meter_labels(np.load(meter_path))
+    F, first_beat = unit_features(
+        np.load(chroma_path),
+        labels,
+        bpm_threshold=bpm_threshold_from_params(params),
+        unit="bar",
+    )
+    shingles = bar_shingles(F, window=window)
+    starts = first_beat[: shingles.shape[0]]
+    return (
+        shingles,
+        labels["bar"][starts].astype(np.int32),
+        labels["time_sec"][starts].astype(np.float64),
+    )
+
+
+def run_bar_index(
+    *,
+    chromagram_files: list[Path] | None = None,
+    chromagram_dir: Path = CHROMAGRAM_DIR,
+    meter_dir: Path = METER_DIR,
+    index_dir: Path = BAR_INDEX_DIR,
+    window: int = WINDOW_BARS_DEFAULT,
+    params_prefix: str = "",
+    rebuild: bool = False,
+    dry_run: bool = False,
+) -> dict:
+    """Add metric chromagrams to the bar-shingle index in index_dir.
+
+    Each track's chromagram is pooled per bar (meter map plus the bpm_threshold in
+    its filename) and cut into window-bar shingles. Tracks already indexed from
+    the same chromagram file are skipped unless rebuild; changed ones are
+    replaced. If chromagram_files is None, every chromagram in chromagram_dir is
+    used (params_prefix picks one per track) and tracks whose chromagram is gone
+    are removed. IVF centroids are (re)trained once the index holds IVF_MIN_ROWS
+    shingles and whenever it has doubled since the last training, or on rebuild.
+
+    Returns:
+        Dict with success, total, succeeded, failed, skipped, message, items, failures.
+    """
+    if window < 1:
+        return _failure(f"window must be >= 1, got {window}")
+    try:
+        index = BarIndex(index_dir, window=window)
+    except ValueError as e:
+        return _failure(str(e))
+
+    full_scan = not chromagram_files
+    paths = resolve_chromagram_files(chromagram_files, chromagram_dir)
+    by_track = _chromagrams_by_track(paths, params_prefix)
+    if not by_track:
+        return {
+            "success": True,
+            "total": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "skipped": 0,
+            "message": "No chromagram files to index.",
+            "items": [],
+            "failures": [],
+        }
+
+    succeeded = 0
+    failed = 0
+    skipped = 0
+    items: list[dict] = []
+    failures: list[dict] = []
+    t_start = time.perf_counter()
+
+    for track, candidates in sorted(by_track.items()):
+        if len(candidates) > 1:
+            skipped += 1
+            items.append({
+                "file": track,
+                "status": "skipped",
+                "detail": f"{len(candidates)} chromagrams; narrow with params: "
+                f"{[p.name for p in candidates]}",
+            })
+            continue
+        chroma_path = candidates[0]
+        meter_path = meter_dir / f"{track}_meter.npy"
+        if not meter_path.exists():
+            skipped += 1
+            items.append({
+                "file": chroma_path.name,
+                "status": "skipped",
+                "detail": f"Missing meter map: {meter_path.name}",
+            })
+            continue
+        try:
+            stamp = source_stamp(chroma_path)
+            if not rebuild and index.is_current(track, stamp):
+                skipped += 1
+                items.append({"file": chroma_path.name, "status": "skipped", "detail": "Up to date"})
+                continue
+            shingles, bars, times = _track_shingles(chroma_path, meter_path, window=window)
+            if shingles.shape[0] == 0:
+                skipped += 1
+                items.append({
+                    "file": chroma_path.name,
+                    "status": "skipped",
+                    "detail": f"Shorter than {window} bars",
+                })
+                continue
+            if not dry_run:
+                index.add(track, shingles, bars, times, stamp=stamp)
+            succeeded += 1
+            items.append({
+                "file": chroma_path.name,
+                "status": "success",
+                "shingles": int(shingles.shape[0]),
+                "detail": f"{shingles.shape[0]} shingle(s), bars {bars[0]}..{bars[-1] + window - 1}",
+            })
+        except Exception as e:
+            failed += 1
+            failures.append({"item": str(chroma_path), "reason": str(e)})
+            items.append({"file": chroma_path.name, "status": "failed", "detail": str(e)})
+
+    removed = sorted(set(index.tracks) - set(by_track)) if full_scan and not params_prefix else []
+    nlist = None
+    if not dry_run:
+        for track in removed:
+            index.remove(track)
+        if index.rows >= IVF_MIN_ROWS and (rebuild or index.needs_training()):
+            nlist = index.train()
+
+    total = len(by_track)
+    message = (
+        f"Processed {total} track(s). Succeeded: {succeeded}, failed: {failed}, skipped: {skipped}. "
+        f"Index: {index.rows} shingle(s) from {len(index.tracks)} track(s)"
+        + (f", removed {len(removed)}" if removed else "")
+        + (f", IVF retrained with {nlist} lists" if nlist else "")
+        + "."
+        + (" [DRY RUN]" if dry_run else "")
+    )
+    return {
+        "success": failed == 0,
+        "total": total,
+        "succeeded": succeeded,
+        "failed": failed,
+        "skipped": skipped,
+        "elapsed_s": time.perf_counter() - t_start,
+        "message": message,
+        "items": items,
+        "failures": failures,
+    }
+
+
+def run_bar_query(
+    *,
+    track: str,
+    first_bar: int,
+    last_bar: int | None = None,
+    index_dir: Path = BAR_INDEX_DIR,
+    k: int = 10,
+    mode: str = "ivf",
+    nprobe: int = NPROBE_DEFAULT,
+    transpose: bool = True,
+    include_self: bool = False,
+) -> dict:
+    """Find the passages most harmonically similar to bars first_bar..last_bar of track.
+
+    The passage must span exactly the index window (last_bar defaults to
+    first_bar + window - 1, the window of the index in index_dir). Other
+    windows of the query track are excluded unless include_self. Matches are
+    items with track, bar, last_bar, time_sec, score (cosine similarity) and
+    shift (semitones the match lies above the query).
+    """
+    if mode not in SEARCH_MODES:
+        return _failure(f"mode must be one of {list(SEARCH_MODES)}, got {mode!r}")
+    if not (index_dir / MANIFEST_FILENAME).exists():
+        return _failure(f"No bar index in {index_dir}; run the retrieval index command first")
+    try:
+        index = BarIndex(index_dir)
+    except ValueError as e:
+        return _failure(str(e))
+    window = index.window
+    if last_bar is None:
+        last_bar = first_bar + window - 1
+    if last_bar - first_bar + 1 != window:
+        return _failure(
+            f"Passage {first_bar}-{last_bar} spans {last_bar - first_bar + 1} bars; "
+            f"the index uses {window}-bar windows"
+        )
+    try:
+        query = index.shingle(track, first_bar)
+    except ValueError as e:
+        return _failure(str(e))
+
+    t_start = time.perf_counter()
+    matches = index.search(
+        query,
+        k=k,
+        mode=mode,
+        nprobe=nprobe,
+        transpose=transpose,
+        exclude_track=None if include_self else track,
+    )
+    elapsed_s = time.perf_counter() - t_start
+    items = [
+        {
+            **m,
+            "item": f"{m['track']} bars {m['bar']}-{m['last_bar']}",
+            "status": "success",
+            "detail": f"score {m['score']:.3f}, shift {m['shift']:+d}, at {m['time_sec']:.1f}s",
+        }
+        for m in matches
+    ]
+    return {
+        "success": True,
+        "total": len(items),
+        "succeeded": len(items),
+        "failed": 0,
+        "skipped": 0,
+        "elapsed_s": elapsed_s,
+        "message": f"Top {len(items)} match(es) for {track} bars {first_bar}-{last_bar} "
+        f"({mode}, {elapsed_s * 1000:.1f} ms).",
+        "items": items,
+        "failures": [],
+    }
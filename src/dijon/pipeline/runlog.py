@@ -0,0 +1,183 @@
+"""Machine-readable run records: one JSON line per processed item in runs.jsonl.
+
+Every logged CLI run appends a record per item to data/logs/derived/runs.jsonl
+next to its human-readable .log, e.g.
+
+    {"run": "20260306-0013_novelty_spectrum.log", "command": "novelty",
+     "method": "spectrum", "track": "YTB-013", "status": "success",
+     "params": "spectrum_1024-256-100.0-10", "output": "YTB-013_novelty_...npy",
+     "region": [0.196, 31.274], "markers": ["HEAD_IN_START", "HEAD_IN_END"],
+     "elapsed_s": null, "run_elapsed_s": 4.2, "dry_run": false, "timestamp": "..."}
+
+params is the parameter string of the output filename (as in the artifact
+catalog). run_elapsed_s is the wall time of the whole run, repeated on each of
+its records; elapsed_s is the item's own time when the pipeline reports one.
+RunIndex reads the file once, then only lines appended since, and answers
+"region used for track X with params P" from a dict.
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from ..global_config import DERIVED_LOGS_DIR
+from .catalog import parse_artifact_name
+
+RUNS_FILENAME = "runs.jsonl"
+
+
+def runs_path(log_dir: Path = DERIVED_LOGS_DIR) -> Path:
+    """Return the run-record file in log_dir."""
+    return Path(log_dir) / RUNS_FILENAME
+
+
+def _item_region(item: dict) -> tuple[list[float] | None, list[str] | None]:
+    """Region [start, end] (s) and marker names of a pipeline item, when it reports them."""
+    if "start_sec" in item and "end_sec" in item:
+        region = [float(item["start_sec"]), float(item["end_sec"])]
+    elif "region_start_sec" in item and "region_end_sec" in item:
+        region = [float(item["region_start_sec"]), float(item["region_end_sec"])]
+    else:
+        region = None
+    markers = None
+    if item.get("start_marker") is not None and item.get("end_marker") is not None:
+        markers = [str(item["start_marker"]), str(item["end_marker"])]
+    return region, markers
+
+
+def run_records(
+    result: dict,
+    *,
+    command: str,
+    method: str | None = None,
+    run: str = "",
+    dry_run: bool = False,
+    run_elapsed_s: float | None = None,
+) -> list[dict]:
+    """Build one run record per item of a pipeline result dict.
+
+    run_elapsed_s (the whole run) is stored on every record; sum it per run, not
+    per record.
+    """
+    timestamp = datetime.now(timezone.utc).isoformat()
+    records = []
+    for item in result.get("items") or []:
+        if not isinstance(item, dict):
+            continue
+        output = item.get("output")
+        name = item.get("file") or item.get("item") or ""
+        if output:
+            track, params = parse_artifact_name(str(output), command)
+        else:
+            track, params = Path(str(name)).stem, ""
+        region, markers = _item_region(item)
+        records.append({
+            "run": run,
+            "command": command,
+            "method": method,
+            "track": track,
+            "file": str(name),
+            "status": item.get("status", "success"),
+            "params": params,
+            "output": output,
+            "region": region,
+            "markers": markers,
+            "elapsed_s": item.get("elapsed_s"),
+            "run_elapsed_s": run_elapsed_s,
+            "dry_run": dry_run,
+            "timestamp": timestamp,
+        })
+    return records
+
+
+def append_run_records(records: list[dict], log_dir: Path = DERIVED_LOGS_DIR) -> Path:
+    """Append records to log_dir/runs.jsonl (one write, so concurrent runs do not interleave lines)."""
+    path = runs_path(log_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if records:
+        text = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(text)
+    return path
+
+
+class RunIndex:
+    """Latest successful run record per (command, track) and (command, track, params).
+
+    Lookups refresh from the byte offset reached last time, so repeated queries cost
+    one stat and a dict access; a truncated or replaced file is re-read from the start.
+    Dry runs are indexed like real ones but never shadow a real run.
+    """
+
+    def __init__(self, log_dir: Path = DERIVED_LOGS_DIR) -> None:
+        self.path = runs_path(log_dir)
+        self._offset = 0
+        self._size = 0
+        self._by_track: dict[tuple[str, str], dict] = {}
+        self._by_params: dict[tuple[str, str, str], dict] = {}
+
+    def refresh(self) -> None:
+        """Index lines appended since the last refresh."""
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if size < self._size:
+            self._offset = 0
+            self._by_track.clear()
+            self._by_params.clear()
+        self._size = size
+        if size <= self._offset:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read(size - self._offset)
+        # Only consume complete lines; a partially written last line is read next time.
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            self._add(record)
+        self._offset += end
+
+    def _add(self, record: dict[str, Any]) -> None:
+        if record.get("status") != "success":
+            return
+        command, track = record.get("command", ""), record.get("track", "")
+        for index, key in (
+            (self._by_track, (command, track)),
+            (self._by_params, (command, track, record.get("params", ""))),
+        ):
+            current = index.get(key)
+            if current is None or not record.get("dry_run") or current.get("dry_run"):
+                index[key] = record
+
+    def latest(self, track: str, *, command: str = "novelty", params: str | None = None) -> dict | None:
+        """Most recent successful record for track (and exact params, if given), or None."""
+        self.refresh()
+        if params is None:
+            return self._by_track.get((command, track))
+        return self._by_params.get((command, track, params))
+
+    def region(
+        self, track: str, *, command: str = "novelty", params: str | None = None
+    ) -> tuple[float, float, str, str]:
+        """(start_sec, end_sec, start_marker, end_marker) used for track by command.
+
+        Marker names are "" when the run was not marker-trimmed. Raises ValueError
+        when no successful run with a region is recorded.
+        """
+        record = self.latest(track, command=command, params=params)
+        if record is None:
+            wanted = f" with params {params}" if params is not None else ""
+            raise ValueError(f"No {command} run recorded for {track}{wanted} in {self.path}")
+        if record.get("region") is None:
+            raise ValueError(f"{command} run {record.get('run')} for {track} recorded no region")
+        start_sec, end_sec = record["region"]
+        start_name, end_name = record.get("markers") or ("", "")
+        return float(start_sec), float(end_sec), start_name, end_name
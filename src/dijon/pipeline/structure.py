@@ -0,0 +1,189 @@
+"""Pipeline for segmenting metric chromagrams into sections (data/derived/structure)."""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import numpy as np
+
+from ..beats import as_meter_labels
+from ..global_config import DERIVED_DIR
+from ..structure import checkerboard_novelty, novelty_boundaries, unit_features
+from ..structure.methods import KERNEL_SIZE_DEFAULT, KERNEL_VARIANCE_DEFAULT, UNITS
+from .catalog import (
+    bpm_threshold_from_params,
+    parse_artifact_name,
+    record_artifact,
+    resolve_chromagram_files,
+)
+
+CHROMAGRAM_DIR = DERIVED_DIR / "chromagram"
+METER_DIR = DERIVED_DIR / "meter"
+STRUCTURE_OUTPUT_DIR = DERIVED_DIR / "structure"
+# One row per section boundary: unit index (bar or beat), onset, bar/beat label and
+# novelty at the peak. The first section starts at unit 0 and is not listed.
+STRUCTURE_DTYPE = np.dtype([
+    ("index", np.int32),
+    ("time_sec", np.float64),
+    ("bar", np.int32),
+    ("beat", np.int8),
+    ("novelty", np.float32),
+])
+
+
+def _output_filename(chroma_path: Path, *, unit: str, kernel_size: int, variance: float) -> str:
+    """<track>_structure_<chromagram params>-<unit>-<kernel_size>-<variance>.npy.
+
+    E.g. YTB-001_structure_metric_cqt_256-180.0-mean-preserve-rms-1.0-2-bar-8-0.5.npy;
+    the chromagram parameters keep variants of one track from overwriting each other.
+    """
+    track, params = parse_artifact_name(Path(chroma_path).name, "chromagram")
+    suffix = f"{unit}-{kernel_size}-{variance}"
+    return f"{track}_structure_{params}-{suffix}.npy" if params else f"{track}_structure_{suffix}.npy"
+
+
+def run_structure(
+    *,
+    chromagram_files: list[Path] | None = None,
+    output_dir: Path = STRUCTURE_OUTPUT_DIR,
+    chromagram_dir: Path = CHROMAGRAM_DIR,
+    meter_dir: Path = METER_DIR,
+    unit: str = "bar",
+    kernel_size: int = KERNEL_SIZE_DEFAULT,
+    variance: float = KERNEL_VARIANCE_DEFAULT,
+    threshold: float = 0.1,
+    dry_run: bool = False,
+) -> dict:
+    """Find section boundaries of metric chromagrams and write .npy to output_dir.
+
+    Chromagram columns are pooled per bar (or beat) using the track's meter map and
+    the bpm_threshold encoded in the chromagram filename. A checkerboard kernel of
+    kernel_size units per side is slid along the self-similarity diagonal; novelty
+    peaks at least kernel_size units apart and above threshold times the largest
+    peak become boundaries. Output: <track>_structure_<chromagram params>-<unit>-
+    <kernel_size>-<variance>.npy, a STRUCTURE_DTYPE array.
+
+    Returns:
+        Dict with success, total, succeeded, failed, skipped, message, items, failures.
+    """
+    problems = []
+    if unit not in UNITS:
+        problems.append(f"unit must be one of {list(UNITS)}, got {unit!r}")
+    if kernel_size < 1:
+        problems.append(f"kernel_size must be >= 1, got {kernel_size}")
+    if variance <= 0:
+        problems.append(f"variance must be positive, got {variance}")
+    if problems:
+        return {
+            "success": False,
+            "total": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "skipped": 0,
+            "message": "; ".join(problems),
+            "items": [],
+            "failures": [],
+        }
+
+    paths = resolve_chromagram_files(chromagram_files, chromagram_dir)
+    if not paths:
+        return {
+            "success": True,
+            "total": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "skipped": 0,
+            "message": "No chromagram files to process.",
+            "items": [],
+            "failures": [],
+        }
+
+    output_dir = Path(output_dir)
+    if not dry_run:
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    succeeded = 0
+    failed = 0
+    skipped = 0
+    items: list[dict] = []
+    failures: list[dict] = []
+    t_start = time.perf_counter()
+
+    for chroma_path in paths:
+        track_name, params = parse_artifact_name(chroma_path.name, "chromagram")
+        meter_path = meter_dir / f"{track_name}_meter.npy"
+        if not meter_path.exists():
+            skipped += 1
+            items.append({
+                "file": chroma_path.name,
+                "status": "skipped",
+                "detail": f"Missing meter map: {meter_path.name}",
+            })
+            continue
+        if not chroma_path.exists():
+            failed += 1
+            failures.append({"item": str(chroma_path), "reason": "File not found"})
+            items.append({"file": chroma_path.name, "status": "failed", "detail": "File not found"})
+            continue
+
+        try:
+            C_metric = np.load(chroma_path)
+            labels = as_meter_labels(np.load(meter_path))
+            F, first_beat = unit_features(
+                C_metric,
+                labels,
+                bpm_threshold=bpm_threshold_from_params(params),
+                unit=unit,
+            )
+            novelty = checkerboard_novelty(F, L=kernel_size, variance=variance)
+            peaks = novelty_boundaries(novelty, min_distance=kernel_size, threshold=threshold)
+
+            beat_rows = first_beat[peaks]
+            boundaries = np.empty(len(peaks), dtype=STRUCTURE_DTYPE)
+            boundaries["index"] = peaks
+            boundaries["time_sec"] = labels["time_sec"][beat_rows]
+            boundaries["bar"] = labels["bar"][beat_rows]
+            boundaries["beat"] = labels["beat"][beat_rows]
+            boundaries["novelty"] = novelty[peaks]
+
+            out_name = _output_filename(
+                chroma_path, unit=unit, kernel_size=kernel_size, variance=variance
+            )
+            out_path = output_dir / out_name
+            if not dry_run:
+                np.save(out_path, boundaries, allow_pickle=False)
+                record_artifact(out_path, "structure")
+
+            succeeded += 1
+            items.append({
+                "file": chroma_path.name,
+                "meter": meter_path.name,
+                "output": out_name,
+                "status": "success",
+                "units": int(F.shape[1]),
+                "sections": len(peaks) + 1,
+                "detail": f"{len(peaks) + 1} section(s) over {F.shape[1]} {unit}s"
+                + (
+                    f"; boundaries at {unit}s {', '.join(str(int(i)) for i in peaks)}"
+                    if len(peaks)
+                    else ""
+                ),
+            })
+        except Exception as e:
+            failed += 1
+            failures.append({"item": str(chroma_path), "reason": str(e)})
+            items.append({"file": chroma_path.name, "status": "failed", "detail": str(e)})
+
+    return {
+        "success": failed == 0,
+        "total": len(paths),
+        "succeeded": succeeded,
+        "failed": failed,
+        "skipped": skipped,
+        "elapsed_s": time.perf_counter() - t_start,
+        "message": f"Processed {len(paths)} file(s). Succeeded: {succeeded}, failed: {failed}, skipped: {skipped}."
+        + (" [DRY RUN]" if dry_run else ""),
+        "items": items,
+        "failures": failures,
+    }
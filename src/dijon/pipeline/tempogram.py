@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import time
 from pathlib import Path
 
+import numba
 import numpy as np
 
 from ..global_config import DERIVED_DIR
@@ -11,7 +13,24 @@ from ..tempogram import (
     compute_cyclic_tempogram,
     compute_tempogram_autocorr,
     compute_tempogram_fourier,
+    compute_tempogram_fourier_parallel,
 )
+from ..tempogram.profile import (
+    PROFILE_SUFFIX,
+    PROFILE_WINDOW_SEC_DEFAULT,
+    compute_tempo_profile_fourier,
+    compute_tempogram_fourier_adaptive,
+    save_tempo_profile,
+    tempo_profiles_from_tempogram,
+)
+from ..tempogram.storage import (
+    STORAGE_DTYPES,
+    decimate_frames,
+    save_tempogram,
+    storage_tag,
+)
+from .catalog import find_artifacts, record_artifact
+from .warmup import warm_kernels
 
 FS_NOVELTY = 100.0  # Contract: novelty files are at 100 Hz
 NOVELTY_DIR = DERIVED_DIR / "novelty"
@@ -21,18 +40,22 @@ TEMPOGRAM_DEFAULTS: dict[str, tuple[int, int]] = {
     "fourier": (512, 1),
     "autocorr": (512, 1),
     "cyclic": (512, 1),
+    "adaptive": (512, 1),
 }
 TEMPOGRAM_TYPES = frozenset(TEMPOGRAM_DEFAULTS)
+EMIT_MODES = frozenset({"tempogram", "profile", "both"})
 THETA_DEFAULT = (40, 320)
 
 
-def _resolve_novelty_files(files: list[Path] | None, novelty_dir: Path) -> list[Path]:
+def resolve_novelty_files(files: list[Path] | None, novelty_dir: Path) -> list[Path]:
     """Return list of novelty paths: explicit if given, else all .npy in novelty_dir.
 
     When files are provided, each item is resolved as follows:
     - Full path (absolute or with directory): used as-is.
-    - Basename only (e.g. YTB-014): glob novelty_dir/<track_id>_novelty_*.npy.
-      If multiple matches, raises ValueError (ambiguous; use explicit path).
+    - Basename only (e.g. YTB-014): novelty_dir/<track_id>_novelty_*.npy, looked up
+      in the derived-artifact catalog. A longer name narrows by parameters, e.g.
+      YTB-014_novelty_spectrum matches only spectrum novelty. If multiple matches,
+      raises ValueError (ambiguous; use explicit path or more parameters).
     """
     if not files:
         if not novelty_dir.exists():
@@ -44,9 +67,13 @@ def _resolve_novelty_files(files: list[Path] | None, novelty_dir: Path) -> list[
         path = Path(p)
         is_shorthand = not path.is_absolute() and len(path.parts) == 1
         if is_shorthand:
-            stem = path.stem
-            track_id = stem.split("_novelty_")[0] if "_novelty_" in stem else stem
-            matches = sorted(novelty_dir.glob(f"{track_id}_novelty_*.npy"))
+            stem = path.name[:-4] if path.suffix == ".npy" else path.name
+            track_id, params_prefix = (
+                stem.split("_novelty_", 1) if "_novelty_" in stem else (stem, "")
+            )
+            matches = find_artifacts(
+                novelty_dir, "novelty", track_id, params_prefix=params_prefix, suffixes=(".npy",)
+            )
             if len(matches) > 1:
                 names = [m.name for m in matches]
                 raise ValueError(
@@ -60,16 +87,75 @@ def _resolve_novelty_files(files: list[Path] | None, novelty_dir: Path) -> list[
     return list(dict.fromkeys(resolved))
 
 
-def _track_name_from_novelty_stem(stem: str) -> str:
+def track_name_from_novelty_stem(stem: str) -> str:
     """Extract track name from novelty filename stem. E.g. YTB-001_novelty_spectrum_... -> YTB-001."""
     if "_novelty_" in stem:
         return stem.split("_novelty_")[0]
     return stem
 
 
-def _output_filename(track_name: str, ttype: str, N: int, H: int, theta_min: int, theta_max: int) -> str:
-    """Build filename: <track_name>_tempogram_<type>_<N>-<H>-<theta_min>-<theta_max>.npy."""
-    return f"{track_name}_tempogram_{ttype}_{N}-{H}-{theta_min}-{theta_max}.npy"
+def _output_filename(
+    track_name: str,
+    ttype: str,
+    N: int,
+    H: int,
+    theta_min: int,
+    theta_max: int,
+    storage: str = "",
+) -> str:
+    """Build filename: <track_name>_tempogram_<type>_<N>-<H>-<theta_min>-<theta_max>[_<storage>].npy.
+
+    storage is the non-default storage tag (e.g. float16-d10); empty for float64.
+    """
+    suffix = f"_{storage}" if storage else ""
+    return f"{track_name}_tempogram_{ttype}_{N}-{H}-{theta_min}-{theta_max}{suffix}.npy"
+
+
+def _profile_filename(out_name: str) -> str:
+    """Profile filename for a tempogram output: <tempogram stem>_profile.npz."""
+    return Path(out_name).stem + PROFILE_SUFFIX
+
+
+def _parse_tempogram_types(ntype: str) -> list[str]:
+    """Split a comma-separated type spec (e.g. "fourier,cyclic") into ordered unique types."""
+    types = [t.strip().lower() for t in ntype.split(",") if t.strip()]
+    return list(dict.fromkeys(types))
+
+
+def _resolve_threads(threads: int) -> int:
+    """Clamp a --threads request to numba's pool: 0 means all, 1 means serial."""
+    if threads < 0:
+        raise ValueError(f"threads must be >= 0, got {threads}")
+    available = numba.config.NUMBA_NUM_THREADS
+    return available if threads == 0 else min(threads, available)
+
+
+def _compute_tempogram(
+    nov: np.ndarray,
+    ttype: str,
+    N: int,
+    H: int,
+    Theta: np.ndarray,
+    fourier_cache: dict[tuple[int, int], np.ndarray],
+    parallel: bool = False,
+) -> tuple[np.ndarray, np.ndarray | None]:
+    """Compute one tempogram type, reusing Fourier magnitudes cached per (N, H).
+
+    Returns (tempogram, scale) where scale is the octave-scale axis for cyclic, else None.
+    """
+    if ttype == "autocorr":
+        out_arr, _T, _F = compute_tempogram_autocorr(nov, FS_NOVELTY, N, H, Theta=Theta)
+        return out_arr, None
+    mag = fourier_cache.get((N, H))
+    if mag is None:
+        compute = compute_tempogram_fourier_parallel if parallel else compute_tempogram_fourier
+        X, _T, _F = compute(nov, FS_NOVELTY, N, H, Theta)
+        mag = np.abs(X)
+        fourier_cache[(N, H)] = mag
+    if ttype == "fourier":
+        return mag, None
+    out_arr, scale = compute_cyclic_tempogram(mag, Theta)  # cyclic: chain from fourier
+    return out_arr, scale
 
 
 def run_tempogram(
@@ -84,6 +170,11 @@ def run_tempogram(
     theta_max: int | None = None,
     dry_run: bool = False,
     skip_if_exists: bool = False,
+    dtype: str = "float64",
+    decimate: int = 1,
+    emit: str = "tempogram",
+    profile_window_sec: float = PROFILE_WINDOW_SEC_DEFAULT,
+    threads: int = 1,
 ) -> dict:
     """Compute tempogram for novelty file(s) and write .npy to output_dir.
 
@@ -91,9 +182,41 @@ def run_tempogram(
     .npy in novelty_dir. For type cyclic, computes fourier tempogram then cyclic;
     saves cyclic array. Output: <track_name>_tempogram_<type>_<N>-<H>-<theta_min>-<theta_max>.npy.
 
+    ntype may be a comma-separated subset of types (e.g. "fourier,cyclic,autocorr").
+    Each novelty file is then loaded once and every requested type is written in
+    the same pass; the Fourier magnitude is computed once and reused for cyclic.
+    Items, counts and total are per output (file x type).
+
     skip_if_exists: When True, skip computation when output file already exists.
+
+    dtype, decimate: Storage format. Arrays are stored as float64 (default), float32
+    or float16, optionally block-averaged over `decimate` frames in time (effective
+    hop H * decimate). Non-default storage adds a tag to the filename, e.g.
+    ..._512-1-40-320_float16-d10.npy. Every output gets a <stem>.json sidecar
+    recording Theta, Fs, N, H and decimation so readers can np.load(mmap_mode="r").
+
+    emit: "tempogram" (default) writes the matrix; "profile" writes only the tempo
+    profile summary (<tempogram stem>_profile.npz: global mean |X| per tempo plus
+    means over profile_window_sec windows); "both" writes both. For a profile-only
+    fourier run the profile is computed chunk-wise from novelty, never holding the
+    full K x M tempogram.
+
+    Type "adaptive" is a coarse-to-fine Fourier tempogram: a log-spaced coarse grid
+    locates the top tempo peaks and only the Theta bins around them are computed.
+    Its .npy holds those refined rows (sidecar "theta" lists them); its profile is
+    interpolated onto the full Theta grid.
+
+    threads: numba threads for the Fourier-based types (fourier, cyclic, adaptive),
+    parallel over tempi. 1 (default) runs the serial kernel, 0 uses all of numba's
+    threads (NUMBA_NUM_THREADS, which also caps larger values). When several
+    tempogram processes run side by side, keep processes x threads <= cores.
+
+    Numba kernels are compiled (or loaded from cache) before the first file;
+    the result reports that as compile_s, separate from elapsed_s (the run).
     """
-    if ntype not in TEMPOGRAM_TYPES:
+    types = _parse_tempogram_types(ntype)
+    unknown = [t for t in types if t not in TEMPOGRAM_TYPES]
+    if not types or unknown:
         return {
             "success": False,
             "total": 0,
@@ -105,14 +228,56 @@ def run_tempogram(
             "failures": [],
         }
 
-    defaults = TEMPOGRAM_DEFAULTS[ntype]
-    N = N if N is not None else defaults[0]
-    H = H if H is not None else defaults[1]
+    if emit not in EMIT_MODES:
+        return {
+            "success": False,
+            "total": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "skipped": 0,
+            "message": f"Unknown emit mode: {emit}. Use one of: {sorted(EMIT_MODES)}",
+            "items": [],
+            "failures": [],
+        }
+    if dtype not in STORAGE_DTYPES or decimate < 1:
+        return {
+            "success": False,
+            "total": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "skipped": 0,
+            "message": f"Invalid storage: dtype={dtype}, decimate={decimate}. "
+            f"Use dtype one of {sorted(STORAGE_DTYPES)} and decimate >= 1.",
+            "items": [],
+            "failures": [],
+        }
+    if threads < 0:
+        return {
+            "success": False,
+            "total": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "skipped": 0,
+            "message": f"Invalid threads: {threads}. Use 0 (all cores) or a positive count.",
+            "items": [],
+            "failures": [],
+        }
+    # Profiles are always float64 and undecimated, so profile-only names carry no tag.
+    storage = storage_tag(dtype, decimate) if emit != "profile" else ""
+
+    # Per-type (N, H): explicit values apply to all types, else each type's default.
+    params = {
+        t: (
+            N if N is not None else TEMPOGRAM_DEFAULTS[t][0],
+            H if H is not None else TEMPOGRAM_DEFAULTS[t][1],
+        )
+        for t in types
+    }
     theta_min = theta_min if theta_min is not None else THETA_DEFAULT[0]
     theta_max = theta_max if theta_max is not None else THETA_DEFAULT[1]
     Theta = np.arange(theta_min, theta_max + 1, dtype=float)
 
-    paths = _resolve_novelty_files(novelty_files, novelty_dir)
+    paths = resolve_novelty_files(novelty_files, novelty_dir)
     if not paths:
         return {
             "success": True,
@@ -129,90 +294,215 @@ def run_tempogram(
     if not dry_run:
         output_dir.mkdir(parents=True, exist_ok=True)
 
-    succeeded = 0
-    failed = 0
-    skipped = 0
-    items: list[dict] = []
-    failures: list[dict] = []
-
-    for nov_path in paths:
-        track_name = _track_name_from_novelty_stem(nov_path.stem)
-        out_name = _output_filename(track_name, ntype, N, H, theta_min, theta_max)
-        out_path = output_dir / out_name
-
-        if skip_if_exists and out_path.exists():
-            skipped += 1
-            items.append({
-                "file": nov_path.name,
-                "input_file": nov_path.name,
-                "output": out_name,
-                "status": "skipped",
-                "detail": "Output exists",
-            })
-            continue
-
-        if not nov_path.exists():
-            failed += 1
-            failures.append({"item": str(nov_path), "reason": "File not found"})
-            items.append({"file": nov_path.name, "status": "failed", "detail": "File not found"})
-            continue
-
-        try:
-            nov = np.load(nov_path, allow_pickle=False).astype(np.float64, copy=False)
-            if nov.ndim != 1:
-                raise ValueError(f"Expected 1D novelty, got shape {nov.shape}")
-
-            if ntype == "fourier":
-                X, _T, _F = compute_tempogram_fourier(nov, FS_NOVELTY, N, H, Theta)
-                out_arr = np.abs(X)
-            elif ntype == "autocorr":
-                out_arr, _T, _F = compute_tempogram_autocorr(nov, FS_NOVELTY, N, H, Theta=Theta)
-            else:  # cyclic: chain from fourier
-                X, _T, F_coef_BPM = compute_tempogram_fourier(nov, FS_NOVELTY, N, H, Theta)
-                mag = np.abs(X)
-                out_arr, _scale = compute_cyclic_tempogram(mag, F_coef_BPM)
-
-            if not dry_run:
-                np.save(out_path, out_arr, allow_pickle=False)
-            succeeded += 1
-            tempo_bin_count = len(Theta)
-            tempo_resolution_bpm = (
-                (theta_max - theta_min) / (tempo_bin_count - 1)
-                if tempo_bin_count > 1
-                else 0.0
+    n_threads = _resolve_threads(threads)
+    parallel = n_threads > 1
+    # set_num_threads is process-wide; restore it so callers keep their own setting.
+    prev_threads = numba.get_num_threads()
+    if parallel:
+        numba.set_num_threads(n_threads)
+    try:
+        # JIT compile / cache load is paid (and reported) once up front, not in the first file.
+        kernels: list[str] = []
+        if "cyclic" in types or ("fourier" in types and emit != "profile"):
+            kernels.append("tempogram.fourier_parallel" if parallel else "tempogram.fourier")
+        if "adaptive" in types or (emit == "profile" and "fourier" in types):
+            kernels.append(
+                "tempogram.fourier_frames_parallel" if parallel else "tempogram.fourier_frames"
             )
-            items.append({
-                "file": nov_path.name,
-                "input_file": nov_path.name,
-                "output": out_name,
-                "status": "success",
-                "num_features": int(len(nov)),
-                "feature_sample_rate_hz": FS_NOVELTY,
-                "N": N,
-                "H": H,
-                "shape": tuple(out_arr.shape),
-                "dtype": str(out_arr.dtype),
-                "min": float(np.min(out_arr)),
-                "max": float(np.max(out_arr)),
-                "mean": float(np.mean(out_arr)),
-                "std": float(np.std(out_arr)),
-                "tempo_min_bpm": int(theta_min),
-                "tempo_max_bpm": int(theta_max),
-                "tempo_resolution_bpm": tempo_resolution_bpm,
-                "tempo_bin_count": tempo_bin_count,
-            })
-        except Exception as e:
-            failed += 1
-            failures.append({"item": str(nov_path), "reason": str(e)})
-            items.append({"file": nov_path.name, "status": "failed", "detail": str(e)})
+        compile_s = warm_kernels(kernels)
+        t_start = time.perf_counter()
+
+        succeeded = 0
+        failed = 0
+        skipped = 0
+        items: list[dict] = []
+        failures: list[dict] = []
+
+        for nov_path in paths:
+            track_name = track_name_from_novelty_stem(nov_path.stem)
+
+            pending: list[tuple[str, str]] = []
+            for ttype in types:
+                t_N, t_H = params[ttype]
+                out_name = _output_filename(
+                    track_name, ttype, t_N, t_H, theta_min, theta_max, storage
+                )
+                targets = []
+                if emit != "profile":
+                    targets.append(output_dir / out_name)
+                if emit != "tempogram":
+                    targets.append(output_dir / _profile_filename(out_name))
+                if skip_if_exists and all(t.exists() for t in targets):
+                    skipped += 1
+                    items.append({
+                        "file": nov_path.name,
+                        "input_file": nov_path.name,
+                        "output": targets[0].name,
+                        "status": "skipped",
+                        "detail": "Output exists",
+                    })
+                    continue
+                pending.append((ttype, out_name))
+            if not pending:
+                continue
+
+            if not nov_path.exists():
+                for _ttype, _out_name in pending:
+                    failed += 1
+                    failures.append({"item": str(nov_path), "reason": "File not found"})
+                    items.append({"file": nov_path.name, "status": "failed", "detail": "File not found"})
+                continue
+
+            try:
+                nov = np.load(nov_path, allow_pickle=False).astype(np.float64, copy=False)
+                if nov.ndim != 1:
+                    raise ValueError(f"Expected 1D novelty, got shape {nov.shape}")
+            except Exception as e:
+                for _ttype, _out_name in pending:
+                    failed += 1
+                    failures.append({"item": str(nov_path), "reason": str(e)})
+                    items.append({"file": nov_path.name, "status": "failed", "detail": str(e)})
+                continue
+
+            fourier_cache: dict[tuple[int, int], np.ndarray] = {}
+            for ttype, out_name in pending:
+                t_N, t_H = params[ttype]
+                try:
+                    profile_name = _profile_filename(out_name)
+                    direct_profile = (
+                        emit == "profile"
+                        and ttype == "fourier"
+                        and "cyclic" not in types
+                        and (t_N, t_H) not in fourier_cache
+                    )
+                    full_arr: np.ndarray | None = None
+                    scale: np.ndarray | None = None
+                    theta_out = Theta
+                    profiles: tuple[np.ndarray, np.ndarray, np.ndarray] | None = None
+                    if ttype == "adaptive":
+                        full_arr, theta_out, adaptive_profiles = compute_tempogram_fourier_adaptive(
+                            nov,
+                            FS_NOVELTY,
+                            t_N,
+                            t_H,
+                            Theta,
+                            window_sec=profile_window_sec,
+                            parallel=parallel,
+                        )
+                        if emit != "tempogram":
+                            profiles = adaptive_profiles
+                    elif direct_profile:
+                        profiles = compute_tempo_profile_fourier(
+                            nov,
+                            FS_NOVELTY,
+                            t_N,
+                            t_H,
+                            Theta,
+                            window_sec=profile_window_sec,
+                            parallel=parallel,
+                        )
+                    else:
+                        full_arr, scale = _compute_tempogram(
+                            nov, ttype, t_N, t_H, Theta, fourier_cache, parallel
+                        )
+                        if emit != "tempogram":
+                            profiles = tempo_profiles_from_tempogram(
+                                full_arr,
+                                frame_rate_hz=FS_NOVELTY / t_H,
+                                window_sec=profile_window_sec,
+                            )
+
+                    out_arr: np.ndarray | None = None
+                    if full_arr is not None and emit != "profile":
+                        extra: dict = {"source_novelty": nov_path.name}
+                        if scale is not None:
+                            extra["scale"] = [float(v) for v in scale]
+                        if dry_run:
+                            out_arr = decimate_frames(full_arr, decimate).astype(dtype, copy=False)
+                        else:
+                            out_arr, _meta = save_tempogram(
+                                output_dir / out_name,
+                                full_arr,
+                                theta=theta_out,
+                                fs=FS_NOVELTY,
+                                N=t_N,
+                                H=t_H,
+                                ttype=ttype,
+                                dtype=dtype,
+                                decimate=decimate,
+                                extra=extra,
+                            )
+                            record_artifact(output_dir / out_name, "tempogram")
+                    if profiles is not None and not dry_run:
+                        global_profile, windowed_profile, window_times = profiles
+                        save_tempo_profile(
+                            output_dir / profile_name,
+                            axis=scale if scale is not None else Theta,
+                            global_profile=global_profile,
+                            windowed_profile=windowed_profile,
+                            window_times_sec=window_times,
+                            ttype=ttype,
+                            fs=FS_NOVELTY,
+                            N=t_N,
+                            H=t_H,
+                            window_sec=profile_window_sec,
+                            source_novelty=nov_path.name,
+                        )
+                        record_artifact(output_dir / profile_name, "tempogram")
+                    # Stats describe the main written array (windowed profile when profile-only).
+                    summary_arr = out_arr if out_arr is not None else profiles[1]
+                    succeeded += 1
+                    tempo_bin_count = len(theta_out)
+                    tempo_resolution_bpm = (
+                        (theta_max - theta_min) / (len(Theta) - 1)
+                        if len(Theta) > 1
+                        else 0.0
+                    )
+                    item = {
+                        "file": nov_path.name,
+                        "input_file": nov_path.name,
+                        "output": out_name if emit != "profile" else profile_name,
+                        "status": "success",
+                        "tempogram_type": ttype,
+                        "num_features": int(len(nov)),
+                        "feature_sample_rate_hz": FS_NOVELTY,
+                        "N": t_N,
+                        "H": t_H,
+                        "shape": tuple(summary_arr.shape),
+                        "dtype": str(summary_arr.dtype),
+                        "decimate": decimate,
+                        "threads": n_threads if ttype != "autocorr" else 1,
+                        "min": float(np.min(summary_arr)),
+                        "max": float(np.max(summary_arr)),
+                        "mean": float(np.mean(summary_arr, dtype=np.float64)),
+                        "std": float(np.std(summary_arr, dtype=np.float64)),
+                        "tempo_min_bpm": int(theta_min),
+                        "tempo_max_bpm": int(theta_max),
+                        "tempo_resolution_bpm": tempo_resolution_bpm,
+                        "tempo_bin_count": tempo_bin_count,
+                    }
+                    if emit == "both":
+                        item["profile_output"] = profile_name
+                    items.append(item)
+                except Exception as e:
+                    failed += 1
+                    failures.append({"item": str(nov_path), "reason": str(e)})
+                    items.append({"file": nov_path.name, "status": "failed", "detail": str(e)})
+    finally:
+        numba.set_num_threads(prev_threads)
 
+    total = len(paths) * len(types)
     return {
         "success": failed == 0,
-        "total": len(paths),
+        "total": total,
         "succeeded": succeeded,
         "failed": failed,
         "skipped": skipped,
-        "message": f"Processed {len(paths)} file(s). Succeeded: {succeeded}, failed: {failed}, skipped: {skipped}."
+        "compile_s": compile_s,
+        "elapsed_s": time.perf_counter() - t_start,
+        "message": f"Processed {len(paths)} file(s)"
+        + (f" x {len(types)} type(s)" if len(types) > 1 else "")
+        + f". Succeeded: {succeeded}, failed: {failed}, skipped: {skipped}."
         + (" [DRY RUN]" if dry_run else ""),
         "items": items,
         "failures": failures,
@@ -0,0 +1,181 @@
+"""Pipeline for warming numba kernels (compile or load from cache) ahead of real runs."""
+
+from __future__ import annotations
+
+import importlib
+import time
+from collections.abc import Callable
+
+import numpy as np
+
+
+def _fourier_sample_args() -> tuple:
+    """Small arguments with the same numba types as pipeline calls (float64 arrays, int N/H)."""
+    return (np.zeros(64), 100.0, 32, 1, np.arange(40.0, 48.0))
+
+
+def _beat_dp_sample_args() -> tuple:
+    """Small arguments matching compute_beat_sequence_local's kernel call."""
+    return (np.zeros(64), np.full(64, 10.0), 1.0, 2.0)
+
+
+def _score_candidates_sample_args() -> tuple:
+    """Two small candidates, typed as score_metric_chromagrams passes them."""
+    return (np.ones((12, 8)), np.array([0, 4, 8], dtype=np.int64), 4, 0.5)
+
+
+def _dtw_sample_args() -> tuple:
+    """Two 8-frame chroma sequences in kernel layout (rows, Y doubled) and their band."""
+    from ..alignment.methods import band_limits
+
+    lo, hi = band_limits(8, 8)
+    return (np.ones((8, 12)), np.ones((8, 24)), lo, hi)
+
+
+def _dtw_band_sample_args() -> tuple:
+    """As _dtw_sample_args, with the shift _dtw_band takes."""
+    X, Y2, lo, hi = _dtw_sample_args()
+    return (X, Y2, 0, lo, hi)
+
+
+def _backtrack_sample_args() -> tuple:
+    """A small accumulated band, typed as _dtw_band returns it.
+
+    Built directly rather than by calling _dtw_band, so that kernel is compiled
+    (and timed) only under its own name.
+    """
+    lo, hi = _dtw_sample_args()[2:]
+    return (np.zeros((8, int((hi - lo).max()) + 1), dtype=np.float32), lo, hi)
+
+
+def _viterbi_sample_args() -> tuple:
+    """Two short tracks of chord scores in decode_chords layout (frame rows, float32)."""
+    return (np.ones((8, 61), dtype=np.float32), np.array([0, 4, 8], dtype=np.int64), 1.0)
+
+
+# name -> ("module:attr" of the dispatcher, sample-args factory). Register new numba
+# kernels here so `dijon warmup` and run-time warm-up cover them. Dispatchers are
+# imported only when warmed, so importing this module (as every pipeline does)
+# does not load the kernel modules or their dependencies (e.g. librosa).
+JIT_KERNELS: dict[str, tuple[str, Callable[[], tuple]]] = {
+    "alignment.backtrack": ("dijon.alignment.methods:_backtrack_band", _backtrack_sample_args),
+    "alignment.dtw_band": ("dijon.alignment.methods:_dtw_band", _dtw_band_sample_args),
+    "alignment.shift_costs": ("dijon.alignment.methods:_dtw_shift_costs", _dtw_sample_args),
+    "beats.dp_local": ("dijon.beats.tracking:_beat_dp_local", _beat_dp_sample_args),
+    "chromagram.score_candidates": (
+        "dijon.chromagram.methods:_score_metric_candidates",
+        _score_candidates_sample_args,
+    ),
+    "harmony.viterbi": ("dijon.harmony.methods:_viterbi_segments", _viterbi_sample_args),
+    "tempogram.fourier": ("dijon.tempogram.methods:compute_tempogram_fourier", _fourier_sample_args),
+    "tempogram.fourier_parallel": (
+        "dijon.tempogram.methods:compute_tempogram_fourier_parallel",
+        _fourier_sample_args,
+    ),
+    "tempogram.fourier_frames": (
+        "dijon.tempogram.methods:_tempogram_fourier_frames",
+        _fourier_sample_args,
+    ),
+    "tempogram.fourier_frames_parallel": (
+        "dijon.tempogram.methods:_tempogram_fourier_frames_parallel",
+        _fourier_sample_args,
+    ),
+}
+
+
+def _dispatcher(name: str) -> Callable:
+    """Import and return the numba dispatcher registered under name."""
+    module, attr = JIT_KERNELS[name][0].split(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+def warm_kernel(name: str) -> dict:
+    """Compile (or load from numba's on-disk cache) one kernel, then run it once.
+
+    Returns:
+        Dict with item, compile_s (compile or cache load), run_s (one call on the
+        sample arguments) and source ("cache", "compiled" or "memory" if this
+        process already had it).
+    """
+    import numba
+
+    dispatcher = _dispatcher(name)
+    args = JIT_KERNELS[name][1]()
+    sig = tuple(numba.typeof(a) for a in args)
+    already = sig in dispatcher.overloads
+    hits_before = sum(dispatcher.stats.cache_hits.values())
+    t0 = time.perf_counter()
+    dispatcher.compile(sig)
+    compile_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    dispatcher(*args)
+    run_s = time.perf_counter() - t0
+    if already:
+        source = "memory"
+    elif sum(dispatcher.stats.cache_hits.values()) > hits_before:
+        source = "cache"
+    else:
+        source = "compiled"
+    return {"item": name, "status": "success", "compile_s": compile_s, "run_s": run_s, "source": source}
+
+
+def warm_kernels(names: list[str]) -> float:
+    """Warm the named kernels; return total compile/cache-load seconds."""
+    return sum(warm_kernel(name)["compile_s"] for name in names)
+
+
+def run_warmup(*, kernels: list[str] | None = None) -> dict:
+    """Compile or cache-load numba kernels and report compile vs run time per kernel.
+
+    Run once after install (or in a worker-pool initializer) so later short
+    invocations only pay the cache load. If kernels is None/empty, warms all
+    registered kernels.
+    """
+    names = list(kernels) if kernels else list(JIT_KERNELS)
+    unknown = [n for n in names if n not in JIT_KERNELS]
+    if unknown:
+        return {
+            "success": False,
+            "total": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "skipped": 0,
+            "message": f"Unknown kernel(s): {unknown}. Use any of: {sorted(JIT_KERNELS)}",
+            "items": [],
+            "failures": [],
+        }
+
+    succeeded = 0
+    failed = 0
+    items: list[dict] = []
+    failures: list[dict] = []
+    compile_total = 0.0
+    run_total = 0.0
+    for name in names:
+        try:
+            item = warm_kernel(name)
+        except Exception as e:
+            failed += 1
+            failures.append({"item": name, "reason": str(e)})
+            items.append({"item": name, "status": "failed", "detail": str(e)})
+            continue
+        succeeded += 1
+        compile_total += item["compile_s"]
+        run_total += item["run_s"]
+        item["detail"] = (
+            f"{item['source']}: compile {item['compile_s']:.3f}s, run {item['run_s']:.4f}s"
+        )
+        items.append(item)
+
+    return {
+        "success": failed == 0,
+        "total": len(names),
+        "succeeded": succeeded,
+        "failed": failed,
+        "skipped": 0,
+        "compile_s": compile_total,
+        "elapsed_s": run_total,
+        "message": f"Warmed {succeeded} kernel(s). Succeeded: {succeeded}, failed: {failed}.",
+        "items": items,
+        "failures": failures,
+    }
@@ -0,0 +1,8 @@
+"""Passage retrieval package."""
+
+from .methods import bar_shingles, transposed_shingles
+
+__all__ = [
+    "bar_shingles",
+    "transposed_shingles",
+]
@@ -0,0 +1,314 @@
+"""Persistent bar-shingle index with exact (BLAS) and IVF approximate top-k search.
+
+Layout of an index directory (data/derived/bar_index by default):
+
+    index.json          window, and per track: source chromagram name, size, mtime, rows
+    tracks/<track>.npz  shingles (float32 (n, 12 * window)), first bar label and
+                        start time of each shingle, IVF list of each shingle
+    ivf.npz             IVF centroids and the row count they were trained on
+
+Adding a track writes only its own file and the manifest, so the index grows as
+tracks are processed; a track whose chromagram changed is replaced. Shingles added
+after training are assigned to the nearest existing centroid. IVF search scores
+only the nprobe lists whose centroids are closest to the query, which for
+tens of thousands of shingles is a few percent of the rows.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from ..utils.storage import atomic_path, save_npz_atomic
+from .methods import WINDOW_BARS_DEFAULT, transposed_shingles
+
+INDEX_VERSION = 1
+MANIFEST_FILENAME = "index.json"
+IVF_FILENAME = "ivf.npz"
+# Below this many shingles exact search is already sub-millisecond; IVF is not trained.
+IVF_MIN_ROWS = 1024
+NPROBE_DEFAULT = 8
+SEARCH_MODES = ("exact", "ivf")
+
+
+def _spherical_kmeans(X: np.ndarray, nlist: int, *, iters: int = 15, seed: int = 0) -> np.ndarray:
+    """Unit-norm centroids (nlist, d) of unit-norm rows X by cosine k-means."""
+    rng = np.random.default_rng(seed)
+    C = X[rng.choice(X.shape[0], nlist, replace=False)].copy()
+    for _ in range(iters):
+        assign = np.argmax(X @ C.T, axis=1)
+        sums = np.zeros_like(C)
+        np.add.at(sums, assign, X)
+        norms = np.linalg.norm(sums, axis=1)
+        empty = norms == 0
+        # Re-seed empty lists from random rows rather than dropping them.
+        sums[empty] = X[rng.choice(X.shape[0], int(empty.sum()), replace=False)]
+        C = sums / np.maximum(np.linalg.norm(sums, axis=1), 1e-9)[:, None]
+    return C.astype(np.float32)
+
+
+class BarIndex:
+    """Bar-window chroma shingles of many tracks, searchable by cosine similarity.
+
+    window None takes the window of an existing index (WINDOW_BARS_DEFAULT for a
+    new one); opening an existing index with a different window raises ValueError.
+    Arrays are loaded on the first search and reloaded after add/remove/train.
+    """
+
+    def __init__(self, index_dir: Path, *, window: int | None = None) -> None:
+        self.dir = Path(index_dir)
+        manifest_path = self.dir / MANIFEST_FILENAME
+        if manifest_path.exists():
+            with open(manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+            if self.manifest.get("version") != INDEX_VERSION:
+                raise ValueError(f"Unsupported bar index version in {manifest_path}")
+            if window is not None and self.manifest["window"] != window:
+                raise ValueError(
+                    f"Index {self.dir} uses {self.manifest['window']}-bar windows, not {window}"
+                )
+        else:
+            self.manifest = {"version": INDEX_VERSION, "window": window or WINDOW_BARS_DEFAULT, "tracks": {}}
+        self.window = int(self.manifest["window"])
+        self.centroids: np.ndarray | None = None
+        self.trained_rows = 0
+        ivf_path = self.dir / IVF_FILENAME
+        if ivf_path.exists():
+            with np.load(ivf_path, allow_pickle=False) as data:
+                self.centroids = data["centroids"]
+                self.trained_rows = int(data["trained_rows"])
+        self._arrays: dict | None = None
+
+    # --- maintenance ---
+
+    @property
+    def tracks(self) -> dict[str, dict]:
+        """Indexed tracks: name -> source chromagram name, size, mtime_ns and row count."""
+        return self.manifest["tracks"]
+
+    @property
+    def rows(self) -> int:
+        """Total number of indexed shingles over all tracks."""
+        return sum(entry["rows"] for entry in self.tracks.values())
+
+    def is_current(self, track: str, stamp: tuple[str, int, int]) -> bool:
+        """True if track is indexed from the chromagram with this (name, size, mtime_ns)."""
+        entry = self.tracks.get(track)
+        return entry is not None and (entry["source"], entry["size"], entry["mtime_ns"]) == tuple(stamp)
+
+    def _track_path(self, track: str) -> Path:
+        return self.dir / "tracks" / f"{track}.npz"
+
+    def _write_manifest(self) -> None:
+        with atomic_path(self.dir / MANIFEST_FILENAME) as tmp:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.manifest, f, indent=1, sort_keys=True)
+
+    def _assign(self, shingles: np.ndarray) -> np.ndarray:
+        if self.centroids is None or shingles.shape[0] == 0:
+            return np.full(shingles.shape[0], -1, dtype=np.int32)
+        return np.argmax(shingles @ self.centroids.T, axis=1).astype(np.int32)
+
+    def add(
+        self,
+        track: str,
+        shingles: np.ndarray,
+        bars: np.ndarray,
+        times: np.ndarray,
+        *,
+        stamp: tuple[str, int, int],
+    ) -> None:
+        """Insert or replace a track's shingles (from bar_shingles) with their first bar labels and times."""
+        shingles = np.ascontiguousarray(shingles, dtype=np.float32)
+        if shingles.ndim != 2 or shingles.shape[1] != 12 * self.window:
+            raise ValueError(
+                f"Expected shingles with {12 * self.window} columns, got shape {shingles.shape}"
+            )
+        if not len(bars) == len(times) == shingles.shape[0]:
+            raise ValueError("shingles, bars and times must have the same length")
+        save_npz_atomic(
+            self._track_path(track),
+            shingles=shingles,
+            bars=np.asarray(bars, dtype=np.int32),
+            times=np.asarray(times, dtype=np.float64),
+            assign=self._assign(shingles),
+        )
+        name, size, mtime_ns = stamp
+        self.tracks[track] = {
+            "source": name,
+            "size": int(size),
+            "mtime_ns": int(mtime_ns),
+            "rows": int(shingles.shape[0]),
+        }
+        self._write_manifest()
+        self._arrays = None
+
+    def remove(self, track: str) -> None:
+        """Drop a track from the index (no-op if absent)."""
+        if self.tracks.pop(track, None) is None:
+            return
+        self._track_path(track).unlink(missing_ok=True)
+        self._write_manifest()
+        self._arrays = None
+
+    def needs_training(self) -> bool:
+        """True when there are enough rows for IVF and it is untrained or trained on under half of them."""
+        rows = self.rows
+        return rows >= IVF_MIN_ROWS and (self.centroids is None or rows > 2 * self.trained_rows)
+
+    def train(self, *, nlist: int | None = None, seed: int = 0) -> int:
+        """Train IVF centroids on the indexed shingles and reassign every track; returns nlist.
+
+        nlist defaults to about sqrt(rows). Training uses at most 256 rows per list.
+        """
+        arrays = self._load()
+        X = arrays["shingles"]
+        if X.shape[0] == 0:
+            raise ValueError("Cannot train IVF on an empty index")
+        nlist = int(nlist or max(1, round(np.sqrt(X.shape[0]))))
+        nlist = min(nlist, X.shape[0])
+        rng = np.random.default_rng(seed)
+        sample = X if X.shape[0] <= 256 * nlist else X[rng.choice(X.shape[0], 256 * nlist, replace=False)]
+        self.centroids = _spherical_kmeans(sample, nlist, seed=seed)
+        self.trained_rows = int(X.shape[0])
+        save_npz_atomic(
+            self.dir / IVF_FILENAME,
+            centroids=self.centroids,
+            trained_rows=np.asarray(self.trained_rows),
+        )
+        for track in self.tracks:
+            path = self._track_path(track)
+            with np.load(path, allow_pickle=False) as data:
+                entry = {key: data[key] for key in ("shingles", "bars", "times")}
+            save_npz_atomic(path, **entry, assign=self._assign(entry["shingles"]))
+        self._arrays = None
+        return nlist
+
+    # --- search ---
+
+    def _load(self) -> dict:
+        """Concatenate all tracks' arrays (cached until the index changes)."""
+        if self._arrays is not None:
+            return self._arrays
+        names = sorted(self.tracks)
+        parts: dict[str, list[np.ndarray]] = {k: [] for k in ("shingles", "bars", "times", "assign")}
+        track_idx, pos = [], []
+        for t, track in enumerate(names):
+            with np.load(self._track_path(track), allow_pickle=False) as data:
+                for key in parts:
+                    parts[key].append(data[key])
+            n = parts["bars"][-1].shape[0]
+            track_idx.append(np.full(n, t, dtype=np.int32))
+            pos.append(np.arange(n, dtype=np.int32))
+        d = 12 * self.window
+        arrays = {
+            "names": names,
+            "shingles": np.concatenate(parts["shingles"]) if names else np.zeros((0, d), np.float32),
+            "bars": np.concatenate(parts["bars"]) if names else np.zeros(0, np.int32),
+            "times": np.concatenate(parts["times"]) if names else np.zeros(0),
+            "assign": np.concatenate(parts["assign"]) if names else np.zeros(0, np.int32),
+            "track": np.concatenate(track_idx) if names else np.zeros(0, np.int32),
+            "pos": np.concatenate(pos) if names else np.zeros(0, np.int32),
+        }
+        if self.centroids is not None:
+            # Inverted lists: rows of list l are order[offsets[l]:offsets[l + 1]].
+            order = np.argsort(arrays["assign"], kind="stable")
+            arrays["order"] = order
+            arrays["offsets"] = np.searchsorted(
+                arrays["assign"][order], np.arange(self.centroids.shape[0] + 1)
+            )
+        self._arrays = arrays
+        return arrays
+
+    def shingle(self, track: str, first_bar: int) -> np.ndarray:
+        """The indexed shingle of track starting at bar label first_bar."""
+        arrays = self._load()
+        if track not in self.tracks:
+            raise ValueError(f"Track {track} is not in the index")
+        t = arrays["names"].index(track)
+        rows = np.flatnonzero((arrays["track"] == t) & (arrays["bars"] == first_bar))
+        if rows.size == 0:
+            raise ValueError(
+                f"No {self.window}-bar window of {track} starts at bar {first_bar}"
+            )
+        return arrays["shingles"][rows[0]]
+
+    def search(
+        self,
+        query: np.ndarray,
+        *,
+        k: int = 10,
+        mode: str = "exact",
+        nprobe: int = NPROBE_DEFAULT,
+        transpose: bool = True,
+        exclude_track: str | None = None,
+    ) -> list[dict]:
+        """Top-k shingles by cosine similarity to query (12 * window,).
+
+        With transpose, the query is also matched in all 12 transpositions and each
+        row keeps its best. Overlapping windows of the same track are suppressed
+        in favour of the better one. mode "ivf" scans only the nprobe closest
+        lists (falls back to exact when IVF is untrained).
+
+        Returns:
+            Dicts with track, bar and last_bar (labels), time_sec, score and shift
+            (semitones the match is transposed relative to the query), best first.
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"mode must be one of {SEARCH_MODES}, got {mode!r}")
+        arrays = self._load()
+        n = arrays["shingles"].shape[0]
+        if n == 0 or k < 1:
+            return []
+        shifts = range(12) if transpose else range(1)
+        Q = transposed_shingles(np.asarray(query, dtype=np.float32)[None, :], shifts)[:, 0]
+
+        if mode == "ivf" and self.centroids is not None:
+            # A list's relevance is its best centroid similarity over the query's
+            # transpositions; the nprobe best lists are scanned with every shift.
+            probe = min(max(1, nprobe), self.centroids.shape[0])
+            relevance = (Q @ self.centroids.T).max(axis=0)
+            lists = np.argpartition(-relevance, probe - 1)[:probe]
+            order, offsets = arrays["order"], arrays["offsets"]
+            rows = np.concatenate([order[offsets[li] : offsets[li + 1]] for li in lists])
+            S = Q @ arrays["shingles"][rows].T
+        else:
+            rows = np.arange(n)
+            S = Q @ arrays["shingles"].T
+        # (n_shifts, n_rows): an elementwise max over shifts, far cheaper than argmax
+        # along the short axis; shifts are resolved only for returned rows.
+        scores = S.max(axis=0)
+
+        if exclude_track is not None and exclude_track in self.tracks:
+            t = arrays["names"].index(exclude_track)
+            keep = arrays["track"][rows] != t
+            rows, scores, S = rows[keep], scores[keep], S[:, keep]
+
+        # Candidates beyond k are needed only to replace overlapping windows.
+        m = min(rows.shape[0], max(k * 2 * self.window, 256))
+        while True:
+            top = np.argpartition(-scores, m - 1)[:m] if m < rows.shape[0] else np.arange(rows.shape[0])
+            top = top[np.argsort(-scores[top], kind="stable")]
+            results: list[dict] = []
+            kept: dict[int, list[int]] = {}
+            for i in top:
+                r = rows[i]
+                t, p = int(arrays["track"][r]), int(arrays["pos"][r])
+                if any(abs(p - q) < self.window for q in kept.get(t, ())):
+                    continue
+                kept.setdefault(t, []).append(p)
+                results.append({
+                    "track": arrays["names"][t],
+                    "bar": int(arrays["bars"][r]),
+                    "last_bar": int(arrays["bars"][r]) + self.window - 1,
+                    "time_sec": float(arrays["times"][r]),
+                    "score": float(scores[i]),
+                    "shift": int(shifts[int(np.argmax(S[:, i]))]),
+                })
+                if len(results) == k:
+                    return results
+            if m >= rows.shape[0]:
+                return results
+            m = rows.shape[0]
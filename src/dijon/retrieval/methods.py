@@ -0,0 +1,41 @@
+# src/dijon/retrieval/methods.py
+"""Bar-window chroma shingles for passage retrieval."""
+
+from __future__ import annotations
+
+import numpy as np
+
+WINDOW_BARS_DEFAULT = 8
+
+
+def bar_shingles(F_bar: np.ndarray, *, window: int = WINDOW_BARS_DEFAULT) -> np.ndarray:
+    """Shingles of window consecutive bars from bar chroma F_bar (12, n_bars).
+
+    Returns float32 (n_bars - window + 1, 12 * window); row s holds bars
+    s..s+window-1, bar after bar. Each bar is L2-normalized, then the shingle, so
+    the dot product of two shingles is the mean cosine similarity of their bars
+    (for passages without silent bars).
+    """
+    if window < 1:
+        raise ValueError(f"window must be >= 1, got {window}")
+    F = np.asarray(F_bar, dtype=np.float32)
+    if F.ndim != 2 or F.shape[0] != 12:
+        raise ValueError(f"Expected bar chroma with shape (12, n_bars), got {F.shape}")
+    n = F.shape[1] - window + 1
+    if n < 1:
+        return np.zeros((0, 12 * window), dtype=np.float32)
+    bars = F.T / np.maximum(np.linalg.norm(F, axis=0), 1e-9)[:, None]
+    S = np.lib.stride_tricks.sliding_window_view(bars, (window, 12))[:, 0].reshape(n, 12 * window)
+    return np.ascontiguousarray(S / np.maximum(np.linalg.norm(S, axis=1), 1e-9)[:, None])
+
+
+def transposed_shingles(Q: np.ndarray, shifts: range | list[int] = range(12)) -> np.ndarray:
+    """Each shingle of Q (n, 12 * window) transposed up by every shift.
+
+    Returns (len(shifts), n, 12 * window): every bar's chroma rolled by shift.
+    Norms are unchanged, so transposed shingles stay comparable by dot product.
+    """
+    Q = np.asarray(Q, dtype=np.float32)
+    n, d = Q.shape
+    bars = Q.reshape(n, d // 12, 12)
+    return np.stack([np.roll(bars, s, axis=2).reshape(n, d) for s in shifts])
@@ -0,0 +1,23 @@
+"""Musical form (section structure) analysis package."""
+
+from .methods import (
+    checkerboard_kernel,
+    checkerboard_novelty,
+    novelty_boundaries,
+    pool_columns,
+    self_similarity,
+    ssm_band,
+    subdivision_beats,
+    unit_features,
+)
+
+__all__ = [
+    "checkerboard_kernel",
+    "checkerboard_novelty",
+    "novelty_boundaries",
+    "pool_columns",
+    "self_similarity",
+    "ssm_band",
+    "subdivision_beats",
+    "unit_features",
+]
@@ -0,0 +1,190 @@
+# src/dijon/structure/methods.py
+"""Self-similarity and checkerboard-novelty segmentation of metric chromagrams."""
+
+from __future__ import annotations
+
+import numpy as np
+from scipy.signal import fftconvolve, find_peaks
+
+from ..beats import as_meter_labels
+
+KERNEL_SIZE_DEFAULT = 8
+KERNEL_VARIANCE_DEFAULT = 0.5
+SSM_BLOCK_DEFAULT = 2048
+UNITS = ("bar", "beat")
+
+
+def subdivision_beats(beat_times: np.ndarray, *, bpm_threshold: float) -> np.ndarray:
+    """Beat-interval index of each C_metric column.
+
+    Mirrors the chromagram subdivision grid: an interval at local BPM <= bpm_threshold
+    has 4 columns, a faster one 2.
+    """
+    if bpm_threshold <= 0:
+        raise ValueError(f"bpm_threshold must be positive, got {bpm_threshold}")
+    beat_durs = np.diff(np.asarray(beat_times, dtype=np.float64))
+    if not np.all(beat_durs > 0):
+        raise ValueError("beat_times must be strictly increasing")
+    subdiv = np.where(60.0 / beat_durs <= bpm_threshold, 4, 2)
+    return np.repeat(np.arange(len(beat_durs)), subdiv)
+
+
+def pool_columns(C: np.ndarray, labels: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Mean of the columns of C sharing a label; labels must be non-decreasing.
+
+    Returns (pooled float32 (d, K), index of the first column of each group).
+    """
+    labels = np.asarray(labels)
+    if labels.ndim != 1 or labels.shape[0] != C.shape[1]:
+        raise ValueError(f"Expected {C.shape[1]} labels, got shape {labels.shape}")
+    if np.any(np.diff(labels) < 0):
+        raise ValueError("labels must be non-decreasing")
+    starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+    sums = np.add.reduceat(np.asarray(C, dtype=np.float64), starts, axis=1)
+    counts = np.diff(np.r_[starts, C.shape[1]])
+    return (sums / counts).astype(np.float32), starts
+
+
+def unit_features(
+    C_metric: np.ndarray,
+    meter_map: np.ndarray,
+    *,
+    bpm_threshold: float,
+    unit: str = "bar",
+) -> tuple[np.ndarray, np.ndarray]:
+    """Beat- or bar-synchronous chroma from a metric chromagram and its meter map.
+
+    meter_map is a structured label array or a legacy (N, 3) array (see
+    dijon.beats.as_meter_labels). Returns (features float32 (12, K), meter-map row
+    index of each unit's first beat). bpm_threshold must be the one C_metric was
+    computed with.
+    """
+    if unit not in UNITS:
+        raise ValueError(f"unit must be one of {UNITS}, got {unit!r}")
+    labels = as_meter_labels(meter_map)
+    beat_of_column = subdivision_beats(labels["time_sec"], bpm_threshold=bpm_threshold)
+    if beat_of_column.shape[0] != C_metric.shape[1]:
+        raise ValueError(
+            f"C_metric has {C_metric.shape[1]} columns but the meter map and "
+            f"bpm_threshold={bpm_threshold} give {beat_of_column.shape[0]}"
+        )
+    unit_of_column = beat_of_column if unit == "beat" else labels["bar"][beat_of_column]
+    F, starts = pool_columns(C_metric, unit_of_column)
+    return F, beat_of_column[starts]
+
+
+def _unit_normalize(F: np.ndarray, eps: float = 1e-9) -> np.ndarray:
+    """float32 copy of F with L2-normalized columns (silent columns stay zero)."""
+    F = np.asarray(F, dtype=np.float32)
+    norms = np.linalg.norm(F, axis=0)
+    return F / np.maximum(norms, eps)[None, :]
+
+
+def self_similarity(F: np.ndarray) -> np.ndarray:
+    """Dense cosine self-similarity matrix (float32 (K, K)) of feature columns.
+
+    For plotting short sequences; segmentation uses ssm_band, which never holds
+    the full matrix.
+    """
+    X = _unit_normalize(F)
+    return X.T @ X
+
+
+def ssm_band(F: np.ndarray, *, width: int, block: int = SSM_BLOCK_DEFAULT) -> np.ndarray:
+    """Cosine self-similarity within width of the diagonal, in lag coordinates.
+
+    Returns float32 (K, 2*width + 1) with band[i, width + r] = S[i, i + r]
+    (zero where i + r is outside the sequence). Rows are computed block-wise, so
+    memory is O(K * width) plus one (block, block + 2*width) product.
+    """
+    if width < 0:
+        raise ValueError(f"width must be >= 0, got {width}")
+    if block < 1:
+        raise ValueError(f"block must be >= 1, got {block}")
+    X = _unit_normalize(F)
+    K = X.shape[1]
+    band = np.zeros((K, 2 * width + 1), dtype=np.float32)
+    lags = np.arange(-width, width + 1)
+    for a in range(0, K, block):
+        b = min(a + block, K)
+        lo, hi = max(0, a - width), min(K, b + width)
+        G = X[:, a:b].T @ X[:, lo:hi]
+        cols = np.arange(a, b)[:, None] + lags[None, :]
+        valid = (cols >= 0) & (cols < K)
+        rows = np.broadcast_to(np.arange(b - a)[:, None], cols.shape)
+        band[a:b][valid] = G[rows[valid], cols[valid] - lo]
+    return band
+
+
+def checkerboard_kernel(L: int, *, variance: float = KERNEL_VARIANCE_DEFAULT) -> np.ndarray:
+    """Gaussian-tapered checkerboard kernel (2L, 2L), normalized to unit L1 norm.
+
+    Entry [L + d1, L + d2] (d1, d2 in -L..L-1) weights S[i + d1, i + d2] in the
+    novelty at i: +1 within the L units before i or within the L units from i on,
+    -1 across, so a peak at i is a boundary at the start of unit i.
+    """
+    if L < 1:
+        raise ValueError(f"L must be >= 1, got {L}")
+    if variance <= 0:
+        raise ValueError(f"variance must be positive, got {variance}")
+    axis = np.arange(-L, L) + 0.5
+    taper = np.sqrt(0.5) / (L * variance)
+    gauss = np.exp(-((taper * axis) ** 2))
+    kernel = np.outer(np.sign(axis), np.sign(axis)) * np.outer(gauss, gauss)
+    return kernel / np.sum(np.abs(kernel))
+
+
+def checkerboard_novelty(
+    F: np.ndarray,
+    *,
+    L: int = KERNEL_SIZE_DEFAULT,
+    variance: float = KERNEL_VARIANCE_DEFAULT,
+    exclude_edges: bool = True,
+    block: int = SSM_BLOCK_DEFAULT,
+) -> np.ndarray:
+    """Novelty of feature columns F from a checkerboard kernel slid along the SSM diagonal.
+
+    Equals sliding checkerboard_kernel(L) over the zero-padded dense SSM, but only
+    the band |i - j| < 2L is built (ssm_band) and each lag diagonal is correlated
+    with its kernel diagonal by one FFT convolution. exclude_edges zeroes the
+    values whose kernel reaches past either end, where zero padding alone
+    produces peaks.
+    """
+    K = F.shape[1]
+    kernel = checkerboard_kernel(L, variance=variance)
+    W = 2 * L - 1
+    band = ssm_band(F, width=W, block=block)
+    # kdiag[m, W + r] = kernel[m, m + r]: the kernel entries on lag r.
+    kdiag = np.zeros((2 * L, 2 * W + 1))
+    m = np.arange(2 * L)
+    for r in range(-W, W + 1):
+        ok = (m + r >= 0) & (m + r < 2 * L)
+        kdiag[m[ok], W + r] = kernel[m[ok], m[ok] + r]
+    # novelty[i] = sum_m,r kdiag[m, r] * band[i + m - L, r]: a correlation, i.e. a
+    # full convolution with the flipped kernel read from index L - 1.
+    full = fftconvolve(band, kdiag[::-1].astype(np.float32), mode="full", axes=0)
+    novelty = np.asarray(full[L - 1 : L - 1 + K].sum(axis=1), dtype=np.float64)
+    if exclude_edges:
+        novelty[: min(L, K)] = 0.0
+        novelty[max(K - L + 1, 0) :] = 0.0
+    return novelty
+
+
+def novelty_boundaries(
+    novelty: np.ndarray,
+    *,
+    min_distance: int = KERNEL_SIZE_DEFAULT,
+    threshold: float = 0.0,
+) -> np.ndarray:
+    """Indices of novelty peaks at least min_distance apart and above threshold.
+
+    threshold is relative to the largest novelty value.
+    """
+    novelty = np.asarray(novelty, dtype=np.float64)
+    peak = float(np.max(novelty)) if novelty.size else 0.0
+    if peak <= 0:
+        return np.zeros(0, dtype=np.int64)
+    peaks, _ = find_peaks(
+        novelty, distance=max(1, int(min_distance)), height=max(threshold * peak, 1e-12)
+    )
+    return peaks.astype(np.int64)
@@ -4,10 +4,15 @@ from .methods import (
     compute_cyclic_tempogram,
     compute_tempogram_autocorr,
     compute_tempogram_fourier,
+    compute_tempogram_fourier_parallel,
 )
+from .profile import compute_tempo_profile_fourier, compute_tempogram_fourier_adaptive
 
 __all__ = [
     "compute_cyclic_tempogram",
+    "compute_tempo_profile_fourier",
     "compute_tempogram_autocorr",
     "compute_tempogram_fourier",
+    "compute_tempogram_fourier_adaptive",
+    "compute_tempogram_fourier_parallel",
 ]
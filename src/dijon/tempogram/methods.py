@@ -1,56 +1,87 @@
 """Tempogram computation (FMP Section 6.2)."""
 
 import numpy as np
-from numba import jit
+from numba import jit, prange
 from scipy.interpolate import interp1d
 
 
-def _compute_autocorrelation_local(x, Fs, N, H, norm_sum=True):
+# Frames per batched FFT block; bounds peak memory at H=1 on long tracks.
+_AUTOCORR_BLOCK_FRAMES = 2048
+
+
+def _frame_novelty(x, N, H):
+    """Return zero-padded, centered windows of x as a strided (M, N) view."""
+    L_left = round(N / 2)
+    L_right = L_left
+    x_pad = np.concatenate(
+        (np.zeros(L_left, dtype=x.dtype), x, np.zeros(L_right, dtype=x.dtype))
+    )
+    return np.lib.stride_tricks.sliding_window_view(x_pad, N)[::H]
+
+
+def _compute_autocorrelation_local(x, Fs, N, H, norm_sum=True, lag_min=0, lag_max=None):
     """Compute local autocorrelation [FMP, Section 6.2.3].
 
     Notebook: C6/C6S2_TempogramAutocorrelation.ipynb
+
+    All frames are processed as batched FFTs over strided windows
+    (Wiener-Khinchin), in blocks of _AUTOCORR_BLOCK_FRAMES frames. Only lags
+    lag_min..lag_max (clipped to N - 1) are kept, so callers that need a tempo
+    range never materialize the full (N, M) correlation matrix.
     """
-    L_left = round(N / 2)
-    L_right = L_left
-    L_pad = L_left + len(x) + L_right
-    x_pad = np.empty(L_pad, dtype=x.dtype)
-    x_pad[:L_left] = 0
-    x_pad[L_left : L_left + len(x)] = x
-    x_pad[L_left + len(x) :] = 0
-    M = int(np.floor(L_pad - N) / H) + 1
-    A = np.empty((N, M))
+    lag_max = N - 1 if lag_max is None else min(int(lag_max), N - 1)
+    lag_min = int(lag_min)
+    frames = _frame_novelty(np.asarray(x, dtype=np.float64), N, H)
+    M = frames.shape[0]
+    n_fft = 1 << int(np.ceil(np.log2(2 * N - 1)))
+    A = np.empty((max(lag_max - lag_min + 1, 0), M))
+    for start in range(0, M, _AUTOCORR_BLOCK_FRAMES):
+        stop = min(start + _AUTOCORR_BLOCK_FRAMES, M)
+        spec = np.fft.rfft(frames[start:stop], n=n_fft, axis=1)
+        r_xx = np.fft.irfft(spec.real**2 + spec.imag**2, n=n_fft, axis=1)
+        A[:, start:stop] = r_xx[:, lag_min : lag_max + 1].T
     if norm_sum is True:
-        lag_summand_num = np.arange(N, 0, -1)
-    for n in range(M):
-        t_0 = n * H
-        t_1 = t_0 + N
-        x_local = x_pad[t_0:t_1]
-        r_xx = np.correlate(x_local, x_local, mode="full")
-        r_xx = r_xx[N - 1 :]
-        if norm_sum is True:
-            r_xx = r_xx / lag_summand_num
-        A[:, n] = r_xx
-    T_coef = np.arange(A.shape[1]) * H / Fs
-    F_coef_lag = np.arange(N) / Fs
+        lag_summand_num = np.arange(N, 0, -1)[lag_min : lag_max + 1]
+        A /= lag_summand_num[:, None]
+    T_coef = np.arange(M) * H / Fs
+    F_coef_lag = np.arange(lag_min, lag_max + 1) / Fs
     return A, T_coef, F_coef_lag
 
 
+def _linear_interp_weights(xp, x_new):
+    """Return (lo, hi, w) so that y_new = y[lo] * (1 - w) + y[hi] * w.
+
+    xp must be strictly increasing; points outside xp are linearly
+    extrapolated from the end segments (interp1d fill_value="extrapolate").
+    """
+    if len(xp) < 2:
+        raise ValueError("At least two lag bins are required; increase window length N")
+    hi = np.clip(np.searchsorted(xp, x_new), 1, len(xp) - 1)
+    lo = hi - 1
+    w = (x_new - xp[lo]) / (xp[hi] - xp[lo])
+    return lo, hi, w
+
+
 def compute_tempogram_autocorr(x, Fs, N, H, norm_sum=False, Theta=None):
-    """Compute autocorrelation-based tempogram [FMP, Section 6.2.3]."""
+    """Compute autocorrelation-based tempogram [FMP, Section 6.2.3].
+
+    Only the lags covering Theta are computed; the lag axis is then linearly
+    interpolated (with extrapolation) straight onto Theta.
+    """
     if Theta is None:
         Theta = np.arange(40, 321)
+    Theta = np.asarray(Theta, dtype=np.float64)
     tempo_min, tempo_max = Theta[0], Theta[-1]
     lag_min = int(np.ceil(Fs * 60 / tempo_max))
     lag_max = int(np.ceil(Fs * 60 / tempo_min))
-    A, T_coef, F_coef_lag = _compute_autocorrelation_local(
-        x, Fs, N, H, norm_sum=norm_sum
+    A_cut, T_coef, F_coef_lag_cut = _compute_autocorrelation_local(
+        x, Fs, N, H, norm_sum=norm_sum, lag_min=lag_min, lag_max=lag_max
     )
-    A_cut = A[lag_min : lag_max + 1, :]
-    F_coef_lag_cut = F_coef_lag[lag_min : lag_max + 1]
-    F_coef_BPM_cut = 60 / F_coef_lag_cut
-    tempogram = interp1d(
-        F_coef_BPM_cut, A_cut, kind="linear", axis=0, fill_value="extrapolate"
-    )(Theta)
+    # Lags are increasing, so BPM is decreasing; flip to an ascending axis.
+    F_coef_BPM_cut = 60 / F_coef_lag_cut[::-1]
+    lo, hi, w = _linear_interp_weights(F_coef_BPM_cut, Theta)
+    A_bpm = A_cut[::-1]
+    tempogram = A_bpm[lo] * (1 - w)[:, None] + A_bpm[hi] * w[:, None]
     return tempogram, T_coef, Theta
 
 
@@ -77,6 +108,62 @@ def compute_cyclic_tempogram(
     return tempogram_cyclic, F_coef_scale
 
 
+@jit(nopython=True, cache=True)
+def _tempogram_fourier_row(x_pad, Fs, N, H, theta, win, out):
+    """Fill out (M,) with the Fourier tempogram row of tempo theta (BPM)."""
+    M = out.shape[0]
+    omega = (theta / 60) / Fs
+    phase_step_sample = np.exp(-2 * np.pi * 1j * omega)
+    phase_step_hop = np.exp(-2 * np.pi * 1j * omega * H)
+
+    exp_slice = np.zeros(N, dtype=np.complex128)
+    exp_slice[0] = 1.0
+    for j in range(1, N):
+        exp_slice[j] = exp_slice[j - 1] * phase_step_sample
+
+    for n in range(M):
+        t_0 = n * H
+        out[n] = np.sum(win * x_pad[t_0 : t_0 + N] * exp_slice)
+        if n < M - 1:
+            exp_slice *= phase_step_hop
+
+
+@jit(nopython=True, cache=True)
+def _tempogram_fourier_frames(x_pad, Fs, N, H, Theta):
+    """Fourier tempogram frames of an already padded signal (no extra padding).
+
+    Frame n covers x_pad[n * H : n * H + N]. Phases are relative to x_pad[0], so
+    magnitudes of a chunk cut from a longer padded signal at a multiple of H
+    match the corresponding frames of the full computation.
+    """
+    win = np.hanning(N)
+    L_pad = x_pad.shape[0]
+    M = int(np.floor(L_pad - N) / H) + 1
+    K = len(Theta)
+    X = np.zeros((K, M), dtype=np.complex128)
+    for k in range(K):
+        _tempogram_fourier_row(x_pad, Fs, N, H, Theta[k], win, X[k])
+    return X
+
+
+@jit(nopython=True, parallel=True, cache=True)
+def _tempogram_fourier_frames_parallel(x_pad, Fs, N, H, Theta):
+    """Same as _tempogram_fourier_frames with tempo rows spread over numba threads."""
+    win = np.hanning(N)
+    L_pad = x_pad.shape[0]
+    M = int(np.floor(L_pad - N) / H) + 1
+    K = len(Theta)
+    X = np.zeros((K, M), dtype=np.complex128)
+    for k in prange(K):
+        _tempogram_fourier_row(x_pad, Fs, N, H, Theta[k], win, X[k])
+    return X
+
+
+def _fourier_frames_kernel(parallel=False):
+    """Return the serial or thread-parallel Fourier tempogram frame kernel."""
+    return _tempogram_fourier_frames_parallel if parallel else _tempogram_fourier_frames
+
+
 @jit(nopython=True, cache=True)
 def compute_tempogram_fourier(x, Fs, N, H, Theta):
     """Compute Fourier-based tempogram [FMP, Section 6.2.2].
@@ -95,7 +182,6 @@ def compute_tempogram_fourier(x, Fs, N, H, Theta):
         T_coef (np.ndarray): Time axis (seconds)
         F_coef_BPM (np.ndarray): Tempo axis (BPM)
     """
-    win = np.hanning(N)
     N_left = N // 2
     L = x.shape[0]
     L_left = N_left
@@ -105,25 +191,31 @@ def compute_tempogram_fourier(x, Fs, N, H, Theta):
     x_pad[:L_left] = 0
     x_pad[L_left : L_left + L] = x
     x_pad[L_left + L :] = 0
-    M = int(np.floor(L_pad - N) / H) + 1
-    K = len(Theta)
-    X = np.zeros((K, M), dtype=np.complex128)
+    X = _tempogram_fourier_frames(x_pad, Fs, N, H, Theta)
+    M = X.shape[1]
+    T_coef = np.arange(M) * H / Fs
+    F_coef_BPM = Theta
+    return X, T_coef, F_coef_BPM
 
-    for k in range(K):
-        omega = (Theta[k] / 60) / Fs
-        phase_step_sample = np.exp(-2 * np.pi * 1j * omega)
-        phase_step_hop = np.exp(-2 * np.pi * 1j * omega * H)
-
-        exp_slice = np.zeros(N, dtype=np.complex128)
-        exp_slice[0] = 1.0
-        for j in range(1, N):
-            exp_slice[j] = exp_slice[j - 1] * phase_step_sample
-
-        for n in range(M):
-            t_0 = n * H
-            X[k, n] = np.sum(win * x_pad[t_0 : t_0 + N] * exp_slice)
-            if n < M - 1:
-                exp_slice *= phase_step_hop
+
+@jit(nopython=True, parallel=True, cache=True)
+def compute_tempogram_fourier_parallel(x, Fs, N, H, Theta):
+    """Multi-threaded compute_tempogram_fourier (prange over tempi).
+
+    Results are identical to compute_tempogram_fourier. The thread count is
+    numba's (numba.set_num_threads / NUMBA_NUM_THREADS).
+
+    Returns:
+        X (np.ndarray): Tempogram
+        T_coef (np.ndarray): Time axis (seconds)
+        F_coef_BPM (np.ndarray): Tempo axis (BPM)
+    """
+    N_left = N // 2
+    L = x.shape[0]
+    x_pad = np.zeros(L + 2 * N_left, dtype=x.dtype)
+    x_pad[N_left : N_left + L] = x
+    X = _tempogram_fourier_frames_parallel(x_pad, Fs, N, H, Theta)
+    M = X.shape[1]
     T_coef = np.arange(M) * H / Fs
     F_coef_BPM = Theta
     return X, T_coef, F_coef_BPM
@@ -0,0 +1,301 @@
+"""Tempo-profile summaries of tempograms (global and windowed mean magnitude).
+
+Beat tracking only needs the mean tempogram magnitude over time, so a profile
+artifact stores that (plus per-window means) instead of the full K x M matrix.
+Profiles can be reduced from a stored (memory-mapped) tempogram in chunks, or
+computed straight from novelty for the Fourier tempogram without ever holding
+more than one chunk of frames.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+
+from .methods import _fourier_frames_kernel
+from .storage import DEFAULT_CHUNK_FRAMES, decimate_frames
+
+PROFILE_SUFFIX = "_profile.npz"
+PROFILE_WINDOW_SEC_DEFAULT = 10.0
+
+
+def profile_path_for(tempogram_path: Path) -> Path:
+    """Return the profile path stored alongside a tempogram .npy."""
+    tempogram_path = Path(tempogram_path)
+    return tempogram_path.with_name(tempogram_path.stem + PROFILE_SUFFIX)
+
+
+def is_profile_path(path: Path) -> bool:
+    """True if path names a tempo-profile artifact."""
+    return Path(path).name.endswith(PROFILE_SUFFIX)
+
+
+def _window_frames(frame_rate_hz: float, window_sec: float) -> int:
+    """Frames per profile window (at least 1)."""
+    if window_sec <= 0:
+        raise ValueError(f"window_sec must be positive, got {window_sec}")
+    return max(1, int(round(window_sec * frame_rate_hz)))
+
+
+class _ProfileAccumulator:
+    """Accumulate |X| sums and per-window means over consecutive frame chunks.
+
+    Chunks must be fed in order and, except for the last, hold a multiple of
+    `window` frames so windows never straddle a chunk boundary.
+    """
+
+    def __init__(self, K: int, window: int) -> None:
+        self.window = window
+        self.total = np.zeros(K, dtype=np.float64)
+        self.count = 0
+        self.windows: list[np.ndarray] = []
+
+    def add(self, mag: np.ndarray) -> None:
+        mag = np.asarray(mag, dtype=np.float64)
+        self.total += mag.sum(axis=1)
+        self.count += mag.shape[1]
+        self.windows.append(decimate_frames(mag, self.window))
+
+    def result(self) -> tuple[np.ndarray, np.ndarray]:
+        global_profile = self.total / self.count if self.count else self.total
+        windowed = (
+            np.concatenate(self.windows, axis=1)
+            if self.windows
+            else np.zeros((len(self.total), 0))
+        )
+        return global_profile, windowed
+
+
+def _chunk_size(window: int, chunk_frames: int) -> int:
+    """Largest multiple of window not above chunk_frames (at least one window)."""
+    return window * max(1, chunk_frames // window)
+
+
+def tempo_profiles_from_tempogram(
+    arr: np.ndarray,
+    *,
+    frame_rate_hz: float,
+    window_sec: float = PROFILE_WINDOW_SEC_DEFAULT,
+    chunk_frames: int = DEFAULT_CHUNK_FRAMES,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Reduce a (K, M) tempogram to global and windowed mean |X| profiles.
+
+    Works chunk-wise, so arr may be a read-only memmap.
+
+    Returns:
+        Tuple of (global_profile (K,), windowed_profile (K, W), window_times_sec (W,)),
+        where window_times_sec are window start times.
+    """
+    if arr.ndim != 2:
+        raise ValueError(f"Expected 2D tempogram, got shape {arr.shape}")
+    K, M = arr.shape
+    window = _window_frames(frame_rate_hz, window_sec)
+    acc = _ProfileAccumulator(K, window)
+    step = _chunk_size(window, chunk_frames)
+    for start in range(0, M, step):
+        acc.add(np.abs(np.asarray(arr[:, start : start + step], dtype=np.float64)))
+    global_profile, windowed = acc.result()
+    window_times = np.arange(windowed.shape[1]) * window / frame_rate_hz
+    return global_profile, windowed, window_times
+
+
+def compute_tempo_profile_fourier(
+    x: np.ndarray,
+    Fs: float,
+    N: int,
+    H: int,
+    Theta: np.ndarray,
+    *,
+    window_sec: float = PROFILE_WINDOW_SEC_DEFAULT,
+    chunk_frames: int = DEFAULT_CHUNK_FRAMES,
+    parallel: bool = False,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Fourier tempo profiles straight from novelty, one chunk of frames at a time.
+
+    Equivalent to tempo_profiles_from_tempogram(|compute_tempogram_fourier(...)|)
+    but never materializes the full K x M tempogram. parallel spreads tempo rows
+    over numba threads.
+
+    Returns:
+        Tuple of (global_profile (K,), windowed_profile (K, W), window_times_sec (W,)).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    Theta = np.asarray(Theta, dtype=np.float64)
+    N_left = N // 2
+    x_pad = np.concatenate((np.zeros(N_left), x, np.zeros(N_left)))
+    M = int(np.floor(len(x_pad) - N) / H) + 1
+    frame_rate_hz = Fs / H
+    window = _window_frames(frame_rate_hz, window_sec)
+    acc = _ProfileAccumulator(len(Theta), window)
+    step = _chunk_size(window, chunk_frames)
+    kernel = _fourier_frames_kernel(parallel)
+    for m0 in range(0, M, step):
+        m1 = min(m0 + step, M)
+        segment = x_pad[m0 * H : (m1 - 1) * H + N]
+        acc.add(np.abs(kernel(segment, Fs, N, H, Theta)))
+    global_profile, windowed = acc.result()
+    window_times = np.arange(windowed.shape[1]) * window / frame_rate_hz
+    return global_profile, windowed, window_times
+
+
+def save_tempo_profile(
+    path: Path,
+    *,
+    axis: np.ndarray,
+    global_profile: np.ndarray,
+    windowed_profile: np.ndarray,
+    window_times_sec: np.ndarray,
+    ttype: str,
+    fs: float,
+    N: int,
+    H: int,
+    window_sec: float,
+    source_novelty: str = "",
+) -> None:
+    """Write a tempo profile as an uncompressed .npz (no pickled objects).
+
+    axis is the tempo set in BPM for fourier/autocorr, the octave scale for cyclic.
+    """
+    np.savez(
+        path,
+        axis=np.asarray(axis, dtype=np.float64),
+        global_profile=np.asarray(global_profile, dtype=np.float64),
+        windowed_profile=np.asarray(windowed_profile, dtype=np.float64),
+        window_times_sec=np.asarray(window_times_sec, dtype=np.float64),
+        type=np.asarray(ttype),
+        fs=np.asarray(float(fs)),
+        N=np.asarray(int(N)),
+        H=np.asarray(int(H)),
+        window_sec=np.asarray(float(window_sec)),
+        source_novelty=np.asarray(source_novelty),
+    )
+
+
+def load_tempo_profile(path: Path) -> dict:
+    """Load a tempo profile saved by save_tempo_profile into a plain dict."""
+    with np.load(path, allow_pickle=False) as data:
+        out = {key: data[key] for key in data.files}
+    for key in ("type", "source_novelty"):
+        out[key] = str(out[key])
+    for key in ("fs", "window_sec"):
+        out[key] = float(out[key])
+    for key in ("N", "H"):
+        out[key] = int(out[key])
+    return out
+
+
+def coarse_tempo_grid(
+    theta_min: float, theta_max: float, bins_per_octave: int
+) -> np.ndarray:
+    """Log-spaced tempi from theta_min to theta_max (both included)."""
+    if bins_per_octave < 1:
+        raise ValueError(f"bins_per_octave must be >= 1, got {bins_per_octave}")
+    n_bins = int(np.ceil(np.log2(theta_max / theta_min) * bins_per_octave)) + 1
+    return np.geomspace(theta_min, theta_max, max(n_bins, 2))
+
+
+def _refine_tempi(
+    Theta: np.ndarray, coarse: np.ndarray, coarse_profile: np.ndarray, top_k: int
+) -> np.ndarray:
+    """Tempi of Theta lying between the coarse neighbours of the top_k coarse peaks."""
+    interior = (coarse_profile[1:-1] >= coarse_profile[:-2]) & (
+        coarse_profile[1:-1] >= coarse_profile[2:]
+    )
+    peaks = np.flatnonzero(interior) + 1
+    if coarse_profile[0] > coarse_profile[1]:
+        peaks = np.append(peaks, 0)
+    if coarse_profile[-1] > coarse_profile[-2]:
+        peaks = np.append(peaks, len(coarse) - 1)
+    if len(peaks) == 0:
+        peaks = np.array([int(np.argmax(coarse_profile))])
+    peaks = peaks[np.argsort(coarse_profile[peaks])[::-1][:top_k]]
+    mask = np.zeros(len(Theta), dtype=bool)
+    for p in peaks:
+        lo = coarse[max(p - 1, 0)]
+        hi = coarse[min(p + 1, len(coarse) - 1)]
+        mask |= (Theta >= lo) & (Theta <= hi)
+    return Theta[mask]
+
+
+def _interp_rows(x_new: np.ndarray, xp: np.ndarray, fp: np.ndarray) -> np.ndarray:
+    """Linearly interpolate each column of fp (len(xp), W) onto x_new.
+
+    xp need not be sorted; for duplicate xp values the first occurrence is used.
+    """
+    order = np.argsort(xp, kind="stable")
+    xp, fp = xp[order], fp[order]
+    xp, first = np.unique(xp, return_index=True)
+    fp = fp[first]
+    if fp.ndim == 1:
+        return np.interp(x_new, xp, fp)
+    return np.stack(
+        [np.interp(x_new, xp, fp[:, w]) for w in range(fp.shape[1])], axis=1
+    )
+
+
+def compute_tempogram_fourier_adaptive(
+    x: np.ndarray,
+    Fs: float,
+    N: int,
+    H: int,
+    Theta: np.ndarray,
+    *,
+    bins_per_octave: int = 12,
+    top_k: int = 3,
+    coarse_hop: int | None = None,
+    window_sec: float = PROFILE_WINDOW_SEC_DEFAULT,
+    chunk_frames: int = DEFAULT_CHUNK_FRAMES,
+    parallel: bool = False,
+) -> tuple[np.ndarray, np.ndarray, tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Coarse-to-fine Fourier tempogram.
+
+    A log-spaced coarse grid over [Theta[0], Theta[-1]] is reduced to tempo
+    profiles chunk-wise (no coarse K x M matrix) at hop coarse_hop (default
+    max(H, N // 8); only time averages are needed there). The full tempogram is then
+    computed only on the tempi of Theta between the coarse neighbours of the
+    top_k coarse peaks. Profiles on the dense Theta grid are exact at every
+    evaluated tempo and linearly interpolated in between. parallel spreads tempo
+    rows of both passes over numba threads.
+
+    Returns:
+        Tuple of (magnitude on refined tempi (K_fine, M), refined tempi (K_fine,),
+        (global_profile (K,), windowed_profile (K, W), window_times_sec (W,)))
+        with profiles on Theta.
+    """
+    Theta = np.asarray(Theta, dtype=np.float64)
+    coarse = coarse_tempo_grid(Theta[0], Theta[-1], bins_per_octave)
+    coarse_hop = coarse_hop if coarse_hop is not None else max(H, N // 8)
+    coarse_global, coarse_windowed, _coarse_times = compute_tempo_profile_fourier(
+        x,
+        Fs,
+        N,
+        coarse_hop,
+        coarse,
+        window_sec=window_sec,
+        chunk_frames=chunk_frames,
+        parallel=parallel,
+    )
+    Theta_fine = _refine_tempi(Theta, coarse, coarse_global, top_k)
+
+    N_left = N // 2
+    x = np.asarray(x, dtype=np.float64)
+    x_pad = np.concatenate((np.zeros(N_left), x, np.zeros(N_left)))
+    mag_fine = np.abs(_fourier_frames_kernel(parallel)(x_pad, Fs, N, H, Theta_fine))
+    fine_global, fine_windowed, window_times = tempo_profiles_from_tempogram(
+        mag_fine, frame_rate_hz=Fs / H, window_sec=window_sec, chunk_frames=chunk_frames
+    )
+
+    # Window counts can differ by one between hops; keep the common windows.
+    W = min(coarse_windowed.shape[1], fine_windowed.shape[1])
+    coarse_windowed, fine_windowed = coarse_windowed[:, :W], fine_windowed[:, :W]
+    window_times = window_times[:W]
+    # Fine values first so they win where a coarse tempo coincides with Theta.
+    evaluated = np.concatenate((Theta_fine, coarse))
+    global_dense = _interp_rows(
+        Theta, evaluated, np.concatenate((fine_global, coarse_global))
+    )
+    windowed_dense = _interp_rows(
+        Theta, evaluated, np.concatenate((fine_windowed, coarse_windowed), axis=0)
+    )
+    return mag_fine, Theta_fine, (global_dense, windowed_dense, window_times)
@@ -0,0 +1,151 @@
+"""Compact on-disk tempogram storage with a JSON metadata sidecar.
+
+A stored tempogram is a plain ``.npy`` (so it can be opened with
+``np.load(..., mmap_mode="r")``) plus ``<stem>.json`` next to it recording the
+tempo axis, sample rate and hop. Arrays may be down-cast to float32/float16 and
+block-averaged in time to cut disk and RAM use.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+TEMPOGRAM_FORMAT = "dijon-tempogram"
+TEMPOGRAM_FORMAT_VERSION = 1
+STORAGE_DTYPES = frozenset({"float64", "float32", "float16"})
+DEFAULT_CHUNK_FRAMES = 8192
+
+
+def storage_tag(dtype: str = "float64", decimate: int = 1) -> str:
+    """Return filename suffix for non-default storage (empty for float64, decimate=1)."""
+    parts: list[str] = []
+    if dtype != "float64":
+        parts.append(dtype)
+    if decimate > 1:
+        parts.append(f"d{decimate}")
+    return "-".join(parts)
+
+
+def metadata_path(npy_path: Path) -> Path:
+    """Return the JSON sidecar path for a stored tempogram."""
+    return Path(npy_path).with_suffix(".json")
+
+
+def decimate_frames(arr: np.ndarray, decimate: int) -> np.ndarray:
+    """Block-average arr along time (axis 1) in groups of `decimate` frames.
+
+    A trailing partial block is averaged over the frames it has.
+    """
+    if decimate < 1:
+        raise ValueError(f"decimate must be >= 1, got {decimate}")
+    if decimate == 1:
+        return arr
+    K, M = arr.shape
+    n_full = M // decimate
+    out = np.empty((K, -(-M // decimate)), dtype=np.float64)
+    if n_full:
+        out[:, :n_full] = (
+            arr[:, : n_full * decimate].reshape(K, n_full, decimate).mean(axis=2)
+        )
+    if M % decimate:
+        out[:, n_full] = arr[:, n_full * decimate :].mean(axis=1)
+    return out
+
+
+def save_tempogram(
+    path: Path,
+    arr: np.ndarray,
+    *,
+    theta: np.ndarray,
+    fs: float,
+    N: int,
+    H: int,
+    ttype: str,
+    dtype: str = "float64",
+    decimate: int = 1,
+    extra: dict | None = None,
+) -> tuple[np.ndarray, dict]:
+    """Write arr as .npy in the requested dtype plus a metadata sidecar.
+
+    Args:
+        path: Output .npy path.
+        arr: Tempogram of shape (K, M).
+        theta: Tempo set (BPM) the tempogram was computed on. Cyclic tempograms
+            pass their octave-scale axis via extra["scale"].
+        fs: Sample rate of the input novelty (Hz).
+        N: Window length (novelty samples).
+        H: Hop size (novelty samples) used for computation.
+        ttype: Tempogram type (fourier, autocorr, cyclic, adaptive).
+        dtype: Storage dtype: float64, float32 or float16.
+        decimate: Block-average factor along time; effective hop is H * decimate.
+        extra: Additional JSON-serializable metadata (e.g. source novelty name).
+
+    Returns:
+        Tuple of (stored array, metadata dict).
+    """
+    if dtype not in STORAGE_DTYPES:
+        raise ValueError(
+            f"Unknown storage dtype: {dtype}. Use one of: {sorted(STORAGE_DTYPES)}"
+        )
+    stored = decimate_frames(arr, decimate).astype(dtype, copy=False)
+    meta = {
+        "format": TEMPOGRAM_FORMAT,
+        "version": TEMPOGRAM_FORMAT_VERSION,
+        "type": ttype,
+        "fs": float(fs),
+        "N": int(N),
+        "H": int(H),
+        "decimate": int(decimate),
+        "frame_rate_hz": float(fs) / (int(H) * int(decimate)),
+        "theta": [float(t) for t in np.asarray(theta)],
+        "dtype": dtype,
+        "shape": list(stored.shape),
+    }
+    if extra:
+        meta.update(extra)
+    path = Path(path)
+    np.save(path, stored, allow_pickle=False)
+    with open(metadata_path(path), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return stored, meta
+
+
+def load_tempogram_meta(path: Path) -> dict | None:
+    """Load the metadata sidecar for a stored tempogram; None if absent or unreadable."""
+    meta_path = metadata_path(path)
+    if not meta_path.exists():
+        return None
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(meta, dict) or meta.get("format") != TEMPOGRAM_FORMAT:
+        return None
+    return meta
+
+
+def open_tempogram(path: Path) -> np.ndarray:
+    """Open a stored tempogram read-only and memory-mapped (no full read)."""
+    return np.load(path, mmap_mode="r", allow_pickle=False)
+
+
+def mean_abs_over_time(
+    arr: np.ndarray, chunk_frames: int = DEFAULT_CHUNK_FRAMES
+) -> np.ndarray:
+    """Return mean(|arr|, axis=1) accumulated in float64 over time chunks.
+
+    Works on memory-mapped arrays without materializing them; only
+    `chunk_frames` columns are resident at a time.
+    """
+    if arr.ndim != 2:
+        raise ValueError(f"Expected 2D tempogram, got shape {arr.shape}")
+    K, M = arr.shape
+    acc = np.zeros(K, dtype=np.float64)
+    for start in range(0, M, chunk_frames):
+        block = np.asarray(arr[:, start : start + chunk_frames], dtype=np.float64)
+        acc += np.abs(block).sum(axis=1)
+    return acc / M if M else acc
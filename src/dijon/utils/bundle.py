@@ -0,0 +1,161 @@
+"""Per-track feature bundles: one uncompressed zip of named arrays plus a JSON index.
+
+A bundle is a valid ``.npz`` (members are ``<name>.npy``, stored without
+compression) with an extra ``bundle.json`` member recording the bundle version,
+track-level metadata and, per array, its dtype, shape and provenance (source
+file, size, mtime, stage, parameters). Because members are stored, each array's
+bytes sit contiguously in the file: FeatureBundle opens members as read-only
+memory maps at their offset, so opening a bundle reads only the zip directory
+and the index, and indexing a member reads only the pages touched.
+
+Member names are ``<stage>/<params>`` (``<stage>`` when the source has no
+parameters); arrays from an .npz source add ``/<key>``.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+from .storage import atomic_path
+
+BUNDLE_FORMAT = "dijon-bundle"
+BUNDLE_VERSION = 1
+INDEX_MEMBER = "bundle.json"
+# Fixed part of a zip local file header; name and extra field lengths are its last two fields.
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+
+
+def write_bundle(
+    path: Path,
+    arrays: dict[str, np.ndarray],
+    *,
+    members: dict[str, dict] | None = None,
+    meta: dict | None = None,
+) -> None:
+    """Write arrays as a bundle atomically (temp file + rename), creating the directory.
+
+    members maps array names to JSON-serializable provenance; meta is stored as
+    bundle-level metadata. Arrays are written one at a time, never all in memory
+    as one buffer, so memory-mapped inputs stream straight to disk.
+    """
+    members = members or {}
+    index = {
+        "format": BUNDLE_FORMAT,
+        "version": BUNDLE_VERSION,
+        "meta": meta or {},
+        "members": {},
+    }
+    with atomic_path(path) as tmp:
+        with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_STORED, allowZip64=True) as zf:
+            for name, arr in arrays.items():
+                arr = np.asanyarray(arr)
+                with zf.open(f"{name}.npy", "w", force_zip64=True) as f:
+                    np.lib.format.write_array(f, arr, allow_pickle=False)
+                index["members"][name] = {
+                    "dtype": np.lib.format.dtype_to_descr(arr.dtype),
+                    "shape": list(arr.shape),
+                    **members.get(name, {}),
+                }
+            zf.writestr(INDEX_MEMBER, json.dumps(index, indent=1, sort_keys=True))
+
+
+def _data_offset(f, info: zipfile.ZipInfo) -> int:
+    """File offset of a stored member's first byte (after its local header)."""
+    f.seek(info.header_offset)
+    fields = _LOCAL_HEADER.unpack(f.read(_LOCAL_HEADER.size))
+    name_len, extra_len = fields[-2], fields[-1]
+    return info.header_offset + _LOCAL_HEADER.size + name_len + extra_len
+
+
+class FeatureBundle:
+    """Read-only, lazily loaded view of a bundle written by write_bundle.
+
+    ``bundle["chromagram/metric_cqt_256-180.0-..."]`` returns a read-only memory
+    map; members() and select() list names without touching array data. Raises
+    ValueError if path is not a bundle.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._arrays: dict[str, tuple[int, tuple[int, ...], np.dtype, bool]] = {}
+        with open(self.path, "rb") as f:
+            try:
+                zf = zipfile.ZipFile(f)
+            except zipfile.BadZipFile as e:
+                raise ValueError(f"{self.path} is not a bundle: {e}") from None
+            with zf:
+                try:
+                    index = json.loads(zf.read(INDEX_MEMBER))
+                except KeyError:
+                    raise ValueError(f"{self.path} is not a bundle: no {INDEX_MEMBER}") from None
+                if index.get("format") != BUNDLE_FORMAT or index.get("version") != BUNDLE_VERSION:
+                    raise ValueError(f"Unsupported bundle format in {self.path}")
+                for info in zf.infolist():
+                    name = info.filename[:-4]
+                    if not info.filename.endswith(".npy") or name not in index["members"]:
+                        continue
+                    if info.compress_type != zipfile.ZIP_STORED:
+                        raise ValueError(f"Member {name} of {self.path} is compressed")
+                    f.seek(_data_offset(f, info))
+                    version = np.lib.format.read_magic(f)
+                    read_header = (
+                        np.lib.format.read_array_header_1_0
+                        if version == (1, 0)
+                        else np.lib.format.read_array_header_2_0
+                    )
+                    shape, fortran_order, dtype = read_header(f)
+                    self._arrays[name] = (f.tell(), shape, dtype, fortran_order)
+        self.meta: dict = index["meta"]
+        self._members: dict[str, dict] = index["members"]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._arrays
+
+    def __len__(self) -> int:
+        return len(self._arrays)
+
+    def __iter__(self):
+        return iter(self._arrays)
+
+    def members(self) -> list[str]:
+        """Array names, sorted."""
+        return sorted(self._arrays)
+
+    def info(self, name: str) -> dict:
+        """dtype, shape and provenance recorded for a member."""
+        if name not in self._members:
+            raise KeyError(name)
+        return self._members[name]
+
+    def select(self, stage: str, params_prefix: str = "") -> list[str]:
+        """Names of a stage's members whose parameters start with params_prefix."""
+        return sorted(
+            name for name in self._arrays
+            if (info := self._members[name]).get("stage", name.split("/", 1)[0]) == stage
+            and str(info.get("params", "")).startswith(params_prefix)
+        )
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """Member as a read-only memory map (a plain empty array for size-0 members)."""
+        if name not in self._arrays:
+            raise KeyError(f"{name} not in bundle {self.path.name}")
+        offset, shape, dtype, fortran_order = self._arrays[name]
+        if int(np.prod(shape)) == 0:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(
+            self.path,
+            dtype=dtype,
+            mode="r",
+            offset=offset,
+            shape=shape,
+            order="F" if fortran_order else "C",
+        )
+
+    def load(self, name: str) -> np.ndarray:
+        """Member read fully into memory."""
+        return np.array(self[name])
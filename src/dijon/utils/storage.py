@@ -0,0 +1,47 @@
+"""Atomic file writes and source-file stamps shared by the on-disk stores.
+
+Derived stores (frame-chroma cache, alignments, harmony, bar index, bundles)
+write through a temporary file next to the target and rename it into place, so
+a reader never sees a partial file and concurrent writers leave one complete
+entry. Entries computed from other files record each source's stamp; a stamp
+that no longer matches the file on disk marks the entry stale.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+
+def source_stamp(path: Path) -> tuple[str, int, int]:
+    """(filename, size, mtime_ns) of a source file; a change invalidates what was derived from it."""
+    st = Path(path).stat()
+    return Path(path).name, st.st_size, st.st_mtime_ns
+
+
+@contextmanager
+def atomic_path(path: Path) -> Iterator[Path]:
+    """Yield a temp path next to path, renamed over path if the block succeeds.
+
+    Creates the directory. The temp file (.<stem>.<pid>.tmp<suffix>) is removed if
+    the block raises.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.stem}.{os.getpid()}.tmp{path.suffix}")
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def save_npz_atomic(path: Path, /, **arrays: np.ndarray) -> None:
+    """np.savez arrays (uncompressed) to path atomically, creating the directory."""
+    with atomic_path(path) as tmp:
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
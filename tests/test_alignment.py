@@ -0,0 +1,138 @@
+"""Tests for banded chroma DTW, transposition search and the alignment pipeline."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+import yaml
+
+from dijon.alignment import align_chromagrams, band_limits, transposition_costs
+from dijon.alignment.storage import load_alignment
+from dijon.pipeline.alignment import run_alignment
+from dijon.utils.storage import source_stamp
+
+PARAMS = "metric_cqt_256-180.0-mean-preserve-rms-1.0-2"
+
+
+def _reference_cost(X: np.ndarray, Y: np.ndarray, shift: int, band: float) -> float:
+    """Plain DTW over the same band, on Y rolled up by shift semitones."""
+    def unit(C: np.ndarray) -> np.ndarray:
+        return C / np.maximum(np.linalg.norm(C, axis=0), 1e-9)
+
+    cost = 1.0 - unit(X).T @ unit(np.roll(Y, shift, axis=0))
+    N, M = cost.shape
+    lo, hi = band_limits(N, M, band=band)
+    D = np.full((N + 1, M + 1), np.inf)
+    D[0, 0] = 0.0
+    for i in range(N):
+        for j in range(lo[i], hi[i] + 1):
+            D[i + 1, j + 1] = cost[i, j] + min(D[i, j], D[i, j + 1], D[i + 1, j])
+    return D[N, M] / (N + M)
+
+
+def _warped_transposed(rng: np.random.Generator, n: int, shift: int) -> tuple[np.ndarray, np.ndarray]:
+    """Chroma X and a time-warped copy transposed down by shift semitones."""
+    X = rng.random((12, n)) ** 4
+    idx = np.sort(rng.choice(n, 3 * n // 4, replace=False))
+    Y = np.roll(X[:, np.repeat(idx, 2)][:, : 5 * n // 4], -shift, axis=0)
+    return X, Y
+
+
+class TestMethods:
+    @pytest.mark.parametrize("shape", [(30, 45), (45, 30), (1, 6), (20, 20)])
+    def test_shift_costs_match_reference_dtw(self, shape: tuple[int, int]) -> None:
+        rng = np.random.default_rng(0)
+        X, Y = rng.random((12, shape[0])), rng.random((12, shape[1]))
+        expected = [_reference_cost(X, Y, s, 0.2) for s in range(12)]
+        np.testing.assert_allclose(transposition_costs(X, Y, band=0.2), expected, atol=1e-12)
+
+    def test_path_is_monotone_and_matches_cost(self) -> None:
+        rng = np.random.default_rng(1)
+        X, Y = rng.random((12, 40)), rng.random((12, 55))
+        result = align_chromagrams(X, Y, band=0.2)
+        path = result["path"]
+        assert path[0].tolist() == [0, 0]
+        assert path[-1].tolist() == [39, 54]
+        steps = np.diff(path, axis=0)
+        assert np.all(steps >= 0) and np.all(steps.sum(axis=1) >= 1) and np.all(steps <= 1)
+        assert result["cost"] == pytest.approx(_reference_cost(X, Y, result["shift"], 0.2), abs=1e-6)
+
+    def test_recovers_transposition(self) -> None:
+        X, Y = _warped_transposed(np.random.default_rng(2), 200, 5)
+        result = align_chromagrams(X, Y)
+        assert result["shift"] == 5
+        assert result["cost"] < np.delete(result["shift_costs"], 5).min()
+
+    def test_band_limits_validate(self) -> None:
+        with pytest.raises(ValueError, match="band"):
+            band_limits(10, 10, band=0.0)
+
+
+class TestRunAlignment:
+    def _setup(self, tmp_path: Path) -> tuple[Path, Path]:
+        chroma_dir = tmp_path / "chromagram"
+        chroma_dir.mkdir()
+        rng = np.random.default_rng(3)
+        X, Y = _warped_transposed(rng, 120, 3)
+        np.save(chroma_dir / f"A_chromagram_{PARAMS}.npy", X.astype(np.float32))
+        np.save(chroma_dir / f"B_chromagram_{PARAMS}.npy", Y.astype(np.float32))
+        np.save(chroma_dir / f"C_chromagram_{PARAMS}.npy", rng.random((12, 80)).astype(np.float32))
+        set_path = tmp_path / "set.yaml"
+        set_path.write_text(
+            yaml.safe_dump({
+                "items": [
+                    {"file_id": "A", "song_name": "Blackest Crow"},
+                    {"file_id": "B", "song_name": "blackest  crow"},
+                    {"file_id": "C", "song_name": "Other tune"},
+                    {"file_id": "D", "song_name": "Other tune"},
+                ]
+            })
+        )
+        return set_path, chroma_dir
+
+    def test_aligns_same_song_pairs_and_reuses_results(self, tmp_path: Path) -> None:
+        set_path, chroma_dir = self._setup(tmp_path)
+        out_dir = tmp_path / "out"
+        result = run_alignment(set_path=set_path, chromagram_dir=chroma_dir, output_dir=out_dir)
+        assert result["success"], result
+        assert (result["total"], result["succeeded"], result["skipped"]) == (2, 1, 1)
+        done = next(item for item in result["items"] if item["status"] == "success")
+        assert done["file"] == "A__B" and done["shift"] == 3 and done["cache"] == "miss"
+
+        stamps = (
+            source_stamp(chroma_dir / f"A_chromagram_{PARAMS}.npy"),
+            source_stamp(chroma_dir / f"B_chromagram_{PARAMS}.npy"),
+        )
+        saved = load_alignment(out_dir / done["output"], stamps)
+        assert saved is not None and saved["shift"] == 3
+        assert saved["path"][-1].tolist() == [119, 149]
+
+        again = run_alignment(set_path=set_path, chromagram_dir=chroma_dir, output_dir=out_dir)
+        assert next(i for i in again["items"] if i["status"] == "success")["cache"] == "hit"
+
+    def test_process_pool_matches_in_process(self, tmp_path: Path) -> None:
+        set_path, chroma_dir = self._setup(tmp_path)
+        serial = run_alignment(
+            set_path=set_path, chromagram_dir=chroma_dir, output_dir=tmp_path / "s", all_pairs=True
+        )
+        pooled = run_alignment(
+            set_path=set_path,
+            chromagram_dir=chroma_dir,
+            output_dir=tmp_path / "p",
+            all_pairs=True,
+            workers=2,
+        )
+        assert pooled["success"], pooled
+        assert pooled["succeeded"] == serial["succeeded"] == 3
+        costs = {i["file"]: i["cost"] for i in serial["items"] if i["status"] == "success"}
+        for item in pooled["items"]:
+            if item["status"] == "success":
+                assert item["cost"] == pytest.approx(costs[item["file"]])
+
+    def test_invalid_band_fails(self, tmp_path: Path) -> None:
+        set_path, chroma_dir = self._setup(tmp_path)
+        result = run_alignment(set_path=set_path, chromagram_dir=chroma_dir, band=2.0)
+        assert not result["success"]
+        assert "band" in result["message"]
@@ -7,11 +7,19 @@ from pathlib import Path
 import numpy as np
 import pytest
 
+from dijon.beats import (
+    compute_beat_sequence,
+    compute_beat_sequence_local,
+    compute_tempo_curve,
+    tempo_curve_to_beat_ref,
+)
 from dijon.pipeline.beats import (
     _resolve_tempogram_files,
+    _source_novelty_name,
     _track_name_from_tempogram_stem,
     run_beats,
 )
+from dijon.pipeline.tempogram import run_tempogram
 
 
 class TestBeatsHelpers:
@@ -141,3 +149,266 @@ class TestRunBeats:
         assert result["success"] is True
         assert result["succeeded"] == 1
         assert (out_dir / "YTB-014_beats.npy").exists()
+
+    def test_run_beats_reads_compact_tempogram_with_metadata_axis(self, tmp_path: Path) -> None:
+        """float16 tempogram with sidecar uses the recorded Theta for the tempo estimate."""
+        from dijon.tempogram.storage import save_tempogram
+
+        nov_dir = tmp_path / "novelty"
+        tempo_dir = tmp_path / "tempogram"
+        nov_dir.mkdir()
+        tempo_dir.mkdir()
+        nov = np.clip(np.random.randn(1000).astype(np.float64) * 0.1 + 0.5, 0, 1)
+        np.save(nov_dir / "TRACK01_novelty_spectrum_1024-256-100.0-10.npy", nov)
+
+        theta = np.arange(90, 151, dtype=np.float64)
+        tempo_arr = np.full((61, 101), 0.1)
+        tempo_arr[30, :] = 1.0  # peak at theta[30] = 120 BPM
+        tempo_path = tempo_dir / "TRACK01_tempogram_fourier_100-10-90-150_float16.npy"
+        save_tempogram(
+            tempo_path, tempo_arr, theta=theta, fs=100.0, N=100, H=10, ttype="fourier", dtype="float16"
+        )
+
+        result = run_beats(
+            tempogram_files=[tempo_path],
+            output_dir=tmp_path / "beats",
+            tempogram_dir=tempo_dir,
+            novelty_dir=nov_dir,
+            dry_run=True,
+        )
+
+        assert result["success"] is True
+        assert result["items"][0]["implied_bpm"] == pytest.approx(120.0)
+
+    def test_run_beats_prefers_sibling_profile(self, tmp_path: Path) -> None:
+        """A <stem>_profile.npz next to the tempogram drives the tempo estimate."""
+        from dijon.tempogram.profile import save_tempo_profile
+
+        nov_dir = tmp_path / "novelty"
+        tempo_dir = tmp_path / "tempogram"
+        nov_dir.mkdir()
+        tempo_dir.mkdir()
+        nov = np.clip(np.random.randn(1000).astype(np.float64) * 0.1 + 0.5, 0, 1)
+        np.save(nov_dir / "TRACK01_novelty_spectrum_1024-256-100.0-10.npy", nov)
+        stem = "TRACK01_tempogram_fourier_100-10-60-120"
+        np.save(tempo_dir / f"{stem}.npy", np.random.rand(61, 101))
+        theta = np.arange(60, 121, dtype=np.float64)
+        global_profile = np.zeros(61)
+        global_profile[40] = 1.0  # 100 BPM
+        save_tempo_profile(
+            tempo_dir / f"{stem}_profile.npz",
+            axis=theta,
+            global_profile=global_profile,
+            windowed_profile=global_profile[:, None],
+            window_times_sec=np.zeros(1),
+            ttype="fourier",
+            fs=100.0,
+            N=100,
+            H=10,
+            window_sec=10.0,
+        )
+
+        assert _resolve_tempogram_files(None, tempo_dir) == [tempo_dir / f"{stem}.npy"]
+        assert _resolve_tempogram_files([Path("TRACK01")], tempo_dir) == [
+            (tempo_dir / f"{stem}.npy").resolve()
+        ]
+
+        result = run_beats(
+            tempogram_files=None,
+            output_dir=tmp_path / "beats",
+            tempogram_dir=tempo_dir,
+            novelty_dir=nov_dir,
+            dry_run=True,
+        )
+
+        assert result["success"] is True
+        assert result["items"][0]["implied_bpm"] == pytest.approx(100.0)
+
+    def test_run_beats_profile_from_novelty(self, tmp_path: Path) -> None:
+        """--from-novelty computes the tempo profile without any tempogram on disk."""
+        nov_dir = tmp_path / "novelty"
+        nov_dir.mkdir()
+        nov = np.zeros(1000)
+        nov[::50] = 1.0  # impulses every 0.5 s -> 120 BPM
+        np.save(nov_dir / "YTB-014_novelty_spectrum_1024-256-100.0-10.npy", nov)
+
+        result = run_beats(
+            tempogram_files=[Path("YTB-014")],
+            output_dir=tmp_path / "beats",
+            tempogram_dir=tmp_path / "tempogram",
+            novelty_dir=nov_dir,
+            theta_min=80,
+            theta_max=160,
+            profile_from_novelty=True,
+            N=200,
+            H=5,
+        )
+
+        assert result["success"] is True
+        item = result["items"][0]
+        assert item["input_novelty"] == "YTB-014_novelty_spectrum_1024-256-100.0-10.npy"
+        assert item["implied_bpm"] == pytest.approx(120.0)
+        assert (tmp_path / "beats" / "YTB-014_beats.npy").exists()
+
+    def test_run_beats_local_tempo_follows_drift(self, tmp_path: Path) -> None:
+        nov_dir = tmp_path / "novelty"
+        nov_dir.mkdir()
+        nov, true_beats = _drifting_novelty(100.0, 140.0, 60.0)
+        np.save(nov_dir / "YTB-014_novelty_spectrum_1024-256-100.0-10.npy", nov)
+
+        result = run_beats(
+            tempogram_files=[Path("YTB-014")],
+            output_dir=tmp_path / "beats",
+            tempogram_dir=tmp_path / "tempogram",
+            novelty_dir=nov_dir,
+            profile_from_novelty=True,
+            N=512,
+            H=4,
+            local_tempo=True,
+            tempo_window_sec=5.0,
+        )
+
+        assert result["success"] is True
+        item = result["items"][0]
+        assert item["tempo_mode"] == "local"
+        assert item["tempo_curve_min_bpm"] < 110 < 130 < item["tempo_curve_max_bpm"]
+        beats = np.round(np.load(tmp_path / "beats" / "YTB-014_beats.npy") * 100).astype(int)
+        assert _hit_rate(beats, true_beats) > 0.95
+        assert _hit_rate(true_beats, beats) > 0.95
+
+
+def _drifting_novelty(
+    bpm_start: float, bpm_end: float, seconds: float, seed: int = 0
+) -> tuple[np.ndarray, np.ndarray]:
+    """Noisy impulse novelty (100 Hz) whose tempo ramps linearly; returns (novelty, beat frames)."""
+    n = int(seconds * 100)
+    bpm = np.linspace(bpm_start, bpm_end, n)
+    phase = np.cumsum(bpm / 60.0 / 100.0)
+    beats = np.searchsorted(phase, np.arange(1, int(phase[-1]) + 1))
+    nov = np.random.default_rng(seed).random(n) * 0.5
+    nov[beats] += 1.0
+    return nov, beats
+
+
+def _hit_rate(found: np.ndarray, reference: np.ndarray, tol: int = 3) -> float:
+    """Fraction of found frames within tol frames of some reference frame."""
+    return float(np.mean(np.abs(found[:, None] - reference[None, :]).min(axis=1) <= tol))
+
+
+class TestLocalTempoTracking:
+    """Tempo-curve extraction and time-varying-penalty DP."""
+
+    def test_tempo_curve_without_smoothing_is_argmax(self) -> None:
+        theta = np.arange(60.0, 181.0)
+        profile = np.random.default_rng(1).random((len(theta), 7))
+        curve = compute_tempo_curve(profile, theta, smoothness=0)
+        np.testing.assert_array_equal(curve, theta[np.argmax(profile, axis=0)])
+
+    def test_tempo_curve_viterbi_ignores_single_window_outlier(self) -> None:
+        theta = np.arange(60.0, 181.0)
+        profile = np.full((len(theta), 5), 0.1)
+        profile[theta == 120.0] = 1.0
+        profile[theta == 170.0, 2] = 1.2  # one-window spurious peak
+        curve = compute_tempo_curve(profile, theta, smoothness=20.0)
+        np.testing.assert_array_equal(curve, np.full(5, 120.0))
+
+    def test_tempo_curve_center_keeps_octave(self) -> None:
+        theta = np.arange(40.0, 321.0)
+        profile = np.full((len(theta), 3), 0.1)
+        profile[theta == 240.0] = 1.0
+        profile[theta == 120.0] = 0.8
+        curve = compute_tempo_curve(profile, theta, center_bpm=120.0)
+        np.testing.assert_array_equal(curve, np.full(3, 120.0))
+
+    def test_local_dp_with_constant_period_matches_full_dp(self) -> None:
+        nov = np.random.default_rng(2).random(2000) * 0.5
+        nov[::50] += 1.0
+        expected = compute_beat_sequence(nov, beat_ref=50)
+        got = compute_beat_sequence_local(nov, 50.0, lag_ratio=100.0)
+        np.testing.assert_array_equal(got, expected)
+
+    def test_local_dp_tracks_drift_better_than_global(self) -> None:
+        nov, true_beats = _drifting_novelty(90.0, 160.0, 120.0)
+        times = np.array([0.0, 120.0])
+        beat_ref = tempo_curve_to_beat_ref(np.array([90.0, 160.0]), times, len(nov), 100.0)
+
+        local = compute_beat_sequence_local(nov, beat_ref)
+        global_ = compute_beat_sequence(nov, beat_ref=int(round(6000 / 125.0)))
+
+        assert _hit_rate(local, true_beats) > 0.95
+        assert _hit_rate(true_beats, local) > 0.95
+        assert _hit_rate(local, true_beats) > _hit_rate(global_, true_beats)
+
+
+class TestNoveltyProvenance:
+    """run_beats loads the novelty a tempogram was computed from, not the first match."""
+
+    SPECTRUM = "TRACK01_novelty_spectrum_1024-256-100.0-10.npy"
+    ENERGY = "TRACK01_novelty_energy_2048-512-100.0-10.npy"
+
+    def _setup(self, tmp_path: Path, emit: str = "tempogram") -> tuple[Path, Path]:
+        nov_dir = tmp_path / "novelty"
+        tempo_dir = tmp_path / "tempogram"
+        nov_dir.mkdir()
+        # "energy" sorts first, so a first-match lookup would pick it.
+        rng = np.random.default_rng(0)
+        np.save(nov_dir / self.ENERGY, rng.random(1000))
+        pulses = np.zeros(1000)
+        pulses[::50] = 1.0  # 120 BPM at 100 Hz
+        np.save(nov_dir / self.SPECTRUM, pulses)
+        result = run_tempogram(
+            novelty_files=[nov_dir / self.SPECTRUM],
+            output_dir=tempo_dir,
+            novelty_dir=nov_dir,
+            N=200,
+            H=10,
+            theta_min=60,
+            theta_max=180,
+            emit=emit,
+        )
+        assert result["success"] is True
+        return nov_dir, tempo_dir
+
+    @pytest.mark.parametrize("emit", ["tempogram", "profile"])
+    def test_uses_recorded_source_novelty(self, tmp_path: Path, emit: str) -> None:
+        nov_dir, tempo_dir = self._setup(tmp_path, emit=emit)
+        (tempo_path,) = _resolve_tempogram_files(None, tempo_dir)
+        assert _source_novelty_name(tempo_path) == self.SPECTRUM
+
+        result = run_beats(
+            tempogram_dir=tempo_dir,
+            novelty_dir=nov_dir,
+            output_dir=tmp_path / "beats",
+            theta_min=60,
+            theta_max=180,
+        )
+
+        assert result["success"] is True
+        item = result["items"][0]
+        assert item["input_novelty"] == self.SPECTRUM
+        assert item["novelty_match"] == "provenance"
+        assert item["implied_bpm"] == pytest.approx(120.0)
+
+    def test_missing_source_novelty_fails_instead_of_substituting(self, tmp_path: Path) -> None:
+        nov_dir, tempo_dir = self._setup(tmp_path)
+        (nov_dir / self.SPECTRUM).unlink()
+
+        result = run_beats(
+            tempogram_dir=tempo_dir, novelty_dir=nov_dir, output_dir=tmp_path / "beats"
+        )
+
+        assert result["failed"] == 1
+        assert self.SPECTRUM in result["items"][0]["detail"]
+
+    def test_tempogram_without_record_falls_back_to_track_match(self, tmp_path: Path) -> None:
+        nov_dir, tempo_dir = self._setup(tmp_path)
+        for sidecar in tempo_dir.glob("*.json"):
+            sidecar.unlink()
+
+        result = run_beats(
+            tempogram_dir=tempo_dir, novelty_dir=nov_dir, output_dir=tmp_path / "beats"
+        )
+
+        item = result["items"][0]
+        assert item["input_novelty"] == self.ENERGY
+        assert item["novelty_match"] == "track"
@@ -0,0 +1,133 @@
+"""Tests for the per-track feature bundle container and the bundle pipeline."""
+
+from __future__ import annotations
+
+import os
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from dijon.beats import label_bars_and_beats
+from dijon.pipeline.bundle import open_bundle, run_bundle
+from dijon.pipeline.catalog import list_artifacts
+from dijon.tempogram.storage import save_tempogram
+from dijon.utils.bundle import FeatureBundle, write_bundle
+
+
+class TestFeatureBundle:
+    def test_round_trip_is_memory_mapped_and_npz_compatible(self, tmp_path: Path) -> None:
+        rng = np.random.default_rng(0)
+        arrays = {
+            "novelty/spectrum": rng.random(1000),
+            "chromagram/metric": rng.random((12, 64)).astype(np.float32),
+            "meter": label_bars_and_beats(0.5 * np.arange(1, 10), 0.5, 4),
+            "fortran": np.asfortranarray(rng.random((3, 5))),
+            "empty": np.zeros((0, 12), dtype=np.float32),
+        }
+        path = tmp_path / "T_bundle.npz"
+        write_bundle(path, arrays, members={"meter": {"stage": "meter", "params": ""}}, meta={"track": "T"})
+
+        with zipfile.ZipFile(path) as zf:
+            assert {info.compress_type for info in zf.infolist()} == {zipfile.ZIP_STORED}
+        bundle = FeatureBundle(path)
+        assert bundle.meta == {"track": "T"}
+        assert bundle.members() == sorted(arrays)
+        for name, arr in arrays.items():
+            np.testing.assert_array_equal(bundle[name], arr)
+            assert bundle[name].dtype == arr.dtype
+        assert isinstance(bundle["chromagram/metric"], np.memmap)
+        assert not bundle["chromagram/metric"].flags.writeable
+        assert bundle.info("meter")["shape"] == [9]
+        with np.load(path, allow_pickle=False) as data:
+            np.testing.assert_array_equal(data["novelty/spectrum"], arrays["novelty/spectrum"])
+        with pytest.raises(KeyError):
+            bundle["tempogram"]
+
+    def test_rejects_non_bundles(self, tmp_path: Path) -> None:
+        np.savez(tmp_path / "plain.npz", a=np.zeros(3))
+        with pytest.raises(ValueError, match="not a bundle"):
+            FeatureBundle(tmp_path / "plain.npz")
+        (tmp_path / "junk.npz").write_bytes(b"nope")
+        with pytest.raises(ValueError, match="not a bundle"):
+            FeatureBundle(tmp_path / "junk.npz")
+
+
+class TestRunBundle:
+    def _derived(self, tmp_path: Path) -> Path:
+        derived = tmp_path / "derived"
+        for stage in ("novelty", "tempogram", "meter", "harmony"):
+            (derived / stage).mkdir(parents=True)
+        np.save(derived / "novelty" / "A_novelty_spectrum_1024-256-100.0-10.npy", np.arange(100.0))
+        np.save(derived / "novelty" / "B_novelty_spectrum_1024-256-100.0-10.npy", np.arange(50.0))
+        save_tempogram(
+            derived / "tempogram" / "A_tempogram_fourier_500-1-40-320.npy",
+            np.ones((4, 10)),
+            theta=np.arange(4.0),
+            fs=100.0,
+            N=500,
+            H=1,
+            ttype="fourier",
+        )
+        np.save(derived / "meter" / "A_meter.npy", label_bars_and_beats(0.5 * np.arange(1, 10), 0.5, 4))
+        np.savez(derived / "harmony" / "A_harmony_metric-1.0.npz", chords=np.zeros(8, np.int16), key_scores=np.ones(24))
+        return derived
+
+    def test_bundles_all_stages_with_provenance(self, tmp_path: Path) -> None:
+        derived = self._derived(tmp_path)
+        out_dir = tmp_path / "bundle"
+        result = run_bundle(derived_dir=derived, output_dir=out_dir)
+        assert result["success"], result
+        assert (result["succeeded"], result["total"]) == (2, 2)
+
+        bundle = open_bundle("A", out_dir)
+        assert bundle.members() == [
+            "harmony/metric-1.0/chords",
+            "harmony/metric-1.0/key_scores",
+            "meter",
+            "novelty/spectrum_1024-256-100.0-10",
+            "tempogram/fourier_500-1-40-320",
+        ]
+        assert bundle.meta["stages"] == ["novelty", "tempogram", "meter", "harmony"]
+        np.testing.assert_array_equal(bundle["novelty/spectrum_1024-256-100.0-10"], np.arange(100.0))
+        assert bundle["meter"]["bar"].tolist() == [1, 1, 1, 1, 2, 2, 2, 2, 3]
+        assert bundle.select("novelty", "spectrum") == ["novelty/spectrum_1024-256-100.0-10"]
+        tempogram = bundle.info("tempogram/fourier_500-1-40-320")
+        assert tempogram["source"] == "A_tempogram_fourier_500-1-40-320.npy"
+        assert tempogram["meta"]["frame_rate_hz"] == 100.0
+        assert bundle.info("harmony/metric-1.0/chords")["key"] == "chords"
+        assert open_bundle("B", out_dir).members() == ["novelty/spectrum_1024-256-100.0-10"]
+
+    def test_unchanged_sources_are_skipped(self, tmp_path: Path) -> None:
+        derived = self._derived(tmp_path)
+        out_dir = tmp_path / "bundle"
+        run_bundle(tracks=["A"], derived_dir=derived, output_dir=out_dir)
+        again = run_bundle(tracks=["A"], derived_dir=derived, output_dir=out_dir)
+        assert again["skipped"] == 1
+
+        novelty = derived / "novelty" / "A_novelty_spectrum_1024-256-100.0-10.npy"
+        np.save(novelty, np.zeros(100))
+        os.utime(novelty, ns=(1, 1))
+        changed = run_bundle(tracks=["A"], derived_dir=derived, output_dir=out_dir)
+        assert changed["succeeded"] == 1
+        np.testing.assert_array_equal(open_bundle("A", out_dir)["novelty/spectrum_1024-256-100.0-10"], 0.0)
+
+    def test_stage_filter_unknown_track_and_dry_run(self, tmp_path: Path) -> None:
+        derived = self._derived(tmp_path)
+        out_dir = tmp_path / "bundle"
+        result = run_bundle(tracks=["A", "Z"], derived_dir=derived, output_dir=out_dir, stages=["meter"], dry_run=True)
+        assert (result["succeeded"], result["skipped"]) == (1, 1)
+        assert not out_dir.exists()
+        assert not run_bundle(derived_dir=derived, stages=["alignment"])["success"]
+        with pytest.raises(FileNotFoundError):
+            open_bundle("A", out_dir)
+
+    def test_list_artifacts(self, tmp_path: Path) -> None:
+        derived = self._derived(tmp_path)
+        rows = list_artifacts(derived / "novelty", "novelty")
+        assert [(t, p) for t, p, _ in rows] == [
+            ("A", "spectrum_1024-256-100.0-10"),
+            ("B", "spectrum_1024-256-100.0-10"),
+        ]
+        assert rows[0][2] == (derived / "novelty" / "A_novelty_spectrum_1024-256-100.0-10.npy").resolve()
@@ -0,0 +1,92 @@
+"""Tests for the derived-artifact catalog."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import numpy as np
+
+from dijon.pipeline.catalog import (
+    CATALOG_FILENAME,
+    catalog_path,
+    find_artifacts,
+    parse_artifact_name,
+    record_artifact,
+)
+from dijon.pipeline.tempogram import resolve_novelty_files
+
+
+def _touch(path: Path) -> Path:
+    np.save(path, np.zeros(3))
+    return path
+
+
+class TestParseArtifactName:
+    def test_track_and_params(self) -> None:
+        assert parse_artifact_name(
+            "YTB-001_novelty_spectrum_1024-256-100.0-10.npy", "novelty"
+        ) == ("YTB-001", "spectrum_1024-256-100.0-10")
+
+    def test_no_params(self) -> None:
+        assert parse_artifact_name("YTB-001_beats.npy", "beats") == ("YTB-001", "")
+
+    def test_without_stage_token(self) -> None:
+        assert parse_artifact_name("stem.npy", "novelty") == ("stem", "")
+
+
+class TestFindArtifacts:
+    def test_finds_track_files_and_filters_params(self, tmp_path: Path) -> None:
+        d = tmp_path / "novelty"
+        d.mkdir()
+        a = _touch(d / "YTB-001_novelty_spectrum_1024-256-100.0-10.npy")
+        b = _touch(d / "YTB-001_novelty_phase_1024-256-100.0-10.npy")
+        _touch(d / "YTB-0010_novelty_spectrum_1024-256-100.0-10.npy")
+        (d / "YTB-001_novelty_spectrum_1024-256-100.0-10.json").write_text("{}")
+
+        assert find_artifacts(d, "novelty", "YTB-001") == [b, a]
+        assert find_artifacts(d, "novelty", "YTB-001", params_prefix="spectrum") == [a]
+        assert find_artifacts(d, "novelty", "YTB-002") == []
+        assert catalog_path(d) == tmp_path.resolve() / CATALOG_FILENAME
+        assert (tmp_path / CATALOG_FILENAME).exists()
+
+    def test_picks_up_added_and_removed_files(self, tmp_path: Path) -> None:
+        d = tmp_path / "beats"
+        d.mkdir()
+        first = _touch(d / "A_beats.npy")
+        assert find_artifacts(d, "beats", "A") == [first]
+
+        second = _touch(d / "B_beats.npy")
+        first.unlink()
+        # Age the directory so the scan is trusted, then check the rescan.
+        os.utime(d, ns=(1_000_000_000, 1_000_000_000))
+        assert find_artifacts(d, "beats", "A") == []
+        assert find_artifacts(d, "beats", "B") == [second]
+        os.utime(d, ns=(1_000_000_000, 1_000_000_000))
+        assert find_artifacts(d, "beats", "B") == [second]
+
+    def test_record_artifact(self, tmp_path: Path) -> None:
+        d = tmp_path / "tempogram"
+        d.mkdir()
+        path = _touch(d / "A_tempogram_fourier_512-1-40-320.npy")
+        record_artifact(path, "tempogram")
+        assert find_artifacts(d, "tempogram", "A", params_prefix="fourier_512") == [path.resolve()]
+
+    def test_falls_back_to_glob_when_catalog_unusable(self, tmp_path: Path) -> None:
+        d = tmp_path / "novelty"
+        d.mkdir()
+        (tmp_path / CATALOG_FILENAME).mkdir()  # not a database
+        a = _touch(d / "A_novelty_spectrum_1-2-3-4.npy")
+        assert find_artifacts(d, "novelty", "A") == [a.resolve()]
+
+
+class TestShorthandWithParams:
+    def test_novelty_shorthand_narrowed_by_params(self, tmp_path: Path) -> None:
+        d = tmp_path / "novelty"
+        d.mkdir()
+        spectrum = _touch(d / "YTB-014_novelty_spectrum_1024-256-100.0-10.npy")
+        _touch(d / "YTB-014_novelty_phase_1024-256-100.0-10.npy")
+
+        resolved = resolve_novelty_files([Path("YTB-014_novelty_spectrum")], d)
+
+        assert resolved == [spectrum.resolve()]
@@ -5,6 +5,7 @@ from __future__ import annotations
 import numpy as np
 import pytest
 
+from dijon.beats import label_bars_and_beats
 from dijon.chromagram import methods
 
 
@@ -124,7 +125,7 @@ def test_extract_beat_times_no_prepend() -> None:
         [[0.03, 1, 1], [0.32, 1, 2], [0.59, 1, 3]],
         dtype=np.float64,
     )
-    got = methods._extract_beat_times_from_meter_map(meter_map, duration=1.0)
+    got = methods.extract_beat_times_from_meter_map(meter_map, duration=1.0)
     assert np.allclose(got, [0.03, 0.32, 0.59])
 
 
@@ -134,15 +135,23 @@ def test_extract_beat_times_no_append() -> None:
         [[0.0, 1, 1], [0.5, 1, 2], [1.5, 2, 1]],
         dtype=np.float64,
     )
-    got = methods._extract_beat_times_from_meter_map(meter_map, duration=2.0)
+    got = methods.extract_beat_times_from_meter_map(meter_map, duration=2.0)
     assert np.allclose(got, [0.0, 0.5, 1.5])
 
 
+def test_extract_beat_times_structured_meter_map_is_zero_copy() -> None:
+    """Structured labels from the meter stage are read through their time_sec field."""
+    meter_map = label_bars_and_beats(np.array([0.0, 0.5, 1.5]), 0.0, 2)
+    got = methods.extract_beat_times_from_meter_map(meter_map, duration=2.0)
+    assert np.allclose(got, [0.0, 0.5, 1.5])
+    assert np.shares_memory(got, meter_map)
+
+
 def test_extract_beat_times_one_row_raises() -> None:
     """Single-row meter map raises; need at least two beat boundaries."""
     meter_map = np.array([[0.5, 1, 1]], dtype=np.float64)
     with pytest.raises(ValueError, match="at least two rows"):
-        methods._extract_beat_times_from_meter_map(meter_map, duration=1.0)
+        methods.extract_beat_times_from_meter_map(meter_map, duration=1.0)
 
 
 def test_extract_beat_times_out_of_bounds_raises() -> None:
@@ -152,7 +161,7 @@ def test_extract_beat_times_out_of_bounds_raises() -> None:
         dtype=np.float64,
     )
     with pytest.raises(ValueError, match="must lie within"):
-        methods._extract_beat_times_from_meter_map(meter_map, duration=1.0)
+        methods.extract_beat_times_from_meter_map(meter_map, duration=1.0)
 
 
 def test_metric_chromagram_weighted_uses_original_audio_for_weights(
@@ -227,3 +236,126 @@ def test_metric_chromagram_weighted_uses_original_audio_for_weights(
     assert chroma_inputs and np.array_equal(chroma_inputs[0], y_harmonic)
     assert weight_inputs and np.array_equal(weight_inputs[0], y)
     assert not np.array_equal(weight_inputs[0], y_harmonic)
+
+
+def test_chroma_sample_span_clips_to_audio() -> None:
+    beat_times = np.array([1.0, 2.0, 3.0])
+    start, end = methods.chroma_sample_span(
+        beat_times, sr=1000, hop_length=10, n_samples=10_000, margin_sec=0.5
+    )
+    assert (start, end) == (500, 3510)
+    assert methods.chroma_sample_span(
+        beat_times, sr=1000, hop_length=10, n_samples=3_200, margin_sec=2.0
+    ) == (0, 3_200)
+    with pytest.raises(ValueError, match="margin"):
+        methods.chroma_sample_span(
+            beat_times, sr=1000, hop_length=10, n_samples=10_000, margin_sec=-1.0
+        )
+
+
+def test_metric_chromagram_from_frames_honours_frame_offset() -> None:
+    sr, hop, duration = 1000, 10, 4.0
+    meter_map = np.array([[1.0, 1, 1], [2.5, 1, 2], [4.0, 2, 1]])
+    rng = np.random.default_rng(0)
+    full = rng.random((12, 1 + int(duration * sr) // hop))
+    kwargs = dict(sr=sr, meter_map=meter_map, duration=duration, hop_length=hop)
+    expected = methods.metric_chromagram_from_frames(full, **kwargs)
+    offset = 20
+    got = methods.metric_chromagram_from_frames(full[:, offset:], frame_offset=offset, **kwargs)
+    np.testing.assert_array_equal(got, expected)
+    with pytest.raises(ValueError):
+        methods.metric_chromagram_from_frames(full[:, offset:], frame_offset=offset + 100, **kwargs)
+
+
+def _detuned_tones(sr: int, duration: float, cents: float) -> np.ndarray:
+    """A4, C5, E5 held for 1 s each, all detuned by cents."""
+    t = np.arange(int(sr * duration)) / sr
+    freqs = np.array([440.0, 523.25, 659.25])[(t // 1.0).astype(int) % 3]
+    freqs = freqs * 2.0 ** (cents / 1200.0)
+    return 0.3 * np.sin(2 * np.pi * np.cumsum(freqs) / sr)
+
+
+def test_chroma_at_tuning_matches_frame_chroma_at_whole_bins() -> None:
+    sr = 22050
+    y = _detuned_tones(sr, 3.0, 23.0)
+    X = methods.tuning_cqt(y, sr=sr, preprocess="none")
+    for cents in (0.0, 100.0 / 3.0, -100.0 / 3.0):
+        got = methods.chroma_at_tuning(X, cents=cents)
+        expected = methods.frame_chroma(
+            y, sr=sr, preprocess="none", tuning=methods.cents_to_cqt_tuning(cents)
+        )
+        assert got.shape == expected.shape
+        np.testing.assert_allclose(got, expected, atol=0.01)
+
+
+@pytest.mark.parametrize("detune", [-40.0, 0.0, 23.0])
+def test_chroma_at_tuning_approximates_frame_chroma_between_bins(detune: float) -> None:
+    sr = 22050
+    y = _detuned_tones(sr, 3.0, detune)
+    X = methods.tuning_cqt(y, sr=sr, preprocess="none")
+    for cents in (-45.0, -25.0, -10.0, 10.0, 16.7, 25.0, 50.0):
+        got = methods.chroma_at_tuning(X, cents=cents)
+        expected = methods.frame_chroma(
+            y, sr=sr, preprocess="none", tuning=methods.cents_to_cqt_tuning(cents)
+        )
+        err = np.abs(got - expected)
+        assert err.max() < 0.1, cents
+        assert err.mean() < 0.01, cents
+
+
+def test_chroma_at_tuning_validates_inputs() -> None:
+    X = np.zeros((7 * 36 + 2 * methods._tuning_margin_bins(36), 5))
+    with pytest.raises(ValueError, match="cents"):
+        methods.chroma_at_tuning(X, cents=60.0)
+    with pytest.raises(ValueError, match="tuning_cqt"):
+        methods.chroma_at_tuning(X[:-1], cents=0.0)
+
+
+def test_estimate_tuning_cents_finds_detuned_offset() -> None:
+    sr = 22050
+    y = _detuned_tones(sr, 6.0, 23.0)
+    meter_map = np.array([[t, 1, 1] for t in np.arange(1.0, 5.01, 0.5)])
+    best, sweep = methods.estimate_tuning_cents(
+        y, sr=sr, meter_map=meter_map, preprocess="none", k=1, lambda_jitter=0.0
+    )
+    assert 15.0 <= best <= 33.0
+    assert sweep.shape[1] == 4
+    assert np.all(np.diff(sweep[:, 0]) > 0)
+    assert best == sweep[np.argmax(sweep[:, 1]), 0]
+
+
+def test_score_metric_chromagrams_matches_per_candidate_scores() -> None:
+    rng = np.random.default_rng(0)
+    candidates = [rng.random((12, m)).astype(np.float32) for m in (1, 2, 17, 40)]
+    candidates[2][:, 3:6] = 0.0
+    candidates += [np.zeros((12, 0), dtype=np.float32), np.zeros((12, 4), dtype=np.float32)]
+    for k, lambda_jitter in ((4, 0.5), (1, 0.0), (20, 1.0)):
+        got = methods.score_metric_chromagrams(candidates, k=k, lambda_jitter=lambda_jitter)
+        expected = np.array(
+            [methods.score_metric_chromagram(C, k=k, lambda_jitter=lambda_jitter) for C in candidates]
+        )
+        assert got.shape == (len(candidates), 3)
+        np.testing.assert_allclose(got, expected, rtol=1e-6, atol=1e-7)
+
+    stack = np.stack([candidates[3], candidates[3] ** 2])
+    np.testing.assert_allclose(
+        methods.score_metric_chromagrams(stack),
+        methods.score_metric_chromagrams(list(stack)),
+    )
+    assert methods.score_metric_chromagrams([]).shape == (0, 3)
+
+
+def test_frame_chroma_blocks_matches_whole_signal() -> None:
+    sr = 22050
+    rng = np.random.default_rng(0)
+    y = _detuned_tones(sr, 8.0, 13.0) + 0.01 * rng.standard_normal(8 * sr)
+    expected = methods.frame_chroma(y, sr=sr)
+    got = methods.frame_chroma_blocks(y, sr=sr, block_sec=2.0)
+    assert got.shape == expected.shape
+    np.testing.assert_allclose(got, expected, atol=1e-5)
+
+    short = y[: sr // 2]
+    np.testing.assert_array_equal(
+        methods.frame_chroma_blocks(short, sr=sr, block_sec=2.0),
+        methods.frame_chroma(short, sr=sr),
+    )
@@ -8,6 +8,11 @@ from pathlib import Path
 import numpy as np
 import pytest
 
+import librosa
+
+from dijon.chromagram import metric_chromagram
+from dijon.chromagram.methods import score_metric_chromagram
+from dijon.pipeline import chromagram as chromagram_pipeline
 from dijon.pipeline.chromagram import (
     _resolve_audio_files,
     _track_name,
@@ -93,9 +98,220 @@ class TestRunChromagram:
             raw_audio_dir=audio_dir,
             meter_dir=meter_dir,
             dry_run=False,
+            frame_cache_dir=tmp_path / "frames",
         )
 
         assert result["success"] is True
         assert result["succeeded"] == 1
         out_name = "YTB-014_chromagram_metric_cqt_256-180.0-mean-preserve-rms-1.0-2.npy"
         assert (out_dir / out_name).exists()
+
+
+def _write_tone_wav(path: Path, sr: int = 22050, duration_sec: float = 2.0) -> None:
+    """Write a mono WAV alternating A4 and C5 every 0.5 s, with decaying onsets."""
+    t = np.arange(int(sr * duration_sec)) / sr
+    freq = np.where((t // 0.5) % 2 == 0, 440.0, 523.25)
+    x = 0.5 * np.sin(2 * np.pi * freq * t) * np.exp(-3 * (t % 0.5))
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes((x * 32767).astype(np.int16).tobytes())
+
+
+class TestFrameChromaCache:
+    """Frame chroma is computed once per track and reused across aggregation sweeps."""
+
+    def _setup(self, tmp_path: Path) -> tuple[Path, Path]:
+        audio_dir = tmp_path / "audio"
+        meter_dir = tmp_path / "meter"
+        audio_dir.mkdir()
+        meter_dir.mkdir()
+        _write_tone_wav(audio_dir / "TRACK01.wav")
+        meter_map = np.array(
+            [[0.0, 1, 1], [0.5, 1, 2], [1.0, 2, 1], [1.5, 2, 2]], dtype=np.float64
+        )
+        np.save(meter_dir / "TRACK01_meter.npy", meter_map)
+        return audio_dir, meter_dir
+
+    def _run(self, tmp_path: Path, audio_dir: Path, meter_dir: Path, **params) -> dict:
+        result = run_chromagram(
+            output_dir=tmp_path / "chromagram",
+            raw_audio_dir=audio_dir,
+            meter_dir=meter_dir,
+            frame_cache_dir=tmp_path / "frames",
+            **params,
+        )
+        assert result["success"] is True, result
+        return result["items"][0]
+
+    def test_sweep_reuses_frames_and_matches_direct(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        audio_dir, meter_dir = self._setup(tmp_path)
+        first = self._run(
+            tmp_path, audio_dir, meter_dir, accent_mode="weighted", weight_power=1.0
+        )
+        assert first["frame_cache"] == "miss"
+
+        def no_decode(*args, **kwargs):
+            raise AssertionError("audio decoded despite cached frames")
+
+        monkeypatch.setattr(chromagram_pipeline, "_read_mono", no_decode)
+        sweep = [
+            {"accent_mode": "weighted", "weight_power": 2.0},
+            {"accent_mode": "normalize", "aggregate": "median"},
+            {"accent_mode": "preserve", "bpm_threshold": 100.0},
+        ]
+        items = [self._run(tmp_path, audio_dir, meter_dir, **params) for params in sweep]
+        assert [item["frame_cache"] for item in items] == ["hit", "hit", "hit"]
+        monkeypatch.undo()
+
+        y, sr = librosa.load(audio_dir / "TRACK01.wav", sr=None, mono=True)
+        meter_map = np.load(meter_dir / "TRACK01_meter.npy")
+        for params, item in zip(sweep, items):
+            expected = metric_chromagram(y, sr=sr, meter_map=meter_map, **params)
+            got = np.load(tmp_path / "chromagram" / item["output"])
+            np.testing.assert_array_equal(got, expected)
+
+    def test_changed_audio_invalidates_cache(self, tmp_path: Path) -> None:
+        audio_dir, meter_dir = self._setup(tmp_path)
+        assert self._run(tmp_path, audio_dir, meter_dir)["frame_cache"] == "miss"
+        assert self._run(tmp_path, audio_dir, meter_dir)["frame_cache"] == "hit"
+
+        _write_tone_wav(audio_dir / "TRACK01.wav", duration_sec=2.5)
+        assert self._run(tmp_path, audio_dir, meter_dir)["frame_cache"] == "miss"
+
+    def test_dry_run_does_not_write_cache(self, tmp_path: Path) -> None:
+        audio_dir, meter_dir = self._setup(tmp_path)
+        item = self._run(tmp_path, audio_dir, meter_dir, dry_run=True)
+        assert item["frame_cache"] == "miss"
+        assert not (tmp_path / "frames").exists()
+
+
+class TestSweep:
+    """--sweep aggregates every configuration from one set of frames and keeps the best."""
+
+    def test_sweep_writes_best_scoring_config(self, tmp_path: Path) -> None:
+        audio_dir = tmp_path / "audio"
+        meter_dir = tmp_path / "meter"
+        audio_dir.mkdir()
+        meter_dir.mkdir()
+        _write_tone_wav(audio_dir / "TRACK01.wav")
+        meter_map = np.array([[0.0, 1, 1], [0.5, 1, 2], [1.0, 2, 1], [1.5, 2, 2]])
+        np.save(meter_dir / "TRACK01_meter.npy", meter_map)
+        configs = [
+            {"accent_mode": "preserve", "aggregate": "mean"},
+            {"accent_mode": "normalize", "aggregate": "median"},
+            {"accent_mode": "weighted", "weight_power": 2.0},
+            {"bpm_threshold": 60.0, "min_frames_per_bin": 1000},
+        ]
+        result = run_chromagram(
+            output_dir=tmp_path / "chromagram",
+            raw_audio_dir=audio_dir,
+            meter_dir=meter_dir,
+            frame_cache_dir=tmp_path / "frames",
+            sweep=configs,
+        )
+        assert result["success"] is True, result
+        assert result["compile_s"] >= 0.0
+        [item] = result["items"]
+        assert item["sweep"]["candidates"] == 3
+        assert list((tmp_path / "chromagram").iterdir()) == [tmp_path / "chromagram" / item["output"]]
+
+        singles = []
+        for config in configs[:3]:
+            single = run_chromagram(
+                output_dir=tmp_path / "single",
+                raw_audio_dir=audio_dir,
+                meter_dir=meter_dir,
+                frame_cache_dir=tmp_path / "frames",
+                **config,
+            )
+            C = np.load(tmp_path / "single" / single["items"][0]["output"])
+            singles.append((score_metric_chromagram(C)[0], single["items"][0]["output"]))
+        best_score, best_output = max(singles)
+        assert item["output"] == best_output
+        assert item["sweep"]["score"] == pytest.approx(best_score, rel=1e-6)
+
+    def test_sweep_rejects_unknown_keys(self, tmp_path: Path) -> None:
+        result = run_chromagram(
+            raw_audio_dir=tmp_path, sweep=[{"hop_length": 512}], frame_cache_dir=None
+        )
+        assert result["success"] is False
+        assert "hop_length" in result["message"]
+
+
+class TestMeterSpan:
+    """Only the meter-map span (plus margin) of the audio is analysed."""
+
+    def test_short_meter_on_long_track_computes_span_frames(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        audio_dir = tmp_path / "audio"
+        meter_dir = tmp_path / "meter"
+        audio_dir.mkdir()
+        meter_dir.mkdir()
+        sr, hop = 22050, 256
+        _write_tone_wav(audio_dir / "TRACK01.wav", sr=sr, duration_sec=12.0)
+        meter_map = np.array([[4.0, 1, 1], [4.5, 1, 2], [5.0, 2, 1], [5.5, 2, 2]])
+        np.save(meter_dir / "TRACK01_meter.npy", meter_map)
+
+        read: list[tuple[int, int]] = []
+        read_mono = chromagram_pipeline._read_mono
+
+        def spy(path, start, stop):
+            read.append((start, stop))
+            return read_mono(path, start, stop)
+
+        monkeypatch.setattr(chromagram_pipeline, "_read_mono", spy)
+        result = run_chromagram(
+            output_dir=tmp_path / "chromagram",
+            raw_audio_dir=audio_dir,
+            meter_dir=meter_dir,
+            frame_cache_dir=tmp_path / "frames",
+            span_margin_sec=1.0,
+        )
+        assert result["success"] is True, result
+        [(start, stop)] = read
+        assert start == (int(3.0 * sr / hop)) * hop
+        assert stop - start < 4 * sr
+        got = np.load(tmp_path / "chromagram" / result["items"][0]["output"])
+        y, _ = librosa.load(audio_dir / "TRACK01.wav", sr=None, mono=True)
+        expected = metric_chromagram(y, sr=sr, meter_map=meter_map, span_margin_sec=1.0)
+        np.testing.assert_array_equal(got, expected)
+
+        cached = np.load(next((tmp_path / "frames").glob("*_framechroma_*.npz")))
+        assert int(cached["frame_offset"]) == start // hop
+        assert cached["frames"].shape[1] == 1 + (stop - start) // hop
+
+    def test_frame_chroma_is_not_sliced_from_a_wider_span(self, tmp_path: Path) -> None:
+        audio_dir = tmp_path / "audio"
+        meter_dir = tmp_path / "meter"
+        audio_dir.mkdir()
+        meter_dir.mkdir()
+        sr = 22050
+        _write_tone_wav(audio_dir / "TRACK01.wav", sr=sr, duration_sec=12.0)
+        meter_map = np.array([[4.0, 1, 1], [4.5, 1, 2], [5.0, 2, 1], [5.5, 2, 2]])
+        np.save(meter_dir / "TRACK01_meter.npy", meter_map)
+
+        def run(margin: float, cache: Path | None) -> dict:
+            result = run_chromagram(
+                output_dir=tmp_path / f"chromagram-{margin}",
+                raw_audio_dir=audio_dir,
+                meter_dir=meter_dir,
+                frame_cache_dir=cache,
+                span_margin_sec=margin,
+            )
+            assert result["success"] is True, result
+            return result["items"][0]
+
+        assert run(3.0, tmp_path / "frames")["frame_cache"] == "miss"
+        narrow = run(1.0, tmp_path / "frames")
+        assert narrow["frame_cache"] == "miss"
+        assert run(1.0, tmp_path / "frames")["frame_cache"] == "hit"
+        assert run(3.0, tmp_path / "frames")["frame_cache"] == "hit"
+        assert len(list((tmp_path / "frames").glob("*_framechroma_*.npz"))) == 2
+        cached = np.load(tmp_path / "chromagram-1.0" / narrow["output"])
+        uncached = run(1.0, None)
+        np.testing.assert_array_equal(cached, np.load(tmp_path / "chromagram-1.0" / uncached["output"]))
@@ -0,0 +1,66 @@
+"""Tests for lazy CLI command loading and import-time budget."""
+
+from __future__ import annotations
+
+import importlib
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from dijon.cli.main import COMMANDS, app
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+HEAVY_MODULES = ("numba", "scipy", "librosa", "numpy")
+IMPORT_BUDGET_US = 300_000  # dijon.cli.main cumulative import time (-X importtime)
+
+
+def _run_python(code: str, *flags: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+
+class TestLazyCommands:
+    """Subcommand modules load only when their subcommand is resolved."""
+
+    def test_help_does_not_import_heavy_modules(self) -> None:
+        code = (
+            "import sys\n"
+            "from dijon.cli.main import app\n"
+            "try:\n"
+            "    app(['--help'])\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            f"print('loaded:', [m for m in {HEAVY_MODULES!r} if m in sys.modules])\n"
+        )
+        out = _run_python(code).stdout.strip().splitlines()
+        assert out[-1] == "loaded: []"
+
+    def test_registry_help_matches_command_modules(self) -> None:
+        for name, (module, help_text) in COMMANDS.items():
+            sub_app = importlib.import_module(module).app
+            assert sub_app.info.name == name
+            assert sub_app.info.help == help_text
+
+    def test_subcommand_resolves_and_runs(self) -> None:
+        result = CliRunner().invoke(app, ["clean", "--help"])
+        assert result.exit_code == 0
+        assert "pyc" in result.output
+
+
+@pytest.mark.slow
+def test_cli_main_import_time_within_budget() -> None:
+    stderr = _run_python("import dijon.cli.main", "-X", "importtime").stderr
+    rows = [line.split("|") for line in stderr.splitlines() if line.startswith("import time:")]
+    cumulative = {row[2].strip(): int(row[1]) for row in rows if row[1].strip().isdigit()}
+    assert cumulative["dijon.cli.main"] < IMPORT_BUDGET_US
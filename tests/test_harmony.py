@@ -0,0 +1,151 @@
+"""Tests for chord/key template matching, Viterbi smoothing and the harmony pipeline."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+import yaml
+
+from dijon.harmony import (
+    chord_scores,
+    chord_templates,
+    decode_chords,
+    estimate_chords,
+    estimate_keys,
+)
+from dijon.harmony.storage import load_harmony
+from dijon.pipeline import harmony as harmony_pipeline
+from dijon.pipeline.harmony import _batches, run_harmony
+
+PARAMS = "metric_cqt_256-180.0-mean-preserve-rms-1.0-2"
+# I - IV - V7 - vi in C, 32 bins each.
+PROGRESSION = [(0, 4, 7), (5, 9, 0), (7, 11, 2, 5), (9, 0, 4)]
+
+
+def _progression_chroma(rng: np.random.Generator, bins_per_chord: int = 32, repeats: int = 2) -> np.ndarray:
+    chords = PROGRESSION * repeats
+    C = 0.05 * rng.random((12, bins_per_chord * len(chords))).astype(np.float32)
+    for i, pitches in enumerate(chords):
+        C[list(pitches), i * bins_per_chord : (i + 1) * bins_per_chord] += 1.0
+    return C
+
+
+class TestMethods:
+    def test_templates_and_scores(self) -> None:
+        names, T = chord_templates()
+        assert len(names) == 60
+        assert names[0] == "C:maj" and names[12] == "C:min" and names[24 + 7] == "G:7"
+        np.testing.assert_allclose(np.linalg.norm(T, axis=1), 1.0, rtol=1e-6)
+        C = np.zeros((12, 3), dtype=np.float32)
+        C[[0, 4, 7], 0] = 1.0
+        C[[7, 11, 2, 5], 1] = 1.0
+        S = chord_scores(C, T)
+        assert S.shape == (3, 61)
+        assert names[int(np.argmax(S[0]))] == "C:maj"
+        assert names[int(np.argmax(S[1]))] == "G:7"
+        # Silent column: only the no-chord entry scores.
+        assert int(np.argmax(S[2])) == 60
+        np.testing.assert_array_equal(S[:2, 60], 0.0)
+
+    def test_batch_matches_per_track(self) -> None:
+        rng = np.random.default_rng(0)
+        tracks = [_progression_chroma(rng), rng.random((12, 50)).astype(np.float32), _progression_chroma(rng, 16)]
+        names, batched = estimate_chords(tracks)
+        for C, labels in zip(tracks, batched):
+            assert labels.dtype == np.int16
+            np.testing.assert_array_equal(labels, estimate_chords([C])[1][0])
+        assert [names[i] for i in batched[0][::32]] == ["C:maj", "F:maj", "G:7", "A:min"] * 2
+
+    def test_smoothing_removes_short_flips(self) -> None:
+        rng = np.random.default_rng(1)
+        C = _progression_chroma(rng)
+        C[:, 10:12] = 0.0
+        C[[2, 6, 9], 10:12] = 1.0  # two bins of D major inside C major
+        raw = decode_chords(chord_scores(C, chord_templates()[1]), smoothing=0)
+        smooth = decode_chords(chord_scores(C, chord_templates()[1]), smoothing=1.0)
+        assert np.count_nonzero(np.diff(raw)) == 7 + 2
+        assert np.count_nonzero(np.diff(smooth)) == 7
+        np.testing.assert_array_equal(np.flatnonzero(np.diff(smooth)) + 1, 32 * np.arange(1, 8))
+
+    def test_viterbi_matches_brute_force(self) -> None:
+        rng = np.random.default_rng(2)
+        S = rng.random((6, 3)).astype(np.float32)
+        penalty = 0.3
+        best, best_path = -np.inf, None
+        for flat in range(3**6):
+            path = [(flat // 3**n) % 3 for n in range(6)]
+            value = sum(S[n, k] for n, k in enumerate(path)) - penalty * np.count_nonzero(np.diff(path))
+            if value > best:
+                best, best_path = value, path
+        np.testing.assert_array_equal(decode_chords(S, smoothing=penalty), best_path)
+
+    def test_keys(self) -> None:
+        rng = np.random.default_rng(3)
+        C = _progression_chroma(rng)
+        names, R = estimate_keys([C, np.roll(C, 2, axis=0)])
+        assert R.shape == (24, 2)
+        assert [names[i] for i in np.argmax(R, axis=0)] == ["C major", "D major"]
+
+    def test_negative_smoothing_rejected(self) -> None:
+        with pytest.raises(ValueError, match="smoothing"):
+            decode_chords(np.zeros((4, 61), dtype=np.float32), smoothing=-1.0)
+
+
+class TestRunHarmony:
+    def test_writes_one_file_per_chromagram(self, tmp_path: Path) -> None:
+        chroma_dir, out_dir = tmp_path / "chromagram", tmp_path / "harmony"
+        chroma_dir.mkdir()
+        rng = np.random.default_rng(4)
+        np.save(chroma_dir / f"A_chromagram_{PARAMS}.npy", _progression_chroma(rng))
+        np.save(chroma_dir / f"B_chromagram_{PARAMS}.npy", np.roll(_progression_chroma(rng), 5, axis=0))
+
+        result = run_harmony(chromagram_dir=chroma_dir, output_dir=out_dir)
+        assert result["success"], result
+        assert [item["key"] for item in result["items"]] == ["C major", "F major"]
+        saved = load_harmony(out_dir / f"A_harmony_{PARAMS}-1.0.npz")
+        assert saved is not None
+        assert saved["key"] == "C major"
+        assert saved["source"] == f"A_chromagram_{PARAMS}.npy"
+        assert saved["labels"][:: 32].tolist() == ["C:maj", "F:maj", "G:7", "A:min"] * 2
+
+    def test_set_input_skips_missing_tracks(self, tmp_path: Path) -> None:
+        chroma_dir = tmp_path / "chromagram"
+        chroma_dir.mkdir()
+        np.save(chroma_dir / f"A_chromagram_{PARAMS}.npy", _progression_chroma(np.random.default_rng(5)))
+        set_path = tmp_path / "set.yaml"
+        set_path.write_text(yaml.safe_dump({"items": [{"file_id": "A"}, {"file_id": "Z"}]}))
+        result = run_harmony(set_path=set_path, chromagram_dir=chroma_dir, output_dir=tmp_path / "out", dry_run=True)
+        assert (result["succeeded"], result["skipped"]) == (1, 1)
+        assert not (tmp_path / "out").exists()
+
+    def test_failed_batch_marks_its_items_failed(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        chroma_dir = tmp_path / "chromagram"
+        chroma_dir.mkdir()
+        rng = np.random.default_rng(6)
+        for track in ("A", "B", "C"):
+            np.save(chroma_dir / f"{track}_chromagram_{PARAMS}.npy", _progression_chroma(rng))
+        calls = []
+
+        def flaky_keys(chroma):
+            calls.append(len(chroma))
+            if len(calls) == 2:
+                raise ValueError("bad chromagram")
+            return estimate_keys(chroma)
+
+        monkeypatch.setattr(harmony_pipeline, "BATCH_COLUMNS", 1)
+        monkeypatch.setattr(harmony_pipeline, "estimate_keys", flaky_keys)
+        result = run_harmony(chromagram_dir=chroma_dir, output_dir=tmp_path / "out")
+        assert not result["success"]
+        assert (result["succeeded"], result["failed"]) == (2, 1)
+        assert [item["status"] for item in result["items"]] == ["success", "failed", "success"]
+        assert result["failures"][0]["reason"] == "bad chromagram"
+
+    def test_batches_respect_column_limit(self) -> None:
+        assert _batches([100, 100, 300, 50, 50], 200) == [[0, 1], [2], [3, 4]]
+
+    def test_invalid_smoothing_fails(self) -> None:
+        result = run_harmony(smoothing=-0.5)
+        assert not result["success"]
+        assert "smoothing" in result["message"]
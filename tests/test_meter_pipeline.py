@@ -6,9 +6,19 @@ import json
 import wave
 from pathlib import Path
 
+import librosa
 import numpy as np
 import pytest
 
+from dijon.beats import (
+    as_meter_labels,
+    compute_beat_energies,
+    compute_beat_energies_from_file,
+    label_bars_and_beats,
+    read_beat_windows,
+    score_meter_hypotheses,
+)
+from dijon.beats.meter import METER_LABEL_DTYPE
 from dijon.pipeline.meter import (
     _resolve_beats_files,
     _track_name_from_beats_stem,
@@ -27,6 +37,16 @@ def _write_minimal_wav(path: Path, sr: int = 22050, duration_sec: float = 1.0) -
         w.writeframes(buf.tobytes())
 
 
+def _write_wav(path: Path, x: np.ndarray, sr: int) -> None:
+    """Write float samples in [-1, 1] as a mono 16-bit WAV."""
+    buf = (np.clip(x, -1.0, 1.0) * 32767).astype(np.int16)
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes(buf.tobytes())
+
+
 def _write_markers_with_head_in(
     markers_dir: Path, track_name: str, head_in_sec: float, duration_sec: float = 5.0
 ) -> None:
@@ -143,7 +163,7 @@ class TestRunMeter:
         assert item["t_last_beat"] == pytest.approx(4.5)
         assert isinstance(item["beats_per_bar"], int)
         assert item["beats_per_bar"] >= 1
-        assert item["label_shape"] == (9, 3)
+        assert item["label_shape"] == (9,)
         assert isinstance(item["bar_count"], int)
         assert item["bar_count"] >= 1
         assert isinstance(item["beat_counts"], dict)
@@ -154,8 +174,8 @@ class TestRunMeter:
         out_file = out_dir / "TRACK01_meter.npy"
         assert out_file.exists()
         arr = np.load(out_file)
-        assert arr.ndim == 2
-        assert arr.shape[1] >= 3
+        assert arr.dtype == METER_LABEL_DTYPE
+        assert arr.shape == (9,)
 
     def test_run_meter_with_shorthand_track_id(self, tmp_path: Path) -> None:
         """Shorthand YTB-014 resolves to beats_dir/YTB-014_beats.npy."""
@@ -184,3 +204,143 @@ class TestRunMeter:
         assert result["success"] is True
         assert result["succeeded"] == 1
         assert (out_dir / "YTB-014_meter.npy").exists()
+
+
+def _score_loop(low: np.ndarray, high: np.ndarray, i0: int, B: int, phase: int) -> float:
+    """Reference: per-beat loop scoring of one (B, phase) hypothesis."""
+    down = [(i - i0) % B == phase for i in range(len(low))]
+    down = np.array(down)
+    return (low[down].mean() - low[~down].mean()) + (high[~down].mean() - high[down].mean())
+
+
+class TestMeterScoring:
+    """Vectorized meter hypothesis scoring and phase search."""
+
+    def test_scores_match_per_beat_loop(self) -> None:
+        rng = np.random.default_rng(0)
+        low = rng.random(50)
+        high = rng.random(50)
+        candidates = tuple(range(2, 13))
+
+        scores = score_meter_hypotheses(low, high, i0=7, candidates=candidates)
+
+        assert scores.shape == (11, 12)
+        for j, B in enumerate(candidates):
+            for p in range(12):
+                if p < B:
+                    assert scores[j, p] == pytest.approx(_score_loop(low, high, 7, B, p))
+                else:
+                    assert scores[j, p] == -np.inf
+
+    def test_empty_groups_are_excluded(self) -> None:
+        scores = score_meter_hypotheses(np.ones(3), np.ones(3), candidates=(2, 4))
+        assert np.isfinite(scores[0, :2]).all()
+        assert np.isfinite(scores[1, :3]).all()
+        assert scores[1, 3] == -np.inf
+
+    def test_run_meter_search_phase_finds_offset_downbeat(self, tmp_path: Path) -> None:
+        beats_dir = tmp_path / "beats"
+        audio_dir = tmp_path / "audio"
+        markers_dir = tmp_path / "markers"
+        beats_dir.mkdir()
+        audio_dir.mkdir()
+
+        # Waltz: bass thump on every 3rd beat starting at beat 4, clicks elsewhere.
+        sr = 8000
+        beat_times = np.arange(0.5, 12.0, 0.5)
+        x = np.zeros(int(12.5 * sr))
+        t = np.arange(int(0.1 * sr)) / sr
+        for i, bt in enumerate(beat_times):
+            start = int(bt * sr)
+            if i % 3 == 1:
+                x[start : start + len(t)] += 0.8 * np.sin(2 * np.pi * 80 * t)
+            else:
+                x[start : start + len(t)] += 0.3 * np.sin(2 * np.pi * 3000 * t)
+        _write_wav(audio_dir / "TRACK01.wav", x, sr)
+        # Head-in marked one beat early (beat index 3); the downbeat is index 4.
+        _write_markers_with_head_in(markers_dir, "TRACK01", 2.0, 12.5)
+        np.save(beats_dir / "TRACK01_beats.npy", beat_times)
+
+        kwargs = dict(
+            beats_dir=beats_dir,
+            output_dir=tmp_path / "meter",
+            raw_audio_dir=audio_dir,
+            markers_dir=markers_dir,
+            max_beats_per_bar=12,
+        )
+        fixed = run_meter(**kwargs)["items"][0]
+        searched = run_meter(**kwargs, search_phase=True)["items"][0]
+
+        assert fixed["downbeat_phase"] == 0
+        assert searched["beats_per_bar"] == 3
+        assert searched["downbeat_phase"] == 1
+        labels = np.load(tmp_path / "meter" / "TRACK01_meter.npy")
+        downbeats = labels["time_sec"][labels["beat"] == 1]
+        assert downbeats == pytest.approx(beat_times[1::3])
+
+    def test_run_meter_rejects_max_beats_per_bar_below_two(self, tmp_path: Path) -> None:
+        result = run_meter(beats_dir=tmp_path, max_beats_per_bar=1)
+        assert result["success"] is False
+        assert "max_beats_per_bar" in result["message"]
+
+
+class TestMeterLabels:
+    """Structured bar/beat labels."""
+
+    def test_label_bars_and_beats_matches_anchor(self) -> None:
+        beat_times = np.arange(0.5, 5.0, 0.5)
+        labels = label_bars_and_beats(beat_times, 2.0, 3)
+
+        assert labels.dtype == METER_LABEL_DTYPE
+        assert labels.dtype.itemsize == 13
+        np.testing.assert_array_equal(labels["time_sec"], beat_times)
+        np.testing.assert_array_equal(labels["bar"], [0, 0, 0, 1, 1, 1, 2, 2, 2])
+        np.testing.assert_array_equal(labels["beat"], [1, 2, 3, 1, 2, 3, 1, 2, 3])
+
+    def test_label_bars_and_beats_empty(self) -> None:
+        assert label_bars_and_beats(np.array([]), 0.0, 4).shape == (0,)
+
+    def test_as_meter_labels_converts_legacy_float_rows(self) -> None:
+        legacy = np.array([[0.5, 1, 1], [1.0, 1, 2], [1.5, 2, 1]], dtype=np.float64)
+        labels = as_meter_labels(legacy)
+        assert labels.dtype == METER_LABEL_DTYPE
+        np.testing.assert_array_equal(labels["bar"], [1, 1, 2])
+        np.testing.assert_array_equal(labels["beat"], [1, 2, 1])
+
+    def test_as_meter_labels_passes_structured_through(self) -> None:
+        labels = label_bars_and_beats(np.arange(4.0), 0.0, 2)
+        assert as_meter_labels(labels) is labels
+
+    def test_as_meter_labels_rejects_bad_shape(self) -> None:
+        with pytest.raises(ValueError, match="shape"):
+            as_meter_labels(np.zeros((3, 2)))
+
+
+class TestBeatEnergies:
+    """Beat-window energies read straight from the audio file."""
+
+    def test_file_energies_match_full_decode(self, tmp_path: Path) -> None:
+        sr = 22050
+        rng = np.random.default_rng(0)
+        stereo = rng.standard_normal((3 * sr, 2)) * 0.2
+        path = tmp_path / "a.wav"
+        buf = (np.clip(stereo, -1, 1) * 32767).astype(np.int16)
+        with wave.open(str(path), "wb") as w:
+            w.setnchannels(2)
+            w.setsampwidth(2)
+            w.setframerate(sr)
+            w.writeframes(buf.tobytes())
+        beat_times = np.array([0.05, 0.37, 1.0, 1.61, 2.93])
+
+        x, _ = librosa.load(path, sr=None, mono=True)
+        expected = compute_beat_energies(beat_times, x, sr)
+        got = compute_beat_energies_from_file(path, beat_times)
+
+        np.testing.assert_array_equal(got[0], expected[0])
+        np.testing.assert_array_equal(got[1], expected[1])
+
+    def test_read_beat_windows_clips_to_file(self, tmp_path: Path) -> None:
+        _write_minimal_wav(tmp_path / "a.wav", sr=8000, duration_sec=1.0)
+        segments, sr = read_beat_windows(tmp_path / "a.wav", np.array([0.0, 0.5, 2.0]))
+        assert sr == 8000
+        assert [len(seg) for seg in segments] == [1200, 2400, 0]
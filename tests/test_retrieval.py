@@ -0,0 +1,158 @@
+"""Tests for bar shingles, the bar-shingle index and the retrieval pipeline."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from dijon.beats import label_bars_and_beats
+from dijon.pipeline.retrieval import run_bar_index, run_bar_query
+from dijon.retrieval import bar_shingles, transposed_shingles
+from dijon.retrieval.index import BarIndex
+
+CHROMA_SUFFIX = "_chromagram_metric_cqt_256-180.0-mean-preserve-rms-1.0-2.npy"
+STAMP = ("x.npy", 1, 1)
+
+
+def _random_track(rng: np.random.Generator, n_bars: int, window: int = 4) -> np.ndarray:
+    return bar_shingles(rng.random((12, n_bars)).astype(np.float32), window=window)
+
+
+def _track_with_progression(progression: list[list[int]], bars_per_chord: int = 2) -> tuple[np.ndarray, np.ndarray]:
+    """C_metric (4 bins per beat at 120 BPM, 4/4) playing each pitch set for bars_per_chord bars."""
+    n_bars = bars_per_chord * len(progression)
+    n_beats = 4 * n_bars + 1
+    meter_map = label_bars_and_beats(0.5 + 0.5 * np.arange(n_beats), 0.5, 4)
+    rng = np.random.default_rng(len(progression))
+    C = 0.05 * rng.random((12, 16 * n_bars)).astype(np.float32)
+    for b, pitches in enumerate(progression):
+        C[pitches, 16 * bars_per_chord * b : 16 * bars_per_chord * (b + 1)] += 1.0
+    return C, meter_map
+
+
+class TestMethods:
+    def test_bar_shingles_shape_and_norm(self) -> None:
+        F = np.random.default_rng(0).random((12, 10)).astype(np.float32)
+        S = bar_shingles(F, window=4)
+        assert S.shape == (7, 48)
+        assert S.dtype == np.float32
+        np.testing.assert_allclose(np.linalg.norm(S, axis=1), 1.0, rtol=1e-5)
+        # Row 1 holds bars 1..4 in order.
+        np.testing.assert_allclose(S[1, :12] / S[1, :12].sum(), F[:, 1] / F[:, 1].sum(), rtol=1e-5)
+        assert bar_shingles(F[:, :3], window=4).shape == (0, 48)
+
+    def test_transposed_shingles_roll_each_bar(self) -> None:
+        S = bar_shingles(np.random.default_rng(1).random((12, 6)), window=3)
+        T = transposed_shingles(S, range(12))
+        assert T.shape == (12, 4, 36)
+        np.testing.assert_array_equal(T[0], S)
+        np.testing.assert_allclose(T[5][:, 12:24], np.roll(S[:, 12:24], 5, axis=1))
+
+
+class TestBarIndex:
+    def test_exact_search_finds_transposed_passage(self, tmp_path: Path) -> None:
+        rng = np.random.default_rng(2)
+        index = BarIndex(tmp_path, window=4)
+        F = rng.random((12, 20)).astype(np.float32)
+        index.add("A", bar_shingles(F, window=4), np.arange(1, 18), np.arange(17.0), stamp=STAMP)
+        index.add("B", _random_track(rng, 30), np.arange(1, 28), np.arange(27.0), stamp=STAMP)
+
+        query = bar_shingles(np.roll(F, -3, axis=0), window=4)[6]
+        [best] = index.search(query, k=1, mode="exact")
+        assert (best["track"], best["bar"], best["last_bar"], best["shift"]) == ("A", 7, 10, 3)
+        assert best["score"] == pytest.approx(1.0, abs=1e-5)
+        [fixed] = index.search(query, k=1, mode="exact", transpose=False)
+        assert fixed["score"] < best["score"]
+
+    def test_overlapping_windows_are_suppressed(self, tmp_path: Path) -> None:
+        index = BarIndex(tmp_path, window=4)
+        index.add("A", _random_track(np.random.default_rng(3), 40), np.arange(1, 38), np.arange(37.0), stamp=STAMP)
+        matches = index.search(index.shingle("A", 10), k=5, mode="exact")
+        assert matches[0]["bar"] == 10
+        starts = sorted(m["bar"] for m in matches)
+        assert all(b - a >= 4 for a, b in zip(starts, starts[1:]))
+        assert index.search(index.shingle("A", 10), k=5, exclude_track="A") == []
+
+    def test_persistence_and_replacement(self, tmp_path: Path) -> None:
+        rng = np.random.default_rng(4)
+        index = BarIndex(tmp_path, window=4)
+        index.add("A", _random_track(rng, 10), np.arange(1, 8), np.arange(7.0), stamp=("a.npy", 10, 5))
+        reopened = BarIndex(tmp_path)
+        assert reopened.window == 4
+        assert reopened.rows == 7
+        assert reopened.is_current("A", ("a.npy", 10, 5))
+        assert not reopened.is_current("A", ("a.npy", 11, 5))
+        reopened.add("A", _random_track(rng, 6), np.arange(1, 4), np.arange(3.0), stamp=("a.npy", 11, 6))
+        assert BarIndex(tmp_path).rows == 3
+        reopened.remove("A")
+        assert BarIndex(tmp_path).tracks == {}
+        with pytest.raises(ValueError, match="4-bar windows"):
+            BarIndex(tmp_path, window=8)
+
+    def test_ivf_agrees_with_exact_and_accepts_new_tracks(self, tmp_path: Path) -> None:
+        rng = np.random.default_rng(5)
+        index = BarIndex(tmp_path, window=4)
+        for t in range(40):
+            index.add(f"T{t:02d}", _random_track(rng, 60), np.arange(1, 58), np.arange(57.0), stamp=STAMP)
+        assert index.needs_training()
+        nlist = index.train()
+        assert nlist == round(np.sqrt(40 * 57))
+        assert not BarIndex(tmp_path).needs_training()
+
+        index.add("new", _random_track(rng, 60), np.arange(1, 58), np.arange(57.0), stamp=STAMP)
+        query = index.shingle("new", 20)
+        exact = index.search(query, k=5, mode="exact")
+        approx = index.search(query, k=5, mode="ivf", nprobe=nlist)
+        assert [(m["track"], m["bar"]) for m in approx] == [(m["track"], m["bar"]) for m in exact]
+        assert index.search(query, k=1, mode="ivf", nprobe=1, transpose=False)[0]["track"] == "new"
+
+
+class TestRetrievalPipeline:
+    def test_index_then_query(self, tmp_path: Path) -> None:
+        chroma_dir, meter_dir, index_dir = tmp_path / "chromagram", tmp_path / "meter", tmp_path / "index"
+        chroma_dir.mkdir()
+        meter_dir.mkdir()
+        # B plays A's progression a whole tone higher, after four bars of something else.
+        C_a, meter_a = _track_with_progression([[0, 4, 7], [5, 9, 0], [7, 11, 2], [0, 4, 7]])
+        C_b, meter_b = _track_with_progression(
+            [[1, 6], [3, 10], [2, 6, 9], [7, 11, 2], [9, 1, 4], [2, 6, 9]]
+        )
+        for name, C, meter_map in (("A", C_a, meter_a), ("B", C_b, meter_b)):
+            np.save(chroma_dir / f"{name}{CHROMA_SUFFIX}", C)
+            np.save(meter_dir / f"{name}_meter.npy", meter_map)
+
+        result = run_bar_index(
+            chromagram_dir=chroma_dir, meter_dir=meter_dir, index_dir=index_dir, window=8
+        )
+        assert result["success"], result
+        assert result["succeeded"] == 2
+        assert BarIndex(index_dir).rows == (8 - 7) + (12 - 7)
+
+        again = run_bar_index(chromagram_dir=chroma_dir, meter_dir=meter_dir, index_dir=index_dir, window=8)
+        assert again["skipped"] == 2
+
+        query = run_bar_query(track="A", first_bar=1, last_bar=8, index_dir=index_dir, k=1, mode="exact")
+        assert query["success"], query
+        [match] = query["items"]
+        assert (match["track"], match["bar"], match["shift"]) == ("B", 5, 2)
+        assert match["score"] > 0.99
+
+    def test_query_validates_passage_length(self, tmp_path: Path) -> None:
+        BarIndex(tmp_path, window=4).add(
+            "A", _random_track(np.random.default_rng(6), 10), np.arange(1, 8), np.arange(7.0), stamp=STAMP
+        )
+        result = run_bar_query(track="A", first_bar=1, last_bar=8, index_dir=tmp_path)
+        assert not result["success"]
+        assert "4-bar windows" in result["message"]
+        assert run_bar_query(track="A", first_bar=2, index_dir=tmp_path)["success"]
+
+    def test_missing_meter_map_is_skipped(self, tmp_path: Path) -> None:
+        C, _ = _track_with_progression([[0, 4, 7]] * 5)
+        np.save(tmp_path / f"A{CHROMA_SUFFIX}", C)
+        result = run_bar_index(
+            chromagram_files=[tmp_path / f"A{CHROMA_SUFFIX}"], meter_dir=tmp_path, index_dir=tmp_path / "index"
+        )
+        assert result["skipped"] == 1
+        assert "meter" in result["items"][0]["detail"]
@@ -0,0 +1,147 @@
+"""Tests for JSONL run records and the run index."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from dijon.cli import base as cli_base
+from dijon.pipeline.runlog import (
+    RUNS_FILENAME,
+    RunIndex,
+    append_run_records,
+    run_records,
+)
+
+
+def _novelty_result(track: str, start: float, end: float, params: str = "spectrum_1024-256-100.0-10") -> dict:
+    return {
+        "success": True,
+        "items": [
+            {
+                "file": f"{track}.wav",
+                "output": f"{track}_novelty_{params}.npy",
+                "status": "success",
+                "start_marker": "HEAD_IN_START",
+                "end_marker": "HEAD_IN_END",
+                "start_sec": start,
+                "end_sec": end,
+            },
+            {"file": "MISSING.wav", "status": "failed", "detail": "File not found"},
+        ],
+    }
+
+
+class TestRunRecords:
+    def test_records_track_params_region_and_markers(self) -> None:
+        records = run_records(
+            _novelty_result("YTB-013", 0.196, 31.274),
+            command="novelty",
+            method="spectrum",
+            run="20260306-0013_novelty_spectrum.log",
+            run_elapsed_s=1.5,
+        )
+        ok, failed = records
+        assert ok["track"] == "YTB-013"
+        assert ok["params"] == "spectrum_1024-256-100.0-10"
+        assert ok["region"] == [0.196, 31.274]
+        assert ok["markers"] == ["HEAD_IN_START", "HEAD_IN_END"]
+        assert ok["run_elapsed_s"] == failed["run_elapsed_s"] == 1.5
+        assert ok["elapsed_s"] is None
+        assert failed["track"] == "MISSING"
+        assert failed["status"] == "failed"
+        assert failed["region"] is None
+
+    def test_chromagram_region_keys(self) -> None:
+        result = {
+            "items": [
+                {
+                    "file": "T.wav",
+                    "output": "T_chromagram_metric_cqt_256-180.0-mean-preserve-rms-1.0-2.npy",
+                    "status": "success",
+                    "region_start_sec": 1.0,
+                    "region_end_sec": 9.0,
+                }
+            ]
+        }
+        [record] = run_records(result, command="chromagram")
+        assert record["region"] == [1.0, 9.0]
+        assert record["markers"] is None
+        assert record["params"].startswith("metric_cqt_256")
+
+
+class TestRunIndex:
+    def test_region_lookup_by_track_and_params(self, tmp_path: Path) -> None:
+        append_run_records(
+            run_records(_novelty_result("A", 1.0, 5.0), command="novelty"), tmp_path
+        )
+        append_run_records(
+            run_records(_novelty_result("A", 2.0, 6.0, params="energy_2048-512-10.0-0"), command="novelty"),
+            tmp_path,
+        )
+        index = RunIndex(tmp_path)
+        assert index.region("A") == (2.0, 6.0, "HEAD_IN_START", "HEAD_IN_END")
+        assert index.region("A", params="spectrum_1024-256-100.0-10")[:2] == (1.0, 5.0)
+        assert index.latest("MISSING") is None
+        with pytest.raises(ValueError, match="No novelty run recorded for B"):
+            index.region("B")
+
+    def test_refresh_reads_only_appended_complete_lines(self, tmp_path: Path) -> None:
+        index = RunIndex(tmp_path)
+        assert index.latest("A") is None
+
+        append_run_records(run_records(_novelty_result("A", 1.0, 5.0), command="novelty"), tmp_path)
+        assert index.region("A")[:2] == (1.0, 5.0)
+
+        path = tmp_path / RUNS_FILENAME
+        record = run_records(_novelty_result("A", 3.0, 7.0), command="novelty")[0]
+        line = json.dumps(record)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line[:20])
+        assert index.region("A")[:2] == (1.0, 5.0)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line[20:] + "\n")
+        assert index.region("A")[:2] == (3.0, 7.0)
+
+    def test_dry_run_does_not_shadow_real_run(self, tmp_path: Path) -> None:
+        append_run_records(run_records(_novelty_result("A", 1.0, 5.0), command="novelty"), tmp_path)
+        append_run_records(
+            run_records(_novelty_result("A", 9.0, 9.5), command="novelty", dry_run=True), tmp_path
+        )
+        assert RunIndex(tmp_path).region("A")[:2] == (1.0, 5.0)
+
+
+class TestCliWritesRunRecords:
+    def test_logged_operation_appends_records(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(cli_base, "DERIVED_LOGS_DIR", tmp_path)
+        cli_base.BaseCLI("novelty").handle_cli_operation(
+            operation="novelty",
+            op_callable=lambda: _novelty_result("YTB-013", 0.5, 30.0),
+            log_module="novelty",
+            log_method="spectrum",
+        )
+        [log] = tmp_path.glob("*_novelty_spectrum.log")
+        record = RunIndex(tmp_path).latest("YTB-013")
+        assert record is not None
+        assert record["run"] == log.name
+        assert record["method"] == "spectrum"
+        assert record["run_elapsed_s"] >= 0.0
+
+    def test_unserializable_item_does_not_fail_the_command(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(cli_base, "DERIVED_LOGS_DIR", tmp_path)
+        result = _novelty_result("YTB-013", 0.5, 30.0)
+        result["items"][0]["start_sec"] = "not a number"
+        got = cli_base.BaseCLI("novelty").handle_cli_operation(
+            operation="novelty",
+            op_callable=lambda: result,
+            log_module="novelty",
+            log_method="spectrum",
+        )
+        assert got is result
+        assert not (tmp_path / RUNS_FILENAME).exists()
@@ -0,0 +1,44 @@
+"""Tests for atomic writes and source stamps in dijon.utils.storage."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from dijon.utils.storage import atomic_path, save_npz_atomic, source_stamp
+
+
+class TestAtomicWrites:
+    """Temp file + rename; nothing is left behind on failure."""
+
+    def test_save_npz_atomic_round_trip(self, tmp_path: Path) -> None:
+        path = tmp_path / "sub" / "entry.npz"
+        save_npz_atomic(path, a=np.arange(3), name=np.asarray("x"))
+        with np.load(path) as data:
+            np.testing.assert_array_equal(data["a"], np.arange(3))
+            assert str(data["name"]) == "x"
+        assert os.listdir(path.parent) == ["entry.npz"]
+
+    def test_failed_write_keeps_previous_file(self, tmp_path: Path) -> None:
+        path = tmp_path / "store" / "entry.npz"
+        save_npz_atomic(path, a=np.zeros(2))
+        with pytest.raises(RuntimeError):
+            with atomic_path(path) as tmp:
+                tmp.write_bytes(b"partial")
+                raise RuntimeError("interrupted")
+        assert os.listdir(path.parent) == ["entry.npz"]
+        with np.load(path) as data:
+            np.testing.assert_array_equal(data["a"], np.zeros(2))
+
+
+def test_source_stamp_changes_with_file(tmp_path: Path) -> None:
+    path = tmp_path / "A.npy"
+    np.save(path, np.zeros(4))
+    name, size, mtime_ns = source_stamp(path)
+    assert (name, size) == ("A.npy", path.stat().st_size)
+    np.save(path, np.zeros(8))
+    os.utime(path, ns=(1, 1))
+    assert source_stamp(path) != (name, size, mtime_ns)
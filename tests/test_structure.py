@@ -0,0 +1,138 @@
+"""Tests for bar-level self-similarity, checkerboard novelty and the structure pipeline."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from dijon.beats import label_bars_and_beats
+from dijon.pipeline.structure import STRUCTURE_DTYPE, run_structure
+from dijon.structure import (
+    checkerboard_kernel,
+    checkerboard_novelty,
+    novelty_boundaries,
+    self_similarity,
+    ssm_band,
+    unit_features,
+)
+
+CHROMA_NAME = "T_chromagram_metric_cqt_256-180.0-mean-preserve-rms-1.0-2.npy"
+
+
+def _two_section_track(bars_a: int = 16, bars_b: int = 16) -> tuple[np.ndarray, np.ndarray]:
+    """C_metric (4 bins per beat at 120 BPM, 4/4) with a chord change after bars_a bars."""
+    n_beats = 4 * (bars_a + bars_b) + 1
+    meter_map = label_bars_and_beats(0.5 + 0.5 * np.arange(n_beats), 0.5, 4)
+    rng = np.random.default_rng(0)
+    C = 0.05 * rng.random((12, 4 * (n_beats - 1))).astype(np.float32)
+    split = 16 * bars_a
+    C[[0, 4, 7], :split] += 1.0
+    C[[2, 6, 9], split:] += 1.0
+    return C, meter_map
+
+
+def _dense_novelty(F: np.ndarray, L: int) -> np.ndarray:
+    """Reference: kernel slid over the zero-padded dense SSM."""
+    S = np.pad(self_similarity(F).astype(np.float64), L)
+    kernel = checkerboard_kernel(L)
+    K = F.shape[1]
+    out = np.array([np.sum(S[n : n + 2 * L, n : n + 2 * L] * kernel) for n in range(K)])
+    out[:L] = 0.0
+    out[K - L + 1 :] = 0.0
+    return out
+
+
+class TestMethods:
+    def test_unit_features_pool_bars_and_beats(self) -> None:
+        C, meter_map = _two_section_track(2, 2)
+        F_bar, first_beat = unit_features(C, meter_map, bpm_threshold=180.0)
+        assert F_bar.shape == (12, 4)
+        np.testing.assert_array_equal(first_beat, [0, 4, 8, 12])
+        np.testing.assert_allclose(F_bar[:, 0], C[:, :16].mean(axis=1), rtol=1e-6)
+        F_beat, _ = unit_features(C, meter_map, bpm_threshold=180.0, unit="beat")
+        assert F_beat.shape == (12, 16)
+
+    def test_unit_features_rejects_wrong_bpm_threshold(self) -> None:
+        C, meter_map = _two_section_track(2, 2)
+        with pytest.raises(ValueError, match="columns"):
+            unit_features(C, meter_map, bpm_threshold=100.0)
+
+    def test_ssm_band_matches_dense_diagonals(self) -> None:
+        F = np.random.default_rng(1).random((12, 50))
+        S = self_similarity(F)
+        band = ssm_band(F, width=3, block=7)
+        for r in range(-3, 4):
+            np.testing.assert_allclose(
+                band[max(0, -r) : 50 - max(0, r), 3 + r], np.diagonal(S, r), atol=1e-6
+            )
+        assert band[0, 0] == 0.0 and band[-1, -1] == 0.0
+
+    @pytest.mark.parametrize("L", [1, 4, 8])
+    def test_banded_novelty_matches_dense_kernel(self, L: int) -> None:
+        F = np.random.default_rng(2).random((12, 120))
+        np.testing.assert_allclose(
+            checkerboard_novelty(F, L=L, block=32), _dense_novelty(F, L), atol=1e-6
+        )
+
+    def test_boundary_at_section_change(self) -> None:
+        C, meter_map = _two_section_track()
+        F, _ = unit_features(C, meter_map, bpm_threshold=180.0)
+        peaks = novelty_boundaries(checkerboard_novelty(F, L=4), min_distance=4, threshold=0.5)
+        np.testing.assert_array_equal(peaks, [16])
+
+
+class TestRunStructure:
+    def test_writes_boundaries(self, tmp_path: Path) -> None:
+        C, meter_map = _two_section_track()
+        chroma_dir, meter_dir, out_dir = tmp_path / "chromagram", tmp_path / "meter", tmp_path / "out"
+        chroma_dir.mkdir()
+        meter_dir.mkdir()
+        np.save(chroma_dir / CHROMA_NAME, C)
+        np.save(meter_dir / "T_meter.npy", meter_map)
+
+        result = run_structure(
+            chromagram_files=["T"],
+            chromagram_dir=chroma_dir,
+            meter_dir=meter_dir,
+            output_dir=out_dir,
+            kernel_size=4,
+            threshold=0.5,
+        )
+        assert result["success"], result
+        [item] = result["items"]
+        assert item["output"] == "T_structure_metric_cqt_256-180.0-mean-preserve-rms-1.0-2-bar-4-0.5.npy"
+        assert item["sections"] == 2
+        boundaries = np.load(out_dir / item["output"])
+        assert boundaries.dtype == STRUCTURE_DTYPE
+        assert boundaries["bar"].tolist() == [17]
+        assert boundaries["beat"].tolist() == [1]
+        assert boundaries["time_sec"][0] == pytest.approx(0.5 + 0.5 * 64)
+
+    def test_chromagram_variants_write_separate_outputs(self, tmp_path: Path) -> None:
+        C, meter_map = _two_section_track()
+        chroma_dir, meter_dir, out_dir = tmp_path / "chromagram", tmp_path / "meter", tmp_path / "out"
+        chroma_dir.mkdir()
+        meter_dir.mkdir()
+        np.save(chroma_dir / CHROMA_NAME, C)
+        np.save(chroma_dir / CHROMA_NAME.replace("-rms-", "-none-"), C)
+        np.save(meter_dir / "T_meter.npy", meter_map)
+
+        result = run_structure(chromagram_dir=chroma_dir, meter_dir=meter_dir, output_dir=out_dir, kernel_size=4)
+        assert result["succeeded"] == 2, result
+        assert len({item["output"] for item in result["items"]}) == 2
+        assert len(list(out_dir.glob("T_structure_*.npy"))) == 2
+
+    def test_missing_meter_map_is_skipped(self, tmp_path: Path) -> None:
+        C, _ = _two_section_track(2, 2)
+        np.save(tmp_path / CHROMA_NAME, C)
+        result = run_structure(
+            chromagram_files=[tmp_path / CHROMA_NAME], meter_dir=tmp_path, output_dir=tmp_path
+        )
+        assert result["skipped"] == 1
+
+    def test_invalid_unit_fails(self) -> None:
+        result = run_structure(unit="phrase")
+        assert not result["success"]
+        assert "unit" in result["message"]
@@ -5,21 +5,37 @@ from __future__ import annotations
 import time
 from pathlib import Path
 
+import numba
 import numpy as np
 import pytest
 
+from dijon.tempogram import methods as tempogram_methods
 from dijon.tempogram import (
     compute_cyclic_tempogram,
     compute_tempogram_autocorr,
     compute_tempogram_fourier,
+    compute_tempogram_fourier_parallel,
+)
+from dijon.tempogram.profile import (
+    coarse_tempo_grid,
+    compute_tempo_profile_fourier,
+    compute_tempogram_fourier_adaptive,
+    load_tempo_profile,
+    tempo_profiles_from_tempogram,
+)
+from dijon.tempogram.storage import (
+    decimate_frames,
+    load_tempogram_meta,
+    mean_abs_over_time,
+    open_tempogram,
 )
 from dijon.pipeline.tempogram import (
     FS_NOVELTY,
     TEMPOGRAM_DEFAULTS,
     _output_filename,
-    _resolve_novelty_files,
-    _track_name_from_novelty_stem,
+    resolve_novelty_files,
     run_tempogram,
+    track_name_from_novelty_stem,
 )
 
 
@@ -27,35 +43,39 @@ class TestTempogramHelpers:
     """Unit tests for pipeline helpers."""
 
     def test_track_name_from_novelty_stem(self) -> None:
-        assert _track_name_from_novelty_stem("YTB-001_novelty_spectrum_1024-256-100.0-10") == "YTB-001"
-        assert _track_name_from_novelty_stem("stem") == "stem"
+        assert track_name_from_novelty_stem("YTB-001_novelty_spectrum_1024-256-100.0-10") == "YTB-001"
+        assert track_name_from_novelty_stem("stem") == "stem"
 
     def test_output_filename_format(self) -> None:
         name = _output_filename("YTB-001", "fourier", 500, 1, 40, 320)
         assert name == "YTB-001_tempogram_fourier_500-1-40-320.npy"
 
+    def test_output_filename_storage_tag(self) -> None:
+        name = _output_filename("YTB-001", "fourier", 512, 1, 40, 320, "float16-d10")
+        assert name == "YTB-001_tempogram_fourier_512-1-40-320_float16-d10.npy"
+
     def test_resolve_novelty_files_explicit(self, tmp_path: Path) -> None:
         a = tmp_path / "a.npy"
         a.touch()
-        got = _resolve_novelty_files([a], tmp_path)
+        got = resolve_novelty_files([a], tmp_path)
         assert len(got) == 1
         assert got[0].name == "a.npy"
 
     def test_resolve_novelty_files_default_folder(self, tmp_path: Path) -> None:
         (tmp_path / "one.npy").touch()
         (tmp_path / "two.npy").touch()
-        got = _resolve_novelty_files(None, tmp_path)
+        got = resolve_novelty_files(None, tmp_path)
         assert len(got) == 2
         assert {p.name for p in got} == {"one.npy", "two.npy"}
 
     def test_resolve_novelty_files_empty(self, tmp_path: Path) -> None:
-        assert _resolve_novelty_files(None, tmp_path) == []
+        assert resolve_novelty_files(None, tmp_path) == []
 
     def test_resolve_novelty_files_shorthand_track_id(self, tmp_path: Path) -> None:
         nov_dir = tmp_path / "novelty"
         nov_dir.mkdir()
         (nov_dir / "YTB-014_novelty_spectrum_1024-256-100.0-10.npy").touch()
-        got = _resolve_novelty_files([Path("YTB-014")], nov_dir)
+        got = resolve_novelty_files([Path("YTB-014")], nov_dir)
         assert len(got) == 1
         assert got[0].name == "YTB-014_novelty_spectrum_1024-256-100.0-10.npy"
 
@@ -65,7 +85,7 @@ class TestTempogramHelpers:
         (nov_dir / "YTB-014_novelty_spectrum_1024-256-100.0-10.npy").touch()
         (nov_dir / "YTB-014_novelty_energy_2048-512-10.0-0.npy").touch()
         with pytest.raises(ValueError, match="Ambiguous shorthand"):
-            _resolve_novelty_files([Path("YTB-014")], nov_dir)
+            resolve_novelty_files([Path("YTB-014")], nov_dir)
 
     def test_resolve_novelty_files_explicit_path_preserved(self, tmp_path: Path) -> None:
         nov_dir = tmp_path / "novelty"
@@ -74,7 +94,7 @@ class TestTempogramHelpers:
         other_dir.mkdir()
         explicit = other_dir / "custom.npy"
         explicit.touch()
-        got = _resolve_novelty_files([explicit], nov_dir)
+        got = resolve_novelty_files([explicit], nov_dir)
         assert len(got) == 1
         assert got[0].name == "custom.npy"
         assert got[0].parent == other_dir.resolve()
@@ -185,6 +205,207 @@ class TestRunTempogram:
         arr = np.load(out_file)
         assert arr.ndim == 2
 
+    def test_run_tempogram_multi_type_single_pass(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Comma-separated types write every output; fourier is computed once for cyclic."""
+        import dijon.pipeline.tempogram as tempogram_pipeline
+
+        nov_dir = tmp_path / "novelty"
+        out_dir = tmp_path / "out"
+        nov_dir.mkdir()
+        nov = np.clip(np.random.randn(500).astype(np.float64) * 0.1 + 0.5, 0, 1)
+        np.save(nov_dir / "stem.npy", nov)
+
+        calls: list[int] = []
+        real_fourier = tempogram_pipeline.compute_tempogram_fourier
+
+        def counting_fourier(*args, **kwargs):
+            calls.append(1)
+            return real_fourier(*args, **kwargs)
+
+        monkeypatch.setattr(tempogram_pipeline, "compute_tempogram_fourier", counting_fourier)
+
+        result = run_tempogram(
+            novelty_files=[nov_dir / "stem.npy"],
+            output_dir=out_dir,
+            novelty_dir=nov_dir,
+            ntype="fourier,cyclic,autocorr",
+            N=100,
+            H=10,
+            dry_run=False,
+        )
+
+        assert result["success"] is True
+        assert result["total"] == 3
+        assert result["succeeded"] == 3
+        assert len(calls) == 1
+        assert [item["tempogram_type"] for item in result["items"]] == ["fourier", "cyclic", "autocorr"]
+        for ttype in ("fourier", "cyclic", "autocorr"):
+            assert (out_dir / f"stem_tempogram_{ttype}_100-10-40-320.npy").exists()
+
+        X, _T, F_coef = real_fourier(nov, FS_NOVELTY, 100, 10, np.arange(40, 321, dtype=float))
+        expected_cyclic, _scale = compute_cyclic_tempogram(np.abs(X), F_coef)
+        np.testing.assert_allclose(
+            np.load(out_dir / "stem_tempogram_cyclic_100-10-40-320.npy"), expected_cyclic
+        )
+
+    def test_run_tempogram_compact_storage_roundtrip(self, tmp_path: Path) -> None:
+        """float16 + decimation writes a tagged file with a metadata sidecar readable via mmap."""
+        nov_dir = tmp_path / "novelty"
+        out_dir = tmp_path / "out"
+        nov_dir.mkdir()
+        nov = np.clip(np.random.randn(500).astype(np.float64) * 0.1 + 0.5, 0, 1)
+        np.save(nov_dir / "stem.npy", nov)
+        common = dict(
+            novelty_files=[nov_dir / "stem.npy"],
+            output_dir=out_dir,
+            novelty_dir=nov_dir,
+            ntype="fourier",
+            N=100,
+            H=2,
+            theta_min=60,
+            theta_max=120,
+        )
+
+        full = run_tempogram(**common)
+        compact = run_tempogram(**common, dtype="float16", decimate=5)
+
+        assert full["success"] is True and compact["success"] is True
+        out_file = out_dir / "stem_tempogram_fourier_100-2-60-120_float16-d5.npy"
+        assert compact["items"][0]["output"] == out_file.name
+        assert compact["items"][0]["dtype"] == "float16"
+
+        meta = load_tempogram_meta(out_file)
+        assert meta is not None
+        assert meta["H"] == 2 and meta["decimate"] == 5
+        assert meta["fs"] == pytest.approx(100.0)
+        assert meta["frame_rate_hz"] == pytest.approx(10.0)
+        assert meta["theta"] == [float(t) for t in range(60, 121)]
+        assert meta["source_novelty"] == "stem.npy"
+
+        arr = open_tempogram(out_file)
+        assert isinstance(arr, np.memmap)
+        assert arr.dtype == np.float16
+        ref = np.load(out_dir / "stem_tempogram_fourier_100-2-60-120.npy")
+        assert arr.shape == (61, -(-ref.shape[1] // 5))
+        np.testing.assert_allclose(
+            mean_abs_over_time(arr, chunk_frames=7), decimate_frames(ref, 5).mean(axis=1), rtol=2e-3
+        )
+
+    def test_run_tempogram_invalid_storage_fails(self, tmp_path: Path) -> None:
+        result = run_tempogram(novelty_files=[], output_dir=tmp_path, dtype="int8")
+        assert result["success"] is False
+        assert "Invalid storage" in result["message"]
+
+    def test_decimate_frames_block_means_with_partial_tail(self) -> None:
+        arr = np.arange(14, dtype=np.float64).reshape(2, 7)
+        out = decimate_frames(arr, 3)
+        np.testing.assert_allclose(out, [[1.0, 4.0, 6.0], [8.0, 11.0, 13.0]])
+
+    def test_run_tempogram_emit_profile_only(self, tmp_path: Path) -> None:
+        """emit=profile writes only the profile .npz; it matches the full tempogram's mean."""
+        nov_dir = tmp_path / "novelty"
+        out_dir = tmp_path / "out"
+        nov_dir.mkdir()
+        nov = np.clip(np.random.randn(800).astype(np.float64) * 0.1 + 0.5, 0, 1)
+        np.save(nov_dir / "stem.npy", nov)
+
+        result = run_tempogram(
+            novelty_files=[nov_dir / "stem.npy"],
+            output_dir=out_dir,
+            novelty_dir=nov_dir,
+            ntype="fourier",
+            N=100,
+            H=2,
+            theta_min=60,
+            theta_max=120,
+            emit="profile",
+            profile_window_sec=2.0,
+        )
+
+        assert result["success"] is True
+        assert result["items"][0]["output"] == "stem_tempogram_fourier_100-2-60-120_profile.npz"
+        assert not (out_dir / "stem_tempogram_fourier_100-2-60-120.npy").exists()
+        profile = load_tempo_profile(out_dir / "stem_tempogram_fourier_100-2-60-120_profile.npz")
+        assert profile["type"] == "fourier" and profile["H"] == 2
+        assert profile["source_novelty"] == "stem.npy"
+
+        Theta = np.arange(60, 121, dtype=float)
+        X, _T, _F = compute_tempogram_fourier(nov, FS_NOVELTY, 100, 2, Theta)
+        np.testing.assert_allclose(profile["axis"], Theta)
+        np.testing.assert_allclose(profile["global_profile"], np.abs(X).mean(axis=1), rtol=1e-10)
+        assert profile["windowed_profile"].shape == (61, -(-X.shape[1] // 100))
+        np.testing.assert_allclose(profile["window_times_sec"][:2], [0.0, 2.0])
+
+    def test_run_tempogram_adaptive_writes_refined_rows_and_dense_profile(self, tmp_path: Path) -> None:
+        nov_dir = tmp_path / "novelty"
+        out_dir = tmp_path / "out"
+        nov_dir.mkdir()
+        rng = np.random.default_rng(0)
+        t = np.arange(1500) / 100.0
+        nov = 0.5 + 0.5 * np.cos(2 * np.pi * 2.5 * t) + 0.05 * rng.random(1500)  # 150 BPM
+        np.save(nov_dir / "stem.npy", nov)
+
+        result = run_tempogram(
+            novelty_files=[nov_dir / "stem.npy"],
+            output_dir=out_dir,
+            novelty_dir=nov_dir,
+            ntype="adaptive",
+            N=256,
+            H=4,
+            emit="both",
+        )
+
+        assert result["success"] is True
+        item = result["items"][0]
+        assert item["output"] == "stem_tempogram_adaptive_256-4-40-320.npy"
+        assert item["profile_output"] == "stem_tempogram_adaptive_256-4-40-320_profile.npz"
+        meta = load_tempogram_meta(out_dir / item["output"])
+        assert meta is not None
+        assert len(meta["theta"]) == item["tempo_bin_count"] < 281
+        assert 150.0 in meta["theta"]
+        profile = load_tempo_profile(out_dir / item["profile_output"])
+        assert profile["axis"].shape == (281,)
+        assert profile["axis"][np.argmax(profile["global_profile"])] == 150.0
+
+    def test_run_tempogram_threads_matches_serial(self, tmp_path: Path) -> None:
+        nov_dir = tmp_path / "novelty"
+        nov_dir.mkdir()
+        np.random.seed(3)
+        np.save(nov_dir / "stem.npy", np.random.rand(400))
+
+        before = numba.get_num_threads()
+        outputs = {}
+        for threads in (1, 2):
+            out_dir = tmp_path / f"out{threads}"
+            result = run_tempogram(
+                novelty_files=[nov_dir / "stem.npy"],
+                output_dir=out_dir,
+                novelty_dir=nov_dir,
+                ntype="fourier,cyclic",
+                N=64,
+                H=4,
+                emit="both",
+                threads=threads,
+            )
+            assert result["success"] is True
+            assert numba.get_num_threads() == before
+            outputs[threads] = out_dir
+
+        for name in (
+            "stem_tempogram_fourier_64-4-40-320.npy",
+            "stem_tempogram_cyclic_64-4-40-320.npy",
+        ):
+            np.testing.assert_allclose(
+                np.load(outputs[2] / name), np.load(outputs[1] / name), rtol=1e-12
+            )
+
+    def test_run_tempogram_negative_threads_fails(self, tmp_path: Path) -> None:
+        result = run_tempogram(novelty_files=[], output_dir=tmp_path, threads=-1)
+        assert result["success"] is False
+        assert "Invalid threads" in result["message"]
+
     def test_run_tempogram_unknown_type_fails(self, tmp_path: Path) -> None:
         result = run_tempogram(
             novelty_files=[],
@@ -351,6 +572,118 @@ class TestComputeTempogramFourier:
         np.testing.assert_allclose(X_opt.real, X_ref.real, rtol=1e-10, atol=1e-10)
         np.testing.assert_allclose(X_opt.imag, X_ref.imag, rtol=1e-10, atol=1e-10)
 
+    def test_parallel_matches_serial(self) -> None:
+        """prange variant returns the same tempogram and axes as the serial one."""
+        np.random.seed(7)
+        x = np.random.rand(300)
+        Theta = np.arange(40, 201, dtype=float)
+
+        X_ser, T_ser, F_ser = compute_tempogram_fourier(x, 100.0, 128, 4, Theta)
+        X_par, T_par, F_par = compute_tempogram_fourier_parallel(x, 100.0, 128, 4, Theta)
+
+        np.testing.assert_array_equal(X_par, X_ser)
+        np.testing.assert_array_equal(T_par, T_ser)
+        np.testing.assert_array_equal(F_par, F_ser)
+
+
+def _autocorr_tempogram_reference(
+    x: np.ndarray, Fs: float, N: int, H: int, Theta: np.ndarray, norm_sum: bool
+) -> np.ndarray:
+    """Reference implementation (per-frame np.correlate + interp1d) for equivalence testing."""
+    from scipy.interpolate import interp1d
+
+    L_left = round(N / 2)
+    x_pad = np.concatenate((np.zeros(L_left), x, np.zeros(L_left)))
+    M = int(np.floor(len(x_pad) - N) / H) + 1
+    A = np.empty((N, M))
+    for n in range(M):
+        x_local = x_pad[n * H : n * H + N]
+        r_xx = np.correlate(x_local, x_local, mode="full")[N - 1 :]
+        A[:, n] = r_xx / np.arange(N, 0, -1) if norm_sum else r_xx
+    lag_min = int(np.ceil(Fs * 60 / Theta[-1]))
+    lag_max = int(np.ceil(Fs * 60 / Theta[0]))
+    F_coef_BPM_cut = 60 / (np.arange(N) / Fs)[lag_min : lag_max + 1]
+    return interp1d(
+        F_coef_BPM_cut, A[lag_min : lag_max + 1, :], kind="linear", axis=0, fill_value="extrapolate"
+    )(Theta)
+
+
+class TestTempoProfile:
+    """Unit tests for tempo-profile reductions."""
+
+    def test_profile_from_novelty_matches_tempogram_reduction(self) -> None:
+        """Chunked-from-novelty profiles equal reductions of the full tempogram."""
+        np.random.seed(3)
+        x = np.clip(np.random.randn(700).astype(np.float64) * 0.1 + 0.5, 0, 1)
+        Fs, N, H = 100.0, 128, 3
+        Theta = np.arange(50, 181, dtype=float)
+
+        X, _T, _F = compute_tempogram_fourier(x, Fs, N, H, Theta)
+        ref = tempo_profiles_from_tempogram(np.abs(X), frame_rate_hz=Fs / H, window_sec=1.0)
+        got = compute_tempo_profile_fourier(x, Fs, N, H, Theta, window_sec=1.0, chunk_frames=50)
+
+        for a, b in zip(got, ref):
+            np.testing.assert_allclose(a, b, rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose(ref[0], np.abs(X).mean(axis=1), rtol=1e-12)
+
+
+class TestAdaptiveTempogram:
+    """Unit tests for the coarse-to-fine Fourier tempogram."""
+
+    def test_coarse_grid_is_log_spaced_and_spans_range(self) -> None:
+        grid = coarse_tempo_grid(40, 320, 12)
+        assert grid[0] == pytest.approx(40) and grid[-1] == pytest.approx(320)
+        assert len(grid) == 37
+        np.testing.assert_allclose(np.diff(np.log2(grid)), 1 / 12)
+
+    def test_adaptive_refines_around_dominant_tempo(self) -> None:
+        """Refined rows equal the full tempogram rows and the dense peak matches."""
+        np.random.seed(11)
+        x = np.random.rand(2000) * 0.2
+        x[::50] += 1.0  # 120 BPM pulse
+        Fs, N, H = 100.0, 256, 4
+        Theta = np.arange(40, 321, dtype=float)
+
+        mag_fine, Theta_fine, (global_dense, windowed, times) = compute_tempogram_fourier_adaptive(
+            x, Fs, N, H, Theta, window_sec=5.0
+        )
+        X, _T, _F = compute_tempogram_fourier(x, Fs, N, H, Theta)
+        full = np.abs(X)
+
+        assert 0 < len(Theta_fine) < len(Theta) // 2
+        assert 120.0 in Theta_fine
+        rows = np.searchsorted(Theta, Theta_fine)
+        np.testing.assert_allclose(mag_fine, full[rows], rtol=1e-9, atol=1e-9)
+        np.testing.assert_allclose(global_dense[rows], full[rows].mean(axis=1), rtol=1e-9)
+        assert Theta[np.argmax(global_dense)] == Theta[np.argmax(full.mean(axis=1))]
+        assert global_dense.shape == (len(Theta),)
+        assert windowed.shape == (len(Theta), len(times))
+
+
+class TestComputeTempogramAutocorr:
+    """Unit tests for the batched autocorrelation tempogram."""
+
+    @pytest.mark.parametrize("norm_sum", [False, True])
+    def test_autocorr_matches_reference_across_blocks(
+        self, monkeypatch: pytest.MonkeyPatch, norm_sum: bool
+    ) -> None:
+        """Batched FFT result matches per-frame correlation, including block seams."""
+        monkeypatch.setattr(tempogram_methods, "_AUTOCORR_BLOCK_FRAMES", 7)
+        np.random.seed(7)
+        x = np.clip(np.random.randn(400).astype(np.float64) * 0.1 + 0.5, 0, 1)
+        Fs, N, H = 100.0, 200, 3
+        Theta = np.arange(40, 201, dtype=float)
+
+        out, T_coef, F_coef = compute_tempogram_autocorr(
+            x, Fs, N, H, norm_sum=norm_sum, Theta=Theta
+        )
+        ref = _autocorr_tempogram_reference(x, Fs, N, H, Theta, norm_sum)
+
+        assert out.shape == ref.shape
+        assert len(T_coef) == out.shape[1]
+        np.testing.assert_allclose(F_coef, Theta)
+        np.testing.assert_allclose(out, ref, rtol=1e-9, atol=1e-9)
+
 
 class TestTempogramBenchmark:
     """Lightweight runtime benchmarks for fourier/autocorr/cyclic tempogram."""
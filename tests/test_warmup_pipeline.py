@@ -0,0 +1,94 @@
+"""Tests for numba warm-up pipeline."""
+
+from __future__ import annotations
+
+import importlib
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from dijon.pipeline.tempogram import run_tempogram
+from dijon.pipeline.warmup import JIT_KERNELS, run_warmup, warm_kernel
+
+
+class TestRunWarmup:
+    """Tests for run_warmup and warm_kernel."""
+
+    def test_run_warmup_all_kernels_reports_compile_and_run(self) -> None:
+        result = run_warmup()
+        assert result["success"] is True
+        assert result["total"] == len(JIT_KERNELS)
+        assert [item["item"] for item in result["items"]] == list(JIT_KERNELS)
+        for item in result["items"]:
+            assert item["compile_s"] >= 0.0
+            assert item["run_s"] >= 0.0
+            assert item["source"] in {"cache", "compiled", "memory"}
+        assert result["compile_s"] >= 0.0
+
+    def test_warm_kernel_second_call_is_in_memory(self) -> None:
+        warm_kernel("tempogram.fourier")
+        assert warm_kernel("tempogram.fourier")["source"] == "memory"
+
+    def test_run_warmup_unknown_kernel_fails(self) -> None:
+        result = run_warmup(kernels=["tempogram.fourier", "nope"])
+        assert result["success"] is False
+        assert "Unknown kernel" in result["message"]
+        assert result["items"] == []
+
+    def test_run_tempogram_reports_compile_separately(self, tmp_path: Path) -> None:
+        nov_dir = tmp_path / "novelty"
+        nov_dir.mkdir()
+        np.save(nov_dir / "stem.npy", np.random.rand(200))
+
+        result = run_tempogram(
+            novelty_files=[nov_dir / "stem.npy"],
+            output_dir=tmp_path / "out",
+            novelty_dir=nov_dir,
+            N=64,
+            H=4,
+        )
+
+        assert result["success"] is True
+        assert result["compile_s"] >= 0.0
+        assert result["elapsed_s"] >= 0.0
+
+
+class TestLazyRegistry:
+    """The kernel registry does not import kernel modules."""
+
+    def test_tempogram_pipeline_import_does_not_load_librosa(self) -> None:
+        src_dir = Path(__file__).resolve().parents[1] / "src"
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(src_dir), env.get("PYTHONPATH")]))
+        code = (
+            "import sys\n"
+            "import dijon.pipeline.tempogram\n"
+            "import dijon.pipeline.beats\n"
+            "print('loaded:', [m for m in ('librosa', 'dijon.chromagram.methods', "
+            "'dijon.harmony.methods', 'dijon.alignment.methods') if m in sys.modules])\n"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True
+        ).stdout.strip().splitlines()
+        assert out[-1] == "loaded: []"
+
+    def test_every_registered_kernel_resolves(self) -> None:
+        for name, (target, _) in JIT_KERNELS.items():
+            module, attr = target.split(":")
+            assert hasattr(importlib.import_module(module), attr), name
+
+    def test_sample_args_do_not_run_other_kernels(self) -> None:
+        from dijon.alignment.methods import _dtw_band
+        from dijon.pipeline.warmup import _backtrack_sample_args, _dispatcher, _dtw_band_sample_args
+
+        before = {name: len(_dispatcher(name).overloads) for name in JIT_KERNELS}
+        for _, sample_args in JIT_KERNELS.values():
+            sample_args()
+        assert {name: len(_dispatcher(name).overloads) for name in JIT_KERNELS} == before
+        D, lo, hi = _backtrack_sample_args()
+        expected = _dtw_band(*_dtw_band_sample_args())
+        assert (D.shape, D.dtype) == (expected.shape, expected.dtype)
+        np.testing.assert_array_equal(lo, _dtw_band_sample_args()[3])